@@ -4,7 +4,8 @@ from pathlib import Path
 from typing import Dict, Optional
 
 import platformdirs
-from pydantic import BaseModel, BaseSettings, Field, root_validator
+from pydantic import BaseModel, Field, root_validator
+from pydantic_settings import BaseSettings
 
 
 class UserProfile(BaseModel):
@@ -108,3 +109,7 @@ class Config(BaseSettings):
 
 
 config = Config()
+
+# Module-level shortcuts for the settings other modules import directly
+PROJ_DIR = config.PROJ_DIR
+APPDIR = config.APPDIR
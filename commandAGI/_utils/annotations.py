@@ -1,22 +1,98 @@
 import functools
+import weakref
+from typing import Any, Dict, List
+
+# Attribute of annotated functions holding all their annotations by key
+_ANNOTATIONS_ATTR = "__commandagi_annotations__"
+
+# class -> {attribute name: {annotation key: annotation value}}
+_registry: "weakref.WeakKeyDictionary[type, Dict[str, Dict[str, Any]]]" = (
+    weakref.WeakKeyDictionary()
+)
 
 
 def annotation(key, value):
     def decorator(func):
+        if isinstance(func, property):
+            # Annotate the getter and keep the property a property
+            return property(decorator(func.fget), func.fset, func.fdel, func.__doc__)
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             return func(*args, **kwargs)
 
         setattr(wrapper, key, value)
+        setattr(
+            wrapper,
+            _ANNOTATIONS_ATTR,
+            {**getattr(func, _ANNOTATIONS_ATTR, {}), key: value},
+        )
         return wrapper
 
     return decorator
 
 
-def gather_annotated_attr_keys(obj, annotation_key):
-    annotated_attrs_keys = []
-    for attr_key in dir(obj):
-        attr_value = getattr(obj, attr_key)
-        if hasattr(attr_value, annotation_key):
-            annotated_attrs_keys.append(attr_key)
-    return annotated_attrs_keys
+def _annotations_of(attr: Any) -> Dict[str, Any]:
+    if isinstance(attr, property):
+        attr = attr.fget
+    elif isinstance(attr, (staticmethod, classmethod)):
+        attr = attr.__func__
+    return getattr(attr, _ANNOTATIONS_ATTR, None) or {}
+
+
+def register_annotations(cls: type) -> Dict[str, Dict[str, Any]]:
+    """Collect the annotated attributes of a class into the registry.
+
+    Only the class dictionaries along the MRO are read, so properties are
+    never evaluated. An attribute overridden without an annotation isn't
+    annotated, just like it wouldn't be when looked up on an instance.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: The annotations of every annotated
+            attribute, by attribute name
+    """
+    annotated = {}
+    for klass in reversed(cls.__mro__):
+        for attr_key, attr in vars(klass).items():
+            annotations = _annotations_of(attr)
+            if annotations:
+                annotated[attr_key] = annotations
+            else:
+                annotated.pop(attr_key, None)
+    _registry[cls] = annotated
+    return annotated
+
+
+def class_annotations(obj) -> Dict[str, Dict[str, Any]]:
+    """Get the annotated attributes of a class or instance, by name.
+
+    The result is built once per class and shared; don't modify it.
+
+    Examples:
+        >>> class Computer:
+        ...     @annotation("mcp_tool", {})
+        ...     def wait(self): ...
+        ...     @annotation("endpoint", {"use_getter": True})
+        ...     @property
+        ...     def screenshot(self): raise RuntimeError("captured")
+        >>> class_annotations(Computer())
+        {'wait': {'mcp_tool': {}}, 'screenshot': {'endpoint': {'use_getter': True}}}
+    """
+    cls = obj if isinstance(obj, type) else type(obj)
+    annotated = _registry.get(cls)
+    if annotated is None:
+        annotated = register_annotations(cls)
+    return annotated
+
+
+def gather_annotated_attrs(obj, annotation_key) -> Dict[str, Dict[str, Any]]:
+    """Get the annotations of the attributes annotated with annotation_key."""
+    return {
+        attr_key: annotations
+        for attr_key, annotations in sorted(class_annotations(obj).items())
+        if annotation_key in annotations
+    }
+
+
+def gather_annotated_attr_keys(obj, annotation_key) -> List[str]:
+    return list(gather_annotated_attrs(obj, annotation_key))
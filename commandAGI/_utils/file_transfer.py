@@ -0,0 +1,270 @@
+"""Building blocks of the daemon's file transfer protocol.
+
+Files move between RemoteComputer and the daemon in chunks of CHUNK_SIZE
+bytes. Each chunk is compressed on its own and travels with the SHA-256 of its
+uncompressed bytes, so a corrupted chunk is detected and sent again. Until a
+transfer is complete, the receiving side writes into a partial file next to
+the destination, named after the version (size and mtime) of the source. An
+interrupted transfer can resume from the chunks already there, and a partial
+file of an older version of the source is never resumed.
+
+Directories travel as one compressed tar stream instead.
+"""
+
+import hashlib
+import os
+import queue
+import re
+import tarfile
+import threading
+import zlib
+from pathlib import Path
+from typing import Iterable, Iterator, List, Literal, Optional
+
+CHUNK_SIZE = 8 << 20
+
+# What file_version() returns, <size>-<mtime>
+_FILE_VERSION = re.compile(r"[0-9]+-[0-9]+")
+
+Compression = Literal["none", "gzip", "zstd"]
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class FileChangedError(RuntimeError):
+    """Raised when a file changed while it was being read in chunks."""
+
+
+def available_compressions() -> List[Compression]:
+    """The compressions supported here, the preferred one first."""
+    return (["zstd"] if zstandard is not None else []) + ["gzip", "none"]
+
+
+class _Passthrough:
+    def compress(self, data: bytes) -> bytes:
+        return data
+
+    decompress = compress
+
+    def flush(self) -> bytes:
+        return b""
+
+
+def compressor(compression: Compression):
+    """A streaming compressor with compress(data) and flush() methods."""
+    if compression == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd compression needs the zstandard package")
+        return zstandard.ZstdCompressor().compressobj()
+    if compression == "gzip":
+        return zlib.compressobj(wbits=31)
+    return _Passthrough()
+
+
+def decompressor(compression: Compression):
+    """A streaming decompressor with a decompress(data) method."""
+    if compression == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd compression needs the zstandard package")
+        return zstandard.ZstdDecompressor().decompressobj()
+    if compression == "gzip":
+        return zlib.decompressobj(wbits=31)
+    return _Passthrough()
+
+
+def compress(data: bytes, compression: Compression) -> bytes:
+    """Compress a whole chunk.
+
+    Examples:
+        >>> data = b"commandAGI " * 100
+        >>> len(compress(data, "gzip")) < len(data)
+        True
+        >>> decompress(compress(data, "gzip"), "gzip") == data
+        True
+    """
+    stream = compressor(compression)
+    return stream.compress(data) + stream.flush()
+
+
+def decompress(data: bytes, compression: Compression) -> bytes:
+    """Decompress a whole chunk."""
+    return decompressor(compression).decompress(data)
+
+
+def sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_version(path: Path) -> str:
+    """A string that changes whenever the file at path is modified."""
+    stat = path.stat()
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def is_file_version(version: str) -> bool:
+    """Whether version has the form of a file_version().
+
+    Examples:
+        >>> is_file_version("1024-1700000000000000000"), is_file_version("1/2")
+        (True, False)
+    """
+    return _FILE_VERSION.fullmatch(version) is not None
+
+
+def partial_path(path: Path, version: str) -> Path:
+    """Where a transfer of the given version of a file into path is kept
+    until it's complete.
+
+    Raises:
+        ValueError: If version isn't a file_version(), since it becomes part
+            of a file name
+
+    Examples:
+        >>> partial_path(Path("/data/model.bin"), "1024-17").as_posix()
+        '/data/.model.bin.1024-17.partial'
+    """
+    if not is_file_version(version):
+        raise ValueError(f"Invalid file version: {version!r}")
+    return path.with_name(f".{path.name}.{version}.partial")
+
+
+def remove_stale_partials(path: Path, keep: Optional[Path] = None):
+    """Remove the partial files of earlier transfers into path."""
+    for stale in path.parent.glob(f".{path.name}.*.partial"):
+        if stale != keep:
+            stale.unlink(missing_ok=True)
+
+
+def resume_offset(partial: Path) -> int:
+    """The offset to resume a transfer into partial from: the end of its last
+    complete chunk."""
+    try:
+        size = partial.stat().st_size
+    except FileNotFoundError:
+        return 0
+    return size - size % CHUNK_SIZE
+
+
+def read_chunk(path: Path, offset: int, length: int = CHUNK_SIZE) -> bytes:
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return f.read(length)
+
+
+def write_chunk(partial: Path, offset: int, data: bytes) -> int:
+    """Write a chunk into a partial file, discarding anything after it.
+
+    Raises:
+        ValueError: If offset is past the end of the partial file, so a
+            chunk before it is missing
+
+    Returns:
+        int: The size of the partial file
+    """
+    partial.parent.mkdir(parents=True, exist_ok=True)
+    with open(partial, "ab+") as f:
+        size = f.seek(0, os.SEEK_END)
+        if offset > size:
+            raise ValueError(f"Chunk at {offset} is past the end of the file ({size})")
+    with open(partial, "rb+") as f:
+        f.seek(offset)
+        f.write(data)
+        f.truncate()
+        return f.tell()
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while data := f.read(CHUNK_SIZE):
+            digest.update(data)
+    return digest.hexdigest()
+
+
+class _QueueWriter:
+    """File-like object that hands what is written to a bounded queue."""
+
+    def __init__(self, chunks: queue.Queue, cancelled: threading.Event):
+        self._chunks = chunks
+        self._cancelled = cancelled
+
+    def write(self, data: bytes) -> int:
+        if self._cancelled.is_set():
+            raise OSError("Tar stream was closed")
+        self._chunks.put(bytes(data))
+        return len(data)
+
+
+def iter_tar(path: Path, compression: Compression = "none") -> Iterator[bytes]:
+    """Yield a directory tree as a compressed tar stream.
+
+    The archive is written by a thread while the stream is consumed, and only
+    a few blocks of it are held in memory at a time.
+    """
+    chunks: queue.Queue = queue.Queue(maxsize=16)
+    cancelled = threading.Event()
+    end = object()
+
+    def write():
+        writer = _QueueWriter(chunks, cancelled)
+        try:
+            with tarfile.open(fileobj=writer, mode="w|") as tar:
+                tar.add(path, arcname=".")
+        except BaseException as e:
+            chunks.put(e)
+        else:
+            chunks.put(end)
+
+    threading.Thread(target=write, daemon=True).start()
+    stream = compressor(compression)
+    try:
+        while (chunk := chunks.get()) is not end:
+            if isinstance(chunk, BaseException):
+                raise chunk
+            if data := stream.compress(chunk):
+                yield data
+        if data := stream.flush():
+            yield data
+    finally:
+        # Let the writer run into the cancellation if it's blocked on the queue
+        cancelled.set()
+        while not chunks.empty():
+            chunks.get_nowait()
+
+
+class _IterReader:
+    """File-like object that reads the decompressed data of an iterator of
+    compressed chunks."""
+
+    def __init__(self, chunks: Iterable[bytes], compression: Compression):
+        self._chunks = iter(chunks)
+        self._stream = decompressor(compression)
+        # Appended to at the end and consumed from the start in place, so
+        # many small reads of a large chunk don't copy the rest every time
+        self._buffer = bytearray()
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += self._stream.decompress(chunk)
+        if size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+
+def extract_tar(chunks: Iterable[bytes], path: Path, compression: Compression = "none"):
+    """Extract a compressed tar stream into a directory.
+
+    Members that would end up outside the directory, links to outside of it,
+    and special files are refused.
+    """
+    path.mkdir(parents=True, exist_ok=True)
+    with tarfile.open(fileobj=_IterReader(chunks, compression), mode="r|") as tar:
+        tar.extractall(path, filter="data")
@@ -0,0 +1,222 @@
+import base64
+import io
+from typing import Any, Literal, Optional
+
+import numpy as np
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None  # PIL is optional
+
+_HASH_WEIGHTS: dict[int, np.ndarray] = {}
+
+
+def _hash_weights(block_size: int) -> np.ndarray:
+    """Get the (cached) multipliers used to hash a block.
+
+    Args:
+        block_size: Edge length of a square block in pixels
+
+    Returns:
+        A (block_size, 1, block_size // 2) array of odd uint64 multipliers, one
+        per pair of pixels in the block
+    """
+    if block_size not in _HASH_WEIGHTS:
+        rng = np.random.default_rng(block_size)
+        weights = rng.integers(
+            0, 2**63, size=(block_size, 1, block_size // 2), dtype=np.uint64
+        )
+        _HASH_WEIGHTS[block_size] = weights | np.uint64(1)
+    return _HASH_WEIGHTS[block_size]
+
+
+def _pixel_words(frame: np.ndarray) -> np.ndarray:
+    """Pack each pixel of an (H, W[, C]) uint8 frame into a single uint32."""
+    if frame.ndim == 2:
+        return frame.astype(np.uint32)
+    if frame.shape[-1] == 4:
+        return np.ascontiguousarray(frame).view(np.uint32).reshape(frame.shape[:2])
+    words = np.zeros(frame.shape[:2], dtype=np.uint32)
+    for channel in range(frame.shape[-1]):
+        words |= frame[..., channel].astype(np.uint32) << np.uint32(8 * channel)
+    return words
+
+
+def block_hashes(frame: np.ndarray, block_size: int = 32) -> np.ndarray:
+    """Hash every block_size x block_size tile of a frame.
+
+    Pixels are packed two to a uint64 word and each block is reduced to a
+    weighted sum of its words (mod 2**64). The frame is processed one band of
+    blocks at a time so the temporaries stay small even for 4K frames.
+
+    Args:
+        frame: (H, W) or (H, W, C) uint8 image array
+        block_size: Edge length of a square block in pixels
+
+    Returns:
+        A (ceil(H / block_size), ceil(W / block_size)) uint64 array of block hashes
+
+    Raises:
+        ValueError: If block_size is not a positive even number
+
+    Examples:
+        >>> frame = np.zeros((64, 96, 4), dtype=np.uint8)
+        >>> block_hashes(frame, block_size=32).shape
+        (2, 3)
+    """
+    if block_size <= 0 or block_size % 2:
+        raise ValueError(f"block_size must be a positive even number: {block_size}")
+
+    words = _pixel_words(frame)
+    height, width = words.shape
+    rows = -(-height // block_size)
+    cols = -(-width // block_size)
+    pad_h = rows * block_size - height
+    pad_w = cols * block_size - width
+    if pad_h or pad_w:
+        words = np.pad(words, ((0, pad_h), (0, pad_w)))
+
+    # Reinterpret pairs of uint32 pixels as one uint64 word (no copy)
+    words = np.ascontiguousarray(words).view(np.uint64)
+    weights = _hash_weights(block_size)
+    hashes = np.empty((rows, cols), dtype=np.uint64)
+    for row in range(rows):
+        band = words[row * block_size : (row + 1) * block_size]
+        band = band.reshape(block_size, cols, block_size // 2)
+        hashes[row] = (band * weights).sum(axis=(0, 2), dtype=np.uint64)
+    return hashes
+
+
+def dirty_rectangles(
+    dirty_mask: np.ndarray, block_size: int, frame_size: tuple[int, int]
+) -> list[tuple[int, int, int, int]]:
+    """Merge a grid of dirty blocks into pixel rectangles.
+
+    Horizontal runs of dirty blocks are merged first, then runs spanning the
+    same columns on consecutive block rows are merged into one rectangle.
+
+    Args:
+        dirty_mask: (rows, cols) boolean array of changed blocks
+        block_size: Edge length of a square block in pixels
+        frame_size: (width, height) of the frame, used to clip the last row/column
+
+    Returns:
+        List of (left, top, width, height) rectangles in pixel coordinates
+
+    Examples:
+        >>> mask = np.array([[True, True, False], [True, True, False]])
+        >>> dirty_rectangles(mask, block_size=10, frame_size=(25, 20))
+        [(0, 0, 20, 20)]
+    """
+    frame_width, frame_height = frame_size
+    # Maps (start_col, end_col) to [start_row, end_row] of the rectangle still open
+    open_runs: dict[tuple[int, int], list[int]] = {}
+    block_rects: list[tuple[int, int, int, int]] = []
+
+    for row, mask_row in enumerate(dirty_mask):
+        padded = np.concatenate(([False], mask_row, [False]))
+        edges = np.flatnonzero(padded[1:] != padded[:-1])
+        runs = set(zip(edges[::2].tolist(), edges[1::2].tolist()))
+
+        for run in list(open_runs):
+            if run not in runs:
+                start_row, end_row = open_runs.pop(run)
+                block_rects.append((run[0], start_row, run[1], end_row))
+        for run in runs:
+            if run in open_runs:
+                open_runs[run][1] = row + 1
+            else:
+                open_runs[run] = [row, row + 1]
+
+    for run, (start_row, end_row) in open_runs.items():
+        block_rects.append((run[0], start_row, run[1], end_row))
+
+    rects = []
+    for start_col, start_row, end_col, end_row in sorted(
+        block_rects, key=lambda r: (r[1], r[0])
+    ):
+        left = start_col * block_size
+        top = start_row * block_size
+        right = min(end_col * block_size, frame_width)
+        bottom = min(end_row * block_size, frame_height)
+        rects.append((left, top, right - left, bottom - top))
+    return rects
+
+
+def diff_block_hashes(
+    previous: Optional[np.ndarray], current: np.ndarray
+) -> Optional[np.ndarray]:
+    """Compare two block-hash grids.
+
+    Args:
+        previous: Hash grid of the previous frame, or None if there is none
+        current: Hash grid of the current frame
+
+    Returns:
+        A boolean mask of changed blocks, or None if the grids are not
+        comparable (no previous frame or the resolution changed)
+    """
+    if previous is None or previous.shape != current.shape:
+        return None
+    return previous != current
+
+
+def crop_patch(
+    frame: np.ndarray,
+    rect: tuple[int, int, int, int],
+    format: Literal["ndarray", "PIL", "base64"] = "ndarray",
+) -> Any:
+    """Crop a rectangle out of a frame and convert it to the requested format.
+
+    4-channel frames are treated as BGRA (as captured by mss) and 3-channel
+    frames as RGB.
+
+    Args:
+        frame: (H, W, C) uint8 image array
+        rect: (left, top, width, height) rectangle to crop
+        format: 'ndarray' for an owned copy of the pixels, 'PIL' for an RGB
+            PIL Image, or 'base64' for a base64 encoded PNG
+
+    Returns:
+        The cropped patch in the requested format
+    """
+    left, top, width, height = rect
+    patch = frame[top : top + height, left : left + width]
+    if format == "ndarray":
+        return patch.copy()
+
+    if Image is None:
+        raise ImportError(f"PIL is required for {format} patches")
+    if patch.ndim == 3 and patch.shape[-1] == 4:
+        patch = patch[..., 2::-1]
+    img = Image.fromarray(np.ascontiguousarray(patch))
+    if format == "PIL":
+        return img
+
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode("utf-8")
+
+
+def decode_patch(
+    patch: str, format: Literal["ndarray", "PIL", "base64"] = "ndarray"
+) -> Any:
+    """Convert a base64 PNG patch made by crop_patch to another format.
+
+    Args:
+        patch: The base64 encoded PNG
+        format: 'ndarray' for an RGB array, 'PIL' for a PIL Image, or
+            'base64' to keep it as it is
+
+    Returns:
+        The patch in the requested format
+    """
+    if format == "base64":
+        return patch
+    if Image is None:
+        raise ImportError(f"PIL is required for {format} patches")
+    img = Image.open(io.BytesIO(base64.b64decode(patch)))
+    if format == "PIL":
+        return img
+    return np.asarray(img.convert("RGB"))
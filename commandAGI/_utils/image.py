@@ -2,7 +2,7 @@ import base64
 import datetime
 import io
 import os
-from typing import Any, Literal
+from typing import Any, Literal, Optional
 
 try:
     from PIL import Image
@@ -13,10 +13,80 @@ from commandAGI._internal.config import APPDIR
 from commandAGI.types import ScreenshotObservation
 
 
+class RawFrame:
+    """An unencoded BGRA frame straight from the capture backend.
+
+    The frame holds a reference to the backend's pixel buffer (e.g. ``mss``'s
+    ``ScreenShot.raw``) instead of a copy, so creating one costs nothing.
+    Conversion to NumPy, PIL, PNG or base64 only happens when a consumer asks
+    for it.
+    """
+
+    pixel_format: Literal["BGRA"] = "BGRA"
+
+    def __init__(
+        self,
+        buffer: Any,
+        width: int,
+        height: int,
+        left: int = 0,
+        top: int = 0,
+    ):
+        self.buffer = buffer
+        self.width = width
+        self.height = height
+        self.left = left
+        self.top = top
+
+    @classmethod
+    def from_mss(cls, screenshot: Any) -> "RawFrame":
+        """Wrap an ``mss`` ScreenShot without copying its pixels."""
+        return cls(
+            buffer=screenshot.raw,
+            width=screenshot.width,
+            height=screenshot.height,
+            left=screenshot.left,
+            top=screenshot.top,
+        )
+
+    @property
+    def size(self) -> tuple[int, int]:
+        return (self.width, self.height)
+
+    def to_ndarray(self):
+        """Return a read-only ``(height, width, 4)`` BGRA view over the buffer."""
+        import numpy as np
+
+        array = np.frombuffer(self.buffer, dtype=np.uint8).reshape(
+            self.height, self.width, 4
+        )
+        array.flags.writeable = False
+        return array
+
+    def to_pil(self) -> "Image.Image":
+        """Decode the frame into an RGB PIL Image."""
+        if Image is None:
+            raise ImportError("PIL is required to convert a RawFrame to PIL")
+        return Image.frombuffer("RGB", self.size, self.buffer, "raw", "BGRX", 0, 1)
+
+    def to_png(self) -> bytes:
+        """Encode the frame as PNG bytes."""
+        buffer = io.BytesIO()
+        self.to_pil().save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    def to_base64(self) -> str:
+        """Encode the frame as a base64 PNG string."""
+        return base64.b64encode(self.to_png()).decode("utf-8")
+
+    def __repr__(self) -> str:
+        return f"RawFrame(size={self.size}, pixel_format={self.pixel_format!r})"
+
+
 def process_screenshot(
     screenshot_data: Any,
     output_format: Literal["base64", "PIL", "path"] = "PIL",
-    input_format: Literal["bytes", "PIL", "path", "base64"] = None,
+    input_format: Literal["bytes", "PIL", "path", "base64", "raw"] = None,
     computer_name: str = "computer",
     cleanup_temp_file: bool = True,
 ) -> ScreenshotObservation:
@@ -33,6 +103,7 @@ def process_screenshot(
             - 'PIL': A PIL Image object
             - 'path': Path to an image file
             - 'base64': Base64 encoded string
+            - 'raw': A RawFrame holding unencoded BGRA pixels
         computer_name: Name of the computer implementation (used in filename)
         cleanup_temp_file: Whether to delete the temporary file if screenshot_data is a path
 
@@ -43,6 +114,8 @@ def process_screenshot(
     if input_format is None:
         if isinstance(screenshot_data, bytes):
             input_format = "bytes"
+        elif isinstance(screenshot_data, RawFrame):
+            input_format = "raw"
         elif Image and isinstance(screenshot_data, Image.Image):
             input_format = "PIL"
         elif isinstance(screenshot_data, str):
@@ -90,6 +163,9 @@ def process_screenshot(
                 raise ImportError("PIL is required for PIL format input")
             img = screenshot_data
 
+        case "raw":
+            img = screenshot_data.to_pil()
+
         case "path":
             temp_file = screenshot_data
             if output_format == "path" and os.path.dirname(
@@ -219,6 +295,100 @@ def process_screenshot(
     )
 
 
+ScreenshotCodec = Literal["png", "jpeg", "webp", "raw"]
+
+_CODEC_MIME_TYPES = {
+    "png": "image/png",
+    "jpeg": "image/jpeg",
+    "webp": "image/webp",
+    "raw": "application/octet-stream",
+}
+
+
+def encode_screenshot(
+    img: "Image.Image",
+    codec: ScreenshotCodec = "png",
+    quality: Optional[int] = None,
+    scale: float = 1.0,
+    region: Optional[tuple[int, int, int, int]] = None,
+) -> tuple[bytes, dict[str, Any]]:
+    """Crop, downscale and encode a screenshot for transfer.
+
+    Args:
+        img: The screenshot as a PIL Image
+        codec: 'png' (lossless), 'jpeg', 'webp', or 'raw' for unencoded RGB
+            pixels
+        quality: Lossy quality from 1 to 100 for 'jpeg' and 'webp' (defaults
+            to 80). 'webp' with quality 100 is lossless. Ignored for 'png' and
+            'raw'.
+        scale: Downscale factor in (0, 1], applied after cropping
+        region: Optional (left, top, width, height) rectangle to crop to,
+            in full-resolution pixel coordinates
+
+    Returns:
+        tuple[bytes, dict[str, Any]]: The encoded image and its metadata
+        (codec, mime_type, width and height after cropping and scaling)
+
+    Raises:
+        ValueError: If the codec or scale is not supported
+
+    Examples:
+        >>> img = Image.new("RGB", (200, 100), color="red")
+        >>> data, meta = encode_screenshot(img, codec="jpeg", scale=0.5)
+        >>> meta
+        {'codec': 'jpeg', 'mime_type': 'image/jpeg', 'width': 100, 'height': 50}
+        >>> decode_screenshot(data, meta).size
+        (100, 50)
+    """
+    if codec not in _CODEC_MIME_TYPES:
+        raise ValueError(f"Unsupported screenshot codec: {codec}")
+    if not 0 < scale <= 1:
+        raise ValueError(f"scale must be in (0, 1]: {scale}")
+
+    if region is not None:
+        left, top, width, height = region
+        img = img.crop((left, top, left + width, top + height))
+    if scale != 1:
+        size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+        # reducing_gap first shrinks by an integer factor, which is much faster
+        img = img.resize(size, Image.Resampling.BILINEAR, reducing_gap=2.0)
+    if img.mode not in ("RGB", "L") and codec != "png":
+        img = img.convert("RGB")
+
+    metadata = {
+        "codec": codec,
+        "mime_type": _CODEC_MIME_TYPES[codec],
+        "width": img.width,
+        "height": img.height,
+    }
+    if codec == "raw":
+        return img.convert("RGB").tobytes(), metadata
+
+    buffer = io.BytesIO()
+    if codec == "png":
+        img.save(buffer, format="PNG")
+    elif codec == "webp" and quality == 100:
+        img.save(buffer, format="WEBP", lossless=True)
+    else:
+        img.save(buffer, format=codec.upper(), quality=quality or 80)
+    return buffer.getvalue(), metadata
+
+
+def decode_screenshot(data: bytes, metadata: dict[str, Any]) -> "Image.Image":
+    """Decode a screenshot produced by encode_screenshot back into a PIL Image.
+
+    Args:
+        data: The encoded image
+        metadata: The metadata returned alongside it by encode_screenshot
+
+    Returns:
+        PIL Image object
+    """
+    if metadata.get("codec") == "raw":
+        return Image.frombytes("RGB", (metadata["width"], metadata["height"]), data)
+    return Image.open(io.BytesIO(data))
+
+
 import base64
 import io
 
@@ -0,0 +1,375 @@
+import itertools
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+# Beyond this many changes between reads, the whole tree is re-read instead
+MAX_PENDING_INVALIDATIONS = 1024
+
+
+class AccessibilityBackend:
+    """Platform hooks LayoutTree uses to read an accessibility tree.
+
+    Subclasses wrap one accessibility API (UIAutomation, AX, AT-SPI, ...) and
+    only need to know how to read a single element; LayoutTree takes care of
+    walking, limiting and caching the tree.
+    """
+
+    def root(self) -> Any:
+        """Return the root element of the tree (e.g. the desktop)."""
+        raise NotImplementedError(f"{self.__class__.__name__}.root")
+
+    def focused_window(self) -> Any:
+        """Return the window that has keyboard focus, or None."""
+        return None
+
+    def children(self, element: Any) -> List[Any]:
+        """Return the direct children of an element."""
+        raise NotImplementedError(f"{self.__class__.__name__}.children")
+
+    def describe(self, element: Any) -> Dict[str, Any]:
+        """Return the UIElement fields of an element, without its children."""
+        raise NotImplementedError(f"{self.__class__.__name__}.describe")
+
+    def child_count(self, element: Any) -> int:
+        """Return the number of children of an element.
+
+        Used for nodes at the depth limit, whose children aren't read.
+        Backends that can count children without fetching them should
+        override this.
+        """
+        return len(self.children(element))
+
+    def key(self, element: Any) -> Hashable:
+        """Return a value that identifies the same element across reads."""
+        return element
+
+    def watch(self, on_change: Callable[[Any], None]) -> bool:
+        """Start calling on_change with every element that changes.
+
+        Returns:
+            bool: False if the platform can't report changes, in which case
+            the tree is re-read on every call
+        """
+        return False
+
+    def unwatch(self):
+        """Stop the notifications started by watch."""
+
+
+class _Node:
+    __slots__ = ("id", "element", "info", "child_ids", "version", "stale")
+
+    def __init__(self, node_id: str, element: Any):
+        self.id = node_id
+        self.element = element
+        self.info: Optional[Dict[str, Any]] = None
+        # None until the children have been read
+        self.child_ids: Optional[List[str]] = None
+        # Version of the tree in which this node or its child list last changed
+        self.version = 0
+        self.stale = True
+
+
+class LayoutTree:
+    """A cached, depth-limited view of an accessibility tree.
+
+    Elements are only read when they are rendered, so limiting the depth or
+    the number of children per node bounds the cost of a call, and deeper
+    subtrees can be fetched later by node id with `get(node_id=...)`. Every
+    node gets an id that stays the same for as long as the element exists.
+
+    Read elements are cached. If the backend reports changes (see
+    AccessibilityBackend.watch) only changed elements are read again;
+    otherwise every rendered element is re-read on each call but unchanged
+    ones still keep their id and version, so `delta` works either way.
+
+    Args:
+        backend: The platform accessibility backend to read from
+
+    Examples:
+        >>> tree = LayoutTree(backend)  # doctest: +SKIP
+        >>> window = tree.get(focused_window_only=True, max_depth=2)  # doctest: +SKIP
+        >>> tree.get(node_id=window["children"][0]["id"], max_depth=2)  # doctest: +SKIP
+    """
+
+    def __init__(self, backend: AccessibilityBackend):
+        self.backend = backend
+        self._lock = threading.RLock()
+        self._ids = (f"n{i}" for i in itertools.count(1))
+        self._nodes: Dict[str, _Node] = {}
+        self._node_ids: Dict[Hashable, str] = {}
+        self._version = 0
+        # Changes reported since the last read, see invalidate
+        self._invalidated_lock = threading.Lock()
+        self._invalidated: List[Any] = []
+        self._invalidate_all = False
+        self._watching = backend.watch(self.invalidate)
+        # State of the previous delta: (options, root id, version)
+        self._delta_state: Optional[tuple] = None
+        self._removed: List[str] = []
+
+    def get(
+        self,
+        node_id: Optional[str] = None,
+        max_depth: Optional[int] = None,
+        max_children: Optional[int] = None,
+        focused_window_only: bool = False,
+    ) -> Optional[Dict[str, Any]]:
+        """Render the tree, or the subtree under one node.
+
+        Args:
+            node_id: Id of a previously returned node to expand. Defaults to
+                the root of the tree.
+            max_depth: Levels of children to include below the returned node.
+                Nodes at the limit have an empty children list but still
+                report child_count. None means no limit.
+            max_children: Maximum number of children to include per node
+            focused_window_only: Start at the focused window instead of the
+                root. Ignored when node_id is given.
+
+        Returns:
+            Optional[Dict[str, Any]]: The UIElement tree, with an id and a
+            child_count on every node, or None if there is no focused window
+
+        Raises:
+            KeyError: If node_id is unknown or was removed from the tree
+        """
+        with self._lock:
+            self._begin()
+            node = self._start_node(node_id, focused_window_only)
+            if node is None:
+                return None
+            return self._render(node, max_depth, max_children)
+
+    def delta(
+        self,
+        max_depth: Optional[int] = None,
+        max_children: Optional[int] = None,
+        focused_window_only: bool = False,
+    ) -> Dict[str, Any]:
+        """Return only the parts of the tree that changed since the last delta.
+
+        The first call, a call with different options or a different focused
+        window, or a call after `reset_delta` returns a keyframe holding the
+        whole tree. Later calls return the subtrees rooted at every node whose
+        properties or child list changed, and the ids of removed nodes.
+
+        Args:
+            max_depth: See get
+            max_children: See get
+            focused_window_only: See get
+
+        Returns:
+            Dict[str, Any]: A LayoutTreeDelta
+        """
+        with self._lock:
+            self._begin()
+            node = self._start_node(None, focused_window_only)
+            options = (max_depth, max_children, focused_window_only)
+            root_id = node.id if node is not None else None
+            previous = self._delta_state
+            keyframe = previous is None or previous[:2] != (options, root_id)
+
+            if node is None:
+                updated = []
+            elif keyframe:
+                updated = [self._render(node, max_depth, max_children)]
+            else:
+                updated = []
+                self._collect_changes(
+                    node, previous[2], max_depth, max_children, updated
+                )
+            removed = [] if keyframe else list(self._removed)
+            self._removed.clear()
+            self._delta_state = (options, root_id, self._version)
+            return {
+                "changed": bool(updated or removed),
+                "keyframe": keyframe,
+                "root_id": root_id,
+                "updated": updated,
+                "removed": removed,
+            }
+
+    def reset_delta(self):
+        """Forget the previous delta so the next one is a keyframe."""
+        with self._lock:
+            self._delta_state = None
+            self._removed.clear()
+
+    def invalidate(self, element: Any = None):
+        """Mark an element, or with no argument the whole tree, as changed.
+
+        Backends call this from their change notifications, possibly from
+        another thread. The change is applied when the tree is next read, so
+        this never waits for a read in progress (which may itself be waiting
+        on the backend's event thread). Unknown elements are ignored since
+        they will be read anyway once they are reached.
+        """
+        with self._invalidated_lock:
+            if element is None or len(self._invalidated) >= MAX_PENDING_INVALIDATIONS:
+                self._invalidate_all = True
+                self._invalidated = []
+            elif not self._invalidate_all:
+                self._invalidated.append(element)
+
+    def _apply_invalidations(self):
+        with self._invalidated_lock:
+            invalidate_all, elements = self._invalidate_all, self._invalidated
+            self._invalidate_all, self._invalidated = False, []
+        if invalidate_all:
+            for node in self._nodes.values():
+                node.stale = True
+            return
+        for element in elements:
+            node_id = self._node_ids.get(self._key(element))
+            if node_id is not None:
+                self._nodes[node_id].stale = True
+
+    def close(self):
+        """Stop watching for changes and drop the cache."""
+        with self._lock:
+            if self._watching:
+                self.backend.unwatch()
+                self._watching = False
+            self._nodes.clear()
+            self._node_ids.clear()
+            self._delta_state = None
+
+    def _begin(self):
+        # Without change notifications nothing in the cache can be trusted
+        if not self._watching:
+            self.invalidate()
+        self._apply_invalidations()
+        self._version += 1
+
+    def _start_node(
+        self, node_id: Optional[str], focused_window_only: bool
+    ) -> Optional[_Node]:
+        if node_id is not None:
+            if node_id not in self._nodes:
+                raise KeyError(f"Unknown layout tree node: {node_id}")
+            return self._refresh(self._nodes[node_id])
+        element = (
+            self.backend.focused_window()
+            if focused_window_only
+            else self.backend.root()
+        )
+        if element is None:
+            return None
+        return self._refresh(self._node_for(element))
+
+    def _key(self, element: Any) -> Hashable:
+        try:
+            key = self.backend.key(element)
+            hash(key)
+            return key
+        except Exception:
+            return id(element)
+
+    def _node_for(self, element: Any) -> _Node:
+        key = self._key(element)
+        node_id = self._node_ids.get(key)
+        if node_id is None:
+            node_id = next(self._ids)
+            self._node_ids[key] = node_id
+            self._nodes[node_id] = _Node(node_id, element)
+        return self._nodes[node_id]
+
+    def _refresh(self, node: _Node) -> _Node:
+        """Re-read a stale node, bumping its version if anything changed."""
+        if not node.stale:
+            return node
+        info = self.backend.describe(node.element)
+        if info != node.info:
+            node.info = info
+            node.version = self._version
+        if node.child_ids is not None:
+            # Only re-read children that were read before; the rest stay lazy
+            self._read_children(node)
+        node.stale = False
+        return node
+
+    def _read_children(self, node: _Node):
+        try:
+            elements = self.backend.children(node.element)
+        except Exception:
+            elements = []
+        child_ids = [self._node_for(element).id for element in elements]
+        if child_ids != node.child_ids:
+            if node.child_ids is not None:
+                kept = set(child_ids)
+                for child_id in node.child_ids:
+                    if child_id not in kept:
+                        self._drop(child_id)
+            node.child_ids = child_ids
+            node.version = self._version
+
+    def _children(self, node: _Node) -> List[_Node]:
+        if node.child_ids is None:
+            self._read_children(node)
+        return [self._nodes[child_id] for child_id in node.child_ids]
+
+    def _drop(self, node_id: str):
+        """Forget a removed node and everything below it."""
+        node = self._nodes.pop(node_id, None)
+        if node is None:
+            return
+        self._node_ids.pop(self._key(node.element), None)
+        if self._delta_state is not None:
+            self._removed.append(node_id)
+        for child_id in node.child_ids or []:
+            self._drop(child_id)
+
+    def _render(
+        self, node: _Node, max_depth: Optional[int], max_children: Optional[int]
+    ) -> Dict[str, Any]:
+        children = []
+        if max_depth is None or max_depth > 0:
+            child_depth = None if max_depth is None else max_depth - 1
+            for child in self._children(node)[:max_children]:
+                try:
+                    self._refresh(child)
+                except Exception:
+                    # The element went away while we were reading the tree
+                    continue
+                children.append(self._render(child, child_depth, max_children))
+        child_count = (
+            len(node.child_ids)
+            if node.child_ids is not None
+            else self._count_children(node)
+        )
+        return {
+            **node.info,
+            "id": node.id,
+            "child_count": child_count,
+            "children": children,
+        }
+
+    def _count_children(self, node: _Node) -> int:
+        # Counted without reading the children, which stay lazy
+        try:
+            return self.backend.child_count(node.element)
+        except Exception:
+            return 0
+
+    def _collect_changes(
+        self,
+        node: _Node,
+        since: int,
+        max_depth: Optional[int],
+        max_children: Optional[int],
+        updated: List[Dict[str, Any]],
+    ):
+        """Walk the limited tree and render the subtrees that changed."""
+        if node.version > since:
+            updated.append(self._render(node, max_depth, max_children))
+            return
+        if max_depth is not None and max_depth <= 0:
+            return
+        child_depth = None if max_depth is None else max_depth - 1
+        for child in self._children(node)[:max_children]:
+            try:
+                self._refresh(child)
+            except Exception:
+                continue
+            self._collect_changes(child, since, child_depth, max_children, updated)
@@ -0,0 +1,299 @@
+"""Draining the output of background processes into bounded buffers.
+
+A process blocks as soon as the pipe to its stdout or stderr is full, so the
+output of a background process has to be read as it's produced, not when
+someone asks for it. OutputPump reads every registered pipe from a single
+thread into an OutputBuffer, where the output can then be read at any time by
+byte offset.
+"""
+
+import os
+import platform
+import selectors
+import tempfile
+import threading
+from collections import deque
+from typing import IO, Deque, List, Optional, Tuple
+
+_READ_SIZE = 65536
+
+
+class OutputBuffer:
+    """The output of one stream of a process, addressed by byte offset.
+
+    The last max_memory bytes are kept in memory. Older output is moved to a
+    temporary file in spill_dir, or dropped if spill_dir is None, in which
+    case start moves past it.
+
+    Args:
+        max_memory: Bytes of output to keep in memory
+        spill_dir: Directory for the spill file, or None to drop old output
+
+    Examples:
+        >>> buffer = OutputBuffer(max_memory=4)
+        >>> buffer.write(b"hello world")
+        >>> buffer.start, buffer.end
+        (7, 11)
+        >>> buffer.read(0)
+        (7, b'orld')
+        >>> spilled = OutputBuffer(max_memory=4, spill_dir=tempfile.gettempdir())
+        >>> spilled.write(b"hello ")
+        >>> spilled.write(b"world")
+        >>> spilled.read(4, max_bytes=5)
+        (4, b'o wor')
+        >>> spilled.discard()
+    """
+
+    def __init__(self, max_memory: int = 1 << 20, spill_dir: Optional[str] = None):
+        self.max_memory = max_memory
+        self.spill_dir = spill_dir
+        self._condition = threading.Condition()
+        self._chunks: Deque[bytes] = deque()
+        # Offsets below _memory_start are in the spill file, or dropped if
+        # below _start
+        self._start = 0
+        self._memory_start = 0
+        self._end = 0
+        self._spill: Optional[IO[bytes]] = None
+        self._closed = False
+        self._error: Optional[Exception] = None
+
+    @property
+    def start(self) -> int:
+        """Offset of the oldest output that can still be read."""
+        return self._start
+
+    @property
+    def end(self) -> int:
+        """Total number of bytes written."""
+        return self._end
+
+    @property
+    def closed(self) -> bool:
+        """Whether the stream has ended, so end won't grow any more."""
+        return self._closed
+
+    @property
+    def error(self) -> Optional[Exception]:
+        """The error that ended the stream early, if any."""
+        return self._error
+
+    def write(self, data: bytes):
+        with self._condition:
+            if self._closed:
+                return  # Discarded while the process still runs
+            self._chunks.append(data)
+            self._end += len(data)
+            excess = self._end - self._memory_start - self.max_memory
+            while excess > 0:
+                oldest = self._chunks.popleft()
+                if len(oldest) > excess:
+                    self._chunks.appendleft(oldest[excess:])
+                    oldest = oldest[:excess]
+                self._evict(oldest)
+                excess -= len(oldest)
+            self._condition.notify_all()
+
+    def _evict(self, data: bytes):
+        self._memory_start += len(data)
+        if self.spill_dir is None:
+            self._start = self._memory_start
+            return
+        if self._spill is None:
+            self._spill = tempfile.TemporaryFile(
+                dir=self.spill_dir, prefix="commandagi-output-"
+            )
+        self._spill.seek(0, os.SEEK_END)
+        self._spill.write(data)
+
+    def close(self, error: Optional[Exception] = None):
+        """Mark the end of the stream.
+
+        Args:
+            error: The error that ended the stream early, if any
+        """
+        with self._condition:
+            self._closed = True
+            if error is not None and self._error is None:
+                self._error = error
+            self._condition.notify_all()
+
+    def discard(self):
+        """Close the stream and free the output, including the spill file."""
+        with self._condition:
+            self._closed = True
+            self._chunks.clear()
+            self._start = self._memory_start = self._end
+            if self._spill is not None:
+                self._spill.close()
+                self._spill = None
+            self._condition.notify_all()
+
+    def read(
+        self, offset: int = 0, max_bytes: Optional[int] = None
+    ) -> Tuple[int, bytes]:
+        """Read output from an offset on.
+
+        Args:
+            offset: Offset of the first byte to read
+            max_bytes: The most bytes to read, or None for all available
+
+        Returns:
+            Tuple[int, bytes]: The offset of the data, which is later than the
+                requested one if that output was dropped, and the data
+        """
+        with self._condition:
+            offset = min(max(offset, self._start), self._end)
+            stop = (
+                self._end if max_bytes is None else min(self._end, offset + max_bytes)
+            )
+            parts: List[bytes] = []
+            if offset < self._memory_start:
+                self._spill.seek(offset)
+                parts.append(self._spill.read(min(stop, self._memory_start) - offset))
+            position = self._memory_start
+            for chunk in self._chunks:
+                if position >= stop:
+                    break
+                chunk_end = position + len(chunk)
+                if chunk_end > offset:
+                    parts.append(chunk[max(offset - position, 0) : stop - position])
+                position = chunk_end
+            return offset, b"".join(parts)
+
+    def wait(self, offset: int, timeout: Optional[float] = None) -> bool:
+        """Wait until there is output past offset or the stream has ended.
+
+        Returns:
+            bool: Whether there is output past offset
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._end > offset or self._closed, timeout=timeout
+            )
+            return self._end > offset
+
+
+class OutputPump:
+    """Reads pipes into OutputBuffers from a single background thread.
+
+    The pipes are watched with a selector, and each one is read whenever it
+    has data, until it reaches end of file. Then its buffer is closed. A pipe
+    that fails (e.g. its buffer can't spill to disk) is closed along with its
+    buffer, which records the error, and the other pipes are still read. On
+    Windows, where pipes can't be watched with a selector, each pipe gets a
+    reader thread instead.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._selector: Optional[selectors.BaseSelector] = None
+        self._pending: List[Tuple[IO[bytes], OutputBuffer]] = []
+        self._wakeup_read: Optional[int] = None
+        self._wakeup_write: Optional[int] = None
+
+    def add(self, pipe: IO[bytes], buffer: OutputBuffer):
+        """Start draining pipe into buffer. The pipe is closed at its end."""
+        if platform.system() == "Windows":
+            threading.Thread(
+                target=self._drain, args=(pipe, buffer), daemon=True
+            ).start()
+            return
+
+        os.set_blocking(pipe.fileno(), False)
+        with self._lock:
+            if self._selector is None:
+                self._start()
+            self._pending.append((pipe, buffer))
+        # Make the pump thread register the pipe
+        os.write(self._wakeup_write, b"\0")
+
+    def _start(self):
+        self._selector = selectors.DefaultSelector()
+        self._wakeup_read, self._wakeup_write = os.pipe()
+        os.set_blocking(self._wakeup_read, False)
+        self._selector.register(self._wakeup_read, selectors.EVENT_READ)
+        threading.Thread(
+            target=self._run, name="commandagi-output-pump", daemon=True
+        ).start()
+
+    def _run(self):
+        while True:
+            for key, _ in self._selector.select():
+                if key.fileobj == self._wakeup_read:
+                    self._register_pending()
+                    continue
+                pipe, buffer = key.data
+                try:
+                    try:
+                        data = os.read(pipe.fileno(), _READ_SIZE)
+                    except BlockingIOError:
+                        continue
+                    except OSError:
+                        data = b""
+                    if data:
+                        buffer.write(data)
+                    else:
+                        self._remove(pipe, buffer)
+                except Exception as e:
+                    # Don't let one stream stop the thread draining all others
+                    self._remove(pipe, buffer, e)
+
+    def _register_pending(self):
+        try:
+            while os.read(self._wakeup_read, _READ_SIZE):
+                pass
+        except BlockingIOError:
+            pass
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for pipe, buffer in pending:
+            try:
+                self._selector.register(pipe, selectors.EVENT_READ, (pipe, buffer))
+            except Exception as e:
+                self._remove(pipe, buffer, e)
+
+    def _remove(
+        self, pipe: IO[bytes], buffer: OutputBuffer, error: Optional[Exception] = None
+    ):
+        """Stop reading a pipe, and close it and its buffer."""
+        try:
+            self._selector.unregister(pipe)
+        except (KeyError, ValueError):
+            pass  # Never registered
+        try:
+            pipe.close()
+        except OSError:
+            pass
+        buffer.close(error)
+
+    @staticmethod
+    def _drain(pipe: IO[bytes], buffer: OutputBuffer):
+        error = None
+        try:
+            while True:
+                try:
+                    data = pipe.read1(_READ_SIZE)
+                except (OSError, ValueError):
+                    break
+                if not data:
+                    break
+                buffer.write(data)
+        except Exception as e:
+            error = e
+        finally:
+            pipe.close()
+            buffer.close(error)
+
+
+_shared_pump: Optional[OutputPump] = None
+_shared_pump_lock = threading.Lock()
+
+
+def shared_pump() -> OutputPump:
+    """Return the OutputPump shared by the whole process."""
+    global _shared_pump
+    with _shared_pump_lock:
+        if _shared_pump is None:
+            _shared_pump = OutputPump()
+        return _shared_pump
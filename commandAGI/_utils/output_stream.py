@@ -0,0 +1,277 @@
+"""Streaming of process output while the process runs.
+
+Output is passed around as a sequence of events: OutputChunk for each piece of
+stdout or stderr as it's read, then a single ProcessExit once the process has
+finished. Between the daemon and RemoteComputer the events travel as
+server-sent events.
+"""
+
+import codecs
+import json
+import os
+import queue
+import signal
+import threading
+import time
+from collections import deque
+from typing import IO, Any, Deque, Dict, Iterable, Iterator, Literal, Optional, Union
+
+from pydantic import BaseModel
+
+SSE_MEDIA_TYPE = "text/event-stream"
+
+_READ_SIZE = 65536
+
+# Seconds between checks of a stream's cancel event while no output arrives
+_CANCEL_POLL_INTERVAL = 0.1
+
+
+class OutputChunk(BaseModel):
+    stream: Literal["stdout", "stderr"]
+    data: str
+
+
+class ProcessExit(BaseModel):
+    # None if the process was killed because it timed out
+    returncode: Optional[int] = None
+    timed_out: bool = False
+    # Bytes of output left out because of max_output_bytes
+    dropped_bytes: int = 0
+
+
+OutputEvent = Union[OutputChunk, ProcessExit]
+
+
+def _pump(name: str, pipe: IO[bytes], events: queue.Queue):
+    try:
+        while data := pipe.read1(_READ_SIZE):
+            events.put((name, data))
+    except (OSError, ValueError):
+        pass
+    finally:
+        events.put((name, None))
+
+
+def _kill(process):
+    """Kill a process that is still running, and the rest of its process group
+    if it leads one (e.g. it was started with start_new_session=True)."""
+    if process.poll() is not None:
+        return
+    try:
+        if os.name == "posix" and os.getpgid(process.pid) == process.pid:
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except ProcessLookupError:
+        pass
+    process.wait()
+
+
+def iter_process_output(
+    process, timeout: Optional[float] = None, cancel: Optional[threading.Event] = None
+) -> Iterator[OutputEvent]:
+    """Yield the output of a process as it's produced.
+
+    The process must have been started with binary stdout and stderr pipes.
+    It is killed if it runs longer than timeout, if cancel is set, or if the
+    caller stops iterating before it has exited. If it leads its own process
+    group, the processes it started are killed with it.
+
+    Args:
+        process: A subprocess.Popen with stdout=PIPE and stderr=PIPE
+        timeout: Seconds after which the process is killed, or None
+        cancel: Event that kills the process when set, even while the caller
+            is blocked waiting for output (e.g. from another thread when the
+            consumer of the output went away)
+
+    Yields:
+        OutputEvent: An OutputChunk per read from either pipe, then a
+            ProcessExit
+    """
+    events: queue.Queue = queue.Queue()
+    decoders = {}
+    for name, pipe in (("stdout", process.stdout), ("stderr", process.stderr)):
+        decoders[name] = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        threading.Thread(target=_pump, args=(name, pipe, events), daemon=True).start()
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    try:
+        open_pipes = len(decoders)
+        while open_pipes:
+            if cancel is not None and cancel.is_set():
+                return
+            remaining = None if deadline is None else deadline - time.monotonic()
+            wait = remaining
+            if cancel is not None:
+                wait = min(_CANCEL_POLL_INTERVAL, wait or _CANCEL_POLL_INTERVAL)
+            try:
+                if remaining is not None and remaining <= 0:
+                    raise queue.Empty
+                name, data = events.get(timeout=wait)
+            except queue.Empty:
+                if remaining is None or time.monotonic() < deadline:
+                    continue
+                _kill(process)
+                yield ProcessExit(timed_out=True)
+                return
+            if data is None:
+                open_pipes -= 1
+                text = decoders[name].decode(b"", final=True)
+            else:
+                text = decoders[name].decode(data)
+            if text:
+                yield OutputChunk(stream=name, data=text)
+        yield ProcessExit(returncode=process.wait())
+    finally:
+        _kill(process)
+
+
+def _truncate(text: str, max_bytes: int, from_start: bool) -> str:
+    data = text.encode("utf-8")
+    data = data[len(data) - max_bytes :] if from_start else data[:max_bytes]
+    # A character cut in half is dropped entirely
+    return data.decode("utf-8", errors="ignore")
+
+
+def limit_output(
+    events: Iterable[OutputEvent], max_bytes: Optional[int] = None, tail: bool = False
+) -> Iterator[OutputEvent]:
+    """Cap the amount of output passed on from a stream of output events.
+
+    Output is counted in UTF-8 bytes across stdout and stderr together, and
+    the bytes that were left out are reported in the ProcessExit.
+
+    Args:
+        events: The events to pass on
+        max_bytes: The most bytes of output to pass on, or None for no limit
+        tail: Whether to keep the last max_bytes of output instead of the
+            first. Nothing is passed on until the process exits, since only
+            then is it known which output comes last.
+
+    Yields:
+        OutputEvent: The events, with output beyond the limit left out
+
+    Examples:
+        >>> events = [
+        ...     OutputChunk(stream="stdout", data="hello "),
+        ...     OutputChunk(stream="stdout", data="world"),
+        ...     ProcessExit(returncode=0),
+        ... ]
+        >>> [e.data for e in limit_output(events, 8) if isinstance(e, OutputChunk)]
+        ['hello ', 'wo']
+        >>> [e.data for e in list(limit_output(events, 8, tail=True))[:-1]]
+        ['lo ', 'world']
+        >>> list(limit_output(events, 8))[-1].dropped_bytes
+        3
+    """
+    if max_bytes is None:
+        yield from events
+        return
+
+    dropped = 0
+    budget = max_bytes
+    kept: Deque[OutputChunk] = deque()
+    kept_bytes = 0
+    for event in events:
+        if isinstance(event, ProcessExit):
+            yield from kept
+            yield event.model_copy(update={"dropped_bytes": dropped})
+            return
+        size = len(event.data.encode("utf-8"))
+        if not tail:
+            if size > budget:
+                dropped += size - budget
+                event = event.model_copy(
+                    update={"data": _truncate(event.data, budget, from_start=False)}
+                )
+                size = budget
+            budget -= size
+            if size:
+                yield event
+            continue
+
+        kept.append(event)
+        kept_bytes += size
+        while kept_bytes > max_bytes:
+            oldest = kept.popleft()
+            oldest_size = len(oldest.data.encode("utf-8"))
+            excess = kept_bytes - max_bytes
+            if oldest_size > excess:
+                kept.appendleft(
+                    oldest.model_copy(
+                        update={
+                            "data": _truncate(
+                                oldest.data, oldest_size - excess, from_start=True
+                            )
+                        }
+                    )
+                )
+                oldest_size = excess
+            kept_bytes -= oldest_size
+            dropped += oldest_size
+    yield from kept
+
+
+def collect_output(events: Iterable[OutputEvent]) -> Dict[str, Any]:
+    """Gather a stream of output events into whole strings.
+
+    Returns:
+        Dict containing stdout, stderr, returncode, timed_out and
+        dropped_bytes
+    """
+    output = {"stdout": [], "stderr": []}
+    result = ProcessExit()
+    for event in events:
+        if isinstance(event, OutputChunk):
+            output[event.stream].append(event.data)
+        else:
+            result = event
+    return {
+        "stdout": "".join(output["stdout"]),
+        "stderr": "".join(output["stderr"]),
+        **result.model_dump(),
+    }
+
+
+def encode_sse_event(event: OutputEvent) -> bytes:
+    """Encode an output event as a server-sent event named after its stream,
+    or "exit"."""
+    name = event.stream if isinstance(event, OutputChunk) else "exit"
+    return f"event: {name}\ndata: {event.model_dump_json()}\n\n".encode("utf-8")
+
+
+def encode_sse_error(message: str) -> bytes:
+    """Encode an error that ended an output stream early."""
+    data = json.dumps({"detail": message})
+    return f"event: error\ndata: {data}\n\n".encode("utf-8")
+
+
+def decode_sse_events(lines: Iterable[str]) -> Iterator[OutputEvent]:
+    """Decode the output events from the lines of a server-sent event stream.
+
+    Raises:
+        RuntimeError: If the stream reports an error
+    """
+    name, data = "message", []
+    for line in lines:
+        if line:
+            if line.startswith(":"):
+                continue  # Comment, e.g. a keep-alive
+            field, _, value = line.partition(":")
+            value = value[1:] if value.startswith(" ") else value
+            if field == "event":
+                name = value
+            elif field == "data":
+                data.append(value)
+            continue
+
+        if not data:
+            continue
+        payload = "\n".join(data)
+        if name in ("stdout", "stderr"):
+            yield OutputChunk.model_validate_json(payload)
+        elif name == "exit":
+            yield ProcessExit.model_validate_json(payload)
+        elif name == "error":
+            raise RuntimeError(json.loads(payload)["detail"])
+        name, data = "message", []
@@ -0,0 +1,147 @@
+import datetime
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import psutil
+
+# Fields a snapshot can contain. Static fields never change for a given
+# process, so they are read once and reused on later snapshots.
+PROCESS_FIELDS = (
+    "pid",
+    "name",
+    "username",
+    "status",
+    "create_time",
+    "memory_mb",
+    "cpu_percent",
+    "cmdline",
+    "exe",
+)
+_STATIC_FIELDS = {"name", "username", "create_time", "cmdline", "exe"}
+# Values used when a field can't be read (e.g. access denied)
+_FIELD_DEFAULTS = {"cmdline": [], "exe": ""}
+
+
+class ProcessSampler:
+    """Takes cheap, repeatable snapshots of the running processes.
+
+    CPU usage is measured over one shared window instead of blocking on every
+    process: the first time a process is seen its CPU counters are primed, and
+    if any process was new the sampler sleeps once for sample_interval before
+    reading them all. On later snapshots the window is simply the time since
+    the previous snapshot, so no sleep is needed. Static fields (name,
+    cmdline, exe, ...) are only read for new processes, and a snapshot younger
+    than ttl seconds is returned from cache.
+
+    Args:
+        ttl: Seconds for which a snapshot is reused
+        sample_interval: Seconds to measure CPU usage over for new processes
+
+    Examples:
+        >>> sampler = ProcessSampler(sample_interval=0)
+        >>> processes = sampler.snapshot(fields=["pid", "name"])
+        >>> sorted(processes[0])
+        ['name', 'pid']
+    """
+
+    def __init__(self, ttl: float = 1.0, sample_interval: float = 0.1):
+        self.ttl = ttl
+        self.sample_interval = sample_interval
+        self._lock = threading.Lock()
+        # pid -> (psutil.Process, cached static fields)
+        self._processes: Dict[int, tuple[psutil.Process, Dict[str, Any]]] = {}
+        self._cache: Optional[List[Dict[str, Any]]] = None
+        self._cache_fields: frozenset = frozenset()
+        self._cache_time = 0.0
+
+    def snapshot(self, fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Get information about the running processes.
+
+        Args:
+            fields: Fields to include for each process (see PROCESS_FIELDS).
+                Defaults to all of them. Asking only for what you need avoids
+                the more expensive lookups such as cmdline and exe.
+
+        Returns:
+            List[Dict[str, Any]]: One dict per process with the requested fields
+
+        Raises:
+            ValueError: If an unknown field is requested
+        """
+        fields = frozenset(fields or PROCESS_FIELDS)
+        unknown = fields.difference(PROCESS_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown process fields: {sorted(unknown)}")
+
+        with self._lock:
+            now = time.monotonic()
+            if (
+                self._cache is None
+                or now - self._cache_time > self.ttl
+                or not fields <= self._cache_fields
+            ):
+                self._cache = self._sample(fields)
+                self._cache_fields = fields
+                self._cache_time = time.monotonic()
+            return [
+                {field: info[field] for field in info if field in fields}
+                for info in self._cache
+            ]
+
+    def _sample(self, fields: frozenset) -> List[Dict[str, Any]]:
+        """Refresh the process table and read the requested fields."""
+        pids = set(psutil.pids())
+        for pid in list(self._processes):
+            if pid not in pids:
+                del self._processes[pid]
+
+        new_processes = False
+        for pid in pids:
+            entry = self._processes.get(pid)
+            try:
+                if entry is None or not entry[0].is_running():
+                    # is_running() also catches a pid reused by another process
+                    proc = psutil.Process(pid)
+                    proc.cpu_percent(interval=None)
+                    self._processes[pid] = (proc, {})
+                    new_processes = True
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                self._processes.pop(pid, None)
+
+        if "cpu_percent" in fields and new_processes and self.sample_interval > 0:
+            time.sleep(self.sample_interval)
+
+        snapshot = []
+        for pid, (proc, static) in list(self._processes.items()):
+            try:
+                info = {"pid": pid}
+                with proc.oneshot():
+                    for field in PROCESS_FIELDS[1:]:
+                        if field not in fields:
+                            continue
+                        if field in _STATIC_FIELDS:
+                            if field not in static:
+                                static[field] = self._read_field(proc, field)
+                            info[field] = static[field]
+                        else:
+                            info[field] = self._read_field(proc, field)
+                snapshot.append(info)
+            except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                self._processes.pop(pid, None)
+        return snapshot
+
+    @staticmethod
+    def _read_field(proc: psutil.Process, field: str) -> Any:
+        try:
+            if field == "memory_mb":
+                return proc.memory_info().rss / (1024 * 1024)
+            if field == "cpu_percent":
+                return proc.cpu_percent(interval=None)
+            if field == "create_time":
+                return datetime.datetime.fromtimestamp(proc.create_time()).strftime(
+                    "%Y-%m-%d %H:%M:%S"
+                )
+            return getattr(proc, field)()
+        except psutil.AccessDenied:
+            return _FIELD_DEFAULTS.get(field)
@@ -2,7 +2,7 @@ import uuid
 from abc import abstractmethod
 from typing import Union
 
-from langchain.schema import ChatMessage
+from langchain_core.messages import ChatMessage
 from pydantic import BaseModel, Field
 
 from commandAGI._utils.mcp_schema import MCPServerConnection
@@ -0,0 +1,130 @@
+"""Framing of commands sent to a persistent shell session.
+
+A command written to an interactive shell gives no sign of when it has
+finished or how it exited. SentinelCommand wraps it in a script that prints a
+unique begin marker, runs the command and then prints a unique end marker
+with the command's exit status, so the output of the command is exactly what
+arrives between the two markers.
+
+The markers are printed with the token split into two arguments, so the
+script itself never contains them and neither does any echo or trace of it
+(e.g. from ``set -x``).
+"""
+
+import uuid
+from typing import List, Optional
+
+
+class SentinelCommand:
+    """A shell command framed by unique begin and end markers.
+
+    Write script to the shell and pass everything read back from it to feed
+    until done is True. The markers are the token followed by "B", and by
+    "E:" and the exit status.
+
+    Args:
+        command: The command to run, may span several lines
+        windows: Whether the shell is cmd.exe (with echo off) rather than a
+            POSIX shell
+
+    Examples:
+        >>> command = SentinelCommand("ls missing")
+        >>> b"ls missing" in command.script
+        True
+        >>> token = command.token.encode()
+        >>> token + b"B" in command.script
+        False
+        >>> command.feed(b"stale prompt$ " + token + b"B\\r\\nls: missing\\r\\n")
+        b''
+        >>> command.feed(b"\\r\\n" + token + b"E:2\\r\\n")
+        b'ls: missing\\r\\n'
+        >>> command.done, command.returncode, command.output
+        (True, 2, b'ls: missing\\r\\n')
+    """
+
+    def __init__(self, command: str, windows: bool = False):
+        self.token = token = uuid.uuid4().hex
+        self._begin = f"{token}B".encode()
+        self._end = f"{token}E:".encode()
+        if windows:
+            # With echo off cmd.exe doesn't print the commands it runs
+            script = (
+                f"echo {token}B\r\n{command}\r\necho.\r\n"
+                f"echo {token}E:%errorlevel%\r\n"
+            )
+        else:
+            head, tail = token[:16], token[16:]
+            # The end marker goes on its own line, after whatever the command
+            # printed last, and reports the command's $?
+            script = (
+                f"printf '%s%s\\n' '{head}' '{tail}B'\n{command}\n"
+                f"printf '\\n%s%s:%s\\n' '{head}' '{tail}E' \"$?\"\n"
+            )
+        self.script = script.encode()
+        self.started = False
+        self.returncode: Optional[int] = None
+        self._pending = bytearray()
+        self._chunks: List[bytes] = []
+
+    @property
+    def done(self) -> bool:
+        return self.returncode is not None
+
+    @property
+    def output(self) -> bytes:
+        """The output of the command received so far."""
+        return b"".join(self._chunks)
+
+    def feed(self, data: bytes) -> bytes:
+        """Process data read from the shell.
+
+        Anything before the begin marker, e.g. prompts or output of earlier
+        commands that timed out, is discarded, as is anything after the end
+        marker.
+
+        Args:
+            data: The bytes read
+
+        Returns:
+            bytes: The command output that became known with this data. A
+                few bytes are held back until it's clear they don't belong
+                to the end marker.
+        """
+        if self.done:
+            return b""
+        self._pending += data
+
+        if not self.started:
+            index = self._pending.find(self._begin)
+            if index < 0:
+                # Only the start of a marker split across reads is kept
+                del self._pending[: max(0, len(self._pending) - len(self._begin))]
+                return b""
+            newline = self._pending.find(b"\n", index)
+            if newline < 0:
+                return b""
+            del self._pending[: newline + 1]
+            self.started = True
+
+        index = self._pending.find(self._end)
+        if index >= 0:
+            newline = self._pending.find(b"\n", index)
+            if newline < 0:
+                return b""
+            self.returncode = int(self._pending[index + len(self._end) : newline])
+            output = bytes(self._pending[:index])
+            # Drop the line break printed before the end marker
+            for line_break in (b"\r\n", b"\n"):
+                if output.endswith(line_break):
+                    output = output[: -len(line_break)]
+                    break
+            self._pending.clear()
+        else:
+            # The end marker and the line break before it may arrive split
+            held = len(self._end) + 2
+            output = bytes(self._pending[:-held]) if len(self._pending) > held else b""
+            del self._pending[: len(output)]
+
+        if output:
+            self._chunks.append(output)
+        return output
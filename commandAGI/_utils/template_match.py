@@ -0,0 +1,221 @@
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import cv2
+import numpy as np
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None  # PIL is optional
+
+
+class PreparedTemplate:
+    """A template image converted once and resized lazily for each scale.
+
+    Args:
+        image: (H, W) grayscale or (H, W, 3) BGR uint8 array
+    """
+
+    def __init__(self, image: np.ndarray):
+        self.image = np.ascontiguousarray(image)
+        self._scaled: Dict[float, np.ndarray] = {1.0: self.image}
+
+    @property
+    def size(self) -> tuple[int, int]:
+        """(width, height) of the template at scale 1."""
+        return self.image.shape[1], self.image.shape[0]
+
+    def at_scale(self, scale: float) -> np.ndarray:
+        """Get the template resized by scale, computing it only once."""
+        if scale not in self._scaled:
+            width, height = self.size
+            size = (max(1, round(width * scale)), max(1, round(height * scale)))
+            interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+            self._scaled[scale] = cv2.resize(
+                self.image, size, interpolation=interpolation
+            )
+        return self._scaled[scale]
+
+
+def to_match_image(image: np.ndarray, grayscale: bool, rgb: bool = True) -> np.ndarray:
+    """Convert an image array to the layout matching runs on.
+
+    Args:
+        image: (H, W), (H, W, 3) or (H, W, 4) uint8 array
+        grayscale: Convert to a single channel instead of BGR
+        rgb: Whether 3-channel input is RGB (PIL order) rather than BGR.
+            4-channel input is taken to be BGRA, as captured by mss.
+
+    Returns:
+        np.ndarray: (H, W) grayscale or (H, W, 3) BGR array
+    """
+    if image.ndim == 2:
+        return image if grayscale else cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+    if image.shape[-1] == 4:
+        code = cv2.COLOR_BGRA2GRAY if grayscale else cv2.COLOR_BGRA2BGR
+    elif rgb:
+        code = cv2.COLOR_RGB2GRAY if grayscale else cv2.COLOR_RGB2BGR
+    else:
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if grayscale else image
+    return cv2.cvtColor(image, code)
+
+
+@lru_cache(maxsize=128)
+def _load_template_file(path: str, mtime: float, grayscale: bool) -> PreparedTemplate:
+    # mtime is part of the cache key so edited files are read again
+    image = np.asarray(Image.open(path).convert("RGB"))
+    return PreparedTemplate(to_match_image(image, grayscale))
+
+
+def prepare_template(
+    template: Union[str, Path, "Image.Image", np.ndarray, PreparedTemplate],
+    grayscale: bool = True,
+) -> PreparedTemplate:
+    """Load and convert a template, reusing the result for template files.
+
+    Args:
+        template: Path to an image file, a PIL Image, an RGB(A) array or an
+            already prepared template
+        grayscale: Prepare the template for grayscale matching
+
+    Returns:
+        PreparedTemplate: The template ready for match_templates
+    """
+    if isinstance(template, PreparedTemplate):
+        return template
+    if isinstance(template, (str, Path)):
+        path = os.path.abspath(template)
+        return _load_template_file(path, os.path.getmtime(path), grayscale)
+    if Image is not None and isinstance(template, Image.Image):
+        template = np.asarray(template.convert("RGB"))
+    return PreparedTemplate(to_match_image(template, grayscale))
+
+
+def non_max_suppression(
+    boxes: np.ndarray, scores: np.ndarray, overlap_threshold: float = 0.3
+) -> List[int]:
+    """Greedily keep the best boxes, dropping any that overlap a kept one.
+
+    Args:
+        boxes: (N, 4) array of (left, top, width, height)
+        scores: (N,) array of scores, higher is better
+        overlap_threshold: Intersection over union above which a box is
+            considered a duplicate of a better one
+
+    Returns:
+        List[int]: Indices of the kept boxes, best first
+
+    Examples:
+        >>> boxes = np.array([[0, 0, 10, 10], [1, 1, 10, 10], [50, 50, 10, 10]])
+        >>> non_max_suppression(boxes, np.array([0.9, 0.95, 0.8]))
+        [1, 2]
+    """
+    if len(boxes) == 0:
+        return []
+    left, top = boxes[:, 0], boxes[:, 1]
+    right, bottom = left + boxes[:, 2], top + boxes[:, 3]
+    areas = boxes[:, 2] * boxes[:, 3]
+    order = np.argsort(scores)[::-1]
+
+    keep = []
+    while order.size:
+        best, rest = order[0], order[1:]
+        keep.append(int(best))
+        overlap_w = np.clip(
+            np.minimum(right[best], right[rest]) - np.maximum(left[best], left[rest]),
+            0,
+            None,
+        )
+        overlap_h = np.clip(
+            np.minimum(bottom[best], bottom[rest]) - np.maximum(top[best], top[rest]),
+            0,
+            None,
+        )
+        intersection = overlap_w * overlap_h
+        iou = intersection / (areas[best] + areas[rest] - intersection)
+        order = rest[iou <= overlap_threshold]
+    return keep
+
+
+def match_templates(
+    frame: np.ndarray,
+    templates: Sequence[PreparedTemplate],
+    threshold: float = 0.8,
+    method: int = cv2.TM_CCOEFF_NORMED,
+    scales: Sequence[float] = (1.0,),
+    overlap_threshold: float = 0.3,
+    max_matches: Optional[int] = None,
+) -> List[List[Dict[str, Any]]]:
+    """Find every occurrence of several templates in one frame.
+
+    Each template is matched at every scale against the same frame. Only
+    local maxima of the score map above threshold are kept as candidates, and
+    overlapping candidates (across scales too) are reduced with
+    non_max_suppression.
+
+    Args:
+        frame: Image to search, in the same layout as the templates (see
+            to_match_image)
+        templates: Templates to locate
+        threshold: Minimum score (0-1) of a match
+        method: cv2 template matching method. For the TM_SQDIFF methods the
+            score is 1 - difference.
+        scales: Factors to resize the templates by, e.g. (1.0, 2.0) to also
+            find icons captured at 1x on a 2x HiDPI screen
+        overlap_threshold: See non_max_suppression
+        max_matches: Maximum number of matches per template
+
+    Returns:
+        List[List[Dict[str, Any]]]: For each template, its matches best first,
+        each with left, top, width, height, x, y (the center), score and scale
+    """
+    frame_h, frame_w = frame.shape[:2]
+    inverted = method in (cv2.TM_SQDIFF, cv2.TM_SQDIFF_NORMED)
+    results = []
+
+    for template in templates:
+        boxes, scores, match_scales = [], [], []
+        for scale in scales:
+            scaled = template.at_scale(scale)
+            height, width = scaled.shape[:2]
+            if height > frame_h or width > frame_w:
+                continue
+            result = cv2.matchTemplate(frame, scaled, method)
+            if inverted:
+                result = 1 - result
+            # Keep only local maxima so a match yields one candidate, not a blob
+            kernel = np.ones((max(1, height // 2), max(1, width // 2)), np.uint8)
+            peaks = (result >= threshold) & (result == cv2.dilate(result, kernel))
+            ys, xs = np.nonzero(peaks)
+            boxes.extend(
+                np.stack(
+                    [xs, ys, np.full_like(xs, width), np.full_like(xs, height)],
+                    axis=1,
+                )
+            )
+            scores.extend(result[ys, xs])
+            match_scales.extend([scale] * len(xs))
+
+        keep = non_max_suppression(
+            np.array(boxes).reshape(-1, 4), np.array(scores), overlap_threshold
+        )[:max_matches]
+        matches = []
+        for index in keep:
+            left, top, width, height = (int(value) for value in boxes[index])
+            matches.append(
+                {
+                    "left": left,
+                    "top": top,
+                    "width": width,
+                    "height": height,
+                    "x": left + width // 2,
+                    "y": top + height // 2,
+                    "score": float(scores[index]),
+                    "scale": match_scales[index],
+                }
+            )
+        results.append(matches)
+    return results
@@ -1,10 +1,13 @@
+import asyncio
+import inspect
 import json
 import uuid
 from enum import Enum
-from typing import Dict, List, Optional, TypeVar, Union
+from typing import Any, Callable, Dict, List, Optional, Union
 
 import instructor
 from anthropic import Anthropic as AnthropicClient
+from anthropic import AsyncAnthropic as AsyncAnthropicClient
 from google.genai import Client as GeminiClient
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.messages import (
@@ -15,20 +18,30 @@ from langchain_core.messages import (
     ToolMessage,
 )
 from langchain_core.tools import BaseTool
+from openai import AsyncClient as AsyncOpenAIClient
 from openai import Client as OpenAIClient
 from pydantic import BaseModel
 
+from commandAGI.agents._message_cache import (
+    AttachToolCall,
+    Conversion,
+    ProviderMessageCache,
+)
 from commandAGI.agents.base_agent import AgentEvent
 from commandAGI.agents.events import (
     AgentResponseEvent,
     SystemInputEvent,
     ToolCallEvent,
     ToolResultEvent,
+    TSchema,
     UserInputEvent,
 )
-from commandAGI.client import Client as CommandAGIClient
 
-TSchema = TypeVar("TSchema", bound=BaseModel)
+try:
+    from commandAGI.client import Client as CommandAGIClient
+except ImportError:
+    # The hosted commandAGI API client is distributed separately
+    CommandAGIClient = None
 
 
 class AIClientType(Enum):
@@ -40,16 +53,22 @@ class AIClientType(Enum):
 
 
 AIClient = Union[
-    CommandAGIClient, OpenAIClient, AnthropicClient, GeminiClient, BaseChatModel
+    CommandAGIClient,
+    OpenAIClient,
+    AsyncOpenAIClient,
+    AnthropicClient,
+    AsyncAnthropicClient,
+    GeminiClient,
+    BaseChatModel,
 ]
 
 
 def _get_api_provider_type_for_client(client: AIClient) -> AIClientType:
-    if isinstance(client, CommandAGIClient):
+    if CommandAGIClient is not None and isinstance(client, CommandAGIClient):
         return AIClientType.COMMANDAGI
-    elif isinstance(client, OpenAIClient):
+    elif isinstance(client, (OpenAIClient, AsyncOpenAIClient)):
         return AIClientType.OPENAI
-    elif isinstance(client, AnthropicClient):
+    elif isinstance(client, (AnthropicClient, AsyncAnthropicClient)):
         return AIClientType.ANTHROPIC
     elif isinstance(client, GeminiClient):
         return AIClientType.GEMINI
@@ -64,8 +83,8 @@ class MultiBackendTool(BaseTool):
 
 
 def _format_tools_for_api_provider(
-    cls, tools: list[BaseTool], provider_type: AIClientType
-) -> list[BaseTool]:
+    tools: Optional[list[BaseTool]], provider_type: AIClientType
+) -> Optional[list[BaseTool]]:
     def _replace_tool_if_needed(tool: BaseTool) -> BaseTool:
         if (
             isinstance(tool, MultiBackendTool)
@@ -76,17 +95,19 @@ def _format_tools_for_api_provider(
             return tool.backend_mappings[provider_type]
         return tool
 
+    if tools is None:
+        return None
     return [_replace_tool_if_needed(tool) for tool in tools]
 
 
-def _generate_response_commandagi(
+def _commandagi_request(
     client: CommandAGIClient,
     inputs: list[Union[ChatMessage, AgentEvent]],
     tools: Optional[list[BaseTool]] = None,
     output_schema: Optional[type[TSchema]] = None,
     **additional_kwargs,
-) -> List[AgentEvent]:
-    return client.chat.completions.create(
+) -> tuple[Callable, dict]:
+    return client.chat.completions.create, dict(
         model="gpt-4o-mini",
         events=inputs,
         tools=tools,
@@ -95,327 +116,321 @@ def _generate_response_commandagi(
     )
 
 
-def _generate_response_openai(
+def _openai_message(input: Union[ChatMessage, AgentEvent]) -> Conversion:
+    if isinstance(input, ChatMessage):
+        return {
+            "role": (
+                input.type
+                if hasattr(input, "type")
+                else input.__class__.__name__.lower().replace("message", "")
+            ),
+            "content": input.content,
+            **(
+                {"function_call": input.additional_kwargs["function_call"]}
+                if hasattr(input, "additional_kwargs")
+                and "function_call" in input.additional_kwargs
+                else {}
+            ),
+        }
+    elif isinstance(input, AgentResponseEvent):
+        message = {"role": input.role, "content": input.content}
+        if input.name:
+            message["name"] = input.name
+        if input.tool_calls:
+            message["tool_calls"] = input.tool_calls
+        return message
+    elif isinstance(input, SystemInputEvent):
+        return {"role": "system", "content": input.content}
+    elif isinstance(input, UserInputEvent):
+        return {"role": "user", "content": input.content}
+    elif isinstance(input, ToolCallEvent):
+        return AttachToolCall(
+            {
+                "id": input.call_id,
+                "type": "function",
+                "function": {
+                    "name": input.tool_name,
+                    "arguments": json.dumps(input.arguments),
+                },
+            }
+        )
+    elif isinstance(input, ToolResultEvent):
+        return {
+            "role": "tool",
+            "tool_call_id": input.call_id,
+            "content": str(input.result) if input.success else str(input.error),
+        }
+    return None
+
+
+def _openai_request(
     client: OpenAIClient,
     inputs: list[Union[ChatMessage, AgentEvent]],
     tools: Optional[list[BaseTool]] = None,
     output_schema: Optional[type[TSchema]] = None,
+    message_cache: Optional[ProviderMessageCache] = None,
     **additional_kwargs,
-) -> List[AgentEvent]:
+) -> tuple[Callable, dict]:
     if output_schema:
         client = instructor.patch(client)
+        additional_kwargs["response_model"] = output_schema
 
-    messages = []
-    for input in inputs:
-        if isinstance(input, ChatMessage):
-            messages.append(
-                {
-                    "role": (
-                        input.type
-                        if hasattr(input, "type")
-                        else input.__class__.__name__.lower().replace("message", "")
-                    ),
-                    "content": input.content,
-                    **(
-                        {"function_call": input.additional_kwargs["function_call"]}
-                        if hasattr(input, "additional_kwargs")
-                        and "function_call" in input.additional_kwargs
-                        else {}
-                    ),
-                }
-            )
-        elif isinstance(input, AgentResponseEvent):
-            message = {"role": input.role, "content": input.content}
-            if input.name:
-                message["name"] = input.name
-            if input.tool_calls:
-                message["tool_calls"] = input.tool_calls
-            messages.append(message)
-        elif isinstance(input, SystemInputEvent):
-            messages.append({"role": "system", "content": input.content})
-        elif isinstance(input, UserInputEvent):
-            messages.append({"role": "user", "content": input.content})
-        elif isinstance(input, ToolCallEvent):
-            last_assistant_idx = next(
-                (
-                    i
-                    for i in range(len(messages) - 1, -1, -1)
-                    if messages[i]["role"] == "assistant"
-                ),
-                None,
-            )
-            tool_call = {
-                "id": input.call_id,
-                "type": "function",
-                "function": {
-                    "name": input.tool_name,
-                    "arguments": json.dumps(input.arguments),
-                },
-            }
-            if last_assistant_idx is not None:
-                if "tool_calls" not in messages[last_assistant_idx]:
-                    messages[last_assistant_idx]["tool_calls"] = []
-                messages[last_assistant_idx]["tool_calls"].append(tool_call)
-            else:
-                messages.append(
-                    {
-                        "role": "assistant",
-                        "content": "",
-                        "tool_calls": [tool_call],
-                    }
-                )
-        elif isinstance(input, ToolResultEvent):
-            messages.append(
-                {
-                    "role": "tool",
-                    "tool_call_id": input.call_id,
-                    "content": str(input.result) if input.success else str(input.error),
-                }
-            )
+    if message_cache is None:
+        message_cache = ProviderMessageCache(_openai_message)
+    messages = message_cache.messages(inputs)
+
+    return client.chat.completions.create, dict(
+        model="gpt-4o-mini",
+        messages=messages,
+        tools=tools,
+        **additional_kwargs,
+    )
 
+
+def _openai_events(
+    response: Any, output_schema: Optional[type[TSchema]] = None
+) -> List[AgentEvent]:
     if output_schema:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=messages,
-            tools=tools,
-            response_model=output_schema,
-            **additional_kwargs,
-        )
         return [
             AgentResponseEvent.from_structured(
                 role="assistant",
                 structured=response,
             )
         ]
-    else:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=messages,
-            tools=tools,
-            **additional_kwargs,
+    message = response.choices[0].message
+    return [
+        AgentResponseEvent(
+            role="assistant",
+            content=message.content or "",
+            name=getattr(message, "name", None),
+            tool_calls=[
+                {
+                    "id": tc.id,
+                    "type": tc.type,
+                    "function": {
+                        "name": tc.function.name,
+                        "arguments": tc.function.arguments,
+                    },
+                }
+                for tc in (message.tool_calls or [])
+            ],
         )
-        message = response.choices[0].message
-        return [
-            AgentResponseEvent(
-                role="assistant",
-                content=message.content or "",
-                name=getattr(message, "name", None),
-                tool_calls=[
-                    {
-                        "id": tc.id,
-                        "type": tc.type,
-                        "function": {
-                            "name": tc.function.name,
-                            "arguments": tc.function.arguments,
-                        },
-                    }
-                    for tc in (message.tool_calls or [])
-                ],
-            )
-        ]
-
+    ]
 
-def _generate_response_anthropic(
-    client: AnthropicClient,
-    inputs: list[Union[ChatMessage, AgentEvent]],
-    tools: Optional[list[BaseTool]] = None,
-    output_schema: Optional[type[TSchema]] = None,
-    **additional_kwargs,
-) -> List[AgentEvent]:
-    if output_schema:
-        client = instructor.from_anthropic(create=client)
 
-    messages = []
-    for input in inputs:
-        if isinstance(input, ChatMessage):
-            messages.append(
+def _anthropic_message(input: Union[ChatMessage, AgentEvent]) -> Conversion:
+    message = _anthropic_plain_message(input)
+    if getattr(input, "cacheable", False) and isinstance(message, dict):
+        # Prompt caching breakpoint, the prefix up to here is cached
+        message = {
+            **message,
+            "content": [
+                {
+                    "type": "text",
+                    "text": message["content"],
+                    "cache_control": {"type": "ephemeral"},
+                }
+            ],
+        }
+    return message
+
+
+def _anthropic_plain_message(input: Union[ChatMessage, AgentEvent]) -> Conversion:
+    if isinstance(input, ChatMessage):
+        return {
+            "role": (
+                input.type
+                if hasattr(input, "type")
+                else input.__class__.__name__.lower().replace("message", "")
+            ),
+            "content": input.content,
+            **(
                 {
-                    "role": (
-                        input.type
-                        if hasattr(input, "type")
-                        else input.__class__.__name__.lower().replace("message", "")
-                    ),
-                    "content": input.content,
-                    **(
+                    "tool_calls": [
                         {
-                            "tool_calls": [
-                                {
-                                    "tool": fc["name"],
-                                    "tool_call_id": str(uuid.uuid4()),
-                                    "parameters": json.loads(fc["arguments"]),
-                                }
-                            ]
-                            for fc in [input.additional_kwargs["function_call"]]
-                            if hasattr(input, "additional_kwargs")
-                            and "function_call" in input.additional_kwargs
+                            "tool": fc["name"],
+                            "tool_call_id": str(uuid.uuid4()),
+                            "parameters": json.loads(fc["arguments"]),
                         }
-                    ),
+                    ]
+                    for fc in [input.additional_kwargs["function_call"]]
+                    if hasattr(input, "additional_kwargs")
+                    and "function_call" in input.additional_kwargs
                 }
-            )
-        elif isinstance(input, AgentResponseEvent):
-            message = {"role": input.role, "content": input.content}
-            if input.name:
-                message["name"] = input.name
-            if input.tool_calls:
-                message["tool_calls"] = [
-                    {
-                        "tool": tc["function"]["name"],
-                        "tool_call_id": tc["id"],
-                        "parameters": json.loads(tc["function"]["arguments"]),
-                    }
-                    for tc in input.tool_calls
-                ]
-            messages.append(message)
-        elif isinstance(input, SystemInputEvent):
-            messages.append({"role": "system", "content": input.content})
-        elif isinstance(input, UserInputEvent):
-            messages.append({"role": "user", "content": input.content})
-        elif isinstance(input, ToolCallEvent):
-            last_assistant_idx = next(
-                (
-                    i
-                    for i in range(len(messages) - 1, -1, -1)
-                    if messages[i]["role"] == "assistant"
-                ),
-                None,
-            )
-            tool_call = {
+            ),
+        }
+    elif isinstance(input, AgentResponseEvent):
+        message = {"role": input.role, "content": input.content}
+        if input.name:
+            message["name"] = input.name
+        if input.tool_calls:
+            message["tool_calls"] = [
+                {
+                    "tool": tc["function"]["name"],
+                    "tool_call_id": tc["id"],
+                    "parameters": json.loads(tc["function"]["arguments"]),
+                }
+                for tc in input.tool_calls
+            ]
+        return message
+    elif isinstance(input, SystemInputEvent):
+        return {"role": "system", "content": input.content}
+    elif isinstance(input, UserInputEvent):
+        return {"role": "user", "content": input.content}
+    elif isinstance(input, ToolCallEvent):
+        return AttachToolCall(
+            {
                 "tool": input.tool_name,
                 "tool_call_id": input.call_id,
                 "parameters": input.arguments,
             }
-            if last_assistant_idx is not None:
-                if "tool_calls" not in messages[last_assistant_idx]:
-                    messages[last_assistant_idx]["tool_calls"] = []
-                messages[last_assistant_idx]["tool_calls"].append(tool_call)
-            else:
-                messages.append(
-                    {
-                        "role": "assistant",
-                        "content": "",
-                        "tool_calls": [tool_call],
-                    }
-                )
-        elif isinstance(input, ToolResultEvent):
-            messages.append(
-                {
-                    "role": "tool",
-                    "tool_call_id": input.call_id,
-                    "content": str(input.result) if input.success else str(input.error),
-                }
-            )
+        )
+    elif isinstance(input, ToolResultEvent):
+        return {
+            "role": "tool",
+            "tool_call_id": input.call_id,
+            "content": str(input.result) if input.success else str(input.error),
+        }
+    return None
 
+
+def _anthropic_request(
+    client: AnthropicClient,
+    inputs: list[Union[ChatMessage, AgentEvent]],
+    tools: Optional[list[BaseTool]] = None,
+    output_schema: Optional[type[TSchema]] = None,
+    message_cache: Optional[ProviderMessageCache] = None,
+    **additional_kwargs,
+) -> tuple[Callable, dict]:
+    if output_schema:
+        create = instructor.from_anthropic(create=client)
+        additional_kwargs["response_model"] = output_schema
+    else:
+        create = client.messages.create
+
+    if message_cache is None:
+        message_cache = ProviderMessageCache(_anthropic_message)
+    messages = message_cache.messages(inputs)
+
+    return create, dict(
+        model="claude-3-5-sonnet-20240620",
+        messages=messages,
+        tools=tools,
+        **additional_kwargs,
+    )
+
+
+def _anthropic_events(
+    response: Any, output_schema: Optional[type[TSchema]] = None
+) -> List[AgentEvent]:
     if output_schema:
-        response = client(
-            model="claude-3-5-sonnet-20240620",
-            messages=messages,
-            tools=tools,
-            response_model=output_schema,
-            **additional_kwargs,
-        )
         return [
             AgentResponseEvent.from_structured(
                 role="assistant",
                 structured=response,
             )
         ]
-    else:
-        response = client.messages.create(
-            model="claude-3-5-sonnet-20240620",
-            messages=messages,
-            tools=tools,
-            **additional_kwargs,
+    message = response.content[0]
+    return [
+        AgentResponseEvent(
+            role="assistant",
+            content=message.text,
+            tool_calls=[
+                {
+                    "id": tc.tool_call_id,
+                    "type": "function",
+                    "function": {
+                        "name": tc.tool,
+                        "arguments": json.dumps(tc.parameters),
+                    },
+                }
+                for tc in (message.tool_calls or [])
+            ],
         )
-        message = response.content[0]
-        return [
-            AgentResponseEvent(
-                role="assistant",
-                content=message.text,
-                tool_calls=[
-                    {
-                        "id": tc.tool_call_id,
-                        "type": "function",
-                        "function": {
-                            "name": tc.tool,
-                            "arguments": json.dumps(tc.parameters),
-                        },
+    ]
+
+
+def _gemini_message(input: Union[ChatMessage, AgentEvent]) -> Conversion:
+    if isinstance(input, ChatMessage):
+        message = {
+            "role": (
+                input.type
+                if hasattr(input, "type")
+                else input.__class__.__name__.lower().replace("message", "")
+            ),
+            "content": input.content,
+        }
+        if (
+            hasattr(input, "additional_kwargs")
+            and "function_call" in input.additional_kwargs
+        ):
+            message["tool_calls"] = [
+                {
+                    "function_call": {
+                        "name": input.additional_kwargs["function_call"]["name"],
+                        "args": json.loads(
+                            input.additional_kwargs["function_call"]["arguments"]
+                        ),
                     }
-                    for tc in (message.tool_calls or [])
-                ],
-            )
-        ]
-
-
-def _generate_response_gemini(
+                }
+            ]
+        return message
+    elif isinstance(input, AgentResponseEvent):
+        message = {"role": input.role, "content": input.content}
+        if input.name:
+            message["name"] = input.name
+        if input.tool_calls:
+            message["tool_calls"] = [
+                {
+                    "function_call": {
+                        "name": tc["function"]["name"],
+                        "args": json.loads(tc["function"]["arguments"]),
+                    }
+                }
+                for tc in input.tool_calls
+            ]
+        return message
+    elif isinstance(input, SystemInputEvent):
+        return {"role": "system", "content": input.content}
+    elif isinstance(input, UserInputEvent):
+        return {"role": "user", "content": input.content}
+    # Gemini handles tool calls and results differently - they are processed
+    # in the client
+    return None
+
+
+def _gemini_request(
     client: GeminiClient,
     inputs: list[Union[ChatMessage, AgentEvent]],
     tools: Optional[list[BaseTool]] = None,
     output_schema: Optional[type[TSchema]] = None,
+    message_cache: Optional[ProviderMessageCache] = None,
     **additional_kwargs,
-) -> List[AgentEvent]:
-    messages = []
-    for input in inputs:
-        if isinstance(input, ChatMessage):
-            message = {
-                "role": (
-                    input.type
-                    if hasattr(input, "type")
-                    else input.__class__.__name__.lower().replace("message", "")
-                ),
-                "content": input.content,
-            }
-            if (
-                hasattr(input, "additional_kwargs")
-                and "function_call" in input.additional_kwargs
-            ):
-                message["tool_calls"] = [
-                    {
-                        "function_call": {
-                            "name": input.additional_kwargs["function_call"]["name"],
-                            "args": json.loads(
-                                input.additional_kwargs["function_call"]["arguments"]
-                            ),
-                        }
-                    }
-                ]
-            messages.append(message)
-        elif isinstance(input, AgentResponseEvent):
-            message = {"role": input.role, "content": input.content}
-            if input.name:
-                message["name"] = input.name
-            if input.tool_calls:
-                message["tool_calls"] = [
-                    {
-                        "function_call": {
-                            "name": tc["function"]["name"],
-                            "args": json.loads(tc["function"]["arguments"]),
-                        }
-                    }
-                    for tc in input.tool_calls
-                ]
-            messages.append(message)
-        elif isinstance(input, SystemInputEvent):
-            messages.append({"role": "system", "content": input.content})
-        elif isinstance(input, UserInputEvent):
-            messages.append({"role": "user", "content": input.content})
-        elif isinstance(input, ToolCallEvent):
-            # Gemini handles tool calls differently - they are processed in the client
-            pass
-        elif isinstance(input, ToolResultEvent):
-            # Gemini handles tool results differently - they are processed in the client
-            pass
+) -> tuple[Callable, dict]:
+    if message_cache is None:
+        message_cache = ProviderMessageCache(_gemini_message)
+    messages = message_cache.messages(inputs)
 
     if output_schema:
-        response = client.generate_content(
-            model="gemini-pro",
-            messages=messages,
-            tools=tools,
-            config={
+        additional_kwargs = {
+            "config": {
                 "response_mime_type": "application/json",
                 "response_schema": output_schema,
                 **additional_kwargs,
-            },
-        )
+            }
+        }
+    return client.generate_content, dict(
+        model="gemini-pro",
+        messages=messages,
+        tools=tools,
+        **additional_kwargs,
+    )
+
+
+def _gemini_events(
+    response: Any, output_schema: Optional[type[TSchema]] = None
+) -> List[AgentEvent]:
+    if output_schema:
         structured = output_schema.model_validate_json(response.parsed)
         return [
             AgentResponseEvent.from_structured(
@@ -423,86 +438,83 @@ def _generate_response_gemini(
                 structured=structured,
             )
         ]
-    else:
-        response = client.generate_content(
-            model="gemini-pro",
-            messages=messages,
-            tools=tools,
-            **additional_kwargs,
+    message = response.candidates[0].content
+    return [
+        AgentResponseEvent(
+            role="assistant",
+            content=message.parts[0].text,
+            tool_calls=[
+                {
+                    "id": str(uuid.uuid4()),
+                    "type": "function",
+                    "function": {
+                        "name": tc.function_call.name,
+                        "arguments": json.dumps(tc.function_call.args),
+                    },
+                }
+                for tc in (message.tool_calls or [])
+            ],
         )
-        message = response.candidates[0].content
-        return [
-            AgentResponseEvent(
-                role="assistant",
-                content=message.parts[0].text,
-                tool_calls=[
-                    {
-                        "id": str(uuid.uuid4()),
-                        "type": "function",
-                        "function": {
-                            "name": tc.function_call.name,
-                            "arguments": json.dumps(tc.function_call.args),
-                        },
-                    }
-                    for tc in (message.tool_calls or [])
-                ],
+    ]
+
+
+def _langchain_message(input: Union[ChatMessage, AgentEvent]) -> Conversion:
+    if isinstance(input, ChatMessage):
+        return input  # Use ChatMessage directly
+    elif isinstance(input, SystemInputEvent):
+        return SystemMessage(content=input.content)
+    elif isinstance(input, UserInputEvent):
+        return HumanMessage(content=input.content)
+    elif isinstance(input, AgentResponseEvent):
+        if input.tool_calls:
+            tool_calls_str = "\n".join(
+                [
+                    f"Tool Call {tc['id']}: {tc['function']['name']}({tc['function']['arguments']})"
+                    for tc in input.tool_calls
+                ]
             )
-        ]
+            content = (
+                f"{input.content}\n\nTool Calls:\n{tool_calls_str}"
+                if input.content
+                else tool_calls_str
+            )
+        else:
+            content = input.content
+        return AIMessage(content=content)
+    elif isinstance(input, ToolCallEvent):
+        return AIMessage(
+            content="",
+            additional_kwargs={
+                "function_call": {
+                    "name": input.tool_name,
+                    "arguments": json.dumps(input.arguments),
+                }
+            },
+        )
+    elif isinstance(input, ToolResultEvent):
+        return ToolMessage(
+            content=str(input.result) if input.success else str(input.error),
+            tool_call_id=input.call_id,
+        )
+    return None
 
 
-def _generate_response_langchain(
+def _langchain_request(
     client: BaseChatModel,
     inputs: list[Union[ChatMessage, AgentEvent]],
     tools: Optional[list[BaseTool]] = None,
     output_schema: Optional[type[TSchema]] = None,
+    message_cache: Optional[ProviderMessageCache] = None,
+    asynchronous: bool = False,
     **additional_kwargs,
-) -> List[AgentEvent]:
+) -> tuple[Callable, dict]:
     if output_schema:
         client = instructor.patch(client)
+        additional_kwargs["response_model"] = output_schema
 
-    lc_messages = []
-    for input in inputs:
-        if isinstance(input, ChatMessage):
-            lc_messages.append(input)  # Use ChatMessage directly
-        elif isinstance(input, SystemInputEvent):
-            lc_messages.append(SystemMessage(content=input.content))
-        elif isinstance(input, UserInputEvent):
-            lc_messages.append(HumanMessage(content=input.content))
-        elif isinstance(input, AgentResponseEvent):
-            if input.tool_calls:
-                tool_calls_str = "\n".join(
-                    [
-                        f"Tool Call {tc['id']}: {tc['function']['name']}({tc['function']['arguments']})"
-                        for tc in input.tool_calls
-                    ]
-                )
-                content = (
-                    f"{input.content}\n\nTool Calls:\n{tool_calls_str}"
-                    if input.content
-                    else tool_calls_str
-                )
-            else:
-                content = input.content
-            lc_messages.append(AIMessage(content=content))
-        elif isinstance(input, ToolCallEvent):
-            lc_messages.append(
-                AIMessage(
-                    content="",
-                    additional_kwargs={
-                        "function_call": {
-                            "name": input.tool_name,
-                            "arguments": json.dumps(input.arguments),
-                        }
-                    },
-                )
-            )
-        elif isinstance(input, ToolResultEvent):
-            lc_messages.append(
-                ToolMessage(
-                    content=str(input.result) if input.success else str(input.error),
-                    tool_call_id=input.call_id,
-                )
-            )
+    if message_cache is None:
+        message_cache = ProviderMessageCache(_langchain_message)
+    lc_messages = message_cache.messages(inputs)
 
     # Configure tools if provided
     if tools:
@@ -510,82 +522,192 @@ def _generate_response_langchain(
             tool for tool in tools
         ]  # Set tools as callbacks for LangChain
 
+    create = client.agenerate if asynchronous else client.generate
+    return create, dict(messages=lc_messages, **additional_kwargs)
+
+
+def _langchain_events(
+    response: Any, output_schema: Optional[type[TSchema]] = None
+) -> List[AgentEvent]:
     if output_schema:
-        response = client.generate(
-            lc_messages,
-            response_model=output_schema,
-            **additional_kwargs,
-        )
         return [
             AgentResponseEvent.from_structured(
                 role="assistant",
                 structured=response,
             )
         ]
-    else:
-        response = client.generate(lc_messages, **additional_kwargs)
-        content = response.content or ""
-
-        # Extract tool calls if present in the response
-        tool_calls = []
-        if (
-            hasattr(response, "additional_kwargs")
-            and "function_call" in response.additional_kwargs
-        ):
-            function_call = response.additional_kwargs["function_call"]
-            tool_calls.append(
-                {
-                    "id": str(uuid.uuid4()),
-                    "type": "function",
-                    "function": {
-                        "name": function_call["name"],
-                        "arguments": function_call["arguments"],
-                    },
-                }
-            )
+    content = response.content or ""
+
+    # Extract tool calls if present in the response
+    tool_calls = []
+    if (
+        hasattr(response, "additional_kwargs")
+        and "function_call" in response.additional_kwargs
+    ):
+        function_call = response.additional_kwargs["function_call"]
+        tool_calls.append(
+            {
+                "id": str(uuid.uuid4()),
+                "type": "function",
+                "function": {
+                    "name": function_call["name"],
+                    "arguments": function_call["arguments"],
+                },
+            }
+        )
 
-        return [
-            AgentResponseEvent(
-                role="assistant",
-                content=content,
-                name=None,
-                tool_calls=tool_calls if tool_calls else None,
-            )
-        ]
+    return [
+        AgentResponseEvent(
+            role="assistant",
+            content=content,
+            name=None,
+            tool_calls=tool_calls if tool_calls else None,
+        )
+    ]
+
+
+_MESSAGE_CONVERTERS = {
+    AIClientType.OPENAI: _openai_message,
+    AIClientType.ANTHROPIC: _anthropic_message,
+    AIClientType.GEMINI: _gemini_message,
+    AIClientType.LANGCHAIN: _langchain_message,
+}
+
+
+def _get_message_cache(
+    message_caches: Optional[Dict[AIClientType, ProviderMessageCache]],
+    provider_type: AIClientType,
+) -> Optional[ProviderMessageCache]:
+    if message_caches is None or provider_type not in _MESSAGE_CONVERTERS:
+        return None
+    if provider_type not in message_caches:
+        message_caches[provider_type] = ProviderMessageCache(
+            _MESSAGE_CONVERTERS[provider_type]
+        )
+    return message_caches[provider_type]
 
 
-def generate_response(
+def _build_request(
     inputs: list[Union[ChatMessage, AgentEvent]],
-    /,
     client: AIClient,
-    output_schema: Optional[type[TSchema]] = None,
-    tools: Optional[list[BaseTool]] = None,
+    output_schema: Optional[type[TSchema]],
+    tools: Optional[list[BaseTool]],
+    message_caches: Optional[Dict[AIClientType, ProviderMessageCache]],
+    asynchronous: bool,
     **additional_kwargs,
-) -> List[AgentEvent]:
-    """Handle chat completion for different providers with their specific parameters."""
+) -> tuple[Callable, dict, Callable]:
+    """Get the provider call for a request and the parser of its response."""
     provider_type = _get_api_provider_type_for_client(client)
     tools = _format_tools_for_api_provider(tools, provider_type)
+    message_cache = _get_message_cache(message_caches, provider_type)
 
     match provider_type:
         case AIClientType.COMMANDAGI:
-            return _generate_response_commandagi(
+            create, kwargs = _commandagi_request(
                 client, inputs, tools, output_schema, **additional_kwargs
             )
+            return create, kwargs, lambda response, output_schema: response
         case AIClientType.OPENAI:
-            return _generate_response_openai(
-                client, inputs, tools, output_schema, **additional_kwargs
+            create, kwargs = _openai_request(
+                client,
+                inputs,
+                tools,
+                output_schema,
+                message_cache=message_cache,
+                **additional_kwargs,
             )
+            return create, kwargs, _openai_events
         case AIClientType.ANTHROPIC:
-            return _generate_response_anthropic(
-                client, inputs, tools, output_schema, **additional_kwargs
+            create, kwargs = _anthropic_request(
+                client,
+                inputs,
+                tools,
+                output_schema,
+                message_cache=message_cache,
+                **additional_kwargs,
             )
+            return create, kwargs, _anthropic_events
         case AIClientType.GEMINI:
-            return _generate_response_gemini(
-                client, inputs, tools, output_schema, **additional_kwargs
+            create, kwargs = _gemini_request(
+                client,
+                inputs,
+                tools,
+                output_schema,
+                message_cache=message_cache,
+                **additional_kwargs,
             )
+            return create, kwargs, _gemini_events
         case AIClientType.LANGCHAIN:
-            return _generate_response_langchain(
-                client, inputs, tools, output_schema, **additional_kwargs
+            create, kwargs = _langchain_request(
+                client,
+                inputs,
+                tools,
+                output_schema,
+                message_cache=message_cache,
+                asynchronous=asynchronous,
+                **additional_kwargs,
             )
+            return create, kwargs, _langchain_events
         case _:
             raise ValueError(f"Unsupported client type: {type(client)}")
+
+
+def generate_response(
+    inputs: list[Union[ChatMessage, AgentEvent]],
+    /,
+    client: AIClient,
+    output_schema: Optional[type[TSchema]] = None,
+    tools: Optional[list[BaseTool]] = None,
+    message_caches: Optional[Dict[AIClientType, ProviderMessageCache]] = None,
+    **additional_kwargs,
+) -> List[AgentEvent]:
+    """Handle chat completion for different providers with their specific parameters.
+
+    Pass the same message_caches dict on every call of a session (see
+    AgentRunSession) so each event is converted to the provider's message
+    format only once instead of on every call.
+    """
+    create, kwargs, parse = _build_request(
+        inputs,
+        client,
+        output_schema,
+        tools,
+        message_caches,
+        asynchronous=False,
+        **additional_kwargs,
+    )
+    return parse(create(**kwargs), output_schema)
+
+
+async def agenerate_response(
+    inputs: list[Union[ChatMessage, AgentEvent]],
+    /,
+    client: AIClient,
+    output_schema: Optional[type[TSchema]] = None,
+    tools: Optional[list[BaseTool]] = None,
+    message_caches: Optional[Dict[AIClientType, ProviderMessageCache]] = None,
+    **additional_kwargs,
+) -> List[AgentEvent]:
+    """Async version of generate_response that never blocks the event loop.
+
+    Async clients (AsyncOpenAI, AsyncAnthropic) and LangChain models are
+    awaited natively. Other clients are called in a worker thread.
+    """
+    create, kwargs, parse = _build_request(
+        inputs,
+        client,
+        output_schema,
+        tools,
+        message_caches,
+        asynchronous=True,
+        **additional_kwargs,
+    )
+    if inspect.iscoroutinefunction(create) or isinstance(
+        client, (AsyncOpenAIClient, AsyncAnthropicClient)
+    ):
+        response = create(**kwargs)
+        if inspect.isawaitable(response):
+            response = await response
+    else:
+        response = await asyncio.to_thread(create, **kwargs)
+    return parse(response, output_schema)
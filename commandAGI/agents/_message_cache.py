@@ -0,0 +1,158 @@
+import threading
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Union
+
+
+class AttachToolCall(NamedTuple):
+    """Conversion result that adds a tool call to the last assistant message.
+
+    Providers that list tool calls on the assistant message (OpenAI,
+    Anthropic) convert a ToolCallEvent into this instead of a message.
+    """
+
+    tool_call: Dict[str, Any]
+
+
+Conversion = Union[None, Any, AttachToolCall]
+
+
+class _Mark(NamedTuple):
+    """Fold state before an event, used to undo it."""
+
+    message_count: int
+    last_assistant: Optional[int]
+    # (index, message before) if the event replaced an earlier message
+    replaced: Optional[tuple[int, Any]]
+    conversion: Conversion
+
+
+class ProviderMessageCache:
+    """Provider messages of an event history, built incrementally.
+
+    Every event is converted once with convert, which returns the provider
+    message, an AttachToolCall, or None to skip the event. When called with
+    the same history plus new events, only the new events are converted and
+    appended. Events that were inserted, deleted or replaced are detected by
+    identity; the messages from the first changed event on are rebuilt,
+    reusing the conversions of events that are still there. Events edited in
+    place must be reported with invalidate (AgentRunSession does this from
+    its message update hooks).
+
+    Args:
+        convert: Converts one event into a provider message
+
+    Examples:
+        >>> cache = ProviderMessageCache(lambda e: {"role": "user", "content": e})
+        >>> history = ["hi", "there"]
+        >>> cache.messages(history)[-1]
+        {'role': 'user', 'content': 'there'}
+        >>> history.append("again")
+        >>> len(cache.messages(history))
+        3
+    """
+
+    def __init__(self, convert: Callable[[Any], Conversion]):
+        self.convert = convert
+        self._lock = threading.Lock()
+        self._events: List[Any] = []
+        self._marks: List[_Mark] = []
+        self._messages: List[Any] = []
+        self._last_assistant: Optional[int] = None
+        # Conversions of events taken out by invalidate, by id(event)
+        self._reusable: Dict[int, tuple[Any, Conversion]] = {}
+
+    def messages(self, events: List[Any]) -> List[Any]:
+        """Get the provider messages for events.
+
+        Returns:
+            List[Any]: A new list; the messages in it must not be modified
+        """
+        with self._lock:
+            unchanged = 0
+            limit = min(len(events), len(self._events))
+            while unchanged < limit and events[unchanged] is self._events[unchanged]:
+                unchanged += 1
+            reusable = self._truncate(unchanged)
+            reusable.update(self._reusable)
+            self._reusable = {}
+
+            for event in events[unchanged:]:
+                entry = reusable.get(id(event))
+                if entry is not None and entry[0] is event:
+                    conversion = entry[1]
+                else:
+                    conversion = self.convert(event)
+                self._fold(event, conversion)
+            return list(self._messages)
+
+    def invalidate(self, index: int) -> None:
+        """Convert the event at index again next time, e.g. after an edit."""
+        with self._lock:
+            if index >= len(self._events):
+                return
+            edited = self._events[index]
+            self._reusable.update(self._truncate(index))
+            self._reusable.pop(id(edited), None)
+
+    def clear(self) -> None:
+        """Forget all events and messages."""
+        with self._lock:
+            self._truncate(0)
+            self._reusable = {}
+
+    def _fold(self, event: Any, conversion: Conversion) -> None:
+        message_count = len(self._messages)
+        last_assistant = self._last_assistant
+        replaced = None
+        if isinstance(conversion, AttachToolCall):
+            if last_assistant is not None:
+                # Copy on write, so message lists returned before stay valid
+                message = self._messages[last_assistant]
+                replaced = (last_assistant, message)
+                self._messages[last_assistant] = {
+                    **message,
+                    "tool_calls": message.get("tool_calls", [])
+                    + [conversion.tool_call],
+                }
+            else:
+                self._append(
+                    {
+                        "role": "assistant",
+                        "content": "",
+                        "tool_calls": [conversion.tool_call],
+                    }
+                )
+        elif conversion is not None:
+            self._append(conversion)
+        self._events.append(event)
+        self._marks.append(
+            _Mark(
+                message_count=message_count,
+                last_assistant=last_assistant,
+                replaced=replaced,
+                conversion=conversion,
+            )
+        )
+
+    def _append(self, message: Any) -> None:
+        if isinstance(message, dict) and message.get("role") == "assistant":
+            self._last_assistant = len(self._messages)
+        self._messages.append(message)
+
+    def _truncate(self, count: int) -> Dict[int, tuple[Any, Conversion]]:
+        """Undo the events from count on and return their conversions."""
+        removed = {}
+        if count >= len(self._events):
+            return removed
+        for event, mark in zip(
+            reversed(self._events[count:]), reversed(self._marks[count:])
+        ):
+            removed[id(event)] = (event, mark.conversion)
+            if mark.replaced is not None:
+                index, message = mark.replaced
+                self._messages[index] = message
+        first = self._marks[count]
+        del self._messages[first.message_count :]
+        self._last_assistant = first.last_assistant
+        del self._events[count:]
+        del self._marks[count:]
+        return removed
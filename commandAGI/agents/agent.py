@@ -3,18 +3,20 @@ from __future__ import annotations
 import asyncio
 import traceback
 from contextlib import contextmanager
-from dataclasses import Field
 from typing import (
+    Any,
     AsyncGenerator,
+    Dict,
     List,
     Literal,
     Optional,
     Protocol,
     Union,
+    runtime_checkable,
 )
 
-from langchain.tools import BaseTool
-from pydantic import BaseModel
+from langchain_core.tools import BaseTool
+from pydantic import ConfigDict, Field, PrivateAttr
 
 from commandAGI._utils.mcp_schema import (
     MCPServerConnection,
@@ -25,8 +27,11 @@ from commandAGI._utils.resource_schema import BaseResource
 from commandAGI._utils.rfc6902 import JsonPatchOperation
 from commandAGI.agents._api_provider_utils import (
     AIClient,
-    generate_response,
+    AIClientType,
+    agenerate_response,
 )
+from commandAGI.agents._message_cache import ProviderMessageCache
+from commandAGI.agents.context_window import ContextWindow
 from commandAGI.agents.base_agent import (
     AgentResponseEvent,
     BaseAgent,
@@ -44,27 +49,25 @@ from commandAGI.agents.events import (
     ToolCallEvent,
     ToolResultEvent,
 )
+from commandAGI.agents.rule_enforcer import RuleEnforcer, RuleState, RuleVerdict
 
 
-class RuleState(BaseModel):
-    rule: str
-    rule_id: str
-    status: Literal["indeterminate", "passed", "feedback", "fail"]
-    feedback: Optional[str] = None
-
-
+@runtime_checkable
 class OnStepDraftHook(Protocol):
     def __call__(self, response: AgentResponseEvent) -> None: ...
 
 
+@runtime_checkable
 class OnRuleCheckHook(Protocol):
     def __call__(self, rule_states: list[RuleState]) -> None: ...
 
 
+@runtime_checkable
 class OnStepHook(Protocol):
     def __call__(self, response: AgentResponseEvent) -> None: ...
 
 
+@runtime_checkable
 class OnMessageInsertHook(Protocol):
     def __call__(
         self,
@@ -81,36 +84,44 @@ class OnMessageInsertHook(Protocol):
     ) -> None: ...
 
 
+@runtime_checkable
 class OnMessageDeleteHook(Protocol):
     def __call__(self, message_index: int) -> None: ...
 
 
+@runtime_checkable
 class OnMessageStartUpdateHook(Protocol):
     def __call__(self, message_index: int) -> None: ...
 
 
+@runtime_checkable
 class OnMessageUpdateOperationHook(Protocol):
     def __call__(self, message_index: int, operation: JsonPatchOperation) -> None: ...
 
 
+@runtime_checkable
 class OnMessageEndUpdateHook(Protocol):
     def __call__(self, message_index: int) -> None: ...
 
 
+@runtime_checkable
 class OnToolExecutionStartHook(Protocol):
     def __call__(self, message_index: int, tool_call_index: int) -> None: ...
 
 
+@runtime_checkable
 class OnToolExecutionEndHook(Protocol):
     def __call__(self, message_index: int, tool_call_index: int) -> None: ...
 
 
+@runtime_checkable
 class OnToolExecutionErrorHook(Protocol):
     def __call__(
         self, message_index: int, tool_call_index: int, error: Exception
     ) -> None: ...
 
 
+@runtime_checkable
 class OnFinishHook(Protocol):
     def __call__(
         self,
@@ -119,11 +130,14 @@ class OnFinishHook(Protocol):
     ) -> None: ...
 
 
+@runtime_checkable
 class OnErrorHook(Protocol):
     def __call__(self, error: Exception) -> None: ...
 
 
 class AgentHooks(BaseAgentHooks):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     on_step_draft_hooks: list[OnStepDraftHook] = Field(default_factory=list)
     on_rule_check_hooks: list[OnRuleCheckHook] = Field(default_factory=list)
     on_step_hooks: list[OnStepHook] = Field(default_factory=list)
@@ -171,7 +185,14 @@ class AgentRunSession(BaseAgentRunSession):
             all_resources.extend(connection.resources())
         return all_resources
 
-    _hooks: AgentHooks = Field(default_factory=AgentHooks)
+    _hooks: AgentHooks = PrivateAttr(default_factory=AgentHooks)
+    # Provider messages of events, so each event is converted only once
+    _message_caches: Dict[AIClientType, ProviderMessageCache] = PrivateAttr(
+        default_factory=dict
+    )
+    # Caches rule verdicts across the steps of the session, they are reused
+    # when a check is given the same events (see Agent.rule_check_window)
+    _rule_enforcer: Optional[RuleEnforcer] = PrivateAttr(default=None)
 
     state: Literal["running", "paused", "stopped"] = "running"
 
@@ -183,15 +204,34 @@ class AgentRunSession(BaseAgentRunSession):
         tools: list[BaseTool] = [],
         resources: list[BaseResource] = [],
         mcp_server_connections: list[MCPServerConnection] = [],
+        context_window: Optional[ContextWindow] = None,
     ):
         super().__init__(
             objective=objective,
             agent=agent,
             events=events,
+            context_window=context_window,
             directly_supplied_tools=tools,
             directly_supplied_resources=resources,
             mcp_server_connections=mcp_server_connections,
         )
+        # Edited and deleted messages are dropped from the provider messages
+        # (inserted ones are found by ProviderMessageCache itself)
+        self.on_message_delete(self._invalidate_messages)
+        self.on_message_update_operation(
+            lambda index, operation: self._invalidate_messages(index)
+        )
+
+    def _invalidate_messages(self, message_index: int):
+        if self.context_window is not None:
+            # The caches see the windowed events, whose indices differ
+            if message_index < len(self.events):
+                self.context_window.invalidate(self.events[message_index])
+            for cache in self._message_caches.values():
+                cache.clear()
+            return
+        for cache in self._message_caches.values():
+            cache.invalidate(message_index)
 
     def pause(self):
         self.state = "paused"
@@ -242,6 +282,17 @@ class AgentRunSession(BaseAgentRunSession):
         self._hooks.on_error_hooks.append(func)
 
 
+def is_exclusive_tool(tool: BaseTool) -> bool:
+    """Whether a tool must not run concurrently with other tools.
+
+    Tools are exclusive unless marked otherwise: GUI actions (clicks, typing)
+    and shell commands act on shared state and have to run alone and in
+    order. Read-only tools that are safe to run together are marked with
+    metadata={"exclusive": False}.
+    """
+    return bool((tool.metadata or {}).get("exclusive", True))
+
+
 class Agent(BaseAgent):
     client: AIClient
     is_complete_prompt: str
@@ -249,6 +300,22 @@ class Agent(BaseAgent):
     max_steps: Optional[int]
     rules: list[str]
     max_retries: int = 3
+    max_concurrent_tools: int = 4
+    """
+    max number of tool calls of one response that run at the same time
+    """
+    max_concurrent_rule_checks: Optional[int] = None
+    """
+    max number of rules checked at the same time, all of them if None
+    """
+    rule_check_window: Optional[int] = None
+    """
+    number of the latest events a rule check is given along with the response, all of them if None
+    """
+    context_window: Optional[ContextWindow] = None
+    """
+    token and screenshot budgets of what is sent to the model, each session gets its own copy
+    """
     directly_supplied_tools: list[BaseTool]
     directly_supplied_resources: List[Resource]
     """
@@ -272,6 +339,10 @@ class Agent(BaseAgent):
         max_steps: Optional[int] = None,
         rules: list[str] = [],
         max_retries: int = 3,
+        max_concurrent_tools: int = 4,
+        max_concurrent_rule_checks: Optional[int] = None,
+        rule_check_window: Optional[int] = None,
+        context_window: Optional[ContextWindow] = None,
     ):
         if min_steps is not None and max_steps is not None and min_steps > max_steps:
             raise ValueError("min_steps cannot be greater than max_steps")
@@ -285,14 +356,18 @@ class Agent(BaseAgent):
         self.max_steps = max_steps
         self.rules = rules
         self.max_retries = max_retries
+        self.max_concurrent_tools = max_concurrent_tools
+        self.max_concurrent_rule_checks = max_concurrent_rule_checks
+        self.rule_check_window = rule_check_window
+        self.context_window = context_window
 
-    def _format_output(
+    async def _format_output(
         self,
         history: list,
         output_schema: Optional[type[TSchema]] = None,
     ) -> TSchema | None:
         if output_schema:
-            return generate_response(
+            return await agenerate_response(
                 history
                 + [
                     {
@@ -305,148 +380,71 @@ class Agent(BaseAgent):
             )
         return None
 
-    async def _enforce_rules(self, history: list[AgentResponseEvent]) -> None:
-        """Enforce all rules in a single chat completion."""
-        response_index = len(history) - 1
-        original_response = history[response_index]
-
-        # Initialize rule states with IDs
-        rule_states = [
-            RuleState(rule=rule, rule_id=str(i), status="indeterminate")
-            for i, rule in enumerate(self.rules)
-        ]
-
-        def pass_rule(rule_id: str) -> str:
-            rule_state = next(rs for rs in rule_states if rs.rule_id == rule_id)
-            rule_state.status = "passed"
-            return "pass"
-
-        def pass_all() -> str:
-            for rs in rule_states:
-                rs.status = "passed"
-            return "pass"
-
-        def retry_rule(rule_id: str, feedback: str) -> str:
-            rule_state = next(rs for rs in rule_states if rs.rule_id == rule_id)
-            rule_state.status = "feedback"
-            rule_state.feedback = feedback
-            return feedback
-
-        def fail_rule(rule_id: str, reason: Optional[str] = None) -> str:
-            rule_state = next(rs for rs in rule_states if rs.rule_id == rule_id)
-            rule_state.status = "fail"
-            rule_state.feedback = reason
-            return reason or "Rule violation"
-
-        rule_tools = [
-            BaseTool(
-                name="pass_rule",
-                description="Pass if a specific rule is followed",
-                func=pass_rule,
-                args_schema=lambda: {"rule_id": str},
-            ),
-            BaseTool(
-                name="pass_all",
-                description="Pass if all rules are followed",
-                func=pass_all,
-            ),
-            BaseTool(
-                name="retry_rule",
-                description="Request a retry with feedback for a specific rule",
-                func=retry_rule,
-                args_schema=lambda: {"rule_id": str, "feedback": str},
-            ),
-            BaseTool(
-                name="fail_rule",
-                description="Fail with an optional reason for a specific rule",
-                func=fail_rule,
-                args_schema=lambda: {"rule_id": str, "reason": (str, None)},
-            ),
-        ]
-
-        for attempt in range(self.max_retries):
-            # Get rules that need checking
-            rules_to_check = [
-                rs for rs in rule_states if rs.status in ("indeterminate", "feedback")
-            ]
-
-            if not rules_to_check:
-                return
-
-            # Create a single prompt with all rules that need checking
-            rules_prompt = "\n".join(
-                f"Rule {rs.rule_id}: {rs.rule}" for rs in rules_to_check
-            )
-            prompt = (
-                "Review the conversation history and check if it follows these rules:\n"
-                f"{rules_prompt}\n\n"
-                "You can:\n"
-                "1. Use pass_all if ALL rules are followed\n"
-                "2. Use pass_rule for each rule that passes\n"
-                "3. Use retry_rule with feedback for rules that need changes\n"
-                "4. Use fail_rule if any rule is violated beyond repair\n"
-                "\nCheck all rules and respond with appropriate tool calls."
+    async def _check_rule(
+        self, rule: str, context: list[AgentEvent], response: AgentResponseEvent
+    ) -> Optional[RuleVerdict]:
+        prompt = (
+            "Review the last response of the conversation and check if it follows "
+            f"this rule:\n{rule}\n\n"
+            "Answer with status 'passed' if the rule is followed, 'feedback' with "
+            "what to change if the response can be revised to follow it, or "
+            "'fail' with the reason if it is violated beyond repair."
+        )
+        result = await agenerate_response(
+            context + [response, SystemInputEvent(content=prompt)],
+            client=self.client,
+            output_schema=RuleVerdict,
+        )
+        return result[0].get_structured(RuleVerdict) if result else None
+
+    async def _enforce_rules(
+        self, state: AgentRunSession, response_index: int
+    ) -> AgentResponseEvent:
+        """Check a response against all rules, revising it until it passes."""
+        if state._rule_enforcer is None:
+            state._rule_enforcer = RuleEnforcer(
+                self.rules,
+                self._check_rule,
+                max_concurrency=self.max_concurrent_rule_checks,
+                window=self.rule_check_window,
             )
-
-            result = await generate_response(
-                history + [{"role": "user", "content": prompt}],
+        # Everything before the response, as the model saw it (the window
+        # may have summarized events, so the response is found by position)
+        context = (await state.context())[: response_index - len(state.events)]
+        original_response = state.events[response_index]
+
+        async def regenerate(
+            response: AgentResponseEvent, feedback: str
+        ) -> AgentResponseEvent:
+            result = await agenerate_response(
+                context
+                + [
+                    response,
+                    SystemInputEvent(
+                        content="Previous response violated rules. Please revise "
+                        "it based on the following feedback, while still "
+                        f"following all the other rules:\n{feedback}"
+                    ),
+                ],
                 client=self.client,
-                tools=rule_tools,
+                tools=state.tools,
             )
+            return next(e for e in result if isinstance(e, AgentResponseEvent))
 
-            if not result.tool_calls:
-                continue
-
-            # Execute all tool calls - they'll modify rule_states directly
-            for tool_call in result.tool_calls:
-                tool = next(t for t in rule_tools if t.name == tool_call.function.name)
-                tool.run(tool_call.function.arguments)
-
-            # Call hooks again after rules are updated
-            for hook in self._hooks.on_rule_check_hooks:
+        def on_rule_check(rule_states: list[RuleState]) -> None:
+            for hook in state._hooks.on_rule_check_hooks:
                 hook(rule_states)
 
-            # Check if any rule failed
-            failed_rule = next((rs for rs in rule_states if rs.status == "fail"), None)
-            if failed_rule:
-                del history[response_index + 1 :]
-                history[response_index] = original_response
-                raise ValueError(
-                    f"Rule {failed_rule.rule_id} violation: {failed_rule.feedback or 'Rule violation'}"
-                )
-
-            # Check if we need to retry
-            rules_with_feedback = [rs for rs in rule_states if rs.status == "feedback"]
-            if rules_with_feedback:
-                feedbacks = [
-                    f"Rule {rs.rule_id} '{rs.rule}': {rs.feedback}"
-                    for rs in rules_with_feedback
-                ]
-                feedback_message = "\n".join(feedbacks)
-
-                history.append(
-                    {
-                        "role": "system",
-                        "content": f"Previous response violated rules. Please revise based on the following feedback:\n{feedback_message}",
-                    }
-                )
-                new_response = await generate_response(history, client=self.client)
-                history[response_index] = new_response
-
-                # Reset feedback states to indeterminate
-                for rs in rules_with_feedback:
-                    rs.status = "indeterminate"
-                    rs.feedback = None
-
-            elif all(rs.status == "passed" for rs in rule_states):
-                # All rules passed, clean up and return
-                final_response = history[response_index]
-                del history[response_index + 1 :]
-                history[response_index] = final_response
-                return
-
-        # If we hit max retries, clean up and raise error
-        raise ValueError("Max retries exceeded while trying to enforce rules")
+        response = await state._rule_enforcer.enforce(
+            context,
+            original_response,
+            regenerate,
+            max_retries=self.max_retries,
+            on_rule_check=on_rule_check,
+        )
+        if response is not original_response:
+            state.events[response_index] = response
+        return response
 
     @contextmanager
     async def session(
@@ -460,6 +458,11 @@ class Agent(BaseAgent):
                 directly_supplied_tools=self.directly_supplied_tools,
                 directly_supplied_resources=self.directly_supplied_resources,
                 objective=prompt,
+                context_window=(
+                    self.context_window.model_copy(deep=True)
+                    if self.context_window
+                    else None
+                ),
             )
             # Initialize with user input
             state.add_event(UserInputEvent(content=prompt))
@@ -475,6 +478,93 @@ class Agent(BaseAgent):
                 return False
         return True
 
+    async def _execute_tool_calls(
+        self, state: AgentRunSession, tool_calls: list[dict[str, Any]]
+    ) -> bool:
+        """Execute the tool calls of a response, concurrently where possible.
+
+        Consecutive calls of non-exclusive tools run together, at most
+        max_concurrent_tools at a time. A call of an exclusive tool (see
+        is_exclusive_tool) waits for the calls before it and runs alone, so
+        GUI actions happen in the order the model gave them. Results are
+        added to the session in call order.
+
+        Args:
+            state: The running session
+            tool_calls: The response's tool calls, as OpenAI-style dicts with
+                the tool name and arguments under "function"
+
+        Returns:
+            bool: False if the session was stopped
+        """
+        message_index = len(state.events) - 1
+        semaphore = asyncio.Semaphore(self.max_concurrent_tools)
+        tools = state.tools
+
+        # Group the calls into batches that can run at the same time
+        batches: list[list[tuple[int, dict[str, Any], Optional[BaseTool]]]] = []
+        previous_exclusive = True
+        for tool_call_index, tool_call in enumerate(tool_calls):
+            name = tool_call["function"]["name"]
+            tool = next((t for t in tools if t.name == name), None)
+            exclusive = tool is None or is_exclusive_tool(tool)
+            if exclusive or previous_exclusive:
+                batches.append([])
+            batches[-1].append((tool_call_index, tool_call, tool))
+            previous_exclusive = exclusive
+
+        async def execute(
+            tool_call_index: int, tool_call: dict[str, Any], tool: BaseTool
+        ):
+            function = tool_call["function"]
+            async with semaphore:
+                for hook in state._hooks.on_tool_execution_start_hooks:
+                    hook(message_index, tool_call_index)
+                if tool is None:
+                    raise ValueError(f"Unknown tool: {function['name']}")
+                return await tool.arun(function["arguments"])
+
+        for batch in batches:
+            if not await self._check_running_state(state):
+                return False
+
+            call_ids = [
+                state.add_tool_call(
+                    tool_name=tool_call["function"]["name"],
+                    arguments=tool_call["function"]["arguments"],
+                )
+                for _, tool_call, _ in batch
+            ]
+            results = await asyncio.gather(
+                *(execute(*call) for call in batch), return_exceptions=True
+            )
+
+            error = None
+            for (tool_call_index, _, _), call_id, result in zip(
+                batch, call_ids, results
+            ):
+                if isinstance(result, Exception):
+                    # Add failed tool result
+                    state.add_tool_result(
+                        call_id=call_id, result=None, error=str(result), success=False
+                    )
+                    for hook in state._hooks.on_tool_execution_error_hooks:
+                        hook(message_index, tool_call_index, result)
+                    state.add_error(
+                        error_type="tool_execution_error",
+                        message=str(result),
+                        traceback="".join(traceback.format_exception(result)),
+                    )
+                    error = error or result
+                    continue
+                # Add successful tool result
+                state.add_tool_result(call_id=call_id, result=result)
+                for hook in state._hooks.on_tool_execution_end_hooks:
+                    hook(message_index, tool_call_index)
+            if error is not None:
+                raise error
+        return True
+
     async def _run(self, state: AgentRunSession) -> TSchema | None:
         try:
             while True:
@@ -526,8 +616,11 @@ class Agent(BaseAgent):
                     return None
 
                 # Generate action based on history
-                response = generate_response(
-                    state.events, client=self.client, tools=state.tools
+                response = await agenerate_response(
+                    await state.context(),
+                    client=self.client,
+                    tools=state.tools,
+                    message_caches=state._message_caches,
                 )
 
                 if not await self._check_running_state(state):
@@ -550,7 +643,7 @@ class Agent(BaseAgent):
 
                 # Enforce rules before executing tool calls
                 if self.rules:
-                    await self._enforce_rules(state)
+                    response = await self._enforce_rules(state, len(state.events) - 1)
 
                 state.step_count += 1
                 for hook in state._hooks.on_step_hooks:
@@ -558,51 +651,8 @@ class Agent(BaseAgent):
 
                 # Execute any tool calls
                 if response.tool_calls:
-                    for tool_call_index, tool_call in enumerate(response.tool_calls):
-                        if not await self._check_running_state(state):
-                            return None
-
-                        try:
-                            for hook in state._hooks.on_tool_execution_start_hooks:
-                                hook(len(state.events) - 1, tool_call_index)
-
-                            tool = next(
-                                t
-                                for t in state.tools
-                                if t.name == tool_call.function.name
-                            )
-
-                            # Add tool call event
-                            call_id = state.add_tool_call(
-                                tool_name=tool_call.function.name,
-                                arguments=tool_call.function.arguments,
-                            )
-
-                            try:
-                                result = tool.run(tool_call.function.arguments)
-                                # Add successful tool result
-                                state.add_tool_result(call_id=call_id, result=result)
-                            except Exception as e:
-                                # Add failed tool result
-                                state.add_tool_result(
-                                    call_id=call_id,
-                                    result=None,
-                                    error=str(e),
-                                    success=False,
-                                )
-                                raise
-
-                            for hook in state._hooks.on_tool_execution_end_hooks:
-                                hook(len(state.events) - 1, tool_call_index)
-                        except Exception as e:
-                            for hook in state._hooks.on_tool_execution_error_hooks:
-                                hook(len(state.events) - 1, tool_call_index, e)
-                            state.add_error(
-                                error_type="tool_execution_error",
-                                message=str(e),
-                                traceback=traceback.format_exc(),
-                            )
-                            raise
+                    if not await self._execute_tool_calls(state, response.tool_calls):
+                        return None
 
                 if not await self._check_running_state(state):
                     return None
@@ -611,25 +661,28 @@ class Agent(BaseAgent):
                 if self.max_steps is not None and state.step_count >= self.max_steps:
                     for hook in state._hooks.on_finish_hooks:
                         hook(len(state.events) - 1, "max_steps")
-                    return self._format_output(state.events, self.output_schema)
+                    return await self._format_output(state.events, self.output_schema)
 
                 # Only check completion if we're past min_steps
                 if self.min_steps is None or state.step_count >= self.min_steps:
                     # Create a copy of events and add completion check message only to the copy
-                    events_copy = state.events.copy()
+                    events_copy = (await state.context()).copy()
                     events_copy.append(
                         SystemInputEvent(content=self.is_complete_prompt)
                     )
-                    is_complete = generate_response(
+                    is_complete = await agenerate_response(
                         events_copy,
                         client=self.client,
                         output_schema=bool,
+                        message_caches=state._message_caches,
                     )
 
                     if is_complete:
                         for hook in state._hooks.on_finish_hooks:
                             hook(len(state.events) - 1, "is_complete")
-                        return self._format_output(state.events, self.output_schema)
+                        return await self._format_output(
+                            state.events, self.output_schema
+                        )
 
         except Exception as e:
             state.add_error(
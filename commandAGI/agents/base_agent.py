@@ -3,11 +3,11 @@ from __future__ import annotations
 import uuid
 from abc import abstractmethod
 from contextlib import contextmanager
-from dataclasses import Field
 from typing import Any, AsyncGenerator, Callable, Dict, List, Optional, TypeVar
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, PrivateAttr
 
+from commandAGI.agents.context_window import ContextWindow
 from commandAGI.agents.events import (
     AgentEvent,
     AgentResponseEvent,
@@ -43,8 +43,15 @@ class BaseAgentRunSession(BaseModel):
     objective: str
     agent: "BaseAgent"
     events: List[AgentEvent] = Field(default_factory=list)
+    context_window: Optional[ContextWindow] = None
 
-    _hooks: BaseAgentHooks = Field(default_factory=BaseAgentHooks)
+    _hooks: BaseAgentHooks = PrivateAttr(default_factory=BaseAgentHooks)
+
+    async def context(self) -> List[AgentEvent]:
+        """Get the events to send to the model, within the context window"""
+        if self.context_window is None:
+            return self.events
+        return await self.context_window.prepare(self.events)
 
     def input(self, input: str):
         """Add user input to the session"""
@@ -0,0 +1,346 @@
+import base64
+import inspect
+import io
+from typing import Any, Awaitable, Callable, Dict, List, Literal, Optional, Union
+
+from PIL import Image
+from pydantic import BaseModel
+
+from commandAGI._utils.image import b64ToImage, imageToB64
+from commandAGI.agents.events import (
+    AgentEvent,
+    AgentResponseEvent,
+    SystemInputEvent,
+    UserInputEvent,
+)
+
+# Base64 of the PNG and JPEG signatures, used to spot screenshots in events
+_B64_IMAGE_PREFIXES = ("iVBORw0KGgo", "/9j/")
+_MIN_B64_IMAGE_LENGTH = 1000
+# Base64 characters decoded to read the size of an image, enough for the
+# header of most PNGs and JPEGs (a multiple of 4)
+_B64_HEADER_LENGTH = 4096
+_CHARS_PER_TOKEN = 4
+# Providers scale images to about this many pixels per token
+_PIXELS_PER_TOKEN = 750
+_MAX_IMAGE_TOKENS = 1600
+_OMITTED_IMAGE = "[screenshot omitted]"
+_SKIPPED_FIELDS = {"timestamp", "event_id", "cacheable"}
+
+ImageLevel = Literal["full", "downsampled", "dropped"]
+Summarizer = Callable[[Optional[str], List[AgentEvent]], Union[str, Awaitable[str]]]
+
+
+def _is_image(value: Any) -> bool:
+    if isinstance(value, Image.Image):
+        return True
+    return (
+        isinstance(value, str)
+        and len(value) >= _MIN_B64_IMAGE_LENGTH
+        and value.startswith(_B64_IMAGE_PREFIXES)
+    )
+
+
+def _map_images(value: Any, func: Callable[[Any], Any]) -> Any:
+    """Apply func to every image in a (nested) field value."""
+    if _is_image(value):
+        return func(value)
+    if isinstance(value, dict):
+        return {key: _map_images(item, func) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_map_images(item, func) for item in value)
+    return value
+
+
+def _image_size(image: Any) -> tuple[int, int]:
+    if isinstance(image, Image.Image):
+        return image.size
+    # Only the start of the image is decoded and its header parsed, a longer
+    # start is tried if the header doesn't fit
+    length = _B64_HEADER_LENGTH
+    while True:
+        head = base64.b64decode(image[:length])
+        try:
+            return Image.open(io.BytesIO(head)).size
+        except OSError:
+            if length >= len(image):
+                raise
+            length *= 4
+
+
+def estimate_tokens(event: AgentEvent) -> int:
+    """Roughly estimate the tokens an event takes in a provider request.
+
+    Text counts one token per four characters and every image by its pixel
+    count, capped like providers do when they scale large images down.
+    """
+    chars = 0
+    image_tokens = 0
+
+    def count(value: Any) -> Any:
+        nonlocal image_tokens
+        width, height = _image_size(value)
+        image_tokens += min(_MAX_IMAGE_TOKENS, width * height // _PIXELS_PER_TOKEN)
+        return ""
+
+    for name in type(event).model_fields:
+        if name not in _SKIPPED_FIELDS:
+            value = getattr(event, name)
+            if value is not None:
+                chars += len(str(_map_images(value, count)))
+    return chars // _CHARS_PER_TOKEN + image_tokens
+
+
+def _has_image(event: AgentEvent) -> bool:
+    found = False
+
+    def mark(value: Any) -> Any:
+        nonlocal found
+        found = True
+        return value
+
+    for name in type(event).model_fields:
+        if name not in _SKIPPED_FIELDS:
+            _map_images(getattr(event, name), mark)
+    return found
+
+
+def llm_summarizer(client: Any, instructions: Optional[str] = None) -> Summarizer:
+    """Create a ContextWindow summarizer that asks a model for the summary.
+
+    Args:
+        client: Client to summarize with, any client supported by
+            generate_response
+        instructions: Prompt asking for the summary
+    """
+    instructions = instructions or (
+        "Summarize the conversation above for your own future reference. Keep "
+        "the objective, decisions, results of tool calls and anything still to "
+        "be done; leave out pleasantries and details that no longer matter."
+    )
+
+    async def summarize(previous: Optional[str], events: List[AgentEvent]) -> str:
+        from commandAGI.agents._api_provider_utils import agenerate_response
+
+        inputs = list(events)
+        if previous:
+            inputs.insert(0, SystemInputEvent(content=previous, type="summary"))
+        inputs.append(UserInputEvent(content=instructions))
+        response = await agenerate_response(inputs, client=client)
+        return response[0].content
+
+    return summarize
+
+
+class ContextWindow(BaseModel):
+    """Keeps the events sent to the model within token and image budgets.
+
+    The session history itself is never changed; prepare returns the events
+    to send instead. Of the events carrying screenshots, the newest
+    full_images are sent as they are, the next downsampled_images are
+    scaled down to downsample_size and older ones are replaced by a
+    placeholder.
+
+    When the estimated size exceeds max_tokens, the oldest turns (after the
+    first event, the objective) are folded into a summary until the rest
+    takes summarize_to of max_tokens. Folding well below the limit keeps the
+    summary and everything before it unchanged for many steps; the last
+    event of that stable prefix is marked cacheable so providers with
+    prompt caching can reuse it.
+
+    Transformed events are cached, so every event is transformed once and
+    the same objects are returned on every call, which also keeps the
+    incremental provider message conversion working.
+
+    Args:
+        max_tokens: Estimated token budget (see estimate_tokens), or None
+        summarize_to: Fraction of max_tokens left after summarizing
+        full_images: Number of newest screenshots sent at full resolution
+        downsampled_images: Number of older screenshots sent downsampled
+        downsample_size: Longest side in pixels of downsampled screenshots
+        summarize: Called with the previous summary and the events to fold,
+            returns the new summary (see llm_summarizer). If None, the
+            folded events are dropped with a note saying so.
+    """
+
+    max_tokens: Optional[int] = None
+    summarize_to: float = 0.5
+    full_images: int = 3
+    downsampled_images: int = 5
+    downsample_size: int = 512
+    summarize: Optional[Summarizer] = None
+
+    # (event_id, image level) -> transformed event
+    _copies: Dict[tuple[str, str], AgentEvent] = {}
+    # id(event) -> (event, estimated tokens)
+    _tokens: Dict[int, tuple[AgentEvent, int]] = {}
+    _summary: Optional[SystemInputEvent] = None
+    # Id of the last event folded into the summary, None before the first fold
+    _summarized_through: Optional[str] = None
+    # Number of leading events covered by the first event and the summary,
+    # where _summarized_through was last found
+    _summarized: int = 1
+    _omitted: int = 0
+    _cacheable: Optional[tuple[AgentEvent, AgentEvent]] = None
+
+    async def prepare(self, events: List[AgentEvent]) -> List[AgentEvent]:
+        """Get the events to send to the model for a session history."""
+        if not events:
+            return []
+        summarized = self._find_summarized(events)
+        if summarized is None:
+            # The last folded event was deleted, so the summary no longer
+            # lines up with the history
+            self.reset()
+            summarized = 1
+        self._summarized = summarized
+
+        recent = self._apply_image_levels(events[self._summarized :])
+        if self.max_tokens is not None and self._total(events[:1], recent) > (
+            self.max_tokens
+        ):
+            cut = self._find_cut(events[:1], recent)
+            if cut:
+                await self._fold(recent[:cut])
+                self._summarized += cut
+                self._summarized_through = events[self._summarized - 1].event_id
+                recent = recent[cut:]
+
+        prefix = list(events[:1])
+        if self._summary is not None:
+            prefix.append(self._summary)
+        prefix[-1] = self._mark_cacheable(prefix[-1])
+        return prefix + recent
+
+    def invalidate(self, event: AgentEvent) -> None:
+        """Transform an event again next time, e.g. after it was edited."""
+        self._tokens.pop(id(event), None)
+        for level in ("downsampled", "dropped"):
+            copy = self._copies.pop((event.event_id, level), None)
+            self._tokens.pop(id(copy), None)
+
+    def reset(self) -> None:
+        """Forget the summary and cached events, e.g. for a new history."""
+        self._copies = {}
+        self._tokens = {}
+        self._summary = None
+        self._summarized_through = None
+        self._summarized = 1
+        self._omitted = 0
+        self._cacheable = None
+
+    def _find_summarized(self, events: List[AgentEvent]) -> Optional[int]:
+        """Get the number of leading events covered by the first event and
+        the summary, None if the last folded event isn't in events anymore.
+
+        The folded events are found by id, so events inserted or deleted
+        before them don't shift the summary.
+        """
+        if self._summarized_through is None:
+            return 1
+        last = self._summarized - 1
+        if last < len(events) and events[last].event_id == self._summarized_through:
+            return self._summarized
+        for i, event in enumerate(events):
+            if event.event_id == self._summarized_through:
+                return i + 1
+        return None
+
+    def _apply_image_levels(self, events: List[AgentEvent]) -> List[AgentEvent]:
+        result = list(events)
+        seen = 0
+        for i in range(len(events) - 1, -1, -1):
+            if not _has_image(events[i]):
+                continue
+            if seen < self.full_images:
+                level = "full"
+            elif seen < self.full_images + self.downsampled_images:
+                level = "downsampled"
+            else:
+                level = "dropped"
+            seen += 1
+            result[i] = self._at_level(events[i], level)
+        return result
+
+    def _at_level(self, event: AgentEvent, level: ImageLevel) -> AgentEvent:
+        if level == "full":
+            return event
+        key = (event.event_id, level)
+        if key not in self._copies:
+            if level == "dropped":
+                # Events only ever move on from downsampled to dropped
+                downsampled = self._copies.pop((event.event_id, "downsampled"), None)
+                self._tokens.pop(id(downsampled), None)
+                convert = self._drop
+            else:
+                convert = self._downsample
+            self._copies[key] = event.model_copy(
+                update={
+                    name: _map_images(getattr(event, name), convert)
+                    for name in type(event).model_fields
+                    if name not in _SKIPPED_FIELDS
+                }
+            )
+        return self._copies[key]
+
+    @staticmethod
+    def _drop(image: Any) -> str:
+        return _OMITTED_IMAGE
+
+    def _downsample(self, image: Any) -> Any:
+        pil_image = image if isinstance(image, Image.Image) else b64ToImage(image)
+        pil_image = pil_image.copy()
+        pil_image.thumbnail((self.downsample_size, self.downsample_size))
+        return pil_image if isinstance(image, Image.Image) else imageToB64(pil_image)
+
+    def _event_tokens(self, event: AgentEvent) -> int:
+        entry = self._tokens.get(id(event))
+        if entry is None or entry[0] is not event:
+            entry = (event, estimate_tokens(event))
+            self._tokens[id(event)] = entry
+        return entry[1]
+
+    def _total(self, pinned: List[AgentEvent], recent: List[AgentEvent]) -> int:
+        events = pinned + ([self._summary] if self._summary else []) + recent
+        return sum(self._event_tokens(event) for event in events)
+
+    def _find_cut(self, pinned: List[AgentEvent], recent: List[AgentEvent]) -> int:
+        """Get the number of recent events to fold into the summary.
+
+        Cuts are made only where a turn starts (a user message or a model
+        response), so tool results stay with the calls they answer.
+        """
+        budget = self.summarize_to * self.max_tokens
+        remaining = self._total(pinned, recent)
+        cut = 0
+        for i, event in enumerate(recent):
+            if i and isinstance(event, (UserInputEvent, AgentResponseEvent)):
+                cut = i
+                if remaining <= budget:
+                    break
+            remaining -= self._event_tokens(event)
+        return cut
+
+    async def _fold(self, events: List[AgentEvent]) -> None:
+        previous = self._summary.content if self._summary else None
+        if self.summarize is None:
+            self._omitted += len(events)
+            text = (
+                f"{self._omitted} earlier events were left out to fit the "
+                "context window."
+            )
+        else:
+            text = self.summarize(previous, events)
+            if inspect.isawaitable(text):
+                text = await text
+        if self._summary is not None:
+            self._tokens.pop(id(self._summary), None)
+        self._summary = SystemInputEvent(content=text, type="summary")
+        # Folded events are never sent again
+        for event in events:
+            self.invalidate(event)
+
+    def _mark_cacheable(self, event: AgentEvent) -> AgentEvent:
+        if self._cacheable is None or self._cacheable[0] is not event:
+            self._cacheable = (event, event.model_copy(update={"cacheable": True}))
+        return self._cacheable[1]
@@ -1,15 +1,21 @@
 import time
 import uuid
-from typing import Any, Dict, List, Optional, Type
+from typing import Any, Dict, List, Optional, Type, TypeVar
 
+from langchain_core.messages import ChatMessage
 from pydantic import BaseModel, Field
 
+TSchema = TypeVar("TSchema", bound=BaseModel)
+
 
 class AgentEvent(BaseModel):
     """Base class for all agent events"""
 
     timestamp: float = Field(default_factory=lambda: time.time())
     event_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    # Last event of a prefix that stays the same between requests, providers
+    # with prompt caching cache everything up to and including it
+    cacheable: bool = False
 
 
 class AgentResponseEvent(AgentEvent):
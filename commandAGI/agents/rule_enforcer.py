@@ -0,0 +1,205 @@
+import asyncio
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Awaitable, Callable, List, Literal, Optional
+
+from pydantic import BaseModel
+
+from commandAGI.agents.events import AgentEvent, AgentResponseEvent
+
+
+class RuleState(BaseModel):
+    rule: str
+    rule_id: str
+    status: Literal["indeterminate", "passed", "feedback", "fail"]
+    feedback: Optional[str] = None
+
+
+class RuleVerdict(BaseModel):
+    """The verdict of checking one rule against a response."""
+
+    status: Literal["passed", "feedback", "fail"]
+    feedback: Optional[str] = None
+
+
+class RuleViolation(ValueError):
+    """A response broke a rule beyond repair."""
+
+    def __init__(self, rule_state: RuleState):
+        self.rule_state = rule_state
+        super().__init__(
+            f"Rule {rule_state.rule_id} violation: "
+            f"{rule_state.feedback or 'Rule violation'}"
+        )
+
+
+# Checks a rule against the context and a response, None if undecided
+RuleCheck = Callable[
+    [str, List[AgentEvent], AgentResponseEvent], Awaitable[Optional[RuleVerdict]]
+]
+# Revises a response given the feedback of the rules it broke
+Regenerate = Callable[[AgentResponseEvent, str], Awaitable[AgentResponseEvent]]
+
+
+# Fields of an event that aren't part of what it says
+_IDENTITY_FIELDS = {"event_id", "timestamp", "cacheable"}
+
+
+def _fingerprint(context: List[AgentEvent], response: AgentResponseEvent) -> bytes:
+    """Hash what a rule check is given, leaving out the ids and timestamps of
+    the events, so the same inputs get the same verdict in a later step."""
+    digest = hashlib.blake2b(digest_size=16)
+    for event in context:
+        digest.update(type(event).__name__.encode())
+        digest.update(event.model_dump_json(exclude=_IDENTITY_FIELDS).encode())
+    digest.update(
+        json.dumps([response.content, response.tool_calls], default=str).encode()
+    )
+    return digest.digest()
+
+
+class RuleEnforcer:
+    """Checks responses against rules, one concurrent check per rule.
+
+    All undecided rules are checked at the same time and checking stops at
+    the first rule that fails. Verdicts are cached by rule and by what the
+    check is given: the content and tool calls of the response, and the
+    latest window events of the context. A rule is never checked twice for
+    the same inputs, and with a window, a verdict is reused in a later step
+    when a response is repeated. When rules give feedback the response is
+    regenerated with it, and only the rules that gave feedback are checked
+    against the revision. Rules that already passed aren't checked again, so
+    regenerate should ask the revision to keep following them.
+
+    Args:
+        rules: The rules, in plain language
+        check: Checks one rule, see RuleCheck
+        max_concurrency: Maximum number of checks running at once, or None
+        cache_size: Number of verdicts kept
+        window: Number of the latest context events a check is given, all of
+            them if None
+
+    Examples:
+        >>> async def check(rule, context, response):
+        ...     ok = "please" in response.content
+        ...     return RuleVerdict(status="passed" if ok else "feedback",
+        ...                        feedback="Say please")
+        >>> async def regenerate(response, feedback):
+        ...     return AgentResponseEvent(role="assistant", content="please wait")
+        >>> enforcer = RuleEnforcer(["Be polite"], check)
+        >>> response = AgentResponseEvent(role="assistant", content="wait")
+        >>> asyncio.run(enforcer.enforce([], response, regenerate)).content
+        'please wait'
+    """
+
+    def __init__(
+        self,
+        rules: List[str],
+        check: RuleCheck,
+        max_concurrency: Optional[int] = None,
+        cache_size: int = 256,
+        window: Optional[int] = None,
+    ):
+        self.rules = rules
+        self.check = check
+        self.max_concurrency = max_concurrency
+        self.cache_size = cache_size
+        self.window = window
+        self._verdicts: OrderedDict[tuple[str, bytes], RuleVerdict] = OrderedDict()
+
+    async def enforce(
+        self,
+        context: List[AgentEvent],
+        response: AgentResponseEvent,
+        regenerate: Regenerate,
+        max_retries: int = 3,
+        on_rule_check: Optional[Callable[[List[RuleState]], None]] = None,
+    ) -> AgentResponseEvent:
+        """Check a response and revise it until it passes all rules.
+
+        Args:
+            context: The events the response answers
+            response: The response to check
+            regenerate: Revises a response, see Regenerate
+            max_retries: Maximum number of rounds of checks
+            on_rule_check: Called with the rule states after every round
+
+        Returns:
+            AgentResponseEvent: The response, or its revision, that passed
+
+        Raises:
+            RuleViolation: If a rule failed
+            ValueError: If the rules still weren't met after max_retries
+        """
+        rule_states = [
+            RuleState(rule=rule, rule_id=str(i), status="indeterminate")
+            for i, rule in enumerate(self.rules)
+        ]
+        semaphore = asyncio.Semaphore(self.max_concurrency or len(rule_states) or 1)
+        if self.window is not None:
+            context = context[-self.window :] if self.window else []
+
+        for attempt in range(max_retries):
+            to_check = [
+                rs for rs in rule_states if rs.status in ("indeterminate", "feedback")
+            ]
+            if not to_check:
+                return response
+            await self._check_all(to_check, context, response, semaphore)
+
+            if on_rule_check is not None:
+                on_rule_check(rule_states)
+
+            with_feedback = [rs for rs in rule_states if rs.status == "feedback"]
+            if with_feedback:
+                if attempt == max_retries - 1:
+                    break
+                feedback = "\n".join(
+                    f"Rule {rs.rule_id} '{rs.rule}': {rs.feedback}"
+                    for rs in with_feedback
+                )
+                response = await regenerate(response, feedback)
+            elif all(rs.status == "passed" for rs in rule_states):
+                return response
+
+        raise ValueError("Max retries exceeded while trying to enforce rules")
+
+    async def _check_all(
+        self,
+        rule_states: List[RuleState],
+        context: List[AgentEvent],
+        response: AgentResponseEvent,
+        semaphore: asyncio.Semaphore,
+    ) -> None:
+        fingerprint = _fingerprint(context, response)
+
+        async def check(rule_state: RuleState):
+            key = (rule_state.rule, fingerprint)
+            if key in self._verdicts:
+                self._verdicts.move_to_end(key)
+                return rule_state, self._verdicts[key]
+            async with semaphore:
+                verdict = await self.check(rule_state.rule, context, response)
+            if verdict is not None:
+                self._verdicts[key] = verdict
+                while len(self._verdicts) > self.cache_size:
+                    self._verdicts.popitem(last=False)
+            return rule_state, verdict
+
+        tasks = [asyncio.ensure_future(check(rs)) for rs in rule_states]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                rule_state, verdict = await next_done
+                if verdict is None:
+                    # Undecided, checked again in the next round
+                    rule_state.status = "indeterminate"
+                    rule_state.feedback = None
+                    continue
+                rule_state.status = verdict.status
+                rule_state.feedback = verdict.feedback
+                if verdict.status == "fail":
+                    raise RuleViolation(rule_state)
+        finally:
+            for task in tasks:
+                task.cancel()
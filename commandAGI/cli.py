@@ -15,54 +15,50 @@ Subcommands:
   hub             Manage agents on the CommandAGI Hub
 """
 
+import importlib
 import time
 from enum import Enum
 
 import typer
 
-# Import hub CLI
-from commandAGI.agents.hub_cli import app as hub_cli
-
-# Import available computers
 from commandAGI.version import __version__, get_container_version, get_package_version
 
-try:
-    pass
-
-    e2b_available = True
-except ImportError:
-    e2b_available = False
-
-# Import gym components if available
-try:
-    from commandAGI.gym.agents.naive_vision_language_computer_agent import (
-        NaiveComputerAgent,
-    )
-    from commandAGI.gym.agents.react_vision_language_computer_agent import (
-        ReactComputerAgent,
-    )
-    from commandAGI.gym.drivers import SimpleDriver
-    from commandAGI.gym.environments.computer_env import ComputerEnv, ComputerEnvConfig
+# Create the CLI app
+cli = typer.Typer(help="commandAGI CLI")
 
-    gym_available = True
-except ImportError:
-    gym_available = False
 
-# Import processors if available
-try:
-    pass
+def add_lazy_typer(name: str, module: str, attr: str, help: str):
+    """Add a sub-CLI that is only imported when its command is run.
 
-    processors_available = True
-except ImportError:
-    processors_available = False
+    Subcommands like hub and daemon pull in heavy dependencies, which would
+    otherwise be imported for every command.
+    """
 
-# Import types
+    @cli.command(
+        name=name,
+        help=help,
+        add_help_option=False,
+        context_settings={"allow_extra_args": True, "ignore_unknown_options": True},
+    )
+    def run_sub_cli(ctx: typer.Context):
+        sub_cli = getattr(importlib.import_module(module), attr)
+        sub_cli(ctx.args, prog_name=f"{ctx.find_root().info_name} {name}")
 
-# Create the CLI app
-cli = typer.Typer(help="commandAGI CLI")
 
 # Add hub CLI as a subcommand
-cli.add_typer(hub_cli, name="hub", help="Manage agents on the CommandAGI Hub")
+add_lazy_typer(
+    "hub",
+    "commandAGI.agents.hub.hub_cli",
+    "app",
+    help="Manage agents on the CommandAGI Hub",
+)
+# Add daemon CLI as a subcommand
+add_lazy_typer(
+    "daemon",
+    "commandAGI.daemon.cli",
+    "cli",
+    help="Start a daemon server for remote control",
+)
 
 
 # Define enums for CLI options
@@ -161,7 +157,20 @@ def run_gym(
     steps: int = typer.Option(10, help="Maximum number of steps to run"),
 ):
     """Run a gym environment with a specified agent."""
-    if not gym_available:
+    # Import gym components if available
+    try:
+        from commandAGI.gym.agents.naive_vision_language_computer_agent import (
+            NaiveComputerAgent,
+        )
+        from commandAGI.gym.agents.react_vision_language_computer_agent import (
+            ReactComputerAgent,
+        )
+        from commandAGI.gym.drivers import SimpleDriver
+        from commandAGI.gym.environments.computer_env import (
+            ComputerEnv,
+            ComputerEnvConfig,
+        )
+    except ImportError:
         typer.echo(
             "Error: Gym module not available. Install with: pip install commandagi[gym]"
         )
@@ -2,78 +2,145 @@
 Computer implementations for commandAGI.
 
 This package contains various computer implementations that can be used with commandAGI.
+
+Computers are imported lazily, on first access, so importing this package
+doesn't load every backend and its dependencies. Other packages can add
+computers by registering them under the ``commandAGI.computers`` entry point
+group, e.g. in their pyproject.toml:
+
+    [project.entry-points."commandAGI.computers"]
+    MyComputer = "my_package.my_computer:MyComputer"
+
+They can then be imported from here or looked up with load_computer.
 """
 
+import importlib
 import logging
-
-from commandAGI.computers.base_computer import BaseComputer, BaseComputerFile
+from typing import Dict, Optional
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
+ENTRY_POINT_GROUP = "commandAGI.computers"
+
+# name -> (module, extra to install if it can't be imported)
+_BUILTIN_COMPUTERS: Dict[str, tuple[str, Optional[str]]] = {
+    "BaseComputer": ("commandAGI.computers.base_computer.base_computer", None),
+    "BaseComputerFile": ("commandAGI.computers.base_computer.base_file", None),
+    "PagedComputerFile": ("commandAGI.computers.base_computer.paged_file", None),
+    "LocalComputer": ("commandAGI.computers.local_computer.local_computer", "local"),
+    "LocalPynputComputer": (
+        "commandAGI.computers.local_pynput_computer.local_pynput_computer",
+        "local",
+    ),
+    "LocalPyAutoGUIComputer": (
+        "commandAGI.computers.local_pyautogui_computer.local_pyautogui_computer",
+        "local",
+    ),
+    "E2BDesktopComputer": (
+        "commandAGI.computers.e2b_desktop_computer.e2b_desktop_computer",
+        "e2b_desktop",
+    ),
+    "RemoteComputer": (
+        "commandAGI.computers.remote_computer.remote_computer",
+        "daemon-client-all",
+    ),
+    "VNCComputer": ("commandAGI.computers.vnc_computer.vnc_computer", "vnc"),
+    "PigDevComputer": (
+        "commandAGI.computers.pigdev_computer.pigdev_computer",
+        "pigdev",
+    ),
+    "BaseScrapybaraComputer": (
+        "commandAGI.computers.scrappybara_computer.base_scrappybara_computer",
+        "scrapybara",
+    ),
+    "UbuntuScrapybaraComputer": (
+        "commandAGI.computers.scrappybara_computer.ubuntu_scrappybara_computer",
+        "scrapybara",
+    ),
+    "BrowserScrapybaraComputer": (
+        "commandAGI.computers.scrappybara_computer.browser_scrappybara_computer",
+        "scrapybara",
+    ),
+    "WindowsScrapybaraComputer": (
+        "commandAGI.computers.scrappybara_computer.windows_scrappybara_computer",
+        "scrapybara",
+    ),
+}
+
+_plugin_computers = None
+
+
+def _plugins() -> Dict[str, object]:
+    """Get the computers registered by other packages, by name."""
+    global _plugin_computers
+    if _plugin_computers is None:
+        # importlib.metadata takes longer to import than this whole package
+        from importlib.metadata import entry_points
+
+        # Reading entry points scans the installed distributions, so only once
+        _plugin_computers = {
+            entry_point.name: entry_point
+            for entry_point in entry_points(group=ENTRY_POINT_GROUP)
+        }
+    return _plugin_computers
+
+
+def available_computers() -> list[str]:
+    """List the names of all computers, without importing any of them."""
+    return list(_BUILTIN_COMPUTERS) + [
+        name for name in _plugins() if name not in _BUILTIN_COMPUTERS
+    ]
+
+
+def load_computer(name: str) -> type:
+    """Import a computer class by name.
+
+    Args:
+        name: Class name of a built-in computer, or the entry point name of a
+            computer registered by another package
+
+    Returns:
+        type: The computer class
+
+    Raises:
+        ImportError: If the computer's dependencies aren't installed
+        KeyError: If there is no computer with that name
+    """
+    if name in _BUILTIN_COMPUTERS:
+        module_name, extra = _BUILTIN_COMPUTERS[name]
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError as e:
+            if extra is None:
+                raise
+            raise ImportError(
+                f"{name} not available. Install with: pip install commandAGI[{extra}]"
+            ) from e
+        computer_cls = getattr(module, name)
+    elif name in _plugins():
+        computer_cls = _plugins()[name].load()
+    else:
+        raise KeyError(f"Unknown computer: {name}")
+    # Later lookups are plain module attribute lookups
+    globals()[name] = computer_cls
+    return computer_cls
+
+
+def __getattr__(name: str):
+    if name in _BUILTIN_COMPUTERS or (not name.startswith("_") and name in _plugins()):
+        return load_computer(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(available_computers()))
 
-try:
-    from commandAGI.computers.local_computer import LocalComputer
-except ImportError:
-    logger.info(
-        "LocalComputer not available. Install with: pip install commandAGI[local]"
-    )
-
-try:
-    from commandAGI.computers.local_pynput_computer import LocalPynputComputer
-except ImportError:
-    logger.info(
-        "LocalPynputComputer not available. Install with: pip install commandAGI[local]"
-    )
-
-try:
-    from commandAGI.computers.local_pyautogui_computer import LocalPyAutoGUIComputer
-except ImportError:
-    logger.info(
-        "LocalPyAutoGUIComputer not available. Install with: pip install commandAGI[local]"
-    )
-
-try:
-    from commandAGI.computers.e2b_desktop_computer import E2BDesktopComputer
-except ImportError:
-    logger.info(
-        "E2BDesktopComputer not available. Install with: pip install commandAGI[e2b_desktop]"
-    )
-
-try:
-    from commandAGI.computers.remote_computer import RemoteComputer
-except ImportError:
-    logger.info(
-        "Computer not available. Install with: pip install commandAGI[daemon-client-all]"
-    )
-
-try:
-    from commandAGI.computers.vnc_computer import VNCComputer
-except ImportError:
-    logger.info("VNCComputer not available. Install with: pip install commandAGI[vnc]")
-
-try:
-    from commandAGI.computers.pigdev_computer import PigDevComputer
-except ImportError:
-    logger.info(
-        "PigDevComputer not available. Install with: pip install commandAGI[pigdev]"
-    )
-
-try:
-    from commandAGI.computers.scrappybara_computer import (
-        BaseScrapybaraComputer,
-        BrowserScrapybaraComputer,
-        UbuntuScrapybaraComputer,
-        WindowsScrapybaraComputer,
-    )
-except ImportError:
-    logger.info(
-        "ScrapybaraComputer not available. Install with: pip install commandAGI[scrapybara]"
-    )
 
 __all__ = [
     "BaseComputer",
     "BaseComputerFile",
+    "PagedComputerFile",
     "LocalComputer",
     "LocalPynputComputer",
     "LocalPyAutoGUIComputer",
@@ -85,4 +152,6 @@ __all__ = [
     "UbuntuScrapybaraComputer",
     "BrowserScrapybaraComputer",
     "WindowsScrapybaraComputer",
+    "available_computers",
+    "load_computer",
 ]
@@ -33,6 +33,11 @@ from commandAGI.computers.scrappybara_computer import (
 )
 from commandAGI.computers.vnc_computer import VNCComputer
 
+ENTRY_POINT_GROUP: str
+
+def available_computers() -> list[str]: ...
+def load_computer(name: str) -> type: ...
+
 __all__ = [
     "BaseComputer",
     "BaseJupyterNotebook",
@@ -52,5 +57,7 @@ __all__ = [
     "UbuntuScrapybaraComputer",
     "BrowserScrapybaraComputer",
     "WindowsScrapybaraComputer",
+    "available_computers",
+    "load_computer",
 ]
 # TODO: update this file to include all the imports from __init__.py
@@ -0,0 +1,4 @@
+from commandAGI.computers.base_computer.base_computer import BaseComputer
+from commandAGI.computers.misc_types import SystemInfo
+
+__all__ = ["BaseComputer", "SystemInfo"]
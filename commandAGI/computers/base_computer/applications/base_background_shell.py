@@ -71,6 +71,30 @@ class BaseBackgroundShell(BaseSubprocess):
         """
         raise NotImplementedError("Subclasses must implement get_command_output")
 
+    def read_command_output(
+        self,
+        pid: int,
+        stream: str = "stdout",
+        offset: int = 0,
+        max_bytes: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Read the output of a background command from a byte offset on.
+
+        Args:
+            pid: Process ID of the background command
+            stream: "stdout" or "stderr"
+            offset: Offset of the first byte to read
+            max_bytes: The most bytes to read, or None for all available
+            timeout: Seconds to wait for output past offset if there is none
+                yet, or None to return immediately
+
+        Returns:
+            Dict containing the data, its offset, the offset to continue
+            reading from (next_offset), and status information
+        """
+        raise NotImplementedError("Subclasses must implement read_command_output")
+
     def stop_command(self, pid: int) -> bool:
         """Stop a background command.
 
@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Dict, Optional, Union
+from typing import Any, Dict, Optional, Union
 
 from commandAGI.computers.base_computer.base_subprocess import BaseSubprocess
 
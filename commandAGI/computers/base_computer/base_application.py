@@ -1,3 +1,10 @@
+from pathlib import Path
+from typing import Literal, Union
+
+from PIL import Image
+from pydantic import Field
+
+from commandAGI._utils.annotations import annotation
 from commandAGI.computers.base_computer.base_subprocess import BaseSubprocess
 
 
@@ -1,18 +1,27 @@
 import logging
 import os
 import tempfile
+import threading
 import time
 from abc import abstractmethod
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Literal, Optional, Union
+from typing import Dict, Iterator, List, Literal, Optional, Sequence, Union
+from weakref import WeakKeyDictionary
 
-from langchain.tools import BaseTool
-from pydantic import BaseModel
+from langchain_core.tools import BaseTool, StructuredTool
+from PIL import Image
+from pydantic import BaseModel, PrivateAttr
 
 from commandAGI._internal.config import APPDIR
-from commandAGI._utils.annotations import annotation, gather_annotated_attr_keys
+from commandAGI._utils.annotations import (
+    annotation,
+    gather_annotated_attrs,
+    register_annotations,
+)
 from commandAGI._utils.counter import next_for_cls
+from commandAGI._utils.output_stream import OutputEvent
 from commandAGI.computers.base_computer.applications.base_background_shell import (
     BaseBackgroundShell,
 )
@@ -54,18 +63,28 @@ from commandAGI.computers.base_computer.applications.base_shell import BaseShell
 from commandAGI.computers.base_computer.applications.base_text_editor import (
     BaseTextEditor,
 )
+from commandAGI.computers.base_computer.base_file import BaseComputerFile
 from commandAGI.computers.base_computer.base_keyboard import KeyboardKey
 from commandAGI.computers.base_computer.base_mouse import MouseButton
 from commandAGI.computers.base_computer.base_subprocess import BaseSubprocess
 from commandAGI.computers.misc_types import (
     ComputerRunningState,
     DisplayInfo,
+    LayoutTreeDelta,
     ProcessInfo,
+    ScreenshotDelta,
+    ScreenshotDeltaRegion,
     SystemInfo,
+    TemplateMatch,
     UIElement,
     WindowInfo,
 )
 
+# class -> {tool name: args schema}, see BaseComputer.tools
+_tool_schemas: "WeakKeyDictionary[type, dict[str, type[BaseModel]]]" = (
+    WeakKeyDictionary()
+)
+
 
 class BaseComputer(BaseModel):
 
@@ -80,6 +99,12 @@ class BaseComputer(BaseModel):
     preferred_video_stream_mode: Literal["vnc", "http"] = "http"
     """Used  to indicate which video stream mode is more efficient (ie, to avoid using proxy streams)"""
 
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs):
+        super().__pydantic_init_subclass__(**kwargs)
+        # Listing tools and endpoints then never touches instance attributes
+        register_annotations(cls)
+
     def __init__(self, name=None, **kwargs):
         name = (
             name
@@ -315,7 +340,9 @@ class BaseComputer(BaseModel):
     @annotation("endpoint", {"method": "get", "path": "/screenshot"})
     @annotation("mcp_resource", {"resource_name": "screenshot"})
     def get_screenshot(
-        self, display_id: int = 0, format: Literal["base64", "PIL", "path"] = "PIL"
+        self,
+        display_id: int = 0,
+        format: Literal["base64", "PIL", "path", "ndarray", "raw"] = "PIL",
     ) -> Union[str, Image.Image, Path]:
         """Return a screenshot in the specified format.
 
@@ -325,6 +352,9 @@ class BaseComputer(BaseModel):
                 - 'base64': Return the screenshot as a base64 encoded string
                 - 'PIL': Return the screenshot as a PIL Image object
                 - 'path': Save the screenshot to a file and return the path
+                - 'ndarray': Return a read-only BGRA NumPy view of the frame
+                  (only supported by computers that capture raw pixels locally)
+                - 'raw': Return an unencoded RawFrame (same support as 'ndarray')
         """
         return self._execute_with_retry(
             "get_screenshot",
@@ -334,7 +364,9 @@ class BaseComputer(BaseModel):
         )
 
     def _get_screenshot(
-        self, display_id: int = 0, format: Literal["base64", "PIL", "path"] = "PIL"
+        self,
+        display_id: int = 0,
+        format: Literal["base64", "PIL", "path", "ndarray", "raw"] = "PIL",
     ) -> Union[str, Image.Image, Path]:
         """Get a screenshot of the current state.
 
@@ -347,6 +379,154 @@ class BaseComputer(BaseModel):
         """
         raise NotImplementedError(f"{self.__class__.__name__}.get_screenshot")
 
+    def _get_screenshot_ndarray(self, display_id: int = 0):
+        """Get a screenshot as an (H, W, C) uint8 NumPy array.
+
+        3-channel arrays are RGB and 4-channel arrays are BGRA. The default
+        implementation decodes a base64 screenshot; computers that capture raw
+        pixels locally should override this to skip the round trip.
+        """
+        import numpy as np
+
+        from commandAGI._utils.image import b64ToImage
+        from commandAGI.types import ScreenshotObservation
+
+        # get_screenshot returns the retry wrapper's status rather than the
+        # image, and base64 is the one format every backend supports
+        screenshot = self._get_screenshot(display_id=display_id, format="base64")
+        if isinstance(screenshot, ScreenshotObservation):
+            screenshot = screenshot.screenshot
+        return np.asarray(b64ToImage(screenshot).convert("RGB"))
+
+    # session -> {display_id: (block_size, block hashes)}, least recently used
+    # sessions first
+    _screenshot_delta_hashes: Optional[OrderedDict] = None
+    max_screenshot_delta_sessions: int = 16
+    """How many callers' previous frames are kept for screenshot deltas"""
+
+    @annotation("endpoint", {"method": "get", "path": "/screenshot_delta"})
+    @annotation("mcp_resource", {"resource_name": "screenshot_delta"})
+    def get_screenshot_delta(
+        self,
+        display_id: int = 0,
+        block_size: int = 32,
+        format: Literal["ndarray", "PIL", "base64"] = "PIL",
+        session: Optional[str] = None,
+    ) -> ScreenshotDelta:
+        """Return only the parts of a display that changed since the last call.
+
+        The frame is split into block_size x block_size tiles which are hashed
+        and compared against the hashes kept from the previous call for the
+        same display and session. Changed tiles are merged into rectangles and
+        cropped out of the current frame. The first call for a display, a
+        resolution or block size change, or a call after
+        `reset_screenshot_delta` returns a keyframe whose single region is the
+        full frame.
+
+        Each caller that polls for deltas should pass its own session, so they
+        don't overwrite each other's previous frame. Only the
+        max_screenshot_delta_sessions most recently used sessions are kept, a
+        forgotten session gets a keyframe.
+
+        Args:
+            display_id: Optional ID of the display to capture. Defaults to 0 (primary display).
+            block_size: Edge length in pixels of the compared tiles (must be even)
+            format: Format of the region patches. Options are:
+                - 'PIL': Return each patch as a PIL Image object
+                - 'base64': Return each patch as a base64 encoded PNG
+                - 'ndarray': Return each patch as a NumPy array
+            session: Identifies the caller whose previous frame is compared against
+
+        Returns:
+            ScreenshotDelta with changed=False and no regions if nothing changed
+        """
+        return self._get_screenshot_delta(
+            display_id=display_id, block_size=block_size, format=format, session=session
+        )
+
+    def _get_screenshot_delta(
+        self,
+        display_id: int = 0,
+        block_size: int = 32,
+        format: Literal["ndarray", "PIL", "base64"] = "PIL",
+        session: Optional[str] = None,
+    ) -> ScreenshotDelta:
+        """Diff the current frame against the session's previous one.
+
+        Computers that don't capture the screen themselves can override this
+        to have the diff computed where the screen is.
+        """
+        from commandAGI._utils.frame_diff import (
+            block_hashes,
+            crop_patch,
+            diff_block_hashes,
+            dirty_rectangles,
+        )
+
+        frame = self._get_screenshot_ndarray(display_id)
+        height, width = frame.shape[:2]
+        hashes = block_hashes(frame, block_size=block_size)
+
+        if self._screenshot_delta_hashes is None:
+            self._screenshot_delta_hashes = OrderedDict()
+        sessions = self._screenshot_delta_hashes
+        displays = sessions.setdefault(session, {})
+        sessions.move_to_end(session)
+        while len(sessions) > self.max_screenshot_delta_sessions:
+            sessions.popitem(last=False)
+        previous_block_size, previous_hashes = displays.get(display_id, (None, None))
+        displays[display_id] = (block_size, hashes)
+
+        dirty_mask = (
+            diff_block_hashes(previous_hashes, hashes)
+            if previous_block_size == block_size
+            else None
+        )
+        if dirty_mask is None:
+            rects = [(0, 0, width, height)]
+        else:
+            rects = dirty_rectangles(dirty_mask, block_size, (width, height))
+
+        return ScreenshotDelta(
+            display_id=display_id,
+            changed=bool(rects),
+            keyframe=dirty_mask is None,
+            frame_size=(width, height),
+            regions=[
+                ScreenshotDeltaRegion(
+                    left=rect[0],
+                    top=rect[1],
+                    width=rect[2],
+                    height=rect[3],
+                    patch=crop_patch(frame, rect, format),
+                )
+                for rect in rects
+            ],
+        )
+
+    @annotation("endpoint", {"method": "post", "path": "/screenshot_delta/reset"})
+    def reset_screenshot_delta(
+        self, display_id: Optional[int] = None, session: Optional[str] = None
+    ):
+        """Forget the last frame so the next screenshot delta is a keyframe.
+
+        Args:
+            display_id: Display to reset. If None, all displays are reset.
+            session: Session whose frames are forgotten
+        """
+        self._reset_screenshot_delta(display_id=display_id, session=session)
+
+    def _reset_screenshot_delta(
+        self, display_id: Optional[int] = None, session: Optional[str] = None
+    ):
+        """Forget the session's previous frames."""
+        if self._screenshot_delta_hashes is None:
+            return
+        if display_id is None:
+            self._screenshot_delta_hashes.pop(session, None)
+        else:
+            self._screenshot_delta_hashes.get(session, {}).pop(display_id, None)
+
     @annotation("endpoint", {"use_getter": True, "use_setter": True})
     @property
     def mouse_position(self) -> tuple[int, int]:
@@ -487,11 +667,19 @@ class BaseComputer(BaseModel):
 
     @annotation("endpoint", {"method": "get", "path": "/processes"})
     @annotation("mcp_resource", {"resource_name": "processes"})
-    def get_processes(self) -> List[ProcessInfo]:
-        """Get information about running processes."""
-        return self._execute_with_retry("get_processes", self._get_processes)
+    def get_processes(self, fields: Optional[List[str]] = None) -> List[ProcessInfo]:
+        """Get information about running processes.
+
+        Args:
+            fields: Optional list of fields to include for each process. Defaults
+                to all fields; implementations may skip expensive lookups for
+                fields that aren't requested.
+        """
+        return self._execute_with_retry(
+            "get_processes", self._get_processes, fields=fields
+        )
 
-    def _get_processes(self) -> List[ProcessInfo]:
+    def _get_processes(self, fields: Optional[List[str]] = None) -> List[ProcessInfo]:
         """Get information about running processes."""
         raise NotImplementedError(f"{self.__class__.__name__}._get_processes")
 
@@ -532,11 +720,43 @@ class BaseComputer(BaseModel):
 
     @annotation("endpoint", {"method": "get", "path": "/layout_tree"})
     @annotation("mcp_resource", {"resource_name": "layout_tree"})
-    def get_layout_tree(self) -> UIElement:
-        """Return a LayoutTreeObservation containing the accessibility tree of the current UI."""
-        return self._execute_with_retry("get_layout_tree", self._get_layout_tree)
+    def get_layout_tree(
+        self,
+        node_id: Optional[str] = None,
+        max_depth: Optional[int] = None,
+        max_children: Optional[int] = None,
+        focused_window_only: bool = False,
+    ) -> UIElement:
+        """Return a LayoutTreeObservation containing the accessibility tree of the current UI.
 
-    def _get_layout_tree(self) -> UIElement:
+        Walking a whole desktop can take seconds, so the tree can be limited
+        and then expanded lazily: every node carries an id and a child_count,
+        and passing a node's id returns the subtree below it.
+
+        Args:
+            node_id: Id of a node from a previous call to expand. Defaults to
+                the root of the tree.
+            max_depth: Levels of children to include below the returned node.
+                None means no limit.
+            max_children: Maximum number of children to include per node
+            focused_window_only: Only return the window that has keyboard focus
+        """
+        return self._execute_with_retry(
+            "get_layout_tree",
+            self._get_layout_tree,
+            node_id=node_id,
+            max_depth=max_depth,
+            max_children=max_children,
+            focused_window_only=focused_window_only,
+        )
+
+    def _get_layout_tree(
+        self,
+        node_id: Optional[str] = None,
+        max_depth: Optional[int] = None,
+        max_children: Optional[int] = None,
+        focused_window_only: bool = False,
+    ) -> UIElement:
         """Get the UI layout tree.
 
         Returns:
@@ -544,6 +764,55 @@ class BaseComputer(BaseModel):
         """
         raise NotImplementedError(f"{self.__class__.__name__}._get_layout_tree")
 
+    @annotation("endpoint", {"method": "get", "path": "/layout_tree_delta"})
+    @annotation("mcp_resource", {"resource_name": "layout_tree_delta"})
+    def get_layout_tree_delta(
+        self,
+        max_depth: Optional[int] = None,
+        max_children: Optional[int] = None,
+        focused_window_only: bool = False,
+    ) -> LayoutTreeDelta:
+        """Return only the parts of the layout tree that changed since the last call.
+
+        The first call, a call with different options, or a call after
+        `reset_layout_tree_delta` returns a keyframe holding the whole tree.
+
+        Args:
+            max_depth: Levels of children to include below the root
+            max_children: Maximum number of children to include per node
+            focused_window_only: Only track the window that has keyboard focus
+
+        Returns:
+            LayoutTreeDelta with changed=False if nothing changed
+        """
+        return self._execute_with_retry(
+            "get_layout_tree_delta",
+            self._get_layout_tree_delta,
+            max_depth=max_depth,
+            max_children=max_children,
+            focused_window_only=focused_window_only,
+        )
+
+    def _get_layout_tree_delta(
+        self,
+        max_depth: Optional[int] = None,
+        max_children: Optional[int] = None,
+        focused_window_only: bool = False,
+    ) -> LayoutTreeDelta:
+        """Get the changes to the UI layout tree since the previous delta."""
+        raise NotImplementedError(f"{self.__class__.__name__}._get_layout_tree_delta")
+
+    @annotation("endpoint", {"method": "post", "path": "/reset_layout_tree_delta"})
+    def reset_layout_tree_delta(self):
+        """Forget the previous layout tree delta so the next one is a keyframe."""
+        return self._execute_with_retry(
+            "reset_layout_tree_delta", self._reset_layout_tree_delta
+        )
+
+    def _reset_layout_tree_delta(self):
+        """Forget the previous layout tree delta."""
+        raise NotImplementedError(f"{self.__class__.__name__}._reset_layout_tree_delta")
+
     @property
     def sysinfo(self) -> SystemInfo:
         """Get information about the system."""
@@ -638,6 +907,139 @@ class BaseComputer(BaseModel):
         """
         raise NotImplementedError(f"{self.__class__.__name__}._run_process")
 
+    def stream_shell(
+        self,
+        command: str,
+        timeout: Optional[float] = None,
+        executible: Optional[str] = None,
+        cwd: Optional[str] = None,
+        env: Optional[dict] = None,
+        max_output_bytes: Optional[int] = None,
+        tail: bool = False,
+        cancel: Optional[threading.Event] = None,
+    ) -> Iterator[OutputEvent]:
+        """Execute a system command and yield its output while it runs.
+
+        The command is killed if the caller stops iterating before it exits,
+        or when cancel is set.
+
+        Args:
+            command: The command to execute
+            timeout: Seconds after which the command is killed, or None
+            executible: Optional shell executable to use
+            cwd: Optional working directory to use
+            env: Optional environment variables to use
+            max_output_bytes: The most bytes of output to yield, or None for
+                no limit
+            tail: Whether to keep the last max_output_bytes of output instead
+                of the first. The output is then only yielded once the
+                command exits.
+            cancel: Event that kills the command when set, e.g. from another
+                thread while the caller is blocked waiting for output
+
+        Yields:
+            OutputEvent: An OutputChunk for each piece of stdout or stderr,
+                then a ProcessExit with the return code
+        """
+        if self._state == "stopped":
+            self._start()
+        elif self._state == "paused":
+            self.resume()
+        yield from self._stream_shell(
+            command,
+            timeout=timeout,
+            executible=executible,
+            cwd=cwd,
+            env=env,
+            max_output_bytes=max_output_bytes,
+            tail=tail,
+            cancel=cancel,
+        )
+
+    def _stream_shell(
+        self,
+        command: str,
+        timeout: Optional[float] = None,
+        executible: Optional[str] = None,
+        cwd: Optional[str] = None,
+        env: Optional[dict] = None,
+        max_output_bytes: Optional[int] = None,
+        tail: bool = False,
+        cancel: Optional[threading.Event] = None,
+    ) -> Iterator[OutputEvent]:
+        """Execute a system command and yield its output while it runs.
+
+        Implementations apply max_output_bytes and tail themselves, as close to
+        the process as possible, e.g. with limit_output.
+        """
+        raise NotImplementedError(f"{self.__class__.__name__}._stream_shell")
+
+    def stream_process(
+        self,
+        command: str,
+        args: List[str] = [],
+        cwd: Optional[str] = None,
+        env: Optional[dict] = None,
+        timeout: Optional[float] = None,
+        max_output_bytes: Optional[int] = None,
+        tail: bool = False,
+        cancel: Optional[threading.Event] = None,
+    ) -> Iterator[OutputEvent]:
+        """Run a process and yield its output while it runs.
+
+        The process is killed if the caller stops iterating before it exits,
+        or when cancel is set.
+
+        Args:
+            command: The command to run
+            args: List of command arguments
+            cwd: Working directory for the process
+            env: Environment variables for the process
+            timeout: Seconds after which the process is killed, or None
+            max_output_bytes: The most bytes of output to yield, or None for
+                no limit
+            tail: Whether to keep the last max_output_bytes of output instead
+                of the first
+            cancel: Event that kills the process when set, e.g. from another
+                thread while the caller is blocked waiting for output
+
+        Yields:
+            OutputEvent: An OutputChunk for each piece of stdout or stderr,
+                then a ProcessExit with the return code
+        """
+        if self._state == "stopped":
+            self._start()
+        elif self._state == "paused":
+            self.resume()
+        yield from self._stream_process(
+            command,
+            args=args,
+            cwd=cwd,
+            env=env,
+            timeout=timeout,
+            max_output_bytes=max_output_bytes,
+            tail=tail,
+            cancel=cancel,
+        )
+
+    def _stream_process(
+        self,
+        command: str,
+        args: List[str] = [],
+        cwd: Optional[str] = None,
+        env: Optional[dict] = None,
+        timeout: Optional[float] = None,
+        max_output_bytes: Optional[int] = None,
+        tail: bool = False,
+        cancel: Optional[threading.Event] = None,
+    ) -> Iterator[OutputEvent]:
+        """Run a process and yield its output while it runs.
+
+        Implementations apply max_output_bytes and tail themselves, as close to
+        the process as possible, e.g. with limit_output.
+        """
+        raise NotImplementedError(f"{self.__class__.__name__}._stream_process")
+
     @annotation("endpoint", {"method": "post", "path": "/start_shell"})
     def start_shell(
         self,
@@ -1511,6 +1913,11 @@ class BaseComputer(BaseModel):
         """
         raise NotImplementedError(f"{self.__class__.__name__}._open")
 
+    # (engine, OCR args) -> OCRCache. The locate_* tools may run concurrently,
+    # so caches are only created under the lock.
+    _ocr_caches: dict = PrivateAttr(default_factory=dict)
+    _ocr_caches_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
     @annotation("endpoint", {"method": "post", "path": "/locate_text_on_screen"})
     @annotation("mcp_tool", {"tool_name": "locate_text_on_screen"})
     def locate_text_on_screen(
@@ -1518,6 +1925,8 @@ class BaseComputer(BaseModel):
         text: str,
         ocr_engine: Literal["screenparse", "pytesseract"] = "pytesseract",
         additional_ocr_args: dict = {},
+        region: Optional[tuple[int, int, int, int]] = None,
+        display_id: int = 0,
     ) -> tuple[int, int] | None:
         """Find text on screen and return coordinates.
 
@@ -1525,41 +1934,92 @@ class BaseComputer(BaseModel):
             text: The text to locate on screen
             ocr_engine: OCR engine to use ("pytesseract" or "screenparse")
             additional_ocr_args: Additional arguments to pass to the OCR engine
+            region: Optional tuple (x, y, width, height) to limit OCR to
+            display_id: ID of the display to search
 
         Returns:
             tuple[int, int] | None: (x,y) coordinates of the text if found, None if not found
         """
-        # Get screenshot in base64 format
-        screenshot = self.get_screenshot(format="base64")
-
-        # Select OCR engine and parse screenshot
-        match ocr_engine.lower():
-            case "screenparse":
-                from commandAGI.processors.screen_parser.screenparse_ai_screen_parser import (
-                    parse_screenshot,
-                )
-
-                # Note: This would require api_key to be passed or configured
-                parsed = parse_screenshot(screenshot, **additional_ocr_args)
+        (position,) = self.locate_texts_on_screen(
+            [text],
+            ocr_engine=ocr_engine,
+            additional_ocr_args=additional_ocr_args,
+            region=region,
+            display_id=display_id,
+        )
+        return position
 
-            case "pytesseract" | _:  # Default to pytesseract
-                from commandAGI.processors.screen_parser.pytesseract_screen_parser import (
-                    parse_screenshot,
-                )
+    @annotation("endpoint", {"method": "post", "path": "/locate_texts_on_screen"})
+    @annotation("mcp_tool", {"tool_name": "locate_texts_on_screen"})
+    def locate_texts_on_screen(
+        self,
+        texts: List[str],
+        ocr_engine: Literal["screenparse", "pytesseract"] = "pytesseract",
+        additional_ocr_args: dict = {},
+        region: Optional[tuple[int, int, int, int]] = None,
+        display_id: int = 0,
+    ) -> List[tuple[int, int] | None]:
+        """Find several texts on screen with a single OCR pass.
 
-                parsed = parse_screenshot(screenshot, **additional_ocr_args)
+        OCR results are cached per engine (see OCRCache): an unchanged screen
+        is not read again, and after a change only the changed tiles are. All
+        texts are then looked up in an index of the words on screen.
 
-        # Search through parsed elements for matching text
-        for element in parsed.elements:
-            if text.lower() in element.text.lower():
-                # Return center point of bounding box
-                left, top, right, bottom = element.bounding_box
-                center_x = (left + right) // 2
-                center_y = (top + bottom) // 2
-                return (center_x, center_y)
+        Args:
+            texts: The texts to locate on screen
+            ocr_engine: OCR engine to use ("pytesseract" or "screenparse")
+            additional_ocr_args: Additional arguments to pass to the OCR engine
+            region: Optional tuple (x, y, width, height) to limit OCR to
+            display_id: ID of the display to search
 
-        # Text not found
-        return None
+        Returns:
+            List[tuple[int, int] | None]: For each text, the (x,y) coordinates
+            of its center if found, None if not found
+        """
+        from commandAGI.processors.screen_parser.ocr_cache import OCRCache
+
+        cache_key = (ocr_engine.lower(), repr(sorted(additional_ocr_args.items())))
+        with self._ocr_caches_lock:
+            ocr_cache = self._ocr_caches.get(cache_key)
+            if ocr_cache is None:
+                # Select OCR engine
+                match ocr_engine.lower():
+                    case "screenparse":
+                        from commandAGI._utils.image import imageToB64
+                        from commandAGI.processors.screen_parser.screenparse_ai_screen_parser import (
+                            parse_screenshot,
+                        )
+
+                        # Note: This would require api_key to be passed or configured
+                        def parse(image):
+                            return parse_screenshot(
+                                imageToB64(image), **additional_ocr_args
+                            )
+
+                    case "pytesseract" | _:  # Default to pytesseract
+                        from commandAGI.processors.screen_parser.pytesseract_screen_parser import (
+                            parse_image,
+                        )
+
+                        def parse(image):
+                            return parse_image(image, **additional_ocr_args)
+
+                ocr_cache = self._ocr_caches[cache_key] = OCRCache(parse)
+
+        frame = self._get_screenshot_ndarray(display_id)
+        index = ocr_cache.read(frame, region=region)
+
+        positions = []
+        for text in texts:
+            box = index.find(text)
+            if box is None:
+                # Text not found
+                positions.append(None)
+                continue
+            # Return center point of bounding box
+            left, top, right, bottom = box
+            positions.append(((left + right) // 2, (top + bottom) // 2))
+        return positions
 
     @annotation("endpoint", {"method": "post", "path": "/locate_object_on_screen"})
     @annotation("mcp_tool", {"tool_name": "locate_object_on_screen"})
@@ -1569,6 +2029,7 @@ class BaseComputer(BaseModel):
         threshold: float = 0.8,
         method: str = "cv2.TM_CCOEFF_NORMED",
         region: Optional[tuple[int, int, int, int]] = None,
+        scales: Sequence[float] = (1.0,),
     ) -> tuple[int, int] | None:
         """Find an image/icon on screen and return coordinates.
 
@@ -1580,64 +2041,94 @@ class BaseComputer(BaseModel):
                 - cv2.TM_SQDIFF_NORMED: Normalized squared difference
                 - cv2.TM_CCORR_NORMED: Normalized cross correlation
             region: Optional tuple (x, y, width, height) to limit search area
+            scales: Factors to resize the template by before matching
 
         Returns:
             tuple[int, int] | None: (x,y) coordinates of center of best match if found above threshold, None if not found
         """
-        import cv2
-        import numpy as np
-        from PIL import Image
+        # Match in color, as this method always has
+        (matches,) = self.locate_objects_on_screen(
+            [template],
+            threshold=threshold,
+            method=method,
+            region=region,
+            scales=scales,
+            max_matches=1,
+            grayscale=False,
+        )
+        if not matches:
+            # No match found above threshold
+            return None
+        return (matches[0]["x"], matches[0]["y"])
+
+    @annotation("endpoint", {"method": "post", "path": "/locate_objects_on_screen"})
+    @annotation("mcp_tool", {"tool_name": "locate_objects_on_screen"})
+    def locate_objects_on_screen(
+        self,
+        templates: List[Union[str, Path, Image.Image]],
+        threshold: float = 0.8,
+        method: str = "cv2.TM_CCOEFF_NORMED",
+        region: Optional[tuple[int, int, int, int]] = None,
+        scales: Sequence[float] = (1.0,),
+        max_matches: Optional[int] = None,
+        overlap_threshold: float = 0.3,
+        grayscale: bool = True,
+        display_id: int = 0,
+    ) -> List[List[TemplateMatch]]:
+        """Find every occurrence of several images/icons in a single screenshot.
+
+        The screen is captured and converted once for all templates, and
+        template files are loaded and resized once per process (see
+        prepare_template), so locating many icons costs one screenshot.
 
-        # Get screenshot as PIL Image
-        screenshot = self.get_screenshot(format="PIL")
+        Args:
+            templates: Paths to template images or PIL Image objects to locate
+            threshold: Matching threshold (0-1), higher is more strict
+            method: Template matching method to use (see locate_object_on_screen)
+            region: Optional tuple (x, y, width, height) to limit search area
+            scales: Factors to resize the templates by, e.g. (1.0, 2.0) to also
+                find icons captured at 1x on a 2x HiDPI screen
+            max_matches: Maximum number of matches per template
+            overlap_threshold: Intersection over union above which two matches
+                are considered the same object
+            grayscale: Match on grayscale images, which is about 3x faster
+            display_id: ID of the display to search
 
-        # Convert template path/PIL Image to cv2 format
-        if isinstance(template, (str, Path)):
-            template = Image.open(template)
-        if isinstance(template, Image.Image):
-            template = cv2.cvtColor(np.array(template), cv2.COLOR_RGB2BGR)
+        Returns:
+            List[List[TemplateMatch]]: For each template, its matches above the
+            threshold, best first, in screen coordinates
+        """
+        import cv2
 
-        # Convert screenshot to cv2 format
-        screenshot = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
+        from commandAGI._utils.template_match import (
+            match_templates,
+            prepare_template,
+            to_match_image,
+        )
 
-        # Crop screenshot to region if specified
+        frame = self._get_screenshot_ndarray(display_id)
         if region:
             x, y, w, h = region
-            screenshot = screenshot[y : y + h, x : x + w]
-
-        # Get template dimensions
-        template_h, template_w = template.shape[:2]
-
-        # Perform template matching
-        method = getattr(cv2, method.split(".")[-1])
-        result = cv2.matchTemplate(screenshot, template, method)
-
-        # Get best match location
-        min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
-
-        # Different methods have different optimal values
-        if method in [cv2.TM_SQDIFF, cv2.TM_SQDIFF_NORMED]:
-            match_val = 1 - min_val  # Convert to similarity score
-            match_loc = min_loc
-        else:
-            match_val = max_val
-            match_loc = max_loc
-
-        # Check if match exceeds threshold
-        if match_val >= threshold:
-            # Calculate center point of match
-            center_x = match_loc[0] + template_w // 2
-            center_y = match_loc[1] + template_h // 2
-
-            # Adjust coordinates if region was specified
-            if region:
-                center_x += region[0]
-                center_y += region[1]
-
-            return (center_x, center_y)
+            frame = frame[y : y + h, x : x + w]
+        frame = to_match_image(frame, grayscale)
+
+        results = match_templates(
+            frame,
+            [prepare_template(template, grayscale) for template in templates],
+            threshold=threshold,
+            method=getattr(cv2, method.split(".")[-1]),
+            scales=scales,
+            overlap_threshold=overlap_threshold,
+            max_matches=max_matches,
+        )
 
-        # No match found above threshold
-        return None
+        # Adjust coordinates if region was specified
+        if region:
+            for matches in results:
+                for match in matches:
+                    for key, offset in (("left", x), ("x", x), ("top", y), ("y", y)):
+                        match[key] += offset
+        return results
 
     @annotation("endpoint", {"method": "post", "path": "/mouse_action"})
     @annotation("mcp_tool", {"tool_name": "mouse_action"})
@@ -1672,16 +2163,25 @@ class BaseComputer(BaseModel):
 
     @property
     def tools(self) -> list[BaseTool]:
-        mcp_tool_names = gather_annotated_attr_keys(self, "mcp_tool")
+        mcp_tools = gather_annotated_attrs(self, "mcp_tool")
+        # Argument schemas are inferred once per class and tool
+        schemas = _tool_schemas.setdefault(type(self), {})
         tools = []
-        for mcp_tool_name in mcp_tool_names:
+        for mcp_tool_name, annotation_data in mcp_tools.items():
             tool_method = getattr(self, mcp_tool_name)
-            tool = BaseTool.from_function(
+            # Tools act on the computer, so they run one at a time unless
+            # annotated with "exclusive": False. Even the locate_* tools
+            # aren't, since they share the computer's screen capture.
+            exclusive = annotation_data["mcp_tool"].get("exclusive", True)
+            tool = StructuredTool.from_function(
                 name=tool_method.__name__,
                 description=tool_method.__doc__,
                 func=tool_method,
                 return_direct=True,
+                args_schema=schemas.get(mcp_tool_name),
+                metadata={"exclusive": exclusive},
             )
+            schemas.setdefault(mcp_tool_name, tool.args_schema)
             tools.append(tool)
         return tools
 
@@ -1689,8 +2189,6 @@ class BaseComputer(BaseModel):
         """Create and return a FastMCP server with tools and resources based on annotations."""
         from fastmcp import FastMCP
 
-        from commandAGI._utils.annotations import gather_annotated_attrs
-
         # Create FastMCP server with the computer's name
         mcp = FastMCP(self.name)
 
@@ -1734,8 +2232,6 @@ class BaseComputer(BaseModel):
 
         from fastapi import FastAPI, HTTPException
 
-        from commandAGI._utils.annotations import gather_annotated_attrs
-
         class HTTPMethod(str, Enum):
             GET = "GET"
             POST = "POST"
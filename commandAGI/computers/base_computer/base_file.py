@@ -1,8 +1,10 @@
 from abc import ABC
-from io import FileIO
+from io import IOBase
+from pathlib import Path
+from typing import Optional, Union
 
 
-class BaseComputerFile(FileIO, ABC):
+class BaseComputerFile(IOBase, ABC):
     """Base class for computer-specific file implementations.
 
     This class provides a file-like interface for working with files on remote computers.
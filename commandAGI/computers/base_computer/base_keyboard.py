@@ -1,3 +1,7 @@
+from enum import Enum
+from typing import Union
+
+
 class KeyboardKey(str, Enum):
     # Special Keys
     ENTER = "enter"
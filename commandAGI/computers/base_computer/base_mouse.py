@@ -1,3 +1,6 @@
+from enum import Enum
+
+
 class MouseButton(str, Enum):
     LEFT = "left"
     RIGHT = "right"
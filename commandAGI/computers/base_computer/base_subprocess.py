@@ -2,7 +2,7 @@ import logging
 from pathlib import Path
 from typing import TYPE_CHECKING, Dict, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 from commandAGI._utils.platform import DEFAULT_SHELL_EXECUTIBLE
 from commandAGI.computers.misc_types import ProcessInfo
@@ -18,7 +18,7 @@ class BaseSubprocess(BaseModel):
     executable: str = DEFAULT_SHELL_EXECUTIBLE
     _logger: Optional[logging.Logger] = None
     last_pinfo: Optional[ProcessInfo] = Field(None, description="Last process info")
-    _computer: BaseComputer = Field(description="Computer instance")
+    _computer: "BaseComputer" = PrivateAttr()
 
     @property
     def cwd(self) -> Path:
@@ -0,0 +1,424 @@
+"""Files on a computer that are read and written in pages, on demand.
+
+A PagedComputerFile never copies the whole file. Reads fetch the pages they
+touch from the computer, plus a read-ahead window that grows while the file
+is read sequentially. Writes go into cached pages, and only the ranges of
+them that changed are written back, on flush() or when too many are pending.
+The cache is kept valid against the size and mtime of the file on the
+computer: when another process changes the file, the cached pages that
+weren't written here are dropped.
+
+Subclasses provide the access to the computer with _stat(), _read_range(),
+_write_range() and _truncate().
+"""
+
+import io
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from commandAGI._utils.file_transfer import CHUNK_SIZE, FileChangedError
+from commandAGI.computers.base_computer.base_file import BaseComputerFile
+
+PAGE_SIZE = 1 << 18
+
+# Read-ahead is measured in pages, and a whole window is fetched in one request
+_MIN_READ_AHEAD = 2
+_MAX_READ_AHEAD = CHUNK_SIZE // PAGE_SIZE
+
+# The size and version of a file on the computer
+FileStat = Tuple[int, str]
+
+
+class _PagedIO(io.RawIOBase):
+    """Unbuffered, seekable view of a file on a computer, cached in pages.
+
+    Pages are bytearrays of up to PAGE_SIZE bytes. A page shorter than that
+    is followed by zeros up to the size of the file, like the gap left by
+    writing past the end of a file. For each changed page, the range of it
+    that changed is tracked, and only that range is written back.
+    """
+
+    def __init__(self, computer_file: "PagedComputerFile", mode: str):
+        if sum(mode.count(c) for c in "rwax") != 1:
+            raise ValueError(f"invalid mode: {mode!r}")
+        self._computer_file = computer_file
+        self._readable = "r" in mode or "+" in mode
+        self._writable = "r" not in mode or "+" in mode
+        self._append = "a" in mode
+        # Least recently used first
+        self._pages: "OrderedDict[int, bytearray]" = OrderedDict()
+        # index -> (start, end) of the changed range within the page
+        self._dirty: Dict[int, Tuple[int, int]] = {}
+        self._position = 0
+        self._read_ahead = _MIN_READ_AHEAD
+        self._next_page: Optional[int] = None
+        # Set when the file is truncated here, until the truncation is written
+        # back, since the bytes after it on the computer are no longer part of
+        # the file
+        self._truncated_to: Optional[int] = None
+
+        stat = computer_file._stat()
+        if stat is not None and "x" in mode:
+            raise FileExistsError(f"File exists on the computer: {computer_file.path}")
+        if stat is None and "r" in mode:
+            raise FileNotFoundError(
+                f"No such file on the computer: {computer_file.path}"
+            )
+        if stat is None or "w" in mode or "x" in mode:
+            stat = computer_file._truncate(0)
+        self._set_stat(stat)
+        self._size = self._remote_size
+        if self._append:
+            self._position = self._size
+
+    def _set_stat(self, stat: Optional[FileStat]):
+        self._remote_size, self._version = stat if stat is not None else (0, None)
+        self._validated_at = time.monotonic()
+
+    @property
+    def _backing_size(self) -> int:
+        """How many bytes of the file on the computer are part of this file."""
+        if self._truncated_to is None:
+            return self._remote_size
+        return min(self._remote_size, self._truncated_to)
+
+    def _has_changes(self) -> bool:
+        return (
+            bool(self._dirty)
+            or self._truncated_to is not None
+            or self._size != self._remote_size
+        )
+
+    def readable(self) -> bool:
+        return self._readable
+
+    def writable(self) -> bool:
+        return self._writable
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            self._revalidate()
+            offset += self._size
+        if offset < 0:
+            raise ValueError(f"negative seek position {offset}")
+        self._position = offset
+        return offset
+
+    def readinto(self, buffer) -> int:
+        self._revalidate()
+        view = memoryview(buffer).cast("B")
+        end = min(self._position + len(view), self._size)
+        done = 0
+        while self._position < end:
+            index, start = divmod(self._position, PAGE_SIZE)
+            count = min(end - self._position, PAGE_SIZE - start)
+            data = self._page(index)[start : start + count]
+            view[done : done + len(data)] = data
+            view[done + len(data) : done + count] = bytes(count - len(data))
+            done += count
+            self._position += count
+        return done
+
+    def readall(self) -> bytes:
+        self._revalidate()
+        buffer = bytearray(max(self._size - self._position, 0))
+        return bytes(buffer[: self.readinto(buffer)])
+
+    def write(self, data) -> int:
+        data = memoryview(data).cast("B")
+        if self._append:
+            self._position = self._size
+        done = 0
+        while done < len(data):
+            index, start = divmod(self._position, PAGE_SIZE)
+            count = min(len(data) - done, PAGE_SIZE - start)
+            if count == PAGE_SIZE:
+                # Overwritten completely, so there's no need to fetch it
+                page = self._pages[index] = bytearray()
+            else:
+                page = self._page(index, read_ahead=False)
+            if len(page) < start:
+                page.extend(bytes(start - len(page)))
+            page[start : start + count] = data[done : done + count]
+            # A page that was just fetched may have been evicted already
+            self._pages[index] = page
+            self._pages.move_to_end(index)
+            dirty_start, dirty_end = self._dirty.get(index, (start, start + count))
+            self._dirty[index] = (
+                min(dirty_start, start),
+                max(dirty_end, start + count),
+            )
+            done += count
+            self._position += count
+        self._size = max(self._size, self._position)
+        if len(self._dirty) > self._computer_file.max_dirty_pages:
+            self.write_back()
+        else:
+            self._evict()
+        return done
+
+    def truncate(self, size: Optional[int] = None) -> int:
+        if size is None:
+            size = self._position
+        if size < self._size:
+            for index in list(self._pages):
+                start = index * PAGE_SIZE
+                if start >= size:
+                    del self._pages[index]
+                    self._dirty.pop(index, None)
+                    continue
+                del self._pages[index][size - start :]
+                if index in self._dirty:
+                    dirty_start, dirty_end = self._dirty[index]
+                    if dirty_start >= size - start:
+                        del self._dirty[index]
+                    else:
+                        self._dirty[index] = (dirty_start, min(dirty_end, size - start))
+            if self._truncated_to is None or size < self._truncated_to:
+                self._truncated_to = size
+        self._size = size
+        return size
+
+    def flush(self):
+        if not self.closed:
+            self.write_back()
+
+    def write_back(self):
+        """Write the changed pages, and the new size, back to the computer."""
+        if not self._has_changes():
+            return
+        computer_file = self._computer_file
+        if self._backing_size < self._remote_size:
+            self._set_stat(computer_file._truncate(self._backing_size))
+        # Changed ranges that touch are written in one request
+        ranges: List[Tuple[int, int]] = []
+        for index in sorted(self._dirty):
+            start, end = self._dirty[index]
+            start, end = index * PAGE_SIZE + start, index * PAGE_SIZE + end
+            if ranges and ranges[-1][1] == start and end - ranges[-1][0] <= CHUNK_SIZE:
+                ranges[-1] = (ranges[-1][0], end)
+            else:
+                ranges.append((start, end))
+        for start, end in ranges:
+            self._write_range(start, end)
+        if self._remote_size < self._size:
+            # Extended without writing up to the end
+            self._set_stat(computer_file._truncate(self._size))
+        self._dirty.clear()
+        self._truncated_to = None
+        self._evict()
+
+    def _write_range(self, start: int, end: int):
+        data = bytearray()
+        for index in range(start // PAGE_SIZE, -(-end // PAGE_SIZE)):
+            page_start = index * PAGE_SIZE
+            data += self._pages[index][
+                max(start - page_start, 0) : min(end - page_start, PAGE_SIZE)
+            ]
+        self._set_stat(self._computer_file._write_range(start, bytes(data)))
+
+    def _revalidate(self):
+        if time.monotonic() - self._validated_at > self._computer_file.revalidate_after:
+            self._refresh()
+
+    def _refresh(self):
+        """Drop the cached pages that weren't changed here if the file on the
+        computer changed."""
+        has_changes = self._has_changes()
+        version = self._version
+        self._set_stat(self._computer_file._stat())
+        if self._version == version:
+            return
+        for index in list(self._pages):
+            if index not in self._dirty:
+                del self._pages[index]
+        self._next_page = None
+        if not has_changes:
+            self._size = self._remote_size
+
+    def _page(self, index: int, read_ahead: bool = True) -> bytearray:
+        page = self._pages.get(index)
+        if page is not None:
+            self._pages.move_to_end(index)
+            return page
+        if index * PAGE_SIZE >= self._backing_size:
+            page = self._pages[index] = bytearray()
+            return page
+
+        # Grow the window while the file is read sequentially
+        if not read_ahead:
+            window = 1
+        elif index == self._next_page:
+            window = self._read_ahead = min(self._read_ahead * 2, _MAX_READ_AHEAD)
+        else:
+            window = self._read_ahead = _MIN_READ_AHEAD
+        last = min(index + window, -(-self._backing_size // PAGE_SIZE))
+        stop = index + 1
+        while stop < last and stop not in self._pages:
+            stop += 1
+        data = self._read_range(index * PAGE_SIZE, (stop - index) * PAGE_SIZE)
+        if read_ahead:
+            self._next_page = stop
+        for i in range(index, stop):
+            start = (i - index) * PAGE_SIZE
+            self._pages[i] = bytearray(data[start : start + PAGE_SIZE])
+        page = self._pages[index]
+        self._evict()
+        return page
+
+    def _read_range(self, offset: int, length: int) -> bytes:
+        length = min(length, self._backing_size - offset)
+        try:
+            return self._computer_file._read_range(offset, length, self._version)
+        except FileChangedError:
+            self._refresh()
+        length = min(length, self._backing_size - offset)
+        if length <= 0:
+            return b""
+        return self._computer_file._read_range(offset, length, self._version)
+
+    def _evict(self):
+        excess = len(self._pages) - self._computer_file.max_cached_pages
+        for index in list(self._pages):
+            if excess <= 0:
+                break
+            if index not in self._dirty:
+                del self._pages[index]
+                excess -= 1
+
+
+class PagedComputerFile(BaseComputerFile):
+    """Base class for files that are accessed on the computer in byte ranges,
+    instead of being copied whole.
+
+    Opening a file costs one round trip, reading fetches only the pages that
+    are read (with read-ahead for sequential reads), and flushing writes back
+    only the bytes that changed. Reading the first line of a large log or
+    appending a line to it therefore transfers a few pages, not the file.
+
+    Subclasses implement _stat(), _read_range(), _write_range() and
+    _truncate() for their computer.
+
+    Examples:
+        >>> with computer.open("/var/log/syslog") as f:  # doctest: +SKIP
+        ...     first_line = f.readline()
+        >>> with computer.open("/var/log/app.log", "a") as f:  # doctest: +SKIP
+        ...     f.write("one more line\\n")
+    """
+
+    max_cached_pages: int = 256
+    """The most pages kept in memory, least recently used ones are dropped first"""
+    max_dirty_pages: int = 64
+    """How many changed pages are held before they are written back"""
+    revalidate_after: float = 1.0
+    """Seconds after which the cache is checked against the file on the computer"""
+
+    def __init__(
+        self,
+        computer: "BaseComputer",
+        path: Union[str, Path],
+        mode: str = "r",
+        encoding: Optional[str] = None,
+        errors: Optional[str] = None,
+        buffering: int = -1,
+    ):
+        self.computer = computer
+        self.path = Path(path)
+        self.mode = mode
+        self._closed = False
+        self._modified = False
+        self._file = None
+
+        self._pages = _PagedIO(self, mode)
+        if buffering == 0:
+            if "b" not in mode:
+                raise ValueError("can't have unbuffered text I/O")
+            self._file = self._pages
+            return
+        buffer_size = buffering if buffering > 1 else io.DEFAULT_BUFFER_SIZE
+        if self._pages.readable() and self._pages.writable():
+            buffer = io.BufferedRandom(self._pages, buffer_size)
+        elif self._pages.writable():
+            buffer = io.BufferedWriter(self._pages, buffer_size)
+        else:
+            buffer = io.BufferedReader(self._pages, buffer_size)
+        if "b" in mode:
+            self._file = buffer
+        else:
+            self._file = io.TextIOWrapper(
+                buffer, encoding=encoding, errors=errors, line_buffering=buffering == 1
+            )
+
+    @property
+    def closed(self) -> bool:
+        # _file is missing if __init__ failed
+        file = getattr(self, "_file", None)
+        return file is None or file.closed
+
+    def flush(self):
+        """Flush the write buffers and write the changed pages back to the
+        computer."""
+        self._file.flush()
+        self._pages.write_back()
+        self._modified = False
+
+    def close(self):
+        """Close the file and write the changed pages back to the computer."""
+        if not self._closed:
+            try:
+                self.flush()
+            finally:
+                self._file.close()
+                self._closed = True
+
+    def truncate(self, size: Optional[int] = None) -> int:
+        """Resize the file, to the current position by default."""
+        self._modified = True
+        return self._file.truncate(size)
+
+    def _stat(self) -> Optional[FileStat]:
+        """Get the size and version of the file on the computer.
+
+        The version must change whenever the file is modified, e.g. be made
+        of its size and mtime.
+
+        Returns:
+            Optional[FileStat]: The size and version, or None if the file
+                doesn't exist
+        """
+        raise NotImplementedError(f"{self.__class__.__name__}._stat")
+
+    def _read_range(self, offset: int, length: int, version: str) -> bytes:
+        """Read up to length bytes of the file on the computer from offset.
+
+        Raises:
+            FileChangedError: If the file is no longer at version
+        """
+        raise NotImplementedError(f"{self.__class__.__name__}._read_range")
+
+    def _write_range(self, offset: int, data: bytes) -> FileStat:
+        """Write data into the file on the computer at offset, creating it
+        if needed.
+
+        Returns:
+            FileStat: The size and version of the file after the write
+        """
+        raise NotImplementedError(f"{self.__class__.__name__}._write_range")
+
+    def _truncate(self, size: int) -> FileStat:
+        """Resize the file on the computer, creating it if needed.
+
+        Returns:
+            FileStat: The size and version of the file after the resize
+        """
+        raise NotImplementedError(f"{self.__class__.__name__}._truncate")
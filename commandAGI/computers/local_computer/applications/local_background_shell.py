@@ -3,10 +3,10 @@ import os
 import platform
 import signal
 import subprocess
-import threading
 from pathlib import Path
 from typing import Any, Dict, Optional, Union
 
+from commandAGI._utils.output_pump import OutputBuffer, shared_pump
 from commandAGI._utils.platform import DEFAULT_SHELL_EXECUTIBLE
 from commandAGI.computers.base_computer.applications.base_background_shell import (
     BaseBackgroundShell,
@@ -23,8 +23,10 @@ class LocalBackgroundShell(BaseBackgroundShell, LocalSubprocess):
     """
 
     _background_processes: Dict[int, subprocess.Popen] = {}
-    _output_buffers: Dict[int, Dict[str, str]] = {}
-    _locks: Dict[int, threading.Lock] = {}
+    # stdout and stderr of each background command, filled by the output pump
+    _output_buffers: Dict[int, Dict[str, OutputBuffer]] = {}
+    _max_output_memory: int = 1 << 20
+    _spill_dir: Optional[str] = None
 
     def __init__(
         self,
@@ -32,6 +34,8 @@ class LocalBackgroundShell(BaseBackgroundShell, LocalSubprocess):
         cwd: Optional[Union[str, Path]] = None,
         env: Optional[Dict[str, str]] = None,
         logger: Optional[logging.Logger] = None,
+        max_output_memory: int = 1 << 20,
+        spill_dir: Optional[Union[str, Path]] = None,
     ):
         """Initialize a LocalBackgroundShell instance.
 
@@ -40,6 +44,10 @@ class LocalBackgroundShell(BaseBackgroundShell, LocalSubprocess):
             cwd: Initial working directory
             env: Environment variables to set
             logger: Logger instance
+            max_output_memory: Bytes of stdout and of stderr to keep in memory
+                per command
+            spill_dir: Directory to move older output to, or None to drop
+                output beyond max_output_memory
         """
         super().__init__(
             executable=executable,
@@ -47,6 +55,8 @@ class LocalBackgroundShell(BaseBackgroundShell, LocalSubprocess):
             env=env or {},
             logger=logger or logging.getLogger("commandAGI.background_shell"),
         )
+        self._max_output_memory = max_output_memory
+        self._spill_dir = str(spill_dir) if spill_dir is not None else None
 
     def execute_background(self, command: str) -> Dict[str, Any]:
         """Execute a command in the background and return immediately.
@@ -73,7 +83,6 @@ class LocalBackgroundShell(BaseBackgroundShell, LocalSubprocess):
                     cwd=self.cwd,
                     env=env,
                     shell=False,
-                    text=True,
                     creationflags=subprocess.CREATE_NEW_PROCESS_GROUP,
                 )
             else:
@@ -85,13 +94,18 @@ class LocalBackgroundShell(BaseBackgroundShell, LocalSubprocess):
                     cwd=self.cwd,
                     env=env,
                     preexec_fn=os.setsid,
-                    text=True,
                 )
 
             pid = process.pid
             self._background_processes[pid] = process
-            self._output_buffers[pid] = {"stdout": "", "stderr": ""}
-            self._locks[pid] = threading.Lock()
+            buffers = {
+                name: OutputBuffer(self._max_output_memory, self._spill_dir)
+                for name in ("stdout", "stderr")
+            }
+            self._output_buffers[pid] = buffers
+            pump = shared_pump()
+            pump.add(process.stdout, buffers["stdout"])
+            pump.add(process.stderr, buffers["stderr"])
 
             self._logger.info(f"Started background command with PID: {pid}")
             return {
@@ -142,32 +156,111 @@ class LocalBackgroundShell(BaseBackgroundShell, LocalSubprocess):
                 "returncode": None,
             }
 
-        with self._locks[pid]:
-            # Read any new output
-            stdout, stderr = "", ""
-            try:
-                if process.stdout and process.stdout.readable():
-                    stdout = process.stdout.read1().decode("utf-8", errors="replace")
-                if process.stderr and process.stderr.readable():
-                    stderr = process.stderr.read1().decode("utf-8", errors="replace")
-            except Exception as e:
-                self._logger.error(f"Error reading output for PID {pid}: {e}")
-
-            # Update buffers
-            self._output_buffers[pid]["stdout"] += stdout
-            self._output_buffers[pid]["stderr"] += stderr
-
-            # Get process status
-            returncode = process.poll()
-            status = "running" if returncode is None else "completed"
+        buffers = self._output_buffers[pid]
+        returncode = process.poll()
+        return {
+            "stdout": self._decode(buffers["stdout"].read()[1]),
+            "stderr": self._decode(buffers["stderr"].read()[1]),
+            "status": "running" if returncode is None else "completed",
+            "returncode": returncode,
+        }
+
+    def read_command_output(
+        self,
+        pid: int,
+        stream: str = "stdout",
+        offset: int = 0,
+        max_bytes: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Read the output of a background command from a byte offset on.
+
+        Pass the returned next_offset as offset to the next call to read the
+        output incrementally.
 
+        Args:
+            pid: Process ID of the background command
+            stream: "stdout" or "stderr"
+            offset: Offset of the first byte to read
+            max_bytes: The most bytes to read, or None for all available. A
+                character longer than max_bytes is read whole, so every read
+                of available output makes progress.
+            timeout: Seconds to wait for output past offset if there is none
+                yet, or None to return immediately
+
+        Returns:
+            Dict containing the data, its offset (later than the requested one
+            if that output was dropped), next_offset, whether the end of the
+            output was reached (eof), the error that stopped the output from
+            being read, if any, and status information
+
+        Raises:
+            ValueError: If stream is neither "stdout" nor "stderr"
+        """
+        if stream not in ("stdout", "stderr"):
+            raise ValueError(f'stream must be "stdout" or "stderr", not {stream!r}')
+        process = self._background_processes.get(pid)
+        if not process:
             return {
-                "stdout": self._output_buffers[pid]["stdout"],
-                "stderr": self._output_buffers[pid]["stderr"],
-                "status": status,
-                "returncode": returncode,
+                "data": "",
+                "offset": offset,
+                "next_offset": offset,
+                "eof": True,
+                "status": "not_found",
+                "returncode": None,
+                "error": None,
             }
 
+        buffer = self._output_buffers[pid][stream]
+        if timeout is not None:
+            buffer.wait(offset, timeout)
+        closed = buffer.closed
+        offset, data = buffer.read(offset, max_bytes)
+        if data and not self._complete_utf8_length(data):
+            # max_bytes is shorter than the next character, so read all of it
+            offset, data = buffer.read(offset, 4)
+            data = data[: self._utf8_length(data[0])]
+        next_offset = offset + len(data)
+        eof = closed and next_offset == buffer.end
+        if not eof:
+            # Leave a character that is split across reads for the next one
+            data = data[: self._complete_utf8_length(data)]
+            next_offset = offset + len(data)
+        returncode = process.poll()
+        return {
+            "data": self._decode(data),
+            "offset": offset,
+            "next_offset": next_offset,
+            "eof": eof,
+            "status": "running" if returncode is None else "completed",
+            "returncode": returncode,
+            "error": None if buffer.error is None else str(buffer.error),
+        }
+
+    @staticmethod
+    def _decode(data: bytes) -> str:
+        return data.decode("utf-8", errors="replace")
+
+    @staticmethod
+    def _utf8_length(byte: int) -> int:
+        """Length of the UTF-8 character that starts with byte."""
+        if byte < 0x80 or byte & 0xC0 == 0x80:
+            # ASCII, or a continuation byte that is decoded on its own
+            return 1
+        # Lead byte: 0b110xxxxx starts 2 bytes, 0b1110xxxx 3, 0b11110xxx 4
+        return 2 if byte >> 5 == 0b110 else 3 if byte >> 4 == 0b1110 else 4
+
+    @classmethod
+    def _complete_utf8_length(cls, data: bytes) -> int:
+        """Length of data without an incomplete UTF-8 character at its end."""
+        for back in range(1, min(4, len(data)) + 1):
+            byte = data[-back]
+            if byte & 0xC0 != 0x80:
+                if back >= cls._utf8_length(byte):
+                    return len(data)
+                return len(data) - back
+        return len(data)
+
     def stop_command(self, pid: int) -> bool:
         """Stop a background command.
 
@@ -214,6 +307,5 @@ class LocalBackgroundShell(BaseBackgroundShell, LocalSubprocess):
         if pid in self._background_processes:
             del self._background_processes[pid]
         if pid in self._output_buffers:
-            del self._output_buffers[pid]
-        if pid in self._locks:
-            del self._locks[pid]
+            for buffer in self._output_buffers.pop(pid).values():
+                buffer.discard()
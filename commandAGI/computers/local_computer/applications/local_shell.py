@@ -1,8 +1,29 @@
+import codecs
+import logging
+import os
+import platform
+import queue
+import shlex
+import signal
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from commandAGI._utils.platform import DEFAULT_SHELL_EXECUTIBLE
+from commandAGI._utils.shell_protocol import SentinelCommand
 from commandAGI.computers.base_computer.applications.base_shell import BaseShell
 from commandAGI.computers.local_computer.local_subprocess import (
     LocalApplication,
 )
 
+if platform.system() != "Windows":
+    import fcntl
+    import pty
+    import select
+    import termios
+
 
 class LocalShell(BaseShell, LocalApplication):
     """Local class for shell operations.
@@ -15,9 +36,20 @@ class LocalShell(BaseShell, LocalApplication):
     _process: Optional[subprocess.Popen] = None
     _master_fd: Optional[int] = None
     _slave_fd: Optional[int] = None
-    _output_buffer: str = ""
+    # Output chunks read by a thread on Windows, where pipes can't be polled
+    _output_queue: Optional[queue.Queue] = None
+    _decoder: Optional[codecs.IncrementalDecoder] = None
     _lock: threading.Lock = threading.Lock()
 
+    # Prepares an interactive shell for SentinelCommand: no line editing (so
+    # no echo by readline or zle) and no prompts between the markers
+    _POSIX_INIT = (
+        "stty -echo 2>/dev/null; set +o emacs +o vi 2>/dev/null; "
+        "unsetopt zle 2>/dev/null; PS1= PS2= RPS1= PROMPT_COMMAND=\n"
+    )
+    _WINDOWS_INIT = "@echo off\r\n"
+    _HANDSHAKE_TIMEOUT = 10.0
+
     def __init__(
         self,
         executable: str = DEFAULT_SHELL_EXECUTIBLE,
@@ -69,21 +101,32 @@ class LocalShell(BaseShell, LocalApplication):
                     ["cmd.exe", "/c", self.executable],
                     stdin=subprocess.PIPE,
                     stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
                     cwd=self.cwd,
                     env=env,
                     shell=False,  # Don't create another shell layer
-                    text=True,
                     bufsize=0,
                     creationflags=subprocess.CREATE_NEW_PROCESS_GROUP,  # New process group
                 )
                 self.pid = self._process.pid
+                self._output_queue = queue.Queue()
+                threading.Thread(
+                    target=self._pump_output,
+                    args=(self._process.stdout, self._output_queue),
+                    daemon=True,
+                ).start()
             else:
                 # Unix implementation using pty
                 self._master_fd, self._slave_fd = pty.openpty()
                 # Make the master file descriptor non-blocking
                 flags = fcntl.fcntl(self._master_fd, fcntl.F_GETFL)
                 fcntl.fcntl(self._master_fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+                # Pass output through as written: no echo of the input and no
+                # \n to \r\n translation
+                attrs = termios.tcgetattr(self._slave_fd)
+                attrs[1] &= ~termios.ONLCR
+                attrs[3] &= ~termios.ECHO
+                termios.tcsetattr(self._slave_fd, termios.TCSANOW, attrs)
 
                 # Start the shell process
                 self._process = subprocess.Popen(
@@ -96,9 +139,25 @@ class LocalShell(BaseShell, LocalApplication):
                     preexec_fn=os.setsid,  # Create new session
                 )
                 self.pid = self._process.pid
+                # Only the shell holds the slave end now, so reads from the
+                # master fail once the shell exits instead of waiting forever
+                os.close(self._slave_fd)
+                self._slave_fd = None
+
+            self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
 
             self._logger.info(f"Shell started with PID: {self.pid}")
 
+            # Set the shell up and skip its start-up output
+            with self._lock:
+                self._write(
+                    self._WINDOWS_INIT
+                    if platform.system() == "Windows"
+                    else self._POSIX_INIT
+                )
+                if not self._run(self._new_command(""), self._HANDSHAKE_TIMEOUT):
+                    raise RuntimeError("Shell did not respond to the handshake")
+
             # Change to the initial working directory if specified
             if self.cwd:
                 self.change_directory(self.cwd)
@@ -166,8 +225,102 @@ class LocalShell(BaseShell, LocalApplication):
             self._slave_fd = None
 
         self._process = None
+        self._output_queue = None
+        self._decoder = None
         self.pid = None
 
+    @staticmethod
+    def _pump_output(stream, output_queue: queue.Queue):
+        """Move output from a pipe to a queue until the pipe closes."""
+        while True:
+            try:
+                data = stream.read(65536)
+            except (OSError, ValueError):
+                data = b""
+            output_queue.put(data)
+            if not data:
+                return
+
+    def _new_command(self, command: str) -> SentinelCommand:
+        return SentinelCommand(command, windows=platform.system() == "Windows")
+
+    def _write(self, text: str):
+        data = text.encode("utf-8")
+        if platform.system() == "Windows":
+            self._process.stdin.write(data)
+            self._process.stdin.flush()
+            return
+        while data:
+            try:
+                written = os.write(self._master_fd, data)
+            except BlockingIOError:
+                select.select([], [self._master_fd], [])
+                continue
+            data = data[written:]
+
+    def _read_available(self, timeout: Optional[float]) -> Optional[bytes]:
+        """Wait until output is available and read all of it.
+
+        Returns:
+            Optional[bytes]: The output, empty if none arrived within timeout,
+                or None once the shell has exited and all output was read
+        """
+        if platform.system() == "Windows":
+            try:
+                data = self._output_queue.get(timeout=timeout)
+            except queue.Empty:
+                return b""
+            chunks = [data]
+            while data:
+                try:
+                    data = self._output_queue.get_nowait()
+                except queue.Empty:
+                    break
+                chunks.append(data)
+            if not data:
+                # Leave the end of output for the next read to find
+                self._output_queue.put(b"")
+            output = b"".join(chunks)
+            return output if data or output else None
+
+        ready_to_read, _, _ = select.select([self._master_fd], [], [], timeout)
+        if not ready_to_read:
+            return b""
+        chunks = []
+        while True:
+            try:
+                data = os.read(self._master_fd, 65536)
+            except BlockingIOError:
+                break
+            except OSError:
+                # EIO: the shell exited and closed the terminal
+                data = b""
+            if not data:
+                return b"".join(chunks) or None
+            chunks.append(data)
+        return b"".join(chunks)
+
+    def _run(self, command: SentinelCommand, timeout: Optional[float]) -> bool:
+        """Send a command and read its output until it has finished.
+
+        Must be called with the lock held.
+
+        Returns:
+            bool: True if the command finished, False if it timed out or the
+                shell exited first
+        """
+        self._write(command.script.decode("utf-8"))
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not command.done:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            data = self._read_available(remaining)
+            if data is None:
+                return False
+            command.feed(data)
+        return True
+
     def execute(self, command: str, timeout: Optional[float] = None) -> Dict[str, Any]:
         """Execute a command in the shell and return the result.
 
@@ -184,38 +337,22 @@ class LocalShell(BaseShell, LocalApplication):
         try:
             self._logger.debug(f"Executing command: {command}")
 
-            # Clear the output buffer before sending the command
+            pending = self._new_command(command)
+            started = time.monotonic()
             with self._lock:
-                self._output_buffer = ""
-
-            # Send the command with a newline
-            self.send_input(command + "\n")
-
-            # Read the output
-            start_time = time.time()
-            output = ""
-
-            # Wait for the command to complete
-            while timeout is None or (time.time() - start_time) < timeout:
-                new_output = self.read_output(timeout=0.1)
-                if new_output:
-                    output += new_output
-
-                # Check if the command has completed (prompt is shown)
-                if output and (output.endswith("$ ") or output.endswith("> ")):
-                    break
-
-                time.sleep(0.1)
-
-            # Remove the command from the output
-            lines = output.splitlines()
-            if lines and command in lines[0]:
-                output = "\n".join(lines[1:])
-
+                finished = self._run(pending, timeout)
+            output = pending.output.decode("utf-8", errors="replace")
+
+            if not finished:
+                if timeout is not None and time.monotonic() - started >= timeout:
+                    reason = f"Command timed out after {timeout}s"
+                else:
+                    reason = "Shell exited before the command finished"
+                return {"stdout": output, "stderr": reason, "returncode": None}
             return {
                 "stdout": output,
                 "stderr": "",  # We can't separate stdout and stderr with pty
-                "returncode": 0,  # We can't easily get the return code
+                "returncode": pending.returncode,
             }
         except Exception as e:
             self._logger.error(f"Error executing command: {e}")
@@ -234,52 +371,17 @@ class LocalShell(BaseShell, LocalApplication):
             return ""
 
         with self._lock:
-            if platform.system() == "Windows":
-                # Windows implementation
-                if not self._process:
-                    return ""
-
-                output = ""
-                try:
-                    # Use a non-blocking read approach for Windows
-                    if self._process.stdout.readable():
-                        # Read available output without blocking
-                        while msvcrt.kbhit():
-                            char = self._process.stdout.read(1)
-                            if not char:
-                                break
-                            output += char
-                except Exception as e:
-                    self._logger.error(f"Error reading output: {e}")
-
-                self._output_buffer += output
-                return output
-            else:
-                # Unix implementation using pty
-                if self._master_fd is None:
-                    return ""
-
-                # Check if there's any output available
-                if timeout is not None:
-                    ready_to_read, _, _ = select.select(
-                        [self._master_fd], [], [], timeout
-                    )
-                    if not ready_to_read:
-                        return ""
-
-                # Read output
-                output = ""
-                try:
-                    while True:
-                        data = os.read(self._master_fd, 1024)
-                        if not data:
-                            break
-                        output += data.decode("utf-8", errors="replace")
-                except (OSError, IOError):
-                    pass
-
-                self._output_buffer += output
-                return output
+            if self._master_fd is None and self._output_queue is None:
+                return ""
+            try:
+                data = self._read_available(timeout)
+            except Exception as e:
+                self._logger.error(f"Error reading output: {e}")
+                return ""
+            if not data:
+                return ""
+            # Characters split between reads are completed by the next one
+            return self._decoder.decode(data)
 
     def send_input(self, text: str) -> bool:
         """Send input to the shell.
@@ -298,16 +400,12 @@ class LocalShell(BaseShell, LocalApplication):
                 # Windows implementation
                 if not self._process or not self._process.stdin:
                     return False
-
-                self._process.stdin.write(text)
-                self._process.stdin.flush()
             else:
                 # Unix implementation using pty
                 if self._master_fd is None:
                     return False
 
-                os.write(self._master_fd, text.encode("utf-8"))
-
+            self._write(text)
             return True
         except Exception as e:
             self._logger.error(f"Error sending input: {e}")
@@ -0,0 +1,306 @@
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from commandAGI._utils.layout_tree import AccessibilityBackend
+from commandAGI.computers.misc_types import Platform
+
+_EMPTY_COMMON_PROPS = {
+    "name": None,
+    "role": None,
+    "enabled": None,
+    "focused": None,
+    "offscreen": None,
+    "bounds": None,
+    "selected": None,
+    "checked": None,
+    "expanded": None,
+    "current_value": None,
+    "min_value": None,
+    "max_value": None,
+    "percentage": None,
+}
+
+
+class WindowsAccessibilityBackend(AccessibilityBackend):
+    """Reads the UI tree with UIAutomation.
+
+    Args:
+        auto: The imported uiautomation module
+    """
+
+    def __init__(self, auto):
+        self.auto = auto
+
+    def root(self) -> Any:
+        return self.auto.GetRootControl()
+
+    def focused_window(self) -> Any:
+        return self.auto.GetForegroundControl()
+
+    def children(self, element: Any) -> List[Any]:
+        return element.GetChildren()
+
+    def key(self, element: Any) -> Hashable:
+        # RuntimeId is unique for as long as the element exists
+        return tuple(element.GetRuntimeId())
+
+    def describe(self, element: Any) -> Dict[str, Any]:
+        common_props = {
+            **_EMPTY_COMMON_PROPS,
+            "name": element.Name if hasattr(element, "Name") else None,
+            "role": (
+                element.ControlTypeName if hasattr(element, "ControlTypeName") else None
+            ),
+            "enabled": element.IsEnabled if hasattr(element, "IsEnabled") else None,
+            "focused": (
+                element.HasKeyboardFocus
+                if hasattr(element, "HasKeyboardFocus")
+                else None
+            ),
+            "offscreen": (
+                element.IsOffscreen if hasattr(element, "IsOffscreen") else None
+            ),
+            "bounds": (
+                {
+                    "left": element.BoundingRectangle.left,
+                    "top": element.BoundingRectangle.top,
+                    "width": element.BoundingRectangle.width(),
+                    "height": element.BoundingRectangle.height(),
+                }
+                if hasattr(element, "BoundingRectangle")
+                else None
+            ),
+        }
+        platform_props = {
+            "AutomationId": (
+                element.AutomationId if hasattr(element, "AutomationId") else None
+            ),
+            "ClassName": element.ClassName if hasattr(element, "ClassName") else None,
+        }
+        return {
+            "properties": common_props,
+            "platform": Platform.WINDOWS,
+            "platform_properties": platform_props,
+        }
+
+
+class _AXElement:
+    """A pyax element and its index path below the frontmost application.
+
+    pyax hands out a new object on every read, so the path is what lets
+    MacOSAccessibilityBackend.key recognize the same element across reads.
+    """
+
+    __slots__ = ("element", "path")
+
+    def __init__(self, element: Any, path: Tuple[Any, ...]):
+        self.element = element
+        self.path = path
+
+
+class MacOSAccessibilityBackend(AccessibilityBackend):
+    """Reads the UI tree of the frontmost application with pyax.
+
+    Args:
+        pyax: The imported pyax module
+    """
+
+    def __init__(self, pyax):
+        self.pyax = pyax
+
+    def root(self) -> Any:
+        app = self.pyax.get_frontmost_application()
+        if not app:
+            return None
+        # Elements of different applications never share a path
+        return _AXElement(app, (self._attribute(app, "AXTitle"),))
+
+    def focused_window(self) -> Any:
+        app = self.root()
+        if app is None:
+            return None
+        window = self._attribute(app.element, "AXFocusedWindow")
+        if not window:
+            return None
+        # Give the window the same path as when it is reached from the root
+        for child in self.children(app):
+            if child.element == window:
+                return child
+        return _AXElement(window, app.path + ("AXFocusedWindow",))
+
+    def children(self, element: Any) -> List[Any]:
+        # Assuming element is iterable for children
+        return [
+            _AXElement(child, element.path + (index,))
+            for index, child in enumerate(element.element)
+        ]
+
+    def key(self, element: Any) -> Hashable:
+        return (
+            self._attribute(element.element, "AXRole"),
+            self._attribute(element.element, "AXTitle"),
+            element.path,
+        )
+
+    def describe(self, element: Any) -> Dict[str, Any]:
+        element = element.element
+        common_props = dict(_EMPTY_COMMON_PROPS)
+        if hasattr(element, "__getitem__"):
+            common_props.update(
+                {
+                    "name": element.get("AXTitle"),
+                    "role": element.get("AXRole"),
+                    "enabled": element.get("AXEnabled"),
+                    "focused": element.get("AXFocused"),
+                    "selected": element.get("AXSelected"),
+                    "expanded": element.get("AXExpanded"),
+                    "current_value": element.get("AXValue"),
+                    "min_value": element.get("AXMinValue"),
+                    "max_value": element.get("AXMaxValue"),
+                }
+            )
+        # Platform-specific properties: store entire element dict
+        platform_props = dict(element) if hasattr(element, "items") else {}
+        return {
+            "properties": common_props,
+            "platform": Platform.MACOS,
+            "platform_properties": platform_props,
+        }
+
+    @staticmethod
+    def _attribute(element: Any, name: str) -> Any:
+        return element.get(name) if hasattr(element, "get") else None
+
+
+class LinuxAccessibilityBackend(AccessibilityBackend):
+    """Reads the UI tree with AT-SPI and listens for its change events.
+
+    pyatspi isn't thread-safe, so while the registry's event loop runs (see
+    watch) every AT-SPI call is made on its thread.
+
+    Args:
+        pyatspi: The imported pyatspi module
+    """
+
+    # Events after which an element has to be read again
+    CHANGE_EVENTS = (
+        "object:children-changed",
+        "object:property-change",
+        "object:state-changed",
+    )
+
+    def __init__(self, pyatspi):
+        self.pyatspi = pyatspi
+        self._listener = None
+        self._event_thread: Optional[threading.Thread] = None
+        self._glib = None
+
+    def root(self) -> Any:
+        return self._call(self.pyatspi.Registry.getDesktop, 0)
+
+    def focused_window(self) -> Any:
+        return self._call(self._focused_window)
+
+    def children(self, element: Any) -> List[Any]:
+        return self._call(self._children, element)
+
+    def child_count(self, element: Any) -> int:
+        return self._call(getattr, element, "childCount")
+
+    def describe(self, element: Any) -> Dict[str, Any]:
+        return self._call(self._describe, element)
+
+    def _focused_window(self) -> Any:
+        for app in self._children(self.pyatspi.Registry.getDesktop(0)):
+            for window in self._children(app):
+                try:
+                    if window.getState().contains(self.pyatspi.STATE_ACTIVE):
+                        return window
+                except Exception:
+                    continue
+        return None
+
+    def _children(self, element: Any) -> List[Any]:
+        return [
+            child
+            for child in (element.getChildAtIndex(i) for i in range(element.childCount))
+            if child
+        ]
+
+    def _describe(self, element: Any) -> Dict[str, Any]:
+        common_props = {
+            **_EMPTY_COMMON_PROPS,
+            "name": element.name if hasattr(element, "name") else None,
+            "role": element.getRole().name if hasattr(element, "getRole") else None,
+        }
+        platform_props = {}
+        try:
+            state_set = element.getState()
+            states = {
+                state: bool(state_set.contains(getattr(self.pyatspi.STATE, state)))
+                for state in self.pyatspi.STATE_VALUE_TO_NAME.values()
+            }
+            common_props["enabled"] = states.get("ENABLED", False)
+            common_props["focused"] = states.get("FOCUSED", False)
+            common_props["selected"] = states.get("SELECTED", False)
+            platform_props["States"] = states
+        except Exception:
+            pass
+        return {
+            "properties": common_props,
+            "platform": Platform.LINUX,
+            "platform_properties": platform_props,
+        }
+
+    def _call(self, func: Callable, *args) -> Any:
+        """Run an AT-SPI call on the event thread, if it is running."""
+        event_thread = self._event_thread
+        if event_thread is None or threading.current_thread() is event_thread:
+            return func(*args)
+
+        future = Future()
+
+        def run():
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(func(*args))
+                except BaseException as e:
+                    future.set_exception(e)
+            return False  # Don't run again
+
+        self._glib.idle_add(run)
+        return future.result()
+
+    def watch(self, on_change: Callable[[Any], None]) -> bool:
+        registry = self.pyatspi.Registry
+        try:
+            # pyatspi runs its event loop on GLib's default main context
+            from gi.repository import GLib
+        except ImportError:
+            return False
+        self._listener = lambda event: on_change(event.source)
+        try:
+            registry.registerEventListener(self._listener, *self.CHANGE_EVENTS)
+        except Exception:
+            self._listener = None
+            return False
+        self._glib = GLib
+        # Events are only delivered while the registry's main loop runs
+        self._event_thread = threading.Thread(
+            target=registry.start, name="commandagi-atspi-events", daemon=True
+        )
+        self._event_thread.start()
+        return True
+
+    def unwatch(self):
+        if self._listener is None:
+            return
+        registry = self.pyatspi.Registry
+        self._call(
+            registry.deregisterEventListener, self._listener, *self.CHANGE_EVENTS
+        )
+        registry.stop()
+        self._event_thread.join(timeout=5)
+        self._listener = None
+        self._event_thread = None
@@ -1,4 +1,3 @@
-import datetime
 import os
 import platform
 import shutil
@@ -9,64 +8,28 @@ import tempfile
 import threading
 import time
 from pathlib import Path
-from typing import Dict, List, Literal, Optional, Union
+from typing import TYPE_CHECKING, Dict, Iterator, List, Literal, Optional, Union
 
 import psutil
 
-from commandAGI._utils.image import process_screenshot
+from commandAGI._utils.image import RawFrame, process_screenshot
+from commandAGI._utils.layout_tree import LayoutTree
+from commandAGI._utils.output_stream import (
+    OutputEvent,
+    iter_process_output,
+    limit_output,
+)
 from commandAGI._utils.platform import DEFAULT_SHELL_EXECUTIBLE
+from commandAGI._utils.process_snapshot import ProcessSampler
 from commandAGI.computers.base_computer import (
     BaseComputer,
     SystemInfo,
 )
-from commandAGI.computers.local_computer.applications.local_background_shell import (
-    LocalBackgroundShell,
-)
-from commandAGI.computers.local_computer.applications.local_blender import LocalBlender
-from commandAGI.computers.local_computer.applications.local_chrome_browser import (
-    LocalChromeBrowser,
-)
-from commandAGI.computers.local_computer.applications.local_cursor_ide import (
-    LocalCursorIDE,
-)
-from commandAGI.computers.local_computer.applications.local_file_explorer import (
-    LocalFileExplorer,
-)
-from commandAGI.computers.local_computer.applications.local_freecad import LocalFreeCAD
-from commandAGI.computers.local_computer.applications.local_kdenlive import (
-    LocalKdenlive,
-)
-from commandAGI.computers.local_computer.applications.local_kicad import LocalKicad
-from commandAGI.computers.local_computer.applications.local_libre_office_calc import (
-    LocalLibreOfficeCalc,
-)
-from commandAGI.computers.local_computer.applications.local_libre_office_present import (
-    LocalLibreOfficePresent,
-)
-from commandAGI.computers.local_computer.applications.local_libreoffice_writer import (
-    LocalLibreOfficeWriter,
-)
-from commandAGI.computers.local_computer.applications.local_microsoft_excel import (
-    LocalMicrosoftExcel,
-)
-from commandAGI.computers.local_computer.applications.local_microsoft_powerpoint import (
-    LocalMicrosoftPowerPoint,
-)
-from commandAGI.computers.local_computer.applications.local_microsoft_word import (
-    LocalMicrosoftWord,
-)
-from commandAGI.computers.local_computer.applications.local_paint_editor import (
-    LocalPaintEditor,
-)
-from commandAGI.computers.local_computer.applications.local_shell import LocalShell
-from commandAGI.computers.local_computer.applications.local_text_editor import (
-    LocalTextEditor,
-)
 from commandAGI.computers.local_computer.local_subprocess import LocalSubprocess
+from commandAGI.computers.misc_types import LayoutTreeDelta
 from commandAGI.types import (
     DisplaysObservation,
     LayoutTreeObservation,
-    Platform,
     ProcessesObservation,
     WindowsObservation,
 )
@@ -89,48 +52,57 @@ else:
     termios = None
     signal = None
 
-try:
-    import mss
+if TYPE_CHECKING:
     from PIL import Image
-except ImportError:
-    raise ImportError(
-        "The local dependencies are not installed. Please install commandAGI with the local extra:\n\npip install commandAGI[local]"
-    )
 
-try:
-    pass
-except ImportError:
-    raise ImportError(
-        "Jupyter notebook dependencies are not installed. Please install with:\n\npip install nbformat nbclient"
+    from commandAGI.computers.local_computer.applications.local_background_shell import (
+        LocalBackgroundShell,
     )
-
-# Accessibility imports - these are optional and will be checked at runtime
-# Windows UI Automation
-uiautomation_available = False
-try:
-    import uiautomation as auto
-
-    uiautomation_available = True
-except ImportError:
-    auto = None
-
-# macOS Accessibility API
-pyax_available = False
-try:
-    import pyax
-
-    pyax_available = True
-except ImportError:
-    pyax = None
-
-# Linux AT-SPI
-pyatspi_available = False
-try:
-    import pyatspi
-
-    pyatspi_available = True
-except ImportError:
-    pyatspi = None
+    from commandAGI.computers.local_computer.applications.local_blender import (
+        LocalBlender,
+    )
+    from commandAGI.computers.local_computer.applications.local_chrome_browser import (
+        LocalChromeBrowser,
+    )
+    from commandAGI.computers.local_computer.applications.local_cursor_ide import (
+        LocalCursorIDE,
+    )
+    from commandAGI.computers.local_computer.applications.local_file_explorer import (
+        LocalFileExplorer,
+    )
+    from commandAGI.computers.local_computer.applications.local_freecad import (
+        LocalFreeCAD,
+    )
+    from commandAGI.computers.local_computer.applications.local_kdenlive import (
+        LocalKdenlive,
+    )
+    from commandAGI.computers.local_computer.applications.local_kicad import LocalKicad
+    from commandAGI.computers.local_computer.applications.local_libre_office_calc import (
+        LocalLibreOfficeCalc,
+    )
+    from commandAGI.computers.local_computer.applications.local_libre_office_present import (
+        LocalLibreOfficePresent,
+    )
+    from commandAGI.computers.local_computer.applications.local_libreoffice_writer import (
+        LocalLibreOfficeWriter,
+    )
+    from commandAGI.computers.local_computer.applications.local_microsoft_excel import (
+        LocalMicrosoftExcel,
+    )
+    from commandAGI.computers.local_computer.applications.local_microsoft_powerpoint import (
+        LocalMicrosoftPowerPoint,
+    )
+    from commandAGI.computers.local_computer.applications.local_microsoft_word import (
+        LocalMicrosoftWord,
+    )
+    from commandAGI.computers.local_computer.applications.local_paint_editor import (
+        LocalPaintEditor,
+    )
+    from commandAGI.computers.local_computer.applications.local_shell import LocalShell
+    from commandAGI.computers.local_computer.applications.local_text_editor import (
+        LocalTextEditor,
+    )
+    from commandAGI.computers.local_computer.local_file import LocalComputerFile
 
 
 class LocalComputer(BaseComputer):
@@ -155,11 +127,19 @@ class LocalComputer(BaseComputer):
         self._pyax = None
         self._atspi = None
         self._jupyter_server_pid = None
+        self._process_sampler = None
+        self._layout_tree = None
 
     def _start(self):
         """Start the local computer environment."""
         if not self._sct:
             self.logger.info("Initializing MSS screen capture")
+            try:
+                import mss
+            except ImportError:
+                raise ImportError(
+                    "The local dependencies are not installed. Please install commandAGI with the local extra:\n\npip install commandAGI[local]"
+                )
             self._sct = mss.mss()
         if not self._temp_dir:
             self.logger.info("Creating temporary directory")
@@ -172,6 +152,10 @@ class LocalComputer(BaseComputer):
         if self._video_streaming:
             self.stop_video_stream()
 
+        if self._layout_tree is not None:
+            self._layout_tree.close()
+            self._layout_tree = None
+
         if self._sct:
             self.logger.info("Closing MSS screen capture")
             self._sct.close()
@@ -182,8 +166,10 @@ class LocalComputer(BaseComputer):
         self.logger.info(f"{self.__class__.__name__} stopped")
 
     def _get_screenshot(
-        self, display_id: int = 0, format: Literal["base64", "PIL", "path"] = "PIL"
-    ) -> Union[str, Image.Image, Path]:
+        self,
+        display_id: int = 0,
+        format: Literal["base64", "PIL", "path", "ndarray", "raw"] = "PIL",
+    ) -> Union[str, "Image.Image", Path, RawFrame]:
         """Return a screenshot of the current state in the specified format.
 
         Args:
@@ -192,278 +178,140 @@ class LocalComputer(BaseComputer):
                 - 'base64': Return the screenshot as a base64 encoded string
                 - 'PIL': Return the screenshot as a PIL Image object
                 - 'path': Save the screenshot to a file and return the path
+                - 'ndarray': Return a read-only (height, width, 4) BGRA NumPy view
+                  over the captured buffer, without copying or encoding
+                - 'raw': Return a RawFrame that defers any conversion until needed
         """
         # Capture screenshot using mss
         self.logger.debug(f"Capturing screenshot of display {display_id}")
         # mss uses 1-based indexing
         monitor = self._sct.monitors[display_id + 1]
-        screenshot = self._sct.grab(monitor)
+        frame = RawFrame.from_mss(self._sct.grab(monitor))
+
+        match format:
+            case "raw":
+                return frame
+            case "ndarray":
+                return frame.to_ndarray()
 
         # Use the utility function to process the screenshot
         return process_screenshot(
-            screenshot_data=screenshot,
+            screenshot_data=frame,
             output_format=format,
-            input_format="PIL",
+            input_format="raw",
             computer_name=self.__class__.__name__.lower(),
         )
 
-    def _get_layout_tree(self) -> LayoutTreeObservation:
+    def _get_screenshot_ndarray(self, display_id: int = 0):
+        """Get a read-only BGRA view of the captured frame without encoding it."""
+        return self._get_screenshot(display_id=display_id, format="ndarray")
+
+    def _get_layout_tree(
+        self,
+        node_id: Optional[str] = None,
+        max_depth: Optional[int] = None,
+        max_children: Optional[int] = None,
+        focused_window_only: bool = False,
+    ) -> LayoutTreeObservation:
         """Return a LayoutTreeObservation containing the accessibility tree of the current UI.
 
         This method uses platform-specific accessibility APIs to retrieve the UI component tree.
+        Elements are read lazily and cached between calls (see LayoutTree), so
+        limiting max_depth or asking for the focused window only keeps each
+        call cheap, and deeper subtrees can be fetched later by node_id.
         """
-        system = platform.system()
-
-        if system == "Windows":
-            return self._get_windows_layout_tree()
-        elif system == "Darwin":
-            return self._get_macos_layout_tree()
-        elif system == "Linux":
-            return self._get_linux_layout_tree()
-        else:
-            self.logger.warning(f"Layout tree retrieval not implemented for {system}")
-            return LayoutTreeObservation(tree={})
-
-    def _get_windows_layout_tree(self) -> LayoutTreeObservation:
-        """Get the UI component tree on Windows using UIAutomation."""
-        if not uiautomation_available:
-            self.logger.error(
-                "UIAutomation not available. Install with: pip install uiautomation"
-            )
-            return LayoutTreeObservation(tree={"error": "UIAutomation not available"})
-
         try:
-            desktop = auto.GetRootControl()
-
-            def build_tree(element):
-                if not element:
-                    return None
-                # Build common normalized properties
-                common_props = {
-                    "name": element.Name if hasattr(element, "Name") else None,
-                    "role": (
-                        element.ControlTypeName
-                        if hasattr(element, "ControlTypeName")
-                        else None
-                    ),
-                    "enabled": (
-                        element.IsEnabled if hasattr(element, "IsEnabled") else None
-                    ),
-                    "focused": (
-                        element.HasKeyboardFocus
-                        if hasattr(element, "HasKeyboardFocus")
-                        else None
-                    ),
-                    "offscreen": (
-                        element.IsOffscreen if hasattr(element, "IsOffscreen") else None
-                    ),
-                    "bounds": (
-                        {
-                            "left": element.BoundingRectangle.left,
-                            "top": element.BoundingRectangle.top,
-                            "width": element.BoundingRectangle.width(),
-                            "height": element.BoundingRectangle.height(),
-                        }
-                        if hasattr(element, "BoundingRectangle")
-                        else None
-                    ),
-                    "selected": None,
-                    "checked": None,
-                    "expanded": None,
-                    "current_value": None,
-                    "min_value": None,
-                    "max_value": None,
-                    "percentage": None,
-                }
-                # Collect platform specific properties
-                platform_props = {
-                    "AutomationId": (
-                        element.AutomationId
-                        if hasattr(element, "AutomationId")
-                        else None
-                    ),
-                    "ClassName": (
-                        element.ClassName if hasattr(element, "ClassName") else None
-                    ),
-                }
-                children = []
-                for child in element.GetChildren():
-                    child_tree = build_tree(child)
-                    if child_tree:
-                        children.append(child_tree)
-                return {
-                    "properties": common_props,
-                    "platform": Platform.WINDOWS,
-                    "platform_properties": platform_props,
-                    "children": children,
-                }
-
-            tree = build_tree(desktop)
+            layout_tree = self._get_layout_tree_cache()
+            if layout_tree is None:
+                return LayoutTreeObservation(tree={})
+            tree = layout_tree.get(
+                node_id=node_id,
+                max_depth=max_depth,
+                max_children=max_children,
+                focused_window_only=focused_window_only,
+            )
+            if tree is None:
+                return LayoutTreeObservation(tree={"error": "No window found"})
             return LayoutTreeObservation(tree=tree)
 
         except Exception as e:
-            self.logger.error(f"Error getting Windows layout tree: {e}")
+            self.logger.error(f"Error getting layout tree: {e}")
             return LayoutTreeObservation(tree={"error": str(e)})
 
-    def _get_macos_layout_tree(self) -> LayoutTreeObservation:
-        """Get the UI component tree on macOS using pyax (Accessibility API)."""
-        if not pyax_available:
-            self.logger.error("pyax not available. Install with: pip install pyax")
-            return LayoutTreeObservation(tree={"error": "pyax not available"})
-
-        try:
-
-            def build_tree(element):
-                if not element:
-                    return None
-                # Normalize common properties
-                common_props = {
-                    "name": (
-                        element.get("AXTitle")
-                        if hasattr(element, "__getitem__")
-                        else None
-                    ),
-                    "role": (
-                        element.get("AXRole")
-                        if hasattr(element, "__getitem__")
-                        else None
-                    ),
-                    "enabled": (
-                        element.get("AXEnabled")
-                        if hasattr(element, "__getitem__")
-                        else None
-                    ),
-                    "focused": (
-                        element.get("AXFocused")
-                        if hasattr(element, "__getitem__")
-                        else None
-                    ),
-                    "offscreen": None,
-                    "bounds": None,
-                    "selected": (
-                        element.get("AXSelected")
-                        if hasattr(element, "__getitem__")
-                        else None
-                    ),
-                    "checked": None,
-                    "expanded": (
-                        element.get("AXExpanded")
-                        if hasattr(element, "__getitem__")
-                        else None
-                    ),
-                    "current_value": (
-                        element.get("AXValue")
-                        if hasattr(element, "__getitem__")
-                        else None
-                    ),
-                    "min_value": (
-                        element.get("AXMinValue")
-                        if hasattr(element, "__getitem__")
-                        else None
-                    ),
-                    "max_value": (
-                        element.get("AXMaxValue")
-                        if hasattr(element, "__getitem__")
-                        else None
-                    ),
-                    "percentage": None,
-                }
-                # Platform-specific properties: store entire element dict
-                platform_props = dict(element) if hasattr(element, "items") else {}
-                children = []
-                try:
-                    # Assuming element is iterable for children
-                    for child in element:
-                        child_tree = build_tree(child)
-                        if child_tree:
-                            children.append(child_tree)
-                except Exception:
-                    pass
-                return {
-                    "properties": common_props,
-                    "platform": Platform.MACOS,
-                    "platform_properties": platform_props,
-                    "children": children,
-                }
+    def _get_layout_tree_delta(
+        self,
+        max_depth: Optional[int] = None,
+        max_children: Optional[int] = None,
+        focused_window_only: bool = False,
+    ) -> LayoutTreeDelta:
+        """Return the changes to the accessibility tree since the previous delta."""
+        layout_tree = self._get_layout_tree_cache()
+        if layout_tree is None:
+            return LayoutTreeDelta(
+                changed=False, keyframe=True, root_id=None, updated=[], removed=[]
+            )
+        return layout_tree.delta(
+            max_depth=max_depth,
+            max_children=max_children,
+            focused_window_only=focused_window_only,
+        )
 
-            frontmost_app = pyax.get_frontmost_application()
-            if not frontmost_app:
-                return LayoutTreeObservation(
-                    tree={"error": "No frontmost application found"}
-                )
-            tree = build_tree(frontmost_app)
-            return LayoutTreeObservation(tree=tree)
+    def _reset_layout_tree_delta(self):
+        """Forget the previous layout tree delta."""
+        if self._layout_tree is not None:
+            self._layout_tree.reset_delta()
 
-        except Exception as e:
-            self.logger.error(f"Error getting macOS layout tree: {e}")
-            return LayoutTreeObservation(tree={"error": str(e)})
+    def _get_layout_tree_cache(self) -> Optional[LayoutTree]:
+        """Get the cached layout tree for this platform, creating it on first use.
 
-    def _get_linux_layout_tree(self) -> LayoutTreeObservation:
-        """Get the UI component tree on Linux using AT-SPI."""
-        if not pyatspi_available:
-            self.logger.error(
-                "pyatspi not available. Install with: pip install pyatspi"
-            )
-            return LayoutTreeObservation(tree={"error": "pyatspi not available"})
+        Returns:
+            Optional[LayoutTree]: None if layout trees aren't supported here
 
-        try:
+        Raises:
+            RuntimeError: If the platform's accessibility library is missing
+        """
+        if self._layout_tree is not None:
+            return self._layout_tree
 
-            def build_tree(element):
-                if not element:
-                    return None
-                common_props = {
-                    "name": element.name if hasattr(element, "name") else None,
-                    "role": (
-                        element.getRole().name if hasattr(element, "getRole") else None
-                    ),
-                    "enabled": None,
-                    "focused": None,
-                    "offscreen": None,
-                    "bounds": None,
-                    "selected": None,
-                    "checked": None,
-                    "expanded": None,
-                    "current_value": None,
-                    "min_value": None,
-                    "max_value": None,
-                    "percentage": None,
-                }
-                platform_props = {}
-                try:
-                    state_set = element.getState()
-                    states = {
-                        state: bool(state_set.contains(getattr(pyatspi.STATE, state)))
-                        for state in pyatspi.STATE_VALUE_TO_NAME.values()
-                    }
-                    common_props["enabled"] = states.get("ENABLED", False)
-                    common_props["focused"] = states.get("FOCUSED", False)
-                    common_props["selected"] = states.get("SELECTED", False)
-                    platform_props["States"] = states
-                except Exception:
-                    pass
-                children = []
-                try:
-                    for i in range(element.childCount):
-                        child = element.getChildAtIndex(i)
-                        child_tree = build_tree(child)
-                        if child_tree:
-                            children.append(child_tree)
-                except Exception:
-                    pass
-                return {
-                    "properties": common_props,
-                    "platform": Platform.LINUX,
-                    "platform_properties": platform_props,
-                    "children": children,
-                }
+        from commandAGI.computers.local_computer.local_accessibility import (
+            LinuxAccessibilityBackend,
+            MacOSAccessibilityBackend,
+            WindowsAccessibilityBackend,
+        )
 
-            desktop = pyatspi.Registry.getDesktop(0)
-            tree = build_tree(desktop)
-            return LayoutTreeObservation(tree=tree)
+        # Accessibility libraries are imported only for the platform in use
+        system = platform.system()
+        if system == "Windows":
+            try:
+                import uiautomation as auto
+            except ImportError:
+                self.logger.error(
+                    "UIAutomation not available. Install with: pip install uiautomation"
+                )
+                raise RuntimeError("UIAutomation not available")
+            backend = WindowsAccessibilityBackend(auto)
+        elif system == "Darwin":
+            try:
+                import pyax
+            except ImportError:
+                self.logger.error("pyax not available. Install with: pip install pyax")
+                raise RuntimeError("pyax not available")
+            backend = MacOSAccessibilityBackend(pyax)
+        elif system == "Linux":
+            try:
+                import pyatspi
+            except ImportError:
+                self.logger.error(
+                    "pyatspi not available. Install with: pip install pyatspi"
+                )
+                raise RuntimeError("pyatspi not available")
+            backend = LinuxAccessibilityBackend(pyatspi)
+        else:
+            self.logger.warning(f"Layout tree retrieval not implemented for {system}")
+            return None
 
-        except Exception as e:
-            self.logger.error(f"Error getting Linux layout tree: {e}")
-            return LayoutTreeObservation(tree={"error": str(e)})
+        self._layout_tree = LayoutTree(backend)
+        return self._layout_tree
 
     def _shell(
         self,
@@ -559,12 +407,16 @@ class LocalComputer(BaseComputer):
 
     _jupyter_server_pid: Optional[int] = None
 
-    def create_jupyter_notebook(self) -> NbFormatJupyterNotebook:
+    def create_jupyter_notebook(self) -> "NbFormatJupyterNotebook":
         """Create and return a new NbFormatJupyterNotebook instance.
 
         Returns:
             NbFormatJupyterNotebook: A notebook client instance for creating and manipulating notebooks.
         """
+        from commandAGI._utils.jupyter.nbformat_jupyter_notebook import (
+            NbFormatJupyterNotebook,
+        )
+
         self.logger.info("Creating new Jupyter notebook client")
         return NbFormatJupyterNotebook()
 
@@ -754,12 +606,92 @@ class LocalComputer(BaseComputer):
         """
         raise NotImplementedError(f"{self.__class__.__name__}._run_process")
 
+    def _stream_shell(
+        self,
+        command: str,
+        timeout: Optional[float] = None,
+        executible: Optional[str] = None,
+        cwd: Optional[str] = None,
+        env: Optional[dict] = None,
+        max_output_bytes: Optional[int] = None,
+        tail: bool = False,
+        cancel: Optional[threading.Event] = None,
+    ) -> Iterator[OutputEvent]:
+        """Execute a shell command and yield its output while it runs.
+
+        Args:
+            command: The command to execute
+            timeout: Seconds after which the command is killed, or None
+            executible: Optional shell executable to use
+            cwd: Optional working directory to use
+            env: Optional environment variables to use
+            max_output_bytes: The most bytes of output to yield
+            tail: Whether to keep the last max_output_bytes of output
+            cancel: Event that kills the command when set
+        """
+        self.logger.info(f"Streaming command: {command}")
+        process = self._popen_for_streaming(
+            command, shell=True, executable=executible, cwd=cwd, env=env
+        )
+        return limit_output(
+            iter_process_output(process, timeout, cancel), max_output_bytes, tail
+        )
+
+    def _stream_process(
+        self,
+        command: str,
+        args: List[str] = [],
+        cwd: Optional[str] = None,
+        env: Optional[dict] = None,
+        timeout: Optional[float] = None,
+        max_output_bytes: Optional[int] = None,
+        tail: bool = False,
+        cancel: Optional[threading.Event] = None,
+    ) -> Iterator[OutputEvent]:
+        """Run a process and yield its output while it runs.
+
+        Args:
+            command: The command/executable to run
+            args: List of command line arguments
+            cwd: Working directory for the process
+            env: Environment variables to set
+            timeout: Seconds after which the process is killed, or None
+            max_output_bytes: The most bytes of output to yield
+            tail: Whether to keep the last max_output_bytes of output
+            cancel: Event that kills the command when set
+        """
+        self.logger.info(f"Streaming process: {command} with args: {args}")
+        process = self._popen_for_streaming([command] + args, cwd=cwd, env=env)
+        return limit_output(
+            iter_process_output(process, timeout, cancel), max_output_bytes, tail
+        )
+
+    def _popen_for_streaming(
+        self, args, cwd: Optional[str] = None, env: Optional[dict] = None, **kwargs
+    ) -> subprocess.Popen:
+        process_env = os.environ.copy()
+        if env:
+            process_env.update(env)
+        if os.name == "posix":
+            # In a process group of its own, so killing the stream also kills
+            # whatever the command started
+            kwargs.setdefault("start_new_session", True)
+        return subprocess.Popen(
+            args,
+            cwd=cwd,
+            env=process_env,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            **kwargs,
+        )
+
     def _start_shell(
         self,
         executable: str = None,
         cwd: Optional[Union[str, Path]] = None,
         env: Optional[Dict[str, str]] = None,
-    ) -> LocalShell:
+    ) -> "LocalShell":
         raise NotImplementedError(f"{self.__class__.__name__}.start_shell")
 
     def _start_background_shell(
@@ -767,7 +699,7 @@ class LocalComputer(BaseComputer):
         executable: str = None,
         cwd: Optional[Union[str, Path]] = None,
         env: Optional[Dict[str, str]] = None,
-    ) -> LocalBackgroundShell:
+    ) -> "LocalBackgroundShell":
         """Create and return a new local background shell instance.
 
         Args:
@@ -778,6 +710,10 @@ class LocalComputer(BaseComputer):
         Returns:
             LocalBackgroundShell: A background shell instance for executing background commands
         """
+        from commandAGI.computers.local_computer.applications.local_background_shell import (
+            LocalBackgroundShell,
+        )
+
         return LocalBackgroundShell(
             executable=executable or DEFAULT_SHELL_EXECUTIBLE,
             cwd=cwd,
@@ -785,7 +721,7 @@ class LocalComputer(BaseComputer):
             logger=self.logger,
         )
 
-    def _start_cursor_ide(self) -> LocalCursorIDE:
+    def _start_cursor_ide(self) -> "LocalCursorIDE":
         """Create and return a new LocalCursorIDE instance.
 
         This method should be implemented by subclasses to return an appropriate
@@ -793,7 +729,7 @@ class LocalComputer(BaseComputer):
         """
         raise NotImplementedError(f"{self.__class__.__name__}._start_cursor_ide")
 
-    def _start_kicad(self) -> LocalKicad:
+    def _start_kicad(self) -> "LocalKicad":
         """Create and return a new LocalKicad instance.
 
         This method should be implemented by subclasses to return an appropriate
@@ -801,7 +737,7 @@ class LocalComputer(BaseComputer):
         """
         raise NotImplementedError(f"{self.__class__.__name__}._start_kicad")
 
-    def _start_blender(self) -> LocalBlender:
+    def _start_blender(self) -> "LocalBlender":
         """Create and return a new LocalBlender instance.
 
         This method should be implemented by subclasses to return an appropriate
@@ -809,7 +745,7 @@ class LocalComputer(BaseComputer):
         """
         raise NotImplementedError(f"{self.__class__.__name__}._start_blender")
 
-    def _start_file_explorer(self) -> LocalFileExplorer:
+    def _start_file_explorer(self) -> "LocalFileExplorer":
         """Create and return a new LocalFileExplorer instance.
 
         This method should be implemented by subclasses to return an appropriate
@@ -817,7 +753,7 @@ class LocalComputer(BaseComputer):
         """
         raise NotImplementedError(f"{self.__class__.__name__}._start_file_explorer")
 
-    def _start_chrome_browser(self) -> LocalChromeBrowser:
+    def _start_chrome_browser(self) -> "LocalChromeBrowser":
         """Create and return a new LocalChromeBrowser instance.
 
         This method should be implemented by subclasses to return an appropriate
@@ -825,7 +761,7 @@ class LocalComputer(BaseComputer):
         """
         raise NotImplementedError(f"{self.__class__.__name__}._start_chrome_browser")
 
-    def _start_text_editor(self) -> LocalTextEditor:
+    def _start_text_editor(self) -> "LocalTextEditor":
         """Create and return a new LocalTextEditor instance.
 
         This method should be implemented by subclasses to return an appropriate
@@ -833,35 +769,35 @@ class LocalComputer(BaseComputer):
         """
         raise NotImplementedError(f"{self.__class__.__name__}._start_text_editor")
 
-    def _start_libre_office_writer(self) -> LocalLibreOfficeWriter:
+    def _start_libre_office_writer(self) -> "LocalLibreOfficeWriter":
         """Create and return a new LocalLibreOfficeWriter instance."""
         raise NotImplementedError(
             f"{self.__class__.__name__}._start_libre_office_writer"
         )
 
-    def _start_libre_office_calc(self) -> LocalLibreOfficeCalc:
+    def _start_libre_office_calc(self) -> "LocalLibreOfficeCalc":
         """Create and return a new LocalLibreOfficeCalc instance."""
         raise NotImplementedError(f"{self.__class__.__name__}._start_libre_office_calc")
 
-    def _start_libre_office_present(self) -> LocalLibreOfficePresent:
+    def _start_libre_office_present(self) -> "LocalLibreOfficePresent":
         """Create and return a new LocalLibreOfficePresent instance."""
         raise NotImplementedError(
             f"{self.__class__.__name__}._start_libre_office_present"
         )
 
-    def _start_microsoft_word(self) -> LocalMicrosoftWord:
+    def _start_microsoft_word(self) -> "LocalMicrosoftWord":
         """Create and return a new LocalWord instance."""
         raise NotImplementedError(f"{self.__class__.__name__}._start_word")
 
-    def _start_microsoft_excel(self) -> LocalMicrosoftExcel:
+    def _start_microsoft_excel(self) -> "LocalMicrosoftExcel":
         """Create and return a new LocalExcel instance."""
         raise NotImplementedError(f"{self.__class__.__name__}._start_excel")
 
-    def _start_microsoft_powerpoint(self) -> LocalMicrosoftPowerPoint:
+    def _start_microsoft_powerpoint(self) -> "LocalMicrosoftPowerPoint":
         """Create and return a new LocalPowerPoint instance."""
         raise NotImplementedError(f"{self.__class__.__name__}._start_powerpoint")
 
-    def _start_paint_editor(self) -> LocalPaintEditor:
+    def _start_paint_editor(self) -> "LocalPaintEditor":
         """Create and return a new LocalPaintEditor instance.
 
         This method should be implemented by subclasses to return an appropriate
@@ -869,7 +805,7 @@ class LocalComputer(BaseComputer):
         """
         raise NotImplementedError(f"{self.__class__.__name__}._start_paint_editor")
 
-    def _start_freecad(self) -> LocalFreeCAD:
+    def _start_freecad(self) -> "LocalFreeCAD":
         """Create and return a new LocalFreeCAD instance.
 
         This method should be implemented by subclasses to return an appropriate
@@ -877,7 +813,7 @@ class LocalComputer(BaseComputer):
         """
         raise NotImplementedError(f"{self.__class__.__name__}._start_cad")
 
-    def _start_kdenlive(self) -> LocalKdenlive:
+    def _start_kdenlive(self) -> "LocalKdenlive":
         """Create and return a new LocalKdenlive instance.
 
         This method should be implemented by subclasses to return an appropriate
@@ -1173,61 +1109,21 @@ class LocalComputer(BaseComputer):
             # Copy a single file
             shutil.copy2(source_path, destination_path)
 
-    def _get_processes(self) -> ProcessesObservation:
-        """Return a ProcessesObservation containing information about running processes."""
-        processes_info = []
-
-        # Get all running processes using psutil
-        for proc in psutil.process_iter(
-            [
-                "pid",
-                "name",
-                "username",
-                "memory_info",
-                "cpu_percent",
-                "create_time",
-                "status",
-            ]
-        ):
-            try:
-                # Get process info as a dictionary
-                proc_info = proc.info
-
-                # Add additional information
-                proc_info["memory_mb"] = (
-                    proc_info["memory_info"].rss / (1024 * 1024)
-                    if proc_info["memory_info"]
-                    else 0
-                )
-                proc_info["cpu_percent"] = proc.cpu_percent(interval=0.1)
-
-                # Format create time
-                if proc_info["create_time"]:
-                    proc_info["create_time"] = datetime.datetime.fromtimestamp(
-                        proc_info["create_time"]
-                    ).strftime("%Y-%m-%d %H:%M:%S")
-
-                # Remove memory_info object as it's not JSON serializable
-                if "memory_info" in proc_info:
-                    del proc_info["memory_info"]
-
-                # Add command line if available
-                try:
-                    proc_info["cmdline"] = proc.cmdline()
-                except (psutil.AccessDenied, psutil.ZombieProcess):
-                    proc_info["cmdline"] = []
+    def _get_processes(
+        self, fields: Optional[List[str]] = None
+    ) -> ProcessesObservation:
+        """Return a ProcessesObservation containing information about running processes.
 
-                # Add executable path if available
-                try:
-                    proc_info["exe"] = proc.exe()
-                except (psutil.AccessDenied, psutil.ZombieProcess):
-                    proc_info["exe"] = ""
-
-                processes_info.append(proc_info)
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                pass
+        CPU usage is sampled over a single shared window and recent snapshots
+        are reused (see ProcessSampler), so this stays fast on busy hosts.
 
-        return ProcessesObservation(processes=processes_info)
+        Args:
+            fields: Optional list of fields to include (see PROCESS_FIELDS).
+                Defaults to all fields.
+        """
+        if self._process_sampler is None:
+            self._process_sampler = ProcessSampler()
+        return ProcessesObservation(processes=self._process_sampler.snapshot(fields))
 
     def _get_windows(self) -> WindowsObservation:
         """Return a WindowsObservation containing information about open windows."""
@@ -1488,7 +1384,7 @@ class LocalComputer(BaseComputer):
         encoding: Optional[str] = None,
         errors: Optional[str] = None,
         buffering: int = -1,
-    ) -> LocalComputerFile:
+    ) -> "LocalComputerFile":
         """Open a file on the local computer.
 
         Args:
@@ -1501,6 +1397,8 @@ class LocalComputer(BaseComputer):
         Returns:
             A LocalComputerFile instance for the specified file
         """
+        from commandAGI.computers.local_computer.local_file import LocalComputerFile
+
         return LocalComputerFile(
             computer=self,
             path=path,
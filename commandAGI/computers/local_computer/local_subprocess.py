@@ -19,7 +19,8 @@ class LocalSubprocess(BaseSubprocess):
             pid: Process ID to monitor/control
             computer: Reference to the computer instance
         """
-        super().__init__(pid=pid, _computer=computer)
+        super().__init__(pid=pid)
+        self._computer = computer
         self._process = psutil.Process(pid)
 
     @property
@@ -1,8 +1,10 @@
 from enum import Enum
-from typing import Optional, TypedDict
+from typing import Any, Dict, List, Optional, TypedDict
 
+from pydantic import BaseModel, Field
 
-class ComputerRunningState(Enum, str):
+
+class ComputerRunningState(str, Enum):
     RUNNING = "running"
     PAUSED = "paused"
     STOPPED = "stopped"
@@ -57,10 +59,22 @@ class UIElement(TypedDict):
     # Platform-specific properties
     platform: Platform  # The platform this element was retrieved from
     platform_properties: Dict[str, Any]  # Raw platform-specific properties
-    # Child elements
+    id: str  # Stable id of the element, used to expand its subtree later
+    child_count: int  # Number of children, including any left out by limits
+    # Child elements (empty beyond the requested depth)
     children: List["UIElement"]
 
 
+class LayoutTreeDelta(TypedDict):
+    """The changes to the layout tree since the previous layout tree delta."""
+
+    changed: bool  # False if nothing changed since the previous delta
+    keyframe: bool  # True if updated holds the whole tree
+    root_id: Optional[str]  # Id of the root (or focused window) node
+    updated: List[UIElement]  # Subtrees rooted at each changed node
+    removed: List[str]  # Ids of nodes that no longer exist
+
+
 # Define process information type
 class ProcessInfo(TypedDict):
     """Information about a running process."""
@@ -104,6 +118,40 @@ class DisplayInfo(TypedDict):
     platform_properties: Dict[str, Any]  # Raw platform-specific properties
 
 
+# Define screenshot delta types
+class ScreenshotDeltaRegion(TypedDict):
+    """A changed rectangle of the screen and its pixels."""
+
+    left: int  # X offset of the region in pixels
+    top: int  # Y offset of the region in pixels
+    width: int  # Width of the region in pixels
+    height: int  # Height of the region in pixels
+    patch: Any  # Cropped pixels (ndarray, PIL Image or base64 PNG)
+
+
+class ScreenshotDelta(TypedDict):
+    """The changes on a display since the previous screenshot delta."""
+
+    display_id: int  # Display the delta was computed for
+    changed: bool  # False if nothing changed since the previous frame
+    keyframe: bool  # True if the only region is the full frame
+    frame_size: tuple[int, int]  # (width, height) of the full frame
+    regions: List[ScreenshotDeltaRegion]  # Changed regions (empty when unchanged)
+
+
+class TemplateMatch(TypedDict):
+    """An occurrence of a template image on the screen."""
+
+    left: int  # X offset of the match in pixels
+    top: int  # Y offset of the match in pixels
+    width: int  # Width of the match in pixels (template width * scale)
+    height: int  # Height of the match in pixels (template height * scale)
+    x: int  # X coordinate of the center of the match
+    y: int  # Y coordinate of the center of the match
+    score: float  # Match score (0-1), higher is better
+    scale: float  # Scale the template was resized by
+
+
 class SystemInfo(BaseModel):
     """Information about the system."""
 
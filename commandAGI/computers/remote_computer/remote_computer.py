@@ -1,10 +1,53 @@
+import base64
 import logging
+import os
+import threading
+import uuid
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, List, Literal, Optional, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    Union,
+)
 
-from commandAGI._utils.image import process_screenshot
+from commandAGI._utils.file_transfer import (
+    CHUNK_SIZE,
+    Compression,
+    FileChangedError,
+    compress,
+    decompress,
+    extract_tar,
+    file_sha256,
+    file_version,
+    iter_tar,
+    partial_path,
+    read_chunk,
+    remove_stale_partials,
+    resume_offset,
+    sha256,
+    write_chunk,
+)
+from commandAGI._utils.frame_diff import decode_patch
+from commandAGI._utils.image import (
+    ScreenshotCodec,
+    decode_screenshot,
+    process_screenshot,
+)
+from commandAGI._utils.output_stream import (
+    SSE_MEDIA_TYPE,
+    OutputEvent,
+    decode_sse_events,
+)
 from commandAGI._utils.platform import DEFAULT_SHELL_EXECUTIBLE
 from commandAGI.computers.base_computer import BaseComputer
+from commandAGI.computers.misc_types import ScreenshotDelta
 from commandAGI.computers.platform_managers.base_platform_manager import (
     BaseComputerPlatformManager,
 )
@@ -64,6 +107,8 @@ from commandAGI.types import (
 
 # Import the proper client classes
 try:
+    import httpx
+
     from commandAGI.daemon.client import AuthenticatedClient
     from commandAGI.daemon.client.api.default.execute_run_process_execute_run_process_post import (
         sync as run_process_sync,
@@ -77,9 +122,6 @@ try:
     from commandAGI.daemon.client.api.default.get_observation_observation_get import (
         sync as get_observation_sync,
     )
-    from commandAGI.daemon.client.api.default.get_screenshot_observation_screenshot_get import (
-        sync as get_screenshot_sync,
-    )
     from commandAGI.daemon.client.api.default.hotkey_hotkey_post import (
         sync as hotkey_sync,
     )
@@ -127,6 +169,11 @@ try:
         RunProcessAction as ClientRunProcessAction,
     )
     from commandAGI.daemon.client.models import TypeAction as ClientTypeAction
+    from commandAGI.daemon.websocket import (
+        DaemonWebSocketClient,
+        RequestNotSentError,
+        websocket_url,
+    )
 except ImportError:
     raise ImportError(
         "commandAGI daemon client is not installed. Please install commandAGI with the daemon extra:\n\npip install commandAGI[daemon-client-all] (or one of the other `daemon-client-*` extras)"
@@ -147,6 +194,25 @@ class RemoteComputer(BaseComputer):
     """Used  to indicate which video stream mode is more efficient (ie, to avoid using proxy streams)"""
     model_config = {"arbitrary_types_allowed": True}
 
+    use_websocket: bool = True
+    """Talk to the daemon over its WebSocket endpoint when it has one, falling back to REST otherwise"""
+    screenshot_codec: ScreenshotCodec = "png"
+    """How the daemon encodes screenshots for transfer: 'png', 'jpeg', 'webp' or 'raw'"""
+    screenshot_quality: Optional[int] = None
+    """Quality (1-100) used for 'jpeg' and 'webp' screenshots"""
+    screenshot_scale: float = 1.0
+    """Factor in (0, 1] by which the daemon downscales screenshots before sending them"""
+    transfer_compression: Compression = "gzip"
+    """How file transfers are compressed: 'gzip', 'zstd' (needs zstandard on both ends) or 'none'"""
+    transfer_retries: int = 3
+    """How many times a file chunk that failed to transfer is sent again"""
+
+    _batched_actions: Optional[List[Dict[str, Any]]] = None
+    _websocket: Optional[DaemonWebSocketClient] = None
+    # The daemon keeps the previous frame of each client's screenshot deltas
+    # under this session
+    _delta_session: Optional[str] = None
+
     def __init__(
         self,
         platform_manager: BaseComputerPlatformManager,
@@ -176,6 +242,7 @@ class RemoteComputer(BaseComputer):
             base_url=self.platform_manager.daemon_url,
             token=self.daemon_token,
         )
+        self._connect_websocket()
         self.logger.info(
             f"Successfully connected to daemon services at {
                 self.platform_manager.daemon_url}"
@@ -195,15 +262,82 @@ class RemoteComputer(BaseComputer):
                 base_url=self.platform_manager.daemon_url,
                 token=self.daemon_token,
             )
+            self._connect_websocket()
             self.logger.info(
                 f"Successfully connected to daemon services at {
                     self.platform_manager.daemon_url}"
             )
 
+    def _connect_websocket(self):
+        """Open the daemon's WebSocket channel, if enabled and supported.
+
+        Failures are not fatal: daemons without the WebSocket endpoint (or
+        clients without the websockets package) keep using the REST API.
+        """
+        if not self.use_websocket or self._websocket is not None:
+            return
+        websocket = DaemonWebSocketClient(
+            url=websocket_url(self.platform_manager.daemon_url),
+            token=self.daemon_token,
+        )
+        try:
+            websocket.connect()
+        except Exception as e:
+            self.logger.debug(f"Daemon WebSocket unavailable, using REST: {e}")
+            return
+        self._websocket = websocket
+
+    def _close_websocket(self):
+        if self._websocket is not None:
+            self._websocket.close()
+            self._websocket = None
+
+    def _websocket_connected(self) -> bool:
+        """Whether the WebSocket channel can be used.
+
+        A closed connection is dropped, and the client keeps using the REST
+        API until it is started again.
+        """
+        if self._websocket is not None and not self._websocket.connected:
+            self.logger.warning("Daemon WebSocket closed, using REST")
+            self._close_websocket()
+        return self._websocket is not None
+
+    def _websocket_request(
+        self, message: Dict[str, Any], idempotent: bool = False
+    ) -> Optional[Tuple[Dict[str, Any], bytes]]:
+        """Send a request over the WebSocket channel, if it is connected.
+
+        Args:
+            message: The request to send
+            idempotent: Whether the request may safely run twice. Only then is
+                it retried over REST if the connection drops after it was sent.
+
+        Returns:
+            Optional[Tuple[Dict[str, Any], bytes]]: The response header and
+            payload, or None if the caller should use the REST API instead
+
+        Raises:
+            ConnectionError: If the connection dropped after a request that
+                isn't idempotent was sent, so the daemon may have run it
+        """
+        if not self._websocket_connected():
+            return None
+        try:
+            return self._websocket.request(message)
+        except ConnectionError as e:
+            self._close_websocket()
+            if not idempotent and not isinstance(e, RequestNotSentError):
+                self.logger.warning(f"Daemon WebSocket closed mid-request: {e}")
+                raise
+            self.logger.warning(f"Daemon WebSocket closed, using REST: {e}")
+            return None
+
     def _stop(self):
         """Stop the daemon services"""
         if self.client:
             self.logger.info("Shutting down daemon services")
+            self._close_websocket()
             self.platform_manager.teardown()
             self.client = None
             self.logger.info("Daemon services successfully stopped")
@@ -221,30 +355,144 @@ class RemoteComputer(BaseComputer):
         return response if response else {}
 
     def _get_screenshot(
-        self, display_id: int = 0, format: Literal["base64", "PIL", "path"] = "PIL"
+        self,
+        display_id: int = 0,
+        format: Literal["base64", "PIL", "path"] = "PIL",
+        codec: Optional[ScreenshotCodec] = None,
+        quality: Optional[int] = None,
+        scale: Optional[float] = None,
+        region: Optional[tuple[int, int, int, int]] = None,
     ) -> Union[str, Image.Image, Path]:
         """Get a screenshot of the computer in the specified format.
 
+        The daemon crops, downscales and encodes the screenshot before sending
+        it, so asking for a smaller or lossy image saves bandwidth on both ends.
+
         Args:
             display_id: Optional ID of the display to capture. Defaults to 0 (primary display).
             format: Format to return the screenshot in. Options are:
                 - 'base64': Return the screenshot as a base64 encoded string
                 - 'PIL': Return the screenshot as a PIL Image object
                 - 'path': Save the screenshot to a file and return the path
+            codec: Wire encoding: 'png', 'jpeg', 'webp' or 'raw'. Defaults to screenshot_codec.
+            quality: Quality (1-100) for 'jpeg'/'webp'. Defaults to screenshot_quality.
+            scale: Downscale factor in (0, 1]. Defaults to screenshot_scale.
+            region: Optional (left, top, width, height) rectangle to crop to
         """
-        # Get the screenshot from the daemon (usually returns base64)
-        response = get_screenshot_sync(client=self.client)
-        if not response or "screenshot" not in response:
-            raise RuntimeError("Failed to get screenshot from daemon")
+        encoding = {
+            "codec": codec or self.screenshot_codec,
+            "quality": quality if quality is not None else self.screenshot_quality,
+            "scale": scale if scale is not None else self.screenshot_scale,
+            "region": list(region) if region else None,
+        }
+
+        # Over the WebSocket the image arrives as a binary frame, without the
+        # base64 overhead
+        response = self._websocket_request(
+            {"type": "screenshot", "display_id": display_id, **encoding},
+            idempotent=True,
+        )
+        if response is not None:
+            metadata, data = response
+        else:
+            params = {"display_id": display_id, **encoding}
+            if encoding["region"]:
+                params["region"] = ",".join(map(str, encoding["region"]))
+            response = self.client.get_httpx_client().get(
+                "/observation/screenshot",
+                params={k: v for k, v in params.items() if v is not None},
+            )
+            response.raise_for_status()
+            metadata = response.json()
+            if "screenshot" not in metadata:
+                raise RuntimeError("Failed to get screenshot from daemon")
+            data = base64.b64decode(metadata["screenshot"])
 
-        # Use the utility function to process the screenshot
         return process_screenshot(
-            screenshot_data=response["screenshot"],
+            screenshot_data=decode_screenshot(data, metadata),
             output_format=format,
-            input_format="base64",
+            input_format="PIL",
             computer_name="daemon",
         )
 
+    def _get_screenshot_delta(
+        self,
+        display_id: int = 0,
+        block_size: int = 32,
+        format: Literal["ndarray", "PIL", "base64"] = "PIL",
+        session: Optional[str] = None,
+    ) -> ScreenshotDelta:
+        """Get the changes on a display, as diffed by the daemon.
+
+        Only the changed regions are sent over the wire. Unless a session is
+        given, deltas are relative to this client's previous call, whichever
+        other clients poll the same daemon.
+        """
+        if self._delta_session is None:
+            self._delta_session = uuid.uuid4().hex
+        response = self.client.get_httpx_client().get(
+            "/observation/screenshot_delta",
+            params={
+                "display_id": display_id,
+                "block_size": block_size,
+                "session": session or self._delta_session,
+            },
+        )
+        response.raise_for_status()
+        delta = response.json()
+        for region in delta["regions"]:
+            region["patch"] = decode_patch(region["patch"], format)
+        delta["frame_size"] = tuple(delta["frame_size"])
+        return ScreenshotDelta(**delta)
+
+    def _reset_screenshot_delta(
+        self, display_id: Optional[int] = None, session: Optional[str] = None
+    ):
+        """Have the daemon forget this client's previous frames."""
+        if session is None and self._delta_session is None:
+            return
+        params = {"session": session or self._delta_session}
+        if display_id is not None:
+            params["display_id"] = display_id
+        response = self.client.get_httpx_client().post(
+            "/observation/screenshot_delta/reset", params=params
+        )
+        response.raise_for_status()
+
+    def subscribe_screen_updates(
+        self,
+        callback: Callable[[Image.Image], None],
+        display_id: int = 0,
+        interval: float = 0.5,
+    ):
+        """Have the daemon push the screen to callback whenever it changes.
+
+        Requires the WebSocket channel. The callback runs on the connection's
+        reader thread, so it should return quickly.
+
+        Args:
+            callback: Called with a PIL Image of the display after each change
+            display_id: ID of the display to watch. Defaults to 0 (primary display).
+            interval: Seconds between the daemon's checks for changes
+        """
+        if not self._websocket_connected():
+            raise RuntimeError("Screen updates require the daemon WebSocket channel")
+
+        def on_update(header: Dict[str, Any], data: bytes):
+            callback(decode_screenshot(data, header))
+
+        encoding = {
+            "codec": self.screenshot_codec,
+            "quality": self.screenshot_quality,
+            "scale": self.screenshot_scale,
+        }
+        self._websocket.subscribe_screen(on_update, display_id, interval, encoding)
+
+    def unsubscribe_screen_updates(self):
+        """Stop the screen updates started by subscribe_screen_updates."""
+        if self._websocket_connected():
+            self._websocket.unsubscribe_screen()
+
     def _get_mouse_position(self) -> tuple[int, int]:
         """Get the current mouse cursor position.
 
@@ -447,10 +695,109 @@ class RemoteComputer(BaseComputer):
         """
         raise NotImplementedError(f"{self.__class__.__name__}._start_video_editor")
 
+    @contextmanager
+    def batch_actions(self, stop_on_error: bool = True):
+        """Buffer input actions and send them to the daemon in a single request.
+
+        Keyboard and mouse actions issued inside the block are not sent one by
+        one; they are queued and flushed to the daemon's /execute/batch endpoint
+        when the block exits, where they run in order without any other input
+        interleaving. Nested blocks are flushed by the outermost one. If the
+        block raises, the buffered actions are discarded.
+
+        Args:
+            stop_on_error: Whether the daemon should skip the remaining actions
+                once one of them fails
+
+        Raises:
+            RuntimeError: On exit, if any action in the batch failed
+
+        Examples:
+            >>> with computer.batch_actions():  # doctest: +SKIP
+            ...     computer.click(100, 200)
+            ...     computer.type("hello")
+            ...     computer.hotkey([KeyboardKey.CTRL, KeyboardKey.S])
+        """
+        if self._batched_actions is not None:
+            yield
+            return
+
+        self._batched_actions = []
+        try:
+            yield
+            actions = self._batched_actions
+        finally:
+            self._batched_actions = None
+        if actions:
+            self.execute_batch(actions, stop_on_error=stop_on_error)
+
+    def execute_batch(
+        self, actions: List[Dict[str, Any]], stop_on_error: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Execute a list of actions on the daemon in one round trip.
+
+        Args:
+            actions: Action payloads, each with an "action_type" and the fields
+                of the matching action model (e.g. {"action_type": "type", "text": "hi"})
+            stop_on_error: Whether to skip the remaining actions once one fails
+
+        Returns:
+            List[Dict[str, Any]]: One result per executed action
+
+        Raises:
+            RuntimeError: If any action failed
+            ConnectionError: If the WebSocket dropped after the batch was sent.
+                The batch isn't resent, since the daemon may have run it.
+        """
+        if not self.client:
+            raise RuntimeError("Client not initialized")
+
+        response = self._websocket_request(
+            {"type": "batch", "actions": actions, "stop_on_error": stop_on_error}
+        )
+        if response is not None:
+            result, _ = response
+        else:
+            response = self.client.get_httpx_client().post(
+                "/execute/batch",
+                json={"actions": actions, "stop_on_error": stop_on_error},
+            )
+            response.raise_for_status()
+            result = response.json()
+        if not result["success"]:
+            failed = [
+                (i, r.get("error"))
+                for i, r in enumerate(result["results"])
+                if not r["success"]
+            ]
+            raise RuntimeError(f"Failed to execute batched actions: {failed}")
+        return result["results"]
+
+    def _send_action(self, action_type: str, **fields) -> bool:
+        """Queue an action if a batch_actions() block is active, or send it over
+        the WebSocket if one is connected.
+
+        Returns:
+            bool: True if the action was handled, False if the caller should
+            send it through its REST endpoint
+        """
+        action = {"action_type": action_type, **fields}
+        if self._batched_actions is not None:
+            self._batched_actions.append(action)
+            return True
+        if self._websocket_connected():
+            # Falls back to the REST batch endpoint if the connection drops
+            # before the action is sent
+            self.execute_batch([action])
+            return True
+        return False
+
     def _keydown(self, key: KeyboardKey):
         """Press down a keyboard key"""
         if not self.client:
             raise RuntimeError("Client not initialized")
+        if self._send_action("keyboard_key_down", key=key):
+            return
 
         client_action = ClientKeyboardKeyDownAction(key=keyboard_key_to_daemon(key))
 
@@ -462,6 +809,8 @@ class RemoteComputer(BaseComputer):
         """Release a keyboard key"""
         if not self.client:
             raise RuntimeError("Client not initialized")
+        if self._send_action("keyboard_key_release", key=key):
+            return
 
         client_action = ClientKeyboardKeyReleaseAction(key=keyboard_key_to_daemon(key))
 
@@ -473,6 +822,8 @@ class RemoteComputer(BaseComputer):
         """Press and release a keyboard key"""
         if not self.client:
             raise RuntimeError("Client not initialized")
+        if self._send_action("keyboard_key_press", key=key, duration=duration):
+            return
 
         client_action = ClientKeyboardKeyPressAction(
             key=keyboard_key_to_daemon(key), duration=duration
@@ -486,6 +837,8 @@ class RemoteComputer(BaseComputer):
         """Execute a keyboard hotkey (multiple keys pressed simultaneously)"""
         if not self.client:
             raise RuntimeError("Client not initialized")
+        if self._send_action("keyboard_hotkey", keys=list(keys)):
+            return
 
         client_action = ClientKeyboardHotkeyAction(
             keys=[keyboard_key_to_daemon(k) for k in keys]
@@ -499,6 +852,8 @@ class RemoteComputer(BaseComputer):
         """Type text on the keyboard"""
         if not self.client:
             raise RuntimeError("Client not initialized")
+        if self._send_action("type", text=text):
+            return
 
         client_action = ClientTypeAction(text=text)
 
@@ -510,6 +865,8 @@ class RemoteComputer(BaseComputer):
         """Move the mouse to a position"""
         if not self.client:
             raise RuntimeError("Client not initialized")
+        if self._send_action("mouse_move", x=x, y=y, move_duration=duration):
+            return
 
         client_action = ClientMouseMoveAction(x=x, y=y, move_duration=move_duration)
 
@@ -521,6 +878,8 @@ class RemoteComputer(BaseComputer):
         """Scroll the mouse wheel"""
         if not self.client:
             raise RuntimeError("Client not initialized")
+        if self._send_action("mouse_scroll", amount=amount):
+            return
 
         client_action = ClientMouseScrollAction(amount=amount)
 
@@ -532,6 +891,8 @@ class RemoteComputer(BaseComputer):
         """Press down a mouse button"""
         if not self.client:
             raise RuntimeError("Client not initialized")
+        if self._send_action("mouse_down", button=button):
+            return
 
         client_action = ClientMouseButtonDownAction(
             button=mouse_button_to_daemon(button) if button else None
@@ -545,6 +906,8 @@ class RemoteComputer(BaseComputer):
         """Release a mouse button"""
         if not self.client:
             raise RuntimeError("Client not initialized")
+        if self._send_action("mouse_button_up", button=button):
+            return
 
         client_action = ClientMouseButtonUpAction(
             button=mouse_button_to_daemon(button) if button else None
@@ -554,6 +917,57 @@ class RemoteComputer(BaseComputer):
         if not response or not response.success:
             raise RuntimeError(f"Failed to execute mouse button up: {button}")
 
+    def _click(
+        self,
+        x: int,
+        y: int,
+        move_duration: float = 0.5,
+        press_duration: float = 0.1,
+        button: MouseButton = MouseButton.LEFT,
+    ):
+        """Click in a single round trip; the daemon applies the press duration."""
+        with self.batch_actions():
+            self._send_action(
+                "click",
+                x=x,
+                y=y,
+                move_duration=move_duration,
+                press_duration=press_duration,
+                button=button,
+            )
+
+    def _double_click(
+        self,
+        x: int,
+        y: int,
+        move_duration: float = 0.5,
+        press_duration: float = 0.1,
+        button: MouseButton = MouseButton.LEFT,
+        double_click_interval_seconds: float = 0.1,
+    ):
+        """Double click in a single round trip; the daemon applies the timings."""
+        with self.batch_actions():
+            self._send_action(
+                "double_click",
+                x=x,
+                y=y,
+                move_duration=move_duration,
+                press_duration=press_duration,
+                button=button,
+                double_click_interval_seconds=double_click_interval_seconds,
+            )
+
+    def _drag(
+        self,
+        end_x: int,
+        end_y: int,
+        move_duration: float = 0.5,
+        button: MouseButton = MouseButton.LEFT,
+    ):
+        """Drag by sending the button down, move and button up in one batch."""
+        with self.batch_actions():
+            super()._drag(end_x, end_y, move_duration, button)
+
     def _pause(self):
         """Pause the daemon client computer.
 
@@ -671,6 +1085,325 @@ class RemoteComputer(BaseComputer):
             raise RuntimeError("Failed to run process")
         return response.output
 
+    def _stream_shell(
+        self,
+        command: str,
+        timeout: Optional[float] = None,
+        executible: Optional[str] = None,
+        cwd: Optional[str] = None,
+        env: Optional[dict] = None,
+        max_output_bytes: Optional[int] = None,
+        tail: bool = False,
+        cancel: Optional[threading.Event] = None,
+    ) -> Iterator[OutputEvent]:
+        """Execute a shell command on the remote computer and yield its output
+        while it runs.
+
+        The output is limited by the daemon, so output beyond max_output_bytes
+        never crosses the network.
+        """
+        return self._stream_output(
+            "/execute/command/stream",
+            {
+                "command": command,
+                "timeout": timeout,
+                "executible": executible,
+                "cwd": cwd,
+                "env": env,
+            },
+            max_output_bytes,
+            tail,
+            cancel,
+        )
+
+    def _stream_process(
+        self,
+        command: str,
+        args: List[str] = [],
+        cwd: Optional[str] = None,
+        env: Optional[dict] = None,
+        timeout: Optional[float] = None,
+        max_output_bytes: Optional[int] = None,
+        tail: bool = False,
+        cancel: Optional[threading.Event] = None,
+    ) -> Iterator[OutputEvent]:
+        """Run a process on the remote computer and yield its output while it
+        runs."""
+        return self._stream_output(
+            "/execute/run_process/stream",
+            {
+                "command": command,
+                "args": args,
+                "cwd": cwd,
+                "env": env,
+                "timeout": timeout,
+            },
+            max_output_bytes,
+            tail,
+            cancel,
+        )
+
+    def _stream_output(
+        self,
+        path: str,
+        action: Dict[str, Any],
+        max_output_bytes: Optional[int],
+        tail: bool,
+        cancel: Optional[threading.Event] = None,
+    ) -> Iterator[OutputEvent]:
+        """Yield the output events sent by one of the daemon's streaming
+        endpoints. Closing the iterator, or setting cancel, closes the
+        connection, which makes the daemon kill the process. cancel is checked
+        as each event arrives."""
+        if not self.client:
+            raise RuntimeError("Client not initialized")
+
+        params = {"tail": tail}
+        if max_output_bytes is not None:
+            params["max_output_bytes"] = max_output_bytes
+        with self.client.get_httpx_client().stream(
+            "POST",
+            path,
+            json=action,
+            params=params,
+            headers={"Accept": SSE_MEDIA_TYPE},
+            # A quiet command may produce no output for a long time
+            timeout=httpx.Timeout(10.0, read=None),
+        ) as response:
+            response.raise_for_status()
+            for event in decode_sse_events(response.iter_lines()):
+                if cancel is not None and cancel.is_set():
+                    return
+                yield event
+
+    def _copy_to_computer(self, source_path: Path, destination_path: Path) -> None:
+        """Upload a file or directory to the remote computer.
+
+        Files are sent in compressed, checksummed chunks. If an upload of the
+        same version of the file was interrupted, it resumes after the last
+        chunk the daemon received. Directories are sent as one tar stream.
+        """
+        if not self.client:
+            raise RuntimeError("Client not initialized")
+
+        http = self.client.get_httpx_client()
+        path = destination_path.as_posix()
+        if source_path.is_dir():
+            response = http.put(
+                "/file/upload_tree",
+                params={"path": path, "compression": self.transfer_compression},
+                content=iter_tar(source_path, self.transfer_compression),
+                timeout=httpx.Timeout(10.0, read=None),
+            )
+            response.raise_for_status()
+            return
+
+        version = file_version(source_path)
+        response = http.get("/file/upload", params={"path": path, "version": version})
+        response.raise_for_status()
+        offset = response.json()["offset"]
+        size = source_path.stat().st_size
+        while offset < size:
+            data = read_chunk(source_path, offset)
+            offset = self._retry_chunk(
+                lambda: self._send_chunk(http, path, version, offset, data)
+            )
+
+        response = http.post(
+            "/file/upload/complete",
+            params={
+                "path": path,
+                "version": version,
+                "size": size,
+                "checksum": file_sha256(source_path),
+            },
+        )
+        response.raise_for_status()
+
+    def _send_chunk(
+        self, http: "httpx.Client", path: str, version: str, offset: int, data: bytes
+    ) -> int:
+        response = http.put(
+            "/file/upload",
+            params={
+                "path": path,
+                "version": version,
+                "offset": offset,
+                "checksum": sha256(data),
+                "compression": self.transfer_compression,
+            },
+            content=compress(data, self.transfer_compression),
+        )
+        response.raise_for_status()
+        return response.json()["offset"]
+
+    def _copy_from_computer(self, source_path: Path, destination_path: Path) -> None:
+        """Download a file or directory from the remote computer.
+
+        Files arrive in compressed, checksummed chunks and are written to a
+        partial file next to the destination, which is moved into place once
+        complete. An interrupted download of the same version of the file
+        resumes from that partial file. Directories arrive as one tar stream.
+
+        Raises:
+            FileNotFoundError: If there is nothing at source_path
+        """
+        if not self.client:
+            raise RuntimeError("Client not initialized")
+
+        http = self.client.get_httpx_client()
+        path = source_path.as_posix()
+        stat = self._stat_file(path)
+        if not stat["exists"]:
+            raise FileNotFoundError(f"No such file on the remote computer: {path}")
+
+        if stat["is_dir"]:
+            with http.stream(
+                "GET",
+                "/file/download_tree",
+                params={"path": path, "compression": self.transfer_compression},
+                timeout=httpx.Timeout(10.0, read=None),
+            ) as response:
+                response.raise_for_status()
+                extract_tar(
+                    response.iter_bytes(), destination_path, self.transfer_compression
+                )
+            return
+
+        version = stat["version"]
+        partial = partial_path(destination_path, version)
+        remove_stale_partials(destination_path, keep=partial)
+        offset = resume_offset(partial)
+        while offset < stat["size"]:
+            data = self._retry_chunk(
+                lambda: self._fetch_chunk(http, path, version, offset)
+            )
+            offset = write_chunk(partial, offset, data)
+        if stat["size"] == 0:
+            write_chunk(partial, 0, b"")
+        os.replace(partial, destination_path)
+
+    def _fetch_chunk(
+        self,
+        http: "httpx.Client",
+        path: str,
+        version: str,
+        offset: int,
+        length: int = CHUNK_SIZE,
+    ) -> bytes:
+        response = http.get(
+            "/file/download",
+            params={
+                "path": path,
+                "version": version,
+                "offset": offset,
+                "length": length,
+                "compression": self.transfer_compression,
+            },
+        )
+        if response.status_code == 412:
+            raise FileChangedError(f"{path} changed on the remote computer")
+        response.raise_for_status()
+        data = decompress(response.content, self.transfer_compression)
+        if sha256(data) != response.headers["X-Chunk-SHA256"]:
+            raise ValueError(f"Chunk at {offset} of {path} doesn't match its checksum")
+        return data
+
+    def _stat_file(self, path: str) -> Dict[str, Any]:
+        """Get whether a file exists on the remote computer, and its size and
+        version."""
+        if not self.client:
+            raise RuntimeError("Client not initialized")
+
+        response = self.client.get_httpx_client().get(
+            "/file/stat", params={"path": path}
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def _read_file_range(
+        self, path: str, offset: int, length: int, version: str
+    ) -> bytes:
+        """Read a byte range of a file on the remote computer.
+
+        Raises:
+            FileChangedError: If the file is no longer at version
+        """
+        if not self.client:
+            raise RuntimeError("Client not initialized")
+
+        http = self.client.get_httpx_client()
+        return self._retry_chunk(
+            lambda: self._fetch_chunk(http, path, version, offset, length)
+        )
+
+    def _write_file_range(self, path: str, offset: int, data: bytes) -> Dict[str, Any]:
+        """Write a byte range into a file on the remote computer, in place.
+
+        Returns:
+            Dict[str, Any]: The stat of the file after the write
+        """
+        if not self.client:
+            raise RuntimeError("Client not initialized")
+
+        http = self.client.get_httpx_client()
+        stat = None
+        for start in range(0, len(data), CHUNK_SIZE):
+            chunk = data[start : start + CHUNK_SIZE]
+            stat = self._retry_chunk(
+                lambda: self._put_range(http, path, offset + start, chunk)
+            )
+        return stat if stat is not None else self._stat_file(path)
+
+    def _put_range(
+        self, http: "httpx.Client", path: str, offset: int, data: bytes
+    ) -> Dict[str, Any]:
+        response = http.put(
+            "/file/write",
+            params={
+                "path": path,
+                "offset": offset,
+                "checksum": sha256(data),
+                "compression": self.transfer_compression,
+            },
+            content=compress(data, self.transfer_compression),
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def _truncate_file(self, path: str, size: int) -> Dict[str, Any]:
+        """Resize a file on the remote computer, creating it if needed.
+
+        Returns:
+            Dict[str, Any]: The stat of the file after the resize
+        """
+        if not self.client:
+            raise RuntimeError("Client not initialized")
+
+        response = self.client.get_httpx_client().post(
+            "/file/truncate", params={"path": path, "size": size}
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def _retry_chunk(self, transfer: Callable[[], Any]) -> Any:
+        """Run a chunk transfer, retrying it when the connection fails or the
+        chunk arrives corrupted."""
+        for attempt in range(self.transfer_retries + 1):
+            try:
+                return transfer()
+            except (httpx.TransportError, ValueError) as e:
+                failure = e
+            except httpx.HTTPStatusError as e:
+                # The daemon rejects a chunk that doesn't match its checksum
+                if e.response.status_code != 422:
+                    raise
+                failure = e
+            self.logger.warning(
+                f"Chunk transfer failed (attempt {attempt + 1}): {failure}"
+            )
+        raise failure
+
     def _open(
         self,
         path: Union[str, Path],
@@ -681,8 +1414,9 @@ class RemoteComputer(BaseComputer):
     ) -> RemoteComputerFile:
         """Open a file on the remote computer.
 
-        This method uses the Daemon Client API to access files on the remote computer.
-        Note: File operations may not be implemented in the current Daemon Client API.
+        The file is read and written in pages through the daemon's file
+        endpoints, so only the parts of it that are read or changed cross the
+        network.
 
         Args:
             path: Path to the file on the remote computer
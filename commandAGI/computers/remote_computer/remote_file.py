@@ -1,10 +1,41 @@
-from commandAGI.computers.base_computer.base_file import BaseComputerFile
+from typing import Any, Dict, Optional
 
+from commandAGI.computers.base_computer.paged_file import FileStat, PagedComputerFile
 
-class RemoteComputerFile(BaseComputerFile):
-    """Implementation of BaseComputerFile for Daemon Client computer files.
+
+class RemoteComputerFile(PagedComputerFile):
+    """Implementation of PagedComputerFile for Daemon Client computer files.
 
     This class provides a file-like interface for working with files on a remote computer
-    accessed via the Daemon Client. It uses temporary local files and the daemon's file
-    transfer capabilities to provide file-like access.
+    accessed via the Daemon Client. Pages of the file are read and written through the
+    daemon's /file/stat, /file/download, /file/write and /file/truncate endpoints.
     """
+
+    @property
+    def _remote_path(self) -> str:
+        return self.path.as_posix()
+
+    def _to_file_stat(self, stat: Dict[str, Any]) -> Optional[FileStat]:
+        if not stat["exists"]:
+            return None
+        if stat["is_dir"]:
+            raise IsADirectoryError(
+                f"Is a directory on the remote computer: {self._remote_path}"
+            )
+        return stat["size"], stat["version"]
+
+    def _stat(self) -> Optional[FileStat]:
+        return self._to_file_stat(self.computer._stat_file(self._remote_path))
+
+    def _read_range(self, offset: int, length: int, version: str) -> bytes:
+        return self.computer._read_file_range(
+            self._remote_path, offset, length, version
+        )
+
+    def _write_range(self, offset: int, data: bytes) -> FileStat:
+        return self._to_file_stat(
+            self.computer._write_file_range(self._remote_path, offset, data)
+        )
+
+    def _truncate(self, size: int) -> FileStat:
+        return self._to_file_stat(self.computer._truncate_file(self._remote_path, size))
@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Literal, Optional, Union
+from typing import Literal, Optional, Tuple, Union
 
 try:
     import vncdotool.api as vnc
@@ -19,6 +19,7 @@ except ImportError:
 
 from commandAGI._utils.image import process_screenshot
 from commandAGI.computers.base_computer import BaseComputer
+from commandAGI.computers.vnc_computer.vnc_file import VNCComputerFile
 from commandAGI.types import (
     KeyboardKey,
     MouseButton,
@@ -347,23 +348,11 @@ class VNCComputer(BaseComputer):
         )
         self._default_run_process(action=action)
 
-    def _copy_to_computer(self, source_path: Path, destination_path: Path) -> None:
-        """Implementation of copy_to_computer functionality for VNCComputer.
-
-        For VNC computers, we attempt to use SFTP if available, since VNC itself
-        doesn't support file transfer. This requires paramiko to be installed and
-        SSH/SFTP to be available on the remote system.
+    def _require_sftp(self) -> None:
+        """Raise NotImplementedError if paramiko is not installed.
 
-        Args:
-            source_path: Path to the source file or directory on the local machine
-            destination_path: Path where the file or directory should be copied on the computer
-
-        Raises:
-            NotImplementedError: If SFTP is not available (paramiko not installed)
-            FileNotFoundError: If the source path does not exist
-            ValueError: If SSH credentials are not properly configured
-            PermissionError: If there are permission issues with SSH/SFTP
-            OSError: For other file operation errors
+        Called before the SSH error handling of the file transfer methods,
+        whose except clauses name paramiko's exceptions.
         """
         if not SFTP_AVAILABLE:
             self.logger.warning(
@@ -373,9 +362,18 @@ class VNCComputer(BaseComputer):
                 "File transfer not supported without paramiko installed. Run: pip install paramiko"
             )
 
-        # Ensure source exists
-        if not source_path.exists():
-            raise FileNotFoundError(f"Source path does not exist: {source_path}")
+    def _connect_sftp(self) -> Tuple["paramiko.SSHClient", "paramiko.SFTPClient"]:
+        """Connect to the computer over SSH and open an SFTP session.
+
+        Returns:
+            Tuple[paramiko.SSHClient, paramiko.SFTPClient]: The SSH connection and
+                the SFTP session on it, both of which the caller closes
+
+        Raises:
+            NotImplementedError: If SFTP is not available (paramiko not installed)
+            ValueError: If SSH credentials are not properly configured
+        """
+        self._require_sftp()
 
         # Verify SSH credentials are configured
         if not self.ssh_username:
@@ -392,31 +390,57 @@ class VNCComputer(BaseComputer):
         ssh = paramiko.SSHClient()
         ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
 
-        try:
-            # Connect to SSH server
-            self.logger.debug(
-                f"Connecting to SSH server {
-                    self.ssh_host}:{
-                    self.ssh_port} as {
-                    self.ssh_username}"
+        # Connect to SSH server
+        self.logger.debug(
+            f"Connecting to SSH server {
+                self.ssh_host}:{
+                self.ssh_port} as {
+                self.ssh_username}"
+        )
+        if self.ssh_key_path:
+            ssh.connect(
+                self.ssh_host,
+                port=self.ssh_port,
+                username=self.ssh_username,
+                key_filename=self.ssh_key_path,
             )
-            if self.ssh_key_path:
-                ssh.connect(
-                    self.ssh_host,
-                    port=self.ssh_port,
-                    username=self.ssh_username,
-                    key_filename=self.ssh_key_path,
-                )
-            else:
-                ssh.connect(
-                    self.ssh_host,
-                    port=self.ssh_port,
-                    username=self.ssh_username,
-                    password=self.ssh_password,
-                )
+        else:
+            ssh.connect(
+                self.ssh_host,
+                port=self.ssh_port,
+                username=self.ssh_username,
+                password=self.ssh_password,
+            )
+
+        # Create SFTP client
+        sftp = ssh.open_sftp()
+        return ssh, sftp
+
+    def _copy_to_computer(self, source_path: Path, destination_path: Path) -> None:
+        """Implementation of copy_to_computer functionality for VNCComputer.
+
+        For VNC computers, we attempt to use SFTP if available, since VNC itself
+        doesn't support file transfer. This requires paramiko to be installed and
+        SSH/SFTP to be available on the remote system.
+
+        Args:
+            source_path: Path to the source file or directory on the local machine
+            destination_path: Path where the file or directory should be copied on the computer
+
+        Raises:
+            NotImplementedError: If SFTP is not available (paramiko not installed)
+            FileNotFoundError: If the source path does not exist
+            ValueError: If SSH credentials are not properly configured
+            PermissionError: If there are permission issues with SSH/SFTP
+            OSError: For other file operation errors
+        """
+        # Ensure source exists
+        if not source_path.exists():
+            raise FileNotFoundError(f"Source path does not exist: {source_path}")
 
-            # Create SFTP client
-            sftp = ssh.open_sftp()
+        self._require_sftp()
+        try:
+            ssh, sftp = self._connect_sftp()
 
             # Create parent directories if they don't exist
             try:
@@ -481,54 +505,9 @@ class VNCComputer(BaseComputer):
             PermissionError: If there are permission issues with SSH/SFTP
             OSError: For other file operation errors
         """
-        if not SFTP_AVAILABLE:
-            self.logger.warning(
-                "SFTP not available. Install paramiko to enable file transfer."
-            )
-            raise NotImplementedError(
-                "File transfer not supported without paramiko installed. Run: pip install paramiko"
-            )
-
-        # Verify SSH credentials are configured
-        if not self.ssh_username:
-            raise ValueError(
-                "SSH username not provided. Set ssh_username when initializing VNCComputer."
-            )
-
-        if not self.ssh_password and not self.ssh_key_path:
-            raise ValueError(
-                "Either ssh_password or ssh_key_path must be provided for SFTP file transfer."
-            )
-
-        # Create SSH client
-        ssh = paramiko.SSHClient()
-        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-
+        self._require_sftp()
         try:
-            # Connect to SSH server
-            self.logger.debug(
-                f"Connecting to SSH server {
-                    self.ssh_host}:{
-                    self.ssh_port} as {
-                    self.ssh_username}"
-            )
-            if self.ssh_key_path:
-                ssh.connect(
-                    self.ssh_host,
-                    port=self.ssh_port,
-                    username=self.ssh_username,
-                    key_filename=self.ssh_key_path,
-                )
-            else:
-                ssh.connect(
-                    self.ssh_host,
-                    port=self.ssh_port,
-                    username=self.ssh_username,
-                    password=self.ssh_password,
-                )
-
-            # Create SFTP client
-            sftp = ssh.open_sftp()
+            ssh, sftp = self._connect_sftp()
 
             # Create parent directories if they don't exist
             destination_path.parent.mkdir(parents=True, exist_ok=True)
@@ -597,7 +576,8 @@ class VNCComputer(BaseComputer):
     ) -> VNCComputerFile:
         """Open a file on the remote computer.
 
-        This method uses SFTP to access files on the remote computer.
+        The file is read and written in pages over SFTP, so only the parts of
+        it that are read or changed are transferred.
 
         Args:
             path: Path to the file on the remote computer
@@ -0,0 +1,85 @@
+import stat
+from pathlib import Path
+from typing import Optional, Union
+
+from commandAGI._utils.file_transfer import FileChangedError
+from commandAGI.computers.base_computer.paged_file import FileStat, PagedComputerFile
+
+
+class VNCComputerFile(PagedComputerFile):
+    """Implementation of PagedComputerFile for VNC computer files.
+
+    VNC can't transfer files, so pages of the file are read and written over an
+    SFTP session, which stays open until the file is closed. SFTP reports mtimes
+    in whole seconds, so a change on the computer that keeps the size of the file
+    is only noticed once its mtime moves to the next second.
+    """
+
+    def __init__(
+        self,
+        computer: "VNCComputer",
+        path: Union[str, Path],
+        mode: str = "r",
+        encoding: Optional[str] = None,
+        errors: Optional[str] = None,
+        buffering: int = -1,
+    ):
+        self._ssh, self._sftp = computer._connect_sftp()
+        try:
+            super().__init__(computer, path, mode, encoding, errors, buffering)
+        except BaseException:
+            self._disconnect()
+            raise
+
+    @property
+    def _remote_path(self) -> str:
+        return self.path.as_posix()
+
+    def _disconnect(self):
+        self._sftp.close()
+        self._ssh.close()
+
+    def close(self):
+        """Close the file, write the changed pages back and end the SFTP session."""
+        if not self._closed:
+            try:
+                super().close()
+            finally:
+                self._disconnect()
+
+    def _stat(self) -> Optional[FileStat]:
+        try:
+            attributes = self._sftp.stat(self._remote_path)
+        except FileNotFoundError:
+            return None
+        if stat.S_ISDIR(attributes.st_mode):
+            raise IsADirectoryError(
+                f"Is a directory on the remote computer: {self._remote_path}"
+            )
+        return attributes.st_size, f"{attributes.st_size}-{attributes.st_mtime}"
+
+    def _read_range(self, offset: int, length: int, version: str) -> bytes:
+        current = self._stat()
+        if current is None or current[1] != version:
+            raise FileChangedError(
+                f"{self._remote_path} changed on the remote computer"
+            )
+        with self._sftp.open(self._remote_path, "rb") as f:
+            f.seek(offset)
+            return f.read(length)
+
+    def _write_range(self, offset: int, data: bytes) -> FileStat:
+        try:
+            f = self._sftp.open(self._remote_path, "r+b")
+        except FileNotFoundError:
+            f = self._sftp.open(self._remote_path, "wb")
+        with f:
+            f.seek(offset)
+            f.write(data)
+        return self._stat()
+
+    def _truncate(self, size: int) -> FileStat:
+        if self._stat() is None:
+            self._sftp.open(self._remote_path, "wb").close()
+        self._sftp.truncate(self._remote_path, size)
+        return self._stat()
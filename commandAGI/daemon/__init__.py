@@ -2,11 +2,27 @@
 Daemon components for commandAGI.
 
 This package contains the daemon server and client components for remote computer control.
+
+The components are imported on first access, so e.g. the client doesn't load
+the server's dependencies.
 """
 
-from commandAGI.daemon.cli import cli
-from commandAGI.daemon.client import AuthenticatedClient
-from commandAGI.daemon.server import ComputerDaemon
+import importlib
+
+_LAZY_ATTRS = {
+    "ComputerDaemon": "commandAGI.daemon.server",
+    "AuthenticatedClient": "commandAGI.daemon.client",
+    "cli": "commandAGI.daemon.cli",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRS:
+        value = getattr(importlib.import_module(_LAZY_ATTRS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "ComputerDaemon",
@@ -6,16 +6,15 @@ from typing import Optional
 
 import typer
 
-from commandAGI.computers.local_pyautogui_computer import LocalPyAutoGUIComputer
-from commandAGI.computers.local_pynput_computer import LocalPynputComputer
-from commandAGI.daemon.server import ComputerDaemon
+from commandAGI.computers import load_computer
 
 cli = typer.Typer()
 
 
+# Backend name -> computer class name, imported only when the daemon starts
 COMPUTER_CLS_OPTIONS = {
-    "pynput": LocalPynputComputer,
-    "pyautogui": LocalPyAutoGUIComputer,
+    "pynput": "LocalPynputComputer",
+    "pyautogui": "LocalPyAutoGUIComputer",
 }
 
 
@@ -68,13 +67,25 @@ def start(
     mcp_server: bool = typer.Option(
         default=False, help="Whether to start the MCP server"
     ),
+    executor_max_workers: int = typer.Option(
+        default=8,
+        envvar="DAEMON_EXECUTOR_MAX_WORKERS",
+        help="Number of worker threads used to run blocking computer calls",
+    ),
+    executor_max_queue_size: int = typer.Option(
+        default=64,
+        envvar="DAEMON_EXECUTOR_MAX_QUEUE_SIZE",
+        help="Maximum number of pending computer calls before requests get a 503",
+    ),
 ):
+    from commandAGI.daemon.server import ComputerDaemon
+
     print("Starting daemon...")
 
     additional_computer_cls_kwargs = json.loads(additional_computer_cls_kwargs_str)
 
-    # Configure computer backend
-    computer_cls = COMPUTER_CLS_OPTIONS[backend]
+    # Configure computer backend, other registered computers work by name too
+    computer_cls = load_computer(COMPUTER_CLS_OPTIONS.get(backend, backend))
 
     # Create the computer instance
     computer = computer_cls(**additional_computer_cls_kwargs)
@@ -110,6 +121,8 @@ def start(
         vnc_stop_commands=vnc_stop_commands,
         rdp_use_system_commands=rdp_use_system_commands,
         mcp_server_name=mcp_server_name,
+        executor_max_workers=executor_max_workers,
+        executor_max_queue_size=executor_max_queue_size,
     )
 
     print(f"API Token: {daemon._api_token}")
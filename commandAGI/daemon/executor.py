@@ -0,0 +1,148 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class ExecutorSaturatedError(Exception):
+    """Raised when the daemon executor already has max_queue_size calls pending."""
+
+
+class DaemonExecutor:
+    """Runs blocking computer calls off the daemon's event loop.
+
+    Calls are submitted to a bounded thread pool. A call may name a resource
+    (e.g. "input" or "screen"): calls on the same resource run one at a time
+    in the order they arrived, while calls on different resources (or on no
+    resource) run concurrently. Calls waiting for a resource wait on the event
+    loop, so they never tie up a worker thread.
+
+    Args:
+        max_workers: Number of worker threads in the pool
+        max_queue_size: Maximum number of calls that may be waiting or running
+            at once. Further calls are rejected with ExecutorSaturatedError.
+    """
+
+    def __init__(self, max_workers: int = 8, max_queue_size: int = 64):
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="commandagi-daemon"
+        )
+        self._resource_locks: Dict[str, asyncio.Lock] = {}
+        self._stats_lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._waiting_by_resource: Dict[str, int] = {}
+
+    async def run(
+        self, resource: Optional[str], func: Callable, *args, **kwargs
+    ) -> Any:
+        """Run func(*args, **kwargs) in the pool and await its result.
+
+        Args:
+            resource: Name of the resource the call must hold exclusively, or
+                None if it may run concurrently with anything
+            func: The blocking callable to run
+            *args: Positional arguments to pass to func
+            **kwargs: Keyword arguments to pass to func
+
+        Returns:
+            Whatever func returns
+
+        Raises:
+            ExecutorSaturatedError: If max_queue_size calls are already pending
+        """
+        with self._stats_lock:
+            if self._queued + self._running >= self.max_queue_size:
+                self._rejected += 1
+                raise ExecutorSaturatedError(
+                    f"Daemon executor is saturated ({self.max_queue_size} calls pending)"
+                )
+            self._queued += 1
+
+        lock = None
+        if resource is not None:
+            lock = self._resource_locks.setdefault(resource, asyncio.Lock())
+            self._track_waiting(resource, 1)
+            try:
+                await lock.acquire()
+            except BaseException:
+                with self._stats_lock:
+                    self._queued -= 1
+                raise
+            finally:
+                self._track_waiting(resource, -1)
+
+        try:
+            future = asyncio.get_running_loop().run_in_executor(
+                self._pool, functools.partial(self._call, func, args, kwargs)
+            )
+        except BaseException:
+            # Nothing was submitted (e.g. the pool is shut down), so _call will
+            # never run to release the resource or the queue slot
+            with self._stats_lock:
+                self._queued -= 1
+            if lock is not None:
+                lock.release()
+            raise
+        if lock is not None:
+            # Release the resource only once the call has really finished, even
+            # if the request awaiting it is cancelled first
+            future.add_done_callback(lambda _: lock.release())
+        return await asyncio.shield(future)
+
+    def _track_waiting(self, resource: str, delta: int):
+        with self._stats_lock:
+            self._waiting_by_resource[resource] = (
+                self._waiting_by_resource.get(resource, 0) + delta
+            )
+
+    def _call(self, func: Callable, args: tuple, kwargs: dict) -> Any:
+        with self._stats_lock:
+            self._queued -= 1
+            self._running += 1
+        try:
+            result = func(*args, **kwargs)
+        except BaseException:
+            with self._stats_lock:
+                self._running -= 1
+                self._failed += 1
+            raise
+        with self._stats_lock:
+            self._running -= 1
+            self._completed += 1
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of the executor's queue-depth metrics.
+
+        Returns:
+            Dict with the pool configuration, the number of queued and running
+            calls, the number of calls waiting on each resource, and
+            completed/failed/rejected totals since startup. Failed calls are
+            not counted as completed.
+        """
+        with self._stats_lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue_size": self.max_queue_size,
+                "queued": self._queued,
+                "running": self._running,
+                "waiting_by_resource": {
+                    resource: waiting
+                    for resource, waiting in self._waiting_by_resource.items()
+                    if waiting
+                },
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting calls and shut the thread pool down."""
+        self._pool.shutdown(wait=wait)
@@ -1,18 +1,79 @@
+import asyncio
+import base64
+import concurrent.futures
+import json
+import logging
+import os
 import platform
 import platform as sys_platform
 import secrets
 import shutil
+import tarfile
 import threading
 import time
-from typing import Any, Dict, Literal, Optional, Tuple
+from pathlib import Path
+from typing import (
+    Annotated,
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    Union,
+)
 
+import numpy as np
 import psutil
 import uvicorn
-from fastapi import Depends, FastAPI, HTTPException, Security
+from fastapi import (
+    Depends,
+    FastAPI,
+    HTTPException,
+    Query,
+    Request,
+    Security,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from pydantic import BaseModel
-
+from pydantic import BaseModel, Field, ValidationError
+
+from commandAGI._utils.file_transfer import (
+    CHUNK_SIZE,
+    Compression,
+    FileChangedError,
+    available_compressions,
+    compress,
+    decompress,
+    extract_tar,
+    file_sha256,
+    file_version,
+    is_file_version,
+    iter_tar,
+    partial_path,
+    read_chunk,
+    remove_stale_partials,
+    resume_offset,
+    sha256,
+    write_chunk,
+)
+from commandAGI._utils.frame_diff import block_hashes, crop_patch, diff_block_hashes
+from commandAGI._utils.image import ScreenshotCodec, encode_screenshot
+from commandAGI._utils.output_stream import (
+    SSE_MEDIA_TYPE,
+    OutputEvent,
+    encode_sse_error,
+    encode_sse_event,
+)
 from commandAGI.computers.base_computer import BaseComputer
+from commandAGI.daemon.executor import DaemonExecutor, ExecutorSaturatedError
+from commandAGI.daemon.websocket import WEBSOCKET_PATH, encode_binary_frame
 from commandAGI.types import (  # Observation types for return type annotations
     ClickAction,
     ComputerPauseAction,
@@ -71,6 +132,102 @@ class VideoStreamUrlResponse(BaseModel):
     url: str
 
 
+# Actions that may be sent to /execute/batch, told apart by their action_type
+BatchableAction = Annotated[
+    Union[
+        ShellCommandAction,
+        KeyboardKeyPressAction,
+        KeyboardKeyDownAction,
+        KeyboardKeyReleaseAction,
+        KeyboardHotkeyAction,
+        TypeAction,
+        MouseMoveAction,
+        MouseScrollAction,
+        MouseButtonDownAction,
+        MouseButtonUpAction,
+        ClickAction,
+        DoubleClickAction,
+        DragAction,
+        RunProcessAction,
+    ],
+    Field(discriminator="action_type"),
+]
+
+
+class ScreenshotEncoding(BaseModel):
+    codec: ScreenshotCodec = "png"
+    quality: Optional[int] = Field(default=None, ge=1, le=100)
+    scale: float = Field(default=1.0, gt=0, le=1)
+    region: Optional[Tuple[int, int, int, int]] = None
+
+
+class EncodedScreenshotResponse(BaseModel):
+    screenshot: str
+    codec: ScreenshotCodec
+    mime_type: str
+    width: int
+    height: int
+
+
+class FileStatResponse(BaseModel):
+    exists: bool
+    is_dir: bool = False
+    size: int = 0
+    mtime_ns: int = 0
+    # Changes whenever the file is modified; None for directories
+    version: Optional[str] = None
+
+
+class UploadOffsetResponse(BaseModel):
+    # Where the upload continues: the end of the last chunk received
+    offset: int
+
+
+class BatchActionRequest(BaseModel):
+    actions: List[BatchableAction]
+    stop_on_error: bool = True
+
+
+class BatchActionResult(BaseModel):
+    success: bool
+    result: Any = None
+    error: Optional[str] = None
+
+
+class BatchResponse(BaseModel):
+    success: bool
+    results: List[BatchActionResult]
+
+
+logger = logging.getLogger(__name__)
+
+# Executor resources: calls on the same resource are serialized in arrival order
+INPUT_RESOURCE = "input"
+SCREEN_RESOURCE = "screen"
+LIFECYCLE_RESOURCE = "lifecycle"
+
+# Observations that can be requested over the WebSocket, by name
+WEBSOCKET_OBSERVATIONS = {
+    "mouse_state",
+    "keyboard_state",
+    "layout_tree",
+    "processes",
+    "windows",
+    "displays",
+}
+
+# How many items a stream reads ahead of the client
+STREAM_READ_AHEAD = 16
+
+
+def encode_frame(frame: np.ndarray, **encoding) -> Tuple[bytes, Dict[str, Any]]:
+    """Encode a captured (H, W, C) frame with encode_screenshot."""
+    height, width = frame.shape[:2]
+    return encode_screenshot(
+        crop_patch(frame, (0, 0, width, height), "PIL"), **encoding
+    )
+
+
 class ComputerDaemon:
     # Default VNC executables
     DEFAULT_VNC_WINDOWS_EXECUTABLES = ["tvnserver.exe", "vncserver.exe", "winvnc.exe"]
@@ -107,6 +264,8 @@ class ComputerDaemon:
         vnc_stop_commands: Optional[dict[str, str]] = None,
         rdp_use_system_commands: bool = True,
         mcp_server_name: str = "commandAGI MCP Server",
+        executor_max_workers: int = 8,
+        executor_max_queue_size: int = 64,
     ):
         self._computer = computer
         # Use the provided token or generate a new one
@@ -133,6 +292,11 @@ class ComputerDaemon:
         # MCP configuration
         self._mcp_server_name = mcp_server_name
 
+        # Blocking computer calls run here so they don't stall the event loop
+        self._executor = DaemonExecutor(
+            max_workers=executor_max_workers, max_queue_size=executor_max_queue_size
+        )
+
         self._fastapi_server = self._create_fastapi_server()
         self._mcp_server = self._create_mcp_server()
 
@@ -148,17 +312,35 @@ class ComputerDaemon:
                 raise HTTPException(status_code=401, detail="Invalid token")
             return credentials.credentials
 
+        @app.exception_handler(ExecutorSaturatedError)
+        async def executor_saturated_handler(
+            request: Request, exc: ExecutorSaturatedError
+        ) -> JSONResponse:
+            return JSONResponse(
+                status_code=503,
+                content={"detail": str(exc)},
+                headers={"Retry-After": "1"},
+            )
+
         @app.post("/reset", response_model=SuccessResponse)
         async def reset(token: str = Depends(verify_token)) -> Dict[str, Any]:
-            return {"success": self._computer.reset_state()}
+            return {
+                "success": await self._executor.run(
+                    LIFECYCLE_RESOURCE, self._computer.reset_state
+                )
+            }
 
         @app.post("/execute/command", response_model=SuccessResponse)
         async def execute_command(
             action: ShellCommandAction, token: str = Depends(verify_token)
         ) -> Dict[str, bool]:
             return {
-                "success": self._computer.shell(
-                    action.command, action.timeout, action.executible
+                "success": await self._executor.run(
+                    None,
+                    self._computer.shell,
+                    action.command,
+                    action.timeout,
+                    action.executible,
                 )
             }
 
@@ -167,36 +349,105 @@ class ComputerDaemon:
             action: RunProcessAction, token: str = Depends(verify_token)
         ) -> Dict[str, bool]:
             return {
-                "success": self._computer.run_process(
-                    action.command, action.args, action.cwd, action.env, action.timeout
+                "success": await self._executor.run(
+                    None,
+                    self._computer.run_process,
+                    action.command,
+                    action.args,
+                    action.cwd,
+                    action.env,
+                    action.timeout,
                 )
             }
 
+        @app.post("/execute/command/stream")
+        async def stream_command(
+            action: ShellCommandAction,
+            max_output_bytes: Optional[int] = Query(default=None, ge=0),
+            tail: bool = False,
+            token: str = Depends(verify_token),
+        ) -> StreamingResponse:
+            cancel = threading.Event()
+            events = self._computer.stream_shell(
+                action.command,
+                timeout=action.timeout,
+                executible=action.executible,
+                cwd=action.cwd,
+                env=action.env,
+                max_output_bytes=max_output_bytes,
+                tail=tail,
+                cancel=cancel,
+            )
+            return StreamingResponse(
+                self._stream_output(events, cancel),
+                media_type=SSE_MEDIA_TYPE,
+                headers={"Cache-Control": "no-cache"},
+            )
+
+        @app.post("/execute/run_process/stream")
+        async def stream_run_process(
+            action: RunProcessAction,
+            max_output_bytes: Optional[int] = Query(default=None, ge=0),
+            tail: bool = False,
+            token: str = Depends(verify_token),
+        ) -> StreamingResponse:
+            cancel = threading.Event()
+            events = self._computer.stream_process(
+                action.command,
+                args=action.args,
+                cwd=action.cwd,
+                env=action.env,
+                timeout=action.timeout,
+                max_output_bytes=max_output_bytes,
+                tail=tail,
+                cancel=cancel,
+            )
+            return StreamingResponse(
+                self._stream_output(events, cancel),
+                media_type=SSE_MEDIA_TYPE,
+                headers={"Cache-Control": "no-cache"},
+            )
+
         @app.post("/execute/keyboard/key_down", response_model=SuccessResponse)
         async def keydown(
             action: KeyboardKeyDownAction, token: str = Depends(verify_token)
         ) -> Dict[str, bool]:
-            return {"success": self._computer.keydown(action.key)}
+            return {
+                "success": await self._executor.run(
+                    INPUT_RESOURCE, self._computer.keydown, action.key
+                )
+            }
 
         @app.post("/execute/keyboard/key_release", response_model=SuccessResponse)
         async def keyup(
             action: KeyboardKeyReleaseAction, token: str = Depends(verify_token)
         ) -> Dict[str, bool]:
-            return {"success": self._computer.keyup(action.key)}
+            return {
+                "success": await self._executor.run(
+                    INPUT_RESOURCE, self._computer.keyup, action.key
+                )
+            }
 
         @app.post("/execute/keyboard/key_press", response_model=SuccessResponse)
         async def keypress(
             action: KeyboardKeyPressAction, token: str = Depends(verify_token)
         ) -> Dict[str, bool]:
-            return {"success": self._computer.keypress(action.key, action.duration)}
+            return {
+                "success": await self._executor.run(
+                    INPUT_RESOURCE, self._computer.keypress, action.key, action.duration
+                )
+            }
 
         @app.post("/execute/keyboard/keys_press", response_model=SuccessResponse)
         async def execute_keyboard_keys_press(
             action: KeyboardKeysPressAction, token: str = Depends(verify_token)
         ) -> Dict[str, bool]:
             return {
-                "success": self._computer.execute_keyboard_keys_press(
-                    action.keys, action.duration
+                "success": await self._executor.run(
+                    INPUT_RESOURCE,
+                    self._computer.execute_keyboard_keys_press,
+                    action.keys,
+                    action.duration,
                 )
             }
 
@@ -204,60 +455,98 @@ class ComputerDaemon:
         async def execute_keyboard_keys_down(
             action: KeyboardKeysDownAction, token: str = Depends(verify_token)
         ) -> Dict[str, bool]:
-            return {"success": self._computer.execute_keyboard_keys_down(action.keys)}
+            return {
+                "success": await self._executor.run(
+                    INPUT_RESOURCE,
+                    self._computer.execute_keyboard_keys_down,
+                    action.keys,
+                )
+            }
 
         @app.post("/execute/keyboard/keys_release", response_model=SuccessResponse)
         async def execute_keyboard_keys_release(
             action: KeyboardKeysReleaseAction, token: str = Depends(verify_token)
         ) -> Dict[str, bool]:
             return {
-                "success": self._computer.execute_keyboard_keys_release(action.keys)
+                "success": await self._executor.run(
+                    INPUT_RESOURCE,
+                    self._computer.execute_keyboard_keys_release,
+                    action.keys,
+                )
             }
 
         @app.post("/execute/keyboard/hotkey", response_model=SuccessResponse)
         async def hotkey(
             action: KeyboardHotkeyAction, token: str = Depends(verify_token)
         ) -> Dict[str, bool]:
-            return {"success": self._computer.hotkey(action.keys)}
+            return {
+                "success": await self._executor.run(
+                    INPUT_RESOURCE, self._computer.hotkey, action.keys
+                )
+            }
 
         @app.post("/execute/type", response_model=SuccessResponse)
         async def type(
             action: TypeAction, token: str = Depends(verify_token)
         ) -> Dict[str, bool]:
-            return {"success": self._computer.type(action.text)}
+            return {
+                "success": await self._executor.run(
+                    INPUT_RESOURCE, self._computer.type, action.text
+                )
+            }
 
         @app.post("/execute/mouse/move", response_model=SuccessResponse)
         async def move(
             action: MouseMoveAction, token: str = Depends(verify_token)
         ) -> Dict[str, bool]:
             return {
-                "success": self._computer.move(action.x, action.y, action.move_duration)
+                "success": await self._executor.run(
+                    INPUT_RESOURCE,
+                    self._computer.move,
+                    action.x,
+                    action.y,
+                    action.move_duration,
+                )
             }
 
         @app.post("/execute/mouse/scroll", response_model=SuccessResponse)
         async def scroll(
             action: MouseScrollAction, token: str = Depends(verify_token)
         ) -> Dict[str, bool]:
-            return {"success": self._computer.scroll(action.amount)}
+            return {
+                "success": await self._executor.run(
+                    INPUT_RESOURCE, self._computer.scroll, action.amount
+                )
+            }
 
         @app.post("/execute/mouse/button_down", response_model=SuccessResponse)
         async def mouse_down(
             action: MouseButtonDownAction, token: str = Depends(verify_token)
         ) -> Dict[str, bool]:
-            return {"success": self._computer.mouse_down(action.button)}
+            return {
+                "success": await self._executor.run(
+                    INPUT_RESOURCE, self._computer.mouse_down, action.button
+                )
+            }
 
         @app.post("/execute/mouse/button_up", response_model=SuccessResponse)
         async def mouse_up(
             action: MouseButtonUpAction, token: str = Depends(verify_token)
         ) -> Dict[str, bool]:
-            return {"success": self._computer.mouse_up(action.button)}
+            return {
+                "success": await self._executor.run(
+                    INPUT_RESOURCE, self._computer.mouse_up, action.button
+                )
+            }
 
         @app.post("/execute/click", response_model=SuccessResponse)
         async def click(
             action: ClickAction, token: str = Depends(verify_token)
         ) -> Dict[str, bool]:
             return {
-                "success": self._computer.click(
+                "success": await self._executor.run(
+                    INPUT_RESOURCE,
+                    self._computer.click,
                     action.x,
                     action.y,
                     action.move_duration,
@@ -271,7 +560,9 @@ class ComputerDaemon:
             action: DoubleClickAction, token: str = Depends(verify_token)
         ) -> Dict[str, bool]:
             return {
-                "success": self._computer.double_click(
+                "success": await self._executor.run(
+                    INPUT_RESOURCE,
+                    self._computer.double_click,
                     action.x,
                     action.y,
                     action.move_duration,
@@ -286,56 +577,174 @@ class ComputerDaemon:
             action: DragAction, token: str = Depends(verify_token)
         ) -> Dict[str, bool]:
             return {
-                "success": self._computer.drag(
-                    action.end_x, action.end_y, action.move_duration, action.button
+                "success": await self._executor.run(
+                    INPUT_RESOURCE,
+                    self._computer.drag,
+                    action.end_x,
+                    action.end_y,
+                    action.move_duration,
+                    action.button,
                 )
             }
 
+        @app.post("/execute/batch", response_model=BatchResponse)
+        async def execute_batch(
+            batch: BatchActionRequest, token: str = Depends(verify_token)
+        ) -> Dict[str, Any]:
+            results = await self._execute_batch(batch.actions, batch.stop_on_error)
+            return {
+                "success": len(results) == len(batch.actions)
+                and all(result["success"] for result in results),
+                "results": results,
+            }
+
+        @app.websocket(WEBSOCKET_PATH)
+        async def websocket_endpoint(websocket: WebSocket):
+            authorization = websocket.headers.get("authorization", "")
+            token = authorization.removeprefix("Bearer ").strip()
+            if token != self._api_token:
+                await websocket.close(code=1008)
+                return
+            await websocket.accept()
+            await self._serve_websocket(websocket)
+
         @app.get("/observation")
         async def get_observation(token: str = Depends(verify_token)) -> Dict[str, Any]:
-            return self._computer.get_observation()
+            return await self._executor.run(
+                SCREEN_RESOURCE, self._computer.get_observation
+            )
 
         @app.get("/observation/screenshot")
         async def get_screenshot(
             display_id: int = 0,
             format: Literal["base64", "PIL", "path"] = "PIL",
+            codec: Optional[ScreenshotCodec] = None,
+            quality: Optional[int] = None,
+            scale: float = 1.0,
+            region: Optional[str] = None,
             token: str = Depends(verify_token),
-        ) -> ScreenshotObservation:
-            return self._computer.get_screenshot(display_id, format)
+        ) -> Union[EncodedScreenshotResponse, ScreenshotObservation]:
+            if codec is None:
+                return await self._executor.run(
+                    SCREEN_RESOURCE, self._computer.get_screenshot, display_id, format
+                )
+
+            # The daemon crops, scales and encodes, so only what the client
+            # asked for goes over the wire
+            try:
+                encoding = ScreenshotEncoding(
+                    codec=codec,
+                    quality=quality,
+                    scale=scale,
+                    region=region.split(",") if region else None,
+                )
+            except ValidationError as e:
+                raise HTTPException(status_code=422, detail=e.errors())
+            data, metadata = await self._capture_screenshot(display_id, encoding)
+            return {"screenshot": base64.b64encode(data).decode("utf-8"), **metadata}
+
+        @app.get("/observation/screenshot_delta")
+        async def get_screenshot_delta(
+            display_id: int = 0,
+            block_size: int = 32,
+            session: Optional[str] = None,
+            token: str = Depends(verify_token),
+        ) -> Dict[str, Any]:
+            # Patches are always base64 PNGs so only the changed tiles go over the wire
+            return await self._executor.run(
+                SCREEN_RESOURCE,
+                self._computer.get_screenshot_delta,
+                display_id,
+                block_size,
+                format="base64",
+                session=session,
+            )
+
+        @app.post("/observation/screenshot_delta/reset", response_model=SuccessResponse)
+        async def reset_screenshot_delta(
+            display_id: Optional[int] = None,
+            session: Optional[str] = None,
+            token: str = Depends(verify_token),
+        ) -> Dict[str, bool]:
+            await self._executor.run(
+                SCREEN_RESOURCE,
+                self._computer.reset_screenshot_delta,
+                display_id,
+                session=session,
+            )
+            return {"success": True}
 
         @app.get("/observation/mouse_state")
         async def get_mouse_state(
             token: str = Depends(verify_token),
         ) -> MouseStateObservation:
-            return self._computer.get_mouse_state()
+            return await self._executor.run(None, self._computer.get_mouse_state)
 
         @app.get("/observation/keyboard_state")
         async def get_keyboard_state(
             token: str = Depends(verify_token),
         ) -> KeyboardStateObservation:
-            return self._computer.get_keyboard_state()
+            return await self._executor.run(None, self._computer.get_keyboard_state)
 
         @app.get("/observation/layout_tree")
         async def get_layout_tree(
+            node_id: Optional[str] = None,
+            max_depth: Optional[int] = None,
+            max_children: Optional[int] = None,
+            focused_window_only: bool = False,
             token: str = Depends(verify_token),
         ) -> LayoutTreeObservation:
-            return self._computer.get_layout_tree()
+            return await self._executor.run(
+                None,
+                self._computer.get_layout_tree,
+                node_id=node_id,
+                max_depth=max_depth,
+                max_children=max_children,
+                focused_window_only=focused_window_only,
+            )
+
+        @app.get("/observation/layout_tree_delta")
+        async def get_layout_tree_delta(
+            max_depth: Optional[int] = None,
+            max_children: Optional[int] = None,
+            focused_window_only: bool = False,
+            token: str = Depends(verify_token),
+        ) -> Dict[str, Any]:
+            return await self._executor.run(
+                None,
+                self._computer.get_layout_tree_delta,
+                max_depth=max_depth,
+                max_children=max_children,
+                focused_window_only=focused_window_only,
+            )
+
+        @app.post(
+            "/observation/layout_tree_delta/reset", response_model=SuccessResponse
+        )
+        async def reset_layout_tree_delta(
+            token: str = Depends(verify_token),
+        ) -> Dict[str, bool]:
+            await self._executor.run(None, self._computer.reset_layout_tree_delta)
+            return {"success": True}
 
         @app.get("/observation/processes")
         async def get_processes(
+            fields: Optional[List[str]] = Query(default=None),
             token: str = Depends(verify_token),
         ) -> ProcessesObservation:
-            return self._computer.get_processes()
+            return await self._executor.run(
+                None, self._computer.get_processes, fields=fields
+            )
 
         @app.get("/observation/windows")
         async def get_windows(token: str = Depends(verify_token)) -> WindowsObservation:
-            return self._computer.get_windows()
+            return await self._executor.run(None, self._computer.get_windows)
 
         @app.get("/observation/displays")
         async def get_displays(
             token: str = Depends(verify_token),
         ) -> DisplaysObservation:
-            return self._computer.get_displays()
+            return await self._executor.run(None, self._computer.get_displays)
 
         @app.get("/health")
         async def health_check() -> Dict[str, Any]:
@@ -355,10 +764,12 @@ class ComputerDaemon:
                         "version": getattr(self._computer, "version", "unknown"),
                         "platform": sys_platform.system(),
                         "python_version": sys_platform.python_version(),
-                        "cpu_percent": psutil.cpu_percent(interval=0.1),
+                        # Non-blocking: compares against the previous call
+                        "cpu_percent": psutil.cpu_percent(interval=None),
                         "memory_percent": psutil.virtual_memory().percent,
                     },
                     "computer_responsive": computer_responsive,
+                    "executor": self._executor.stats(),
                 }
             except Exception as e:
                 # If there's an error, we're still "healthy" but we report the
@@ -370,8 +781,11 @@ class ComputerDaemon:
             action: FileCopyToComputerAction, token: str = Depends(verify_token)
         ) -> Dict[str, bool]:
             return {
-                "success": self._computer.copy_to_computer(
-                    action.source_path, action.destination_path
+                "success": await self._executor.run(
+                    None,
+                    self._computer.copy_to_computer,
+                    action.source_path,
+                    action.destination_path,
                 )
             }
 
@@ -380,18 +794,199 @@ class ComputerDaemon:
             action: FileCopyFromComputerAction, token: str = Depends(verify_token)
         ) -> Dict[str, bool]:
             return {
-                "success": self._computer.copy_from_computer(
-                    action.source_path, action.destination_path
+                "success": await self._executor.run(
+                    None,
+                    self._computer.copy_from_computer,
+                    action.source_path,
+                    action.destination_path,
                 )
             }
 
+        def check_compression(compression: Compression = "none") -> Compression:
+            if compression not in available_compressions():
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Compression {compression} is not available, use one "
+                    f"of {available_compressions()}",
+                )
+            return compression
+
+        def check_version(version: str) -> str:
+            # The version becomes part of the name of the partial file
+            if not is_file_version(version):
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Invalid file version {version!r}, expected <size>-<mtime>",
+                )
+            return version
+
+        @app.get("/file/stat", response_model=FileStatResponse)
+        async def file_stat(
+            path: str, token: str = Depends(verify_token)
+        ) -> Dict[str, Any]:
+            return await self._executor.run(None, self._file_stat, Path(path))
+
+        @app.get("/file/download")
+        async def download_file_chunk(
+            path: str,
+            version: str = Depends(check_version),
+            offset: int = Query(default=0, ge=0),
+            length: int = Query(default=CHUNK_SIZE, gt=0, le=CHUNK_SIZE),
+            compression: Compression = Depends(check_compression),
+            token: str = Depends(verify_token),
+        ) -> Response:
+            try:
+                data = await self._executor.run(
+                    None, self._read_file_chunk, Path(path), version, offset, length
+                )
+            except FileNotFoundError as e:
+                raise HTTPException(status_code=404, detail=str(e))
+            except FileChangedError as e:
+                raise HTTPException(status_code=412, detail=str(e))
+            body = await self._executor.run(None, compress, data, compression)
+            return Response(
+                body,
+                media_type="application/octet-stream",
+                headers={"X-Chunk-SHA256": sha256(data)},
+            )
+
+        @app.get("/file/upload", response_model=UploadOffsetResponse)
+        async def get_upload_offset(
+            path: str,
+            version: str = Depends(check_version),
+            token: str = Depends(verify_token),
+        ) -> Dict[str, int]:
+            partial = partial_path(Path(path), version)
+            return {"offset": await self._executor.run(None, resume_offset, partial)}
+
+        @app.put("/file/upload", response_model=UploadOffsetResponse)
+        async def upload_file_chunk(
+            request: Request,
+            path: str,
+            checksum: str,
+            version: str = Depends(check_version),
+            offset: int = Query(ge=0),
+            compression: Compression = Depends(check_compression),
+            token: str = Depends(verify_token),
+        ) -> Dict[str, int]:
+            body = await request.body()
+            data = await self._executor.run(None, decompress, body, compression)
+            if sha256(data) != checksum:
+                raise HTTPException(status_code=422, detail="Chunk checksum mismatch")
+            partial = partial_path(Path(path), version)
+            try:
+                size = await self._executor.run(
+                    None, write_chunk, partial, offset, data
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=409, detail=str(e))
+            return {"offset": size}
+
+        @app.post("/file/upload/complete", response_model=SuccessResponse)
+        async def complete_upload(
+            path: str,
+            size: int,
+            checksum: str,
+            version: str = Depends(check_version),
+            token: str = Depends(verify_token),
+        ) -> Dict[str, bool]:
+            try:
+                await self._executor.run(
+                    None, self._complete_upload, Path(path), version, size, checksum
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=422, detail=str(e))
+            return {"success": True}
+
+        @app.put("/file/write", response_model=FileStatResponse)
+        async def write_file_range(
+            request: Request,
+            path: str,
+            checksum: str,
+            offset: int = Query(ge=0),
+            compression: Compression = Depends(check_compression),
+            token: str = Depends(verify_token),
+        ) -> Dict[str, Any]:
+            body = await request.body()
+            data = await self._executor.run(None, decompress, body, compression)
+            if sha256(data) != checksum:
+                raise HTTPException(status_code=422, detail="Chunk checksum mismatch")
+            return await self._executor.run(
+                None, self._write_file_range, Path(path), offset, data
+            )
+
+        @app.post("/file/truncate", response_model=FileStatResponse)
+        async def truncate_file(
+            path: str, size: int = Query(ge=0), token: str = Depends(verify_token)
+        ) -> Dict[str, Any]:
+            return await self._executor.run(None, self._truncate_file, Path(path), size)
+
+        @app.get("/file/download_tree")
+        async def download_tree(
+            path: str,
+            compression: Compression = Depends(check_compression),
+            token: str = Depends(verify_token),
+        ) -> StreamingResponse:
+            if not await self._executor.run(None, os.path.isdir, path):
+                raise HTTPException(status_code=404, detail=f"No directory at {path}")
+            return StreamingResponse(
+                self._iterate(iter_tar(Path(path), compression)),
+                media_type="application/x-tar",
+            )
+
+        @app.put("/file/upload_tree", response_model=SuccessResponse)
+        async def upload_tree(
+            request: Request,
+            path: str,
+            compression: Compression = Depends(check_compression),
+            token: str = Depends(verify_token),
+        ) -> Dict[str, bool]:
+            loop = asyncio.get_running_loop()
+            received: asyncio.Queue = asyncio.Queue(maxsize=16)
+
+            async def receive():
+                try:
+                    async for data in request.stream():
+                        await received.put(data)
+                    await received.put(None)
+                except asyncio.CancelledError:
+                    raise  # The extraction is over, nothing reads the queue
+                except Exception:
+                    # End the extraction, which fails on the truncated archive
+                    await received.put(None)
+                    raise
+
+            def chunks():
+                get = received.get
+                while data := asyncio.run_coroutine_threadsafe(get(), loop).result():
+                    yield data
+
+            receiving = asyncio.ensure_future(receive())
+            try:
+                await self._run_in_thread(
+                    extract_tar, chunks(), Path(path), compression
+                )
+            except tarfile.TarError as e:
+                raise HTTPException(status_code=400, detail=f"Invalid archive: {e}")
+            finally:
+                receiving.cancel()
+                # Wake the extraction if it still waits for data, e.g. because
+                # the client disconnected, so that its thread ends
+                while not received.empty():
+                    received.get_nowait()
+                received.put_nowait(None)
+            return {"success": True}
+
         @app.post("/jupyter/start_server", response_model=SuccessResponse)
         async def start_jupyter_server(
             action: JupyterStartServerAction, token: str = Depends(verify_token)
         ) -> Dict[str, bool]:
             return {
-                "success": self._computer.start_jupyter_server(
-                    action.port, action.notebook_dir
+                "success": await self._executor.run(
+                    None,
+                    self._computer.start_jupyter_server,
+                    action.port,
+                    action.notebook_dir,
                 )
             }
 
@@ -399,19 +994,31 @@ class ComputerDaemon:
         async def stop_jupyter_server(
             action: JupyterStopServerAction, token: str = Depends(verify_token)
         ) -> Dict[str, bool]:
-            return {"success": self._computer.stop_jupyter_server()}
+            return {
+                "success": await self._executor.run(
+                    None, self._computer.stop_jupyter_server
+                )
+            }
 
         @app.post("/video/start_stream", response_model=SuccessResponse)
         async def start_video_stream(
             action: VideoStartStreamAction, token: str = Depends(verify_token)
         ) -> Dict[str, bool]:
-            return {"success": self._computer.start_video_stream()}
+            return {
+                "success": await self._executor.run(
+                    None, self._computer.start_video_stream
+                )
+            }
 
         @app.post("/video/stop_stream", response_model=SuccessResponse)
         async def stop_video_stream(
             action: VideoStopStreamAction, token: str = Depends(verify_token)
         ) -> Dict[str, bool]:
-            return {"success": self._computer.stop_video_stream()}
+            return {
+                "success": await self._executor.run(
+                    None, self._computer.stop_video_stream
+                )
+            }
 
         @app.get("/video/stream_url", response_model=VideoStreamUrlResponse)
         async def get_video_stream_url(
@@ -423,52 +1030,68 @@ class ComputerDaemon:
         async def start_computer(
             action: ComputerStartAction, token: str = Depends(verify_token)
         ) -> Dict[str, bool]:
-            return {"success": self._computer.start()}
+            return {
+                "success": await self._executor.run(
+                    LIFECYCLE_RESOURCE, self._computer.start
+                )
+            }
 
         @app.post("/computer/stop", response_model=SuccessResponse)
         async def stop_computer(
             action: ComputerStopAction, token: str = Depends(verify_token)
         ) -> Dict[str, bool]:
-            return {"success": self._computer.stop()}
+            return {
+                "success": await self._executor.run(
+                    LIFECYCLE_RESOURCE, self._computer.stop
+                )
+            }
 
         @app.post("/computer/pause", response_model=SuccessResponse)
         async def pause_computer(
             action: ComputerPauseAction, token: str = Depends(verify_token)
         ) -> Dict[str, bool]:
-            return {"success": self._computer.pause()}
+            return {
+                "success": await self._executor.run(
+                    LIFECYCLE_RESOURCE, self._computer.pause
+                )
+            }
 
         @app.post("/computer/resume", response_model=SuccessResponse)
         async def resume_computer(
             action: ComputerResumeAction, token: str = Depends(verify_token)
         ) -> Dict[str, bool]:
-            return {"success": self._computer.resume(action.timeout_hours)}
+            return {
+                "success": await self._executor.run(
+                    LIFECYCLE_RESOURCE, self._computer.resume, action.timeout_hours
+                )
+            }
 
         @app.post("/vnc/start", response_model=MessageResponse)
         async def start_vnc_server(
             action: VncStartServerAction, token: str = Depends(verify_token)
         ) -> Dict[str, Any]:
-            success, message = self.start_vnc_server()
+            success, message = await self._executor.run(None, self.start_vnc_server)
             return {"success": success, "message": message}
 
         @app.post("/vnc/stop", response_model=MessageResponse)
         async def stop_vnc_server(
             action: VncStopServerAction, token: str = Depends(verify_token)
         ) -> Dict[str, Any]:
-            success, message = self.stop_vnc_server()
+            success, message = await self._executor.run(None, self.stop_vnc_server)
             return {"success": success, "message": message}
 
         @app.post("/rdp/start", response_model=MessageResponse)
         async def start_rdp_server(
             action: RdpStartServerAction, token: str = Depends(verify_token)
         ) -> Dict[str, Any]:
-            success, message = self.start_rdp_server()
+            success, message = await self._executor.run(None, self.start_rdp_server)
             return {"success": success, "message": message}
 
         @app.post("/rdp/stop", response_model=MessageResponse)
         async def stop_rdp_server(
             action: RdpStopServerAction, token: str = Depends(verify_token)
         ) -> Dict[str, Any]:
-            success, message = self.stop_rdp_server()
+            success, message = await self._executor.run(None, self.stop_rdp_server)
             return {"success": success, "message": message}
 
         @app.post("/mcp/start", response_model=MessageResponse)
@@ -502,6 +1125,409 @@ class ComputerDaemon:
 
         return app
 
+    async def _serve_websocket(self, websocket: WebSocket):
+        """Serve requests from a client connected to the WebSocket endpoint.
+
+        Each request is handled in its own task so a slow call (e.g. a shell
+        command) doesn't hold up the others; responses carry the request id.
+        Images are sent as binary frames (see encode_binary_frame) instead of
+        base64 JSON.
+        """
+        send_lock = asyncio.Lock()
+        tasks: set[asyncio.Task] = set()
+        screen_task: Optional[asyncio.Task] = None
+
+        async def send(header: Dict[str, Any], payload: Optional[bytes] = None):
+            async with send_lock:
+                if payload is None:
+                    await websocket.send_text(json.dumps(header))
+                else:
+                    await websocket.send_bytes(encode_binary_frame(header, payload))
+
+        async def push_screen(
+            display_id: int, interval: float, encoding: ScreenshotEncoding
+        ):
+            nonlocal screen_task
+            previous = None
+            try:
+                while True:
+                    frame = await self._executor.run(
+                        SCREEN_RESOURCE,
+                        self._computer._get_screenshot_ndarray,
+                        display_id,
+                    )
+                    hashes = await self._executor.run(None, block_hashes, frame)
+                    changed = diff_block_hashes(previous, hashes)
+                    if changed is None or changed.any():
+                        previous = hashes
+                        data, metadata = await self._executor.run(
+                            None, encode_frame, frame, **encoding.model_dump()
+                        )
+                        header = {
+                            "type": "screen_update",
+                            "display_id": display_id,
+                            **metadata,
+                        }
+                        await send(header, data)
+                    await asyncio.sleep(interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(f"Screen updates for display {display_id} failed")
+                if screen_task is asyncio.current_task():
+                    screen_task = None
+                try:
+                    await send({"type": "screen_closed", "error": str(e)})
+                except Exception:
+                    pass  # The client is gone too
+
+        async def handle(message: Dict[str, Any]):
+            nonlocal screen_task
+            request_id = message.get("id")
+            try:
+                if message.get("type") == "subscribe_screen":
+                    if screen_task is not None:
+                        screen_task.cancel()
+                    screen_task = asyncio.create_task(
+                        push_screen(
+                            message.get("display_id", 0),
+                            message.get("interval", 0.5),
+                            ScreenshotEncoding.model_validate(message),
+                        )
+                    )
+                    await send({"id": request_id, "success": True})
+                elif message.get("type") == "unsubscribe_screen":
+                    if screen_task is not None:
+                        screen_task.cancel()
+                        screen_task = None
+                    await send({"id": request_id, "success": True})
+                else:
+                    await send(*await self._handle_websocket_request(message))
+            except ValidationError as e:
+                await send(
+                    {
+                        "id": request_id,
+                        "type": "error",
+                        "error": f"Invalid request: {e}",
+                    }
+                )
+            except Exception as e:
+                await send({"id": request_id, "type": "error", "error": str(e)})
+
+        try:
+            while True:
+                try:
+                    message = json.loads(await websocket.receive_text())
+                except json.JSONDecodeError as e:
+                    await send({"type": "error", "error": f"Invalid JSON: {e}"})
+                    continue
+                if not isinstance(message, dict):
+                    await send(
+                        {"type": "error", "error": "Requests must be JSON objects"}
+                    )
+                    continue
+                task = asyncio.create_task(handle(message))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            for task in [*tasks, screen_task]:
+                if task is not None:
+                    task.cancel()
+
+    async def _handle_websocket_request(
+        self, message: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], Optional[bytes]]:
+        """Run a single WebSocket request on the computer.
+
+        Returns:
+            Tuple[Dict[str, Any], Optional[bytes]]: The response header and,
+            for screenshots, the PNG payload to send as a binary frame
+        """
+        request_id = message.get("id")
+        request_type = message.get("type")
+
+        if request_type == "batch":
+            batch = BatchActionRequest.model_validate(message)
+            results = await self._execute_batch(batch.actions, batch.stop_on_error)
+            success = len(results) == len(batch.actions) and all(
+                result["success"] for result in results
+            )
+            return {"id": request_id, "success": success, "results": results}, None
+
+        if request_type == "screenshot":
+            display_id = message.get("display_id", 0)
+            data, metadata = await self._capture_screenshot(
+                display_id, ScreenshotEncoding.model_validate(message)
+            )
+            header = {"id": request_id, "type": "screenshot", "display_id": display_id}
+            return {**header, **metadata}, data
+
+        if request_type == "observation" and message.get("name") in (
+            WEBSOCKET_OBSERVATIONS
+        ):
+            getter = getattr(self._computer, f"get_{message['name']}")
+            result = await self._executor.run(None, getter)
+            return {"id": request_id, "result": jsonable_encoder(result)}, None
+
+        raise ValueError(f"Unsupported WebSocket request: {request_type}")
+
+    async def _capture_screenshot(
+        self, display_id: int, encoding: ScreenshotEncoding
+    ) -> Tuple[bytes, Dict[str, Any]]:
+        """Take a screenshot and encode it as requested.
+
+        Only the capture holds the screen resource; encoding runs concurrently
+        with other calls.
+        """
+        frame = await self._executor.run(
+            SCREEN_RESOURCE, self._computer._get_screenshot_ndarray, display_id
+        )
+        return await self._executor.run(
+            None, encode_frame, frame, **encoding.model_dump()
+        )
+
+    async def _run_in_thread(self, func: Callable, *args) -> Any:
+        """Run a blocking call in a thread of its own and await its result.
+
+        For calls that last as long as a transfer, which would otherwise hold
+        a worker of the executor (see _iterate).
+        """
+        future: concurrent.futures.Future = concurrent.futures.Future()
+
+        def run():
+            try:
+                future.set_result(func(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name="daemon-transfer", daemon=True).start()
+        return await asyncio.wrap_future(future)
+
+    async def _iterate(
+        self, items: Iterator[Any], cancel: Optional[threading.Event] = None
+    ) -> AsyncIterator[Any]:
+        """Yield the items of a blocking generator, which runs in a thread of
+        its own.
+
+        A stream lasts as long as its command or transfer, so it doesn't hold
+        a worker of the executor, which would starve the other routes. The
+        thread reads at most STREAM_READ_AHEAD items ahead of the consumer, so
+        only what has been produced but not yet sent is held in memory.
+
+        If the consumer stops early (e.g. the client disconnects), cancel is
+        set, so a generator that waits for something (e.g. a quiet command)
+        can stop waiting, and the generator is closed as soon as the read in
+        progress returns.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        room = threading.Semaphore(STREAM_READ_AHEAD)
+        stopped = threading.Event()
+
+        def send(kind: str, value: Any = None):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, (kind, value))
+            except RuntimeError:
+                # The event loop is closed, so nobody is waiting anymore
+                pass
+
+        def produce():
+            try:
+                while True:
+                    room.acquire()
+                    if stopped.is_set():
+                        return
+                    try:
+                        item = next(items)
+                    except StopIteration:
+                        send("end")
+                        return
+                    send("item", item)
+            except Exception as e:
+                send("error", e)
+            finally:
+                items.close()
+
+        threading.Thread(target=produce, name="daemon-stream", daemon=True).start()
+        try:
+            while True:
+                kind, value = await queue.get()
+                room.release()
+                if kind == "end":
+                    return
+                if kind == "error":
+                    raise value
+                yield value
+        finally:
+            stopped.set()
+            if cancel is not None:
+                cancel.set()
+            # Wake the thread if it waits for room
+            room.release()
+
+    async def _stream_output(
+        self, events: Iterator[OutputEvent], cancel: Optional[threading.Event] = None
+    ) -> AsyncIterator[bytes]:
+        """Send output events from the computer as server-sent events.
+
+        When the client disconnects, cancel is set, which kills the process
+        right away instead of after its next output.
+        """
+        try:
+            async for event in self._iterate(events, cancel):
+                yield encode_sse_event(event)
+        except Exception as e:
+            yield encode_sse_error(str(e))
+
+    @staticmethod
+    def _file_stat(path: Path) -> Dict[str, Any]:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return {"exists": False}
+        is_dir = path.is_dir()
+        return {
+            "exists": True,
+            "is_dir": is_dir,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "version": None if is_dir else file_version(path),
+        }
+
+    @staticmethod
+    def _read_file_chunk(path: Path, version: str, offset: int, length: int) -> bytes:
+        """Read a chunk of a file, as long as the file is still at version."""
+        if file_version(path) != version:
+            raise FileChangedError(f"{path} changed since version {version}")
+        return read_chunk(path, offset, length)
+
+    @classmethod
+    def _write_file_range(cls, path: Path, offset: int, data: bytes) -> Dict[str, Any]:
+        """Write data into a file in place, creating the file if needed."""
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0))
+        with open(fd, "r+b") as f:
+            f.seek(offset)
+            f.write(data)
+        return cls._file_stat(path)
+
+    @classmethod
+    def _truncate_file(cls, path: Path, size: int) -> Dict[str, Any]:
+        """Resize a file, creating it if needed."""
+        with open(path, "ab") as f:
+            f.truncate(size)
+        return cls._file_stat(path)
+
+    @staticmethod
+    def _complete_upload(path: Path, version: str, size: int, checksum: str):
+        """Check an uploaded file and move it into place.
+
+        Raises:
+            ValueError: If the file doesn't match the size or checksum, in which
+                case the upload starts over
+        """
+        partial = partial_path(path, version)
+        if size == 0:
+            write_chunk(partial, 0, b"")
+        if not partial.exists() or partial.stat().st_size != size:
+            raise ValueError(f"Upload of {path} is incomplete")
+        if file_sha256(partial) != checksum:
+            partial.unlink()
+            raise ValueError(f"Upload of {path} doesn't match its checksum")
+        os.replace(partial, path)
+        remove_stale_partials(path)
+
+    async def _execute_batch(
+        self, actions: List[BatchableAction], stop_on_error: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Execute a list of actions in order on the computer.
+
+        Each action holds the executor resource for its own type while it
+        runs, so a long shell command in a batch doesn't block input
+        requests, and vice versa.
+
+        Args:
+            actions: The actions to execute
+            stop_on_error: Whether to skip the remaining actions once one fails
+
+        Returns:
+            List[Dict[str, Any]]: One result per action that was executed, with
+            a success flag and either the action's return value or the error
+            message if the action raised
+        """
+        results = []
+        for action in actions:
+            try:
+                result = await self._executor.run(
+                    self._action_resource(action), self._execute_action, action
+                )
+            except Exception as e:
+                results.append({"success": False, "error": str(e)})
+                if stop_on_error:
+                    break
+            else:
+                results.append({"success": True, "result": jsonable_encoder(result)})
+        return results
+
+    @staticmethod
+    def _action_resource(action: BatchableAction) -> Optional[str]:
+        """Return the executor resource an action must hold while it runs."""
+        if isinstance(action, (ShellCommandAction, RunProcessAction)):
+            # Matches the /execute/shell and /execute/run_process endpoints
+            return None
+        return INPUT_RESOURCE
+
+    def _execute_action(self, action: BatchableAction) -> Any:
+        """Dispatch a single action to the matching computer method."""
+        computer = self._computer
+        if isinstance(action, ShellCommandAction):
+            return computer.shell(action.command, action.timeout, action.executible)
+        if isinstance(action, KeyboardKeyPressAction):
+            return computer.keypress(action.key, action.duration)
+        if isinstance(action, KeyboardKeyDownAction):
+            return computer.keydown(action.key)
+        if isinstance(action, KeyboardKeyReleaseAction):
+            return computer.keyup(action.key)
+        if isinstance(action, KeyboardHotkeyAction):
+            return computer.hotkey(action.keys)
+        if isinstance(action, TypeAction):
+            return computer.type(action.text)
+        if isinstance(action, MouseMoveAction):
+            return computer.move(action.x, action.y, action.move_duration)
+        if isinstance(action, MouseScrollAction):
+            return computer.scroll(action.amount)
+        if isinstance(action, MouseButtonDownAction):
+            return computer.mouse_down(action.button)
+        if isinstance(action, MouseButtonUpAction):
+            return computer.mouse_up(action.button)
+        if isinstance(action, ClickAction):
+            return computer.click(
+                action.x,
+                action.y,
+                action.move_duration,
+                action.press_duration,
+                action.button,
+            )
+        if isinstance(action, DoubleClickAction):
+            return computer.double_click(
+                action.x,
+                action.y,
+                action.move_duration,
+                action.press_duration,
+                action.button,
+                action.double_click_interval_seconds,
+            )
+        if isinstance(action, DragAction):
+            return computer.drag(
+                action.end_x, action.end_y, action.move_duration, action.button
+            )
+        if isinstance(action, RunProcessAction):
+            return computer.run_process(
+                action.command, action.args, action.cwd, action.env, action.timeout
+            )
+        raise ValueError(f"Unsupported batch action: {action.action_type}")
+
     _uvicorn_server_thread: threading.Thread | None = None
 
     def start_fastapi_server(self, host="0.0.0.0", port=8000) -> Tuple[bool, str]:
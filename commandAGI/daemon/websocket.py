@@ -0,0 +1,246 @@
+import itertools
+import json
+import logging
+import struct
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Binary frames are: 4-byte big-endian header length, JSON header, raw payload
+_HEADER_LENGTH = struct.Struct("!I")
+
+WEBSOCKET_PATH = "/ws"
+
+
+class RequestNotSentError(ConnectionError):
+    """Raised when the connection closed before a request could be sent, so
+    the daemon never received it and it is safe to send again."""
+
+
+def encode_binary_frame(header: Dict[str, Any], payload: bytes) -> bytes:
+    """Pack a JSON header and a binary payload into a single WebSocket frame.
+
+    Args:
+        header: JSON-serializable message header
+        payload: Raw bytes sent after the header (e.g. a PNG image)
+
+    Returns:
+        bytes: The encoded frame
+
+    Examples:
+        >>> decode_binary_frame(encode_binary_frame({"id": 1}, b"png"))
+        ({'id': 1}, b'png')
+    """
+    header_bytes = json.dumps(header).encode("utf-8")
+    return _HEADER_LENGTH.pack(len(header_bytes)) + header_bytes + payload
+
+
+def decode_binary_frame(frame: bytes) -> Tuple[Dict[str, Any], bytes]:
+    """Split a frame produced by encode_binary_frame into header and payload.
+
+    Args:
+        frame: The encoded frame
+
+    Returns:
+        Tuple[Dict[str, Any], bytes]: The JSON header and the raw payload
+    """
+    (header_length,) = _HEADER_LENGTH.unpack_from(frame)
+    start = _HEADER_LENGTH.size
+    header = json.loads(frame[start : start + header_length])
+    return header, bytes(frame[start + header_length :])
+
+
+def websocket_url(daemon_url: str) -> str:
+    """Get the WebSocket URL of a daemon from its HTTP base URL.
+
+    Examples:
+        >>> websocket_url("https://vm.example.com:8000/")
+        'wss://vm.example.com:8000/ws'
+    """
+    url = daemon_url.rstrip("/")
+    if url.startswith("https://"):
+        url = "wss://" + url[len("https://") :]
+    elif url.startswith("http://"):
+        url = "ws://" + url[len("http://") :]
+    return url + WEBSOCKET_PATH
+
+
+class DaemonWebSocketClient:
+    """A persistent WebSocket connection to a ComputerDaemon.
+
+    Requests are JSON text messages tagged with an id. The daemon answers each
+    one with either a JSON text message or, for images, a binary frame (see
+    encode_binary_frame) carrying the same id, so several requests may be in
+    flight at once. Screen updates pushed by the daemon carry no id and are
+    passed to the callback given to subscribe_screen, until the daemon reports
+    that they stopped.
+
+    Args:
+        url: WebSocket URL of the daemon (see websocket_url)
+        token: API token of the daemon
+        timeout: Seconds to wait for the handshake and for each response
+    """
+
+    def __init__(self, url: str, token: str, timeout: float = 30.0):
+        self.url = url
+        self.token = token
+        self.timeout = timeout
+        self.logger = logging.getLogger(__name__)
+        self._connection = None
+        self._reader_thread: Optional[threading.Thread] = None
+        self._send_lock = threading.Lock()
+        self._pending: Dict[int, Future] = {}
+        self._pending_lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._screen_callback: Optional[Callable[[Dict[str, Any], bytes], None]] = None
+
+    def connect(self):
+        """Open the connection and start reading responses.
+
+        Raises:
+            ImportError: If the websockets package is not installed
+            Exception: If the daemon refuses the connection (e.g. it predates
+                the WebSocket endpoint or the token is wrong)
+        """
+        from websockets.sync.client import connect
+
+        self._connection = connect(
+            self.url,
+            additional_headers={"Authorization": f"Bearer {self.token}"},
+            open_timeout=self.timeout,
+            max_size=None,
+        )
+        self._reader_thread = threading.Thread(
+            target=self._read_loop, name="commandagi-daemon-ws", daemon=True
+        )
+        self._reader_thread.start()
+
+    @property
+    def connected(self) -> bool:
+        return self._reader_thread is not None and self._reader_thread.is_alive()
+
+    def request(self, message: Dict[str, Any]) -> Tuple[Dict[str, Any], bytes]:
+        """Send a request and wait for the daemon's response.
+
+        Args:
+            message: The request, e.g. {"type": "screenshot", "display_id": 0}
+
+        Returns:
+            Tuple[Dict[str, Any], bytes]: The response header and its binary
+            payload (empty for JSON responses)
+
+        Raises:
+            RequestNotSentError: If the connection is closed before the request
+                is sent
+            ConnectionError: If the connection closes after the request was
+                sent, so the daemon may have acted on it
+            RuntimeError: If the daemon reports an error
+            TimeoutError: If no response arrives within the timeout
+        """
+        if not self.connected:
+            raise RequestNotSentError("WebSocket connection to daemon is closed")
+
+        request_id = next(self._ids)
+        future = Future()
+        with self._pending_lock:
+            self._pending[request_id] = future
+        try:
+            try:
+                self._send({**message, "id": request_id})
+            except Exception as e:
+                from websockets.exceptions import ConnectionClosed
+
+                if isinstance(e, ConnectionClosed):
+                    raise RequestNotSentError(
+                        "WebSocket connection to daemon is closed"
+                    ) from e
+                raise
+            header, payload = future.result(timeout=self.timeout)
+        finally:
+            with self._pending_lock:
+                self._pending.pop(request_id, None)
+
+        if header.get("type") == "error":
+            raise RuntimeError(f"Daemon error: {header['error']}")
+        return header, payload
+
+    def subscribe_screen(
+        self,
+        callback: Callable[[Dict[str, Any], bytes], None],
+        display_id: int = 0,
+        interval: float = 0.5,
+        encoding: Optional[Dict[str, Any]] = None,
+    ):
+        """Ask the daemon to push an image of the screen whenever it changes.
+
+        Args:
+            callback: Called from the reader thread with the update header
+                (display_id and the encoding metadata) and the image bytes
+            display_id: ID of the display to watch
+            interval: Seconds between checks for changes
+            encoding: Optional codec, quality, scale and region for the
+                images (see encode_screenshot). Defaults to full-size PNG.
+        """
+        self._screen_callback = callback
+        self.request(
+            {
+                "type": "subscribe_screen",
+                "display_id": display_id,
+                "interval": interval,
+                **(encoding or {}),
+            }
+        )
+
+    def unsubscribe_screen(self):
+        """Stop the screen updates started by subscribe_screen."""
+        self.request({"type": "unsubscribe_screen"})
+        self._screen_callback = None
+
+    def close(self):
+        """Close the connection, failing any requests still waiting."""
+        if self._connection is not None:
+            self._connection.close()
+        if self._reader_thread is not None:
+            self._reader_thread.join(timeout=self.timeout)
+
+    def _send(self, message: Dict[str, Any]):
+        with self._send_lock:
+            self._connection.send(json.dumps(message))
+
+    def _read_loop(self):
+        try:
+            for message in self._connection:
+                if isinstance(message, bytes):
+                    header, payload = decode_binary_frame(message)
+                else:
+                    header, payload = json.loads(message), b""
+                self._dispatch(header, payload)
+        except Exception as e:
+            self.logger.debug(f"WebSocket connection to daemon closed: {e}")
+        finally:
+            with self._pending_lock:
+                pending = list(self._pending.values())
+                self._pending.clear()
+            for future in pending:
+                if not future.done():
+                    future.set_exception(
+                        ConnectionError("WebSocket connection to daemon closed")
+                    )
+
+    def _dispatch(self, header: Dict[str, Any], payload: bytes):
+        request_id = header.get("id")
+        if request_id is None:
+            if header.get("type") == "screen_closed":
+                self.logger.warning(f"Daemon stopped screen updates: {header['error']}")
+                self._screen_callback = None
+            elif header.get("type") == "screen_update" and self._screen_callback:
+                try:
+                    self._screen_callback(header, payload)
+                except Exception as e:
+                    self.logger.error(f"Error in screen update callback: {e}")
+            return
+
+        with self._pending_lock:
+            future = self._pending.get(request_id)
+        if future is not None and not future.done():
+            future.set_result((header, payload))
@@ -5,11 +5,13 @@ This package contains the gym framework for training and evaluating agents that
 """
 
 from commandAGI.gym.agents.base_agent import BaseAgent
+from commandAGI.gym.dataset import EpisodeDataset
 from commandAGI.gym.drivers import (
     BaseDriver,
     MultiprocessDriver,
     SimpleDriver,
     ThreadedDriver,
+    VectorDriver,
 )
 
 # Import core components
@@ -28,8 +30,10 @@ __all__ = [
     "SimpleDriver",
     "ThreadedDriver",
     "MultiprocessDriver",
+    "VectorDriver",
     "BaseTrainer",
     "OnlineTrainer",
     "OfflineTrainer",
     "BatchTrainer",
+    "EpisodeDataset",
 ]
@@ -27,6 +27,21 @@ class BaseAgent(BaseModel, Generic[ObsType, ActionType], ABC):
             ActionType: The chosen action.
         """
 
+    def act_batch(self, observations: list[ObsType]) -> list[ActionType]:
+        """Determine the next action for several environments at once.
+
+        Used by VectorDriver to make one call for all the environments it
+        steps together. Override this to run the policy on the whole batch
+        at once (e.g. one forward pass or one batched model request).
+
+        Args:
+            observations (list[ObsType]): One observation per environment.
+
+        Returns:
+            list[ActionType]: The chosen actions, in the same order.
+        """
+        return [self.act(observation) for observation in observations]
+
     @abstractmethod
     def update(self, reward: float) -> None:
         """Update the agent's internal state based on the reward."""
@@ -4,7 +4,7 @@ from collections.abc import Callable
 from textwrap import dedent
 from typing import List, Optional
 
-from langchain.schema import ChatMessage
+from langchain_core.messages import ChatMessage
 from langchain_core.output_parsers.string import StrOutputParser
 from pydantic import Field
 from rich.console import Console
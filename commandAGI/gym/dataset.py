@@ -0,0 +1,302 @@
+import base64
+import io
+import os
+import queue
+import random
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+from commandAGI.gym.episode_store import SegmentedLogEpisode
+from commandAGI.gym.schema import Episode, Step
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None  # PIL is optional
+
+_END = object()
+
+
+def _find_screenshot(observation: Any) -> Any:
+    """Get the screenshot out of an observation, if it has one.
+
+    Handles ComputerObservation dicts (whose screenshot is a
+    ScreenshotObservation or its dict dump) as well as plain dicts and
+    objects with a screenshot field.
+    """
+    for _ in range(2):
+        if isinstance(observation, dict):
+            observation = observation.get("screenshot")
+        elif hasattr(observation, "screenshot"):
+            observation = observation.screenshot
+        if observation is None or isinstance(observation, (str, bytes, np.ndarray)):
+            return observation
+        if Image is not None and isinstance(observation, Image.Image):
+            return observation
+    return None
+
+
+def decode_image(
+    image: Any,
+    size: Optional[tuple[int, int]] = None,
+    grayscale: bool = False,
+) -> np.ndarray:
+    """Decode a screenshot into a uint8 array.
+
+    Args:
+        image: Base64 string, encoded bytes, PIL Image or array
+        size: Optional (width, height) to resize to
+        grayscale: Convert to a single channel instead of RGB
+
+    Returns:
+        np.ndarray: (H, W, 3) RGB or, with grayscale, (H, W) array
+    """
+    if isinstance(image, np.ndarray):
+        image = Image.fromarray(image)
+    elif isinstance(image, str):
+        image = Image.open(io.BytesIO(base64.b64decode(image)))
+    elif isinstance(image, bytes):
+        image = Image.open(io.BytesIO(image))
+    image = image.convert("L" if grayscale else "RGB")
+    if size is not None and image.size != tuple(size):
+        image = image.resize(tuple(size), Image.BILINEAR)
+    return np.asarray(image, dtype=np.uint8)
+
+
+class DecodeStep:
+    """Default step transform of EpisodeDataset.
+
+    Decodes the screenshot of the observation (resized to image_size so all
+    samples share a shape) and keeps the reward. Actions are agent specific,
+    so to train on them pass a transform that encodes them as arrays.
+
+    Args:
+        image_size: (width, height) screenshots are resized to
+        grayscale: Decode screenshots to a single channel
+
+    Examples:
+        >>> sample = DecodeStep(image_size=(8, 4))(
+        ...     Step(observation={"screenshot": np.zeros((10, 10, 3), np.uint8)},
+        ...          action=None, reward=1.0, info={})
+        ... )
+        >>> sample["screenshot"].shape, sample["reward"].dtype
+        ((4, 8, 3), dtype('float32'))
+    """
+
+    def __init__(
+        self, image_size: Optional[tuple[int, int]] = None, grayscale: bool = False
+    ):
+        self.image_size = image_size
+        self.grayscale = grayscale
+
+    def __call__(self, step: Step) -> Dict[str, np.ndarray]:
+        sample = {"reward": np.float32(step.reward)}
+        screenshot = _find_screenshot(step.observation)
+        if screenshot is not None:
+            sample["screenshot"] = decode_image(
+                screenshot, self.image_size, self.grayscale
+            )
+        return sample
+
+
+def collate(samples: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Stack samples into a batch with one array per key.
+
+    Raises:
+        ValueError: If the samples don't all have the same keys and shapes
+    """
+    batch = {}
+    for key in samples[0]:
+        try:
+            batch[key] = np.stack([np.asarray(sample[key]) for sample in samples])
+        except (KeyError, ValueError) as e:
+            raise ValueError(
+                f"Samples must have the same fields and shapes to be batched, "
+                f"{key!r} does not (set image_size for screenshots)"
+            ) from e
+    return batch
+
+
+class EpisodeDataset:
+    """Streams training batches from recorded episodes on disk.
+
+    Steps are read one episode at a time, so memory use is bounded by the
+    shuffle buffer and the prefetched batches rather than the dataset size.
+    A background thread reads the steps and hands them to a pool of
+    num_workers threads that run transform (decoding screenshots), so the
+    training loop only collates finished samples.
+
+    Episodes are split between shards by their position in the episode list,
+    so with the same list every worker or node can compute its own shard.
+    Within a shard the episode order and the shuffle buffer are seeded by
+    seed and the epoch (see set_epoch), which makes every epoch
+    reproducible.
+
+    Args:
+        episodes: Episode directories (opened with open_episode) or Episodes
+        batch_size: Number of samples per batch
+        transform: Turns a Step into a dict of arrays, defaults to DecodeStep
+        shuffle_buffer: Number of steps shuffled together, 0 keeps the
+            recorded order
+        seed: Seed of the shuffling
+        num_shards: Total number of shards, e.g. workers times nodes
+        shard_index: The shard this dataset reads
+        num_workers: Threads running transform
+        prefetch_batches: Batches prepared ahead of the training loop
+        drop_last: Drop the last batch if it's smaller than batch_size
+        open_episode: Opens an episode directory, defaults to
+            SegmentedLogEpisode
+
+    Examples:
+        >>> dataset = EpisodeDataset.from_directory(  # doctest: +SKIP
+        ...     "recordings", batch_size=64, transform=DecodeStep((224, 224)),
+        ...     num_shards=world_size, shard_index=rank,
+        ... )
+        >>> for epoch in range(10):  # doctest: +SKIP
+        ...     dataset.set_epoch(epoch)
+        ...     for batch in dataset:
+        ...         train_step(batch["screenshot"], batch["reward"])
+    """
+
+    def __init__(
+        self,
+        episodes: Sequence[Union[str, Episode]],
+        batch_size: int = 32,
+        transform: Optional[Callable[[Step], Dict[str, Any]]] = None,
+        shuffle_buffer: int = 1000,
+        seed: int = 0,
+        num_shards: int = 1,
+        shard_index: int = 0,
+        num_workers: int = 4,
+        prefetch_batches: int = 2,
+        drop_last: bool = True,
+        open_episode: Optional[Callable[[str], Episode]] = None,
+    ):
+        if not 0 <= shard_index < num_shards:
+            raise ValueError(
+                f"shard_index must be in [0, {num_shards}), got {shard_index}"
+            )
+        self.episodes = list(episodes)
+        self.batch_size = batch_size
+        self.transform = transform or DecodeStep()
+        self.shuffle_buffer = shuffle_buffer
+        self.seed = seed
+        self.num_shards = num_shards
+        self.shard_index = shard_index
+        self.num_workers = num_workers
+        self.prefetch_batches = prefetch_batches
+        self.drop_last = drop_last
+        self.open_episode = open_episode or SegmentedLogEpisode
+        self.epoch = 0
+
+    @classmethod
+    def from_directory(cls, directory: str, **kwargs) -> "EpisodeDataset":
+        """Create a dataset of all episodes saved in subdirectories of directory."""
+        episodes = sorted(
+            os.path.join(directory, name)
+            for name in os.listdir(directory)
+            if os.path.isfile(os.path.join(directory, name, "index.bin"))
+        )
+        return cls(episodes, **kwargs)
+
+    def set_epoch(self, epoch: int):
+        """Set the epoch, which changes the shuffling of the next iteration."""
+        self.epoch = epoch
+
+    def shard_episodes(self) -> List[Union[str, Episode]]:
+        """Get the episodes of this shard, in the order they're read."""
+        episodes = self.episodes[self.shard_index :: self.num_shards]
+        if self.shuffle_buffer:
+            random.Random(self._epoch_seed()).shuffle(episodes)
+        return episodes
+
+    def iter_steps(self) -> Iterator[Step]:
+        """Iterate over the steps of this shard, shuffled but not transformed."""
+        if not self.shuffle_buffer:
+            yield from self._read_steps()
+            return
+        rng = random.Random(self._epoch_seed() + 1)
+        buffer = []
+        for step in self._read_steps():
+            if len(buffer) < self.shuffle_buffer:
+                buffer.append(step)
+                continue
+            # Swap a random buffered step out for the new one
+            i = rng.randrange(len(buffer))
+            buffer[i], step = step, buffer[i]
+            yield step
+        rng.shuffle(buffer)
+        yield from buffer
+
+    def __iter__(self) -> Iterator[Dict[str, np.ndarray]]:
+        """Iterate over batches of transformed steps.
+
+        Yields:
+            Dict[str, np.ndarray]: One array per transform field, stacked
+            along a leading batch dimension
+        """
+        futures: queue.Queue = queue.Queue(
+            maxsize=max(1, self.prefetch_batches) * self.batch_size
+        )
+        stop = threading.Event()
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, self.num_workers), thread_name_prefix="episode-decode"
+        )
+
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    futures.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def produce():
+            try:
+                for step in self.iter_steps():
+                    if not put(executor.submit(self.transform, step)):
+                        return
+            except BaseException as e:
+                failed: Future = Future()
+                failed.set_exception(e)
+                put(failed)
+            put(_END)
+
+        reader = threading.Thread(target=produce, name="episode-reader", daemon=True)
+        reader.start()
+        try:
+            samples = []
+            while True:
+                future = futures.get()
+                if future is _END:
+                    break
+                samples.append(future.result())
+                if len(samples) == self.batch_size:
+                    yield collate(samples)
+                    samples = []
+            if samples and not self.drop_last:
+                yield collate(samples)
+        finally:
+            stop.set()
+            reader.join()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _epoch_seed(self) -> int:
+        return self.seed * 1_000_003 + self.epoch
+
+    def _read_steps(self) -> Iterator[Step]:
+        for source in self.shard_episodes():
+            if not isinstance(source, str):
+                yield from source
+                continue
+            episode = self.open_episode(source)
+            try:
+                yield from episode
+            finally:
+                close = getattr(episode, "close", None)
+                if close is not None:
+                    close()
@@ -1,12 +1,24 @@
 import multiprocessing as mp
+import queue
+import threading
+import time
 from abc import ABC, abstractmethod
-from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
-from typing import Generic, List
+from concurrent.futures import (
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import TYPE_CHECKING, Callable, Generic, List, Literal, Optional
 
 from commandAGI.gym.agents.base_agent import BaseAgent
 from commandAGI.gym.environments.base_env import BaseEnv
 from commandAGI.gym.schema import ActionType, Episode, InMemoryEpisode, ObsType, Step
 
+if TYPE_CHECKING:
+    from commandAGI.computers.base_computer import BaseComputer
+    from commandAGI.gym.environments.computer_env import ComputerEnvConfig
+
 
 class BaseDriver(Generic[ObsType, ActionType], ABC):
     """Abstract base class for drivers."""
@@ -92,3 +104,297 @@ class MultiprocessDriver(BaseDriver[ObsType, ActionType]):
 
     def collect_episode(self) -> Episode[ObsType, ActionType]:
         return super().collect_episode()
+
+
+class _ActBatcher(Generic[ObsType, ActionType]):
+    """Groups act calls from several threads into act_batch calls."""
+
+    def __init__(
+        self,
+        agent: BaseAgent[ObsType, ActionType],
+        max_batch_size: int,
+        max_wait: float,
+    ):
+        self.agent = agent
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._requests: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run, name="commandagi-act-batcher", daemon=True
+        )
+        self._thread.start()
+
+    def act(self, observation: ObsType) -> ActionType:
+        future = Future()
+        self._requests.put((observation, future))
+        return future.result()
+
+    def close(self):
+        self._requests.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            request = self._requests.get()
+            if request is None:
+                return
+            batch = [request]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < max(1, self.max_batch_size):
+                try:
+                    request = self._requests.get(
+                        timeout=max(0, deadline - time.monotonic())
+                    )
+                except queue.Empty:
+                    break
+                if request is None:
+                    self._requests.put(None)
+                    break
+                batch.append(request)
+
+            try:
+                actions = self.agent.act_batch(
+                    [observation for observation, _ in batch]
+                )
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), action in zip(batch, actions):
+                future.set_result(action)
+
+
+class VectorDriver(BaseDriver[ObsType, ActionType]):
+    """Driver that steps several independent environments in parallel.
+
+    Every environment is created by env_factory, so each one owns its own
+    computer and rollouts never share state. Environment calls run on a
+    thread pool since they mostly wait on I/O (screenshots, daemon
+    requests, model APIs).
+
+    In "sync" mode all environments step in lockstep: their observations are
+    passed to one agent.act_batch call and the resulting actions are executed
+    in parallel. In "async" mode every environment runs its own loop and
+    never waits for slower ones; their act calls are still grouped into
+    act_batch calls, waiting at most batch_wait seconds to fill a batch.
+    With agent_factory each environment gets its own agent instead, which
+    is needed for agents that keep per-episode state; act calls are then not
+    batched.
+
+    Args:
+        env_factory: Called with an index in range(num_envs) to create each
+            environment
+        num_envs: Number of environments to run
+        agent: Agent shared by all environments
+        agent_factory: Called with an environment index to create a
+            separate agent for each environment
+        episode_cls: Episode class used to record rollouts
+        mode: "sync" for lockstep stepping, "async" for independent loops
+        episode_queue: Optional queue that receives every episode as soon as
+            it finishes, e.g. to write or train on it while collection runs
+        batch_wait: Seconds the async mode waits to fill an act_batch call
+
+    Examples:
+        >>> driver = VectorDriver.from_computer_factory(  # doctest: +SKIP
+        ...     ComputerEnvConfig(),
+        ...     lambda i: RemoteComputer(daemon_base_url=urls[i]),
+        ...     num_envs=len(urls),
+        ...     agent=agent,
+        ...     mode="async",
+        ... )
+        >>> episodes = driver.collect_episodes(1000)  # doctest: +SKIP
+    """
+
+    def __init__(
+        self,
+        env_factory: Callable[[int], BaseEnv[ObsType, ActionType]],
+        num_envs: int,
+        agent: Optional[BaseAgent[ObsType, ActionType]] = None,
+        agent_factory: Optional[Callable[[int], BaseAgent[ObsType, ActionType]]] = None,
+        episode_cls: type[Episode[ObsType, ActionType]] = InMemoryEpisode,
+        mode: Literal["sync", "async"] = "sync",
+        episode_queue: Optional[queue.Queue] = None,
+        batch_wait: float = 0.05,
+    ):
+        if (agent is None) == (agent_factory is None):
+            raise ValueError("Pass exactly one of agent and agent_factory")
+        if mode not in ("sync", "async"):
+            raise ValueError(f"Invalid mode: {mode}")
+
+        self.num_envs = num_envs
+        self.mode = mode
+        self.episode_queue = episode_queue
+        self.batch_wait = batch_wait
+        self._executor = ThreadPoolExecutor(
+            max_workers=num_envs, thread_name_prefix="commandagi-vector-env"
+        )
+        # Environments are usually slow to start (they boot a computer)
+        self.envs = list(self._executor.map(env_factory, range(num_envs)))
+        self.agents = (
+            [agent_factory(i) for i in range(num_envs)]
+            if agent_factory is not None
+            else None
+        )
+        super().__init__(self.envs[0], agent or self.agents[0], episode_cls)
+
+    @classmethod
+    def from_computer_factory(
+        cls,
+        config: "ComputerEnvConfig",
+        computer_factory: Callable[[int], "BaseComputer"],
+        num_envs: int,
+        **kwargs,
+    ) -> "VectorDriver":
+        """Create a driver with one ComputerEnv per computer from a factory.
+
+        Args:
+            config: Configuration shared by all environments
+            computer_factory: Called with an environment index to create its
+                computer (e.g. a separate sandbox or daemon per environment)
+            num_envs: Number of environments to run
+            **kwargs: Other arguments of VectorDriver
+        """
+        from commandAGI.gym.environments.computer_env import ComputerEnv
+
+        return cls(
+            lambda i: ComputerEnv(config, computer=computer_factory(i)),
+            num_envs,
+            **kwargs,
+        )
+
+    def collect_episodes(self, num_episodes: int) -> List[Episode[ObsType, ActionType]]:
+        if self.mode == "sync":
+            return self._collect_sync(num_episodes)
+        return self._collect_async(num_episodes)
+
+    def collect_episode(self) -> Episode[ObsType, ActionType]:
+        return self.collect_episodes(1)[0]
+
+    def close(self):
+        """Close every environment and stop the worker threads."""
+        list(self._executor.map(lambda env: env.close(), self.envs))
+        self._executor.shutdown()
+
+    def _finish(
+        self,
+        episode: Episode[ObsType, ActionType],
+        episodes: List[Episode[ObsType, ActionType]],
+    ):
+        episodes.append(episode)
+        if self.episode_queue is not None:
+            self.episode_queue.put(episode)
+
+    def _reset(self, index: int) -> ObsType:
+        if self.agents is not None:
+            self.agents[index].reset()
+        return self.envs[index].reset()
+
+    def _collect_sync(self, num_episodes: int) -> List[Episode[ObsType, ActionType]]:
+        episodes = []
+        active = list(range(min(self.num_envs, num_episodes)))
+        started = len(active)
+        if self.agents is None:
+            self.agent.reset()
+        observations = dict(zip(active, self._executor.map(self._reset, active)))
+        running = {index: self.episode_cls() for index in active}
+
+        while active:
+            if self.agents is None:
+                actions = self.agent.act_batch([observations[i] for i in active])
+            else:
+                actions = [self.agents[i].act(observations[i]) for i in active]
+            results = self._executor.map(
+                lambda i, action: self.envs[i].step(action), active, actions
+            )
+
+            to_reset = []
+            for index, action, (next_obs, reward, done, info) in zip(
+                list(active), actions, results
+            ):
+                running[index].push(
+                    Step(
+                        observation=observations[index],
+                        action=action,
+                        reward=reward,
+                        info=info,
+                    )
+                )
+                observations[index] = next_obs
+                if not done:
+                    continue
+                self._finish(running.pop(index), episodes)
+                if started < num_episodes:
+                    started += 1
+                    to_reset.append(index)
+                else:
+                    active.remove(index)
+
+            for index, observation in zip(
+                to_reset, self._executor.map(self._reset, to_reset)
+            ):
+                observations[index] = observation
+                running[index] = self.episode_cls()
+
+        return episodes
+
+    def _collect_async(self, num_episodes: int) -> List[Episode[ObsType, ActionType]]:
+        episodes = []
+        lock = threading.Lock()
+        remaining = [num_episodes]
+        num_workers = min(self.num_envs, num_episodes)
+        batcher = None
+        if self.agents is None:
+            self.agent.reset()
+            batcher = _ActBatcher(
+                self.agent, max_batch_size=num_workers, max_wait=self.batch_wait
+            )
+
+        def run_env(index: int):
+            act = batcher.act if batcher is not None else self.agents[index].act
+            env = self.envs[index]
+            try:
+                while True:
+                    with lock:
+                        if remaining[0] == 0:
+                            return
+                        remaining[0] -= 1
+
+                    observation = self._reset(index)
+                    episode = self.episode_cls()
+                    done = False
+                    while not done:
+                        action = act(observation)
+                        next_obs, reward, done, info = env.step(action)
+                        episode.push(
+                            Step(
+                                observation=observation,
+                                action=action,
+                                reward=reward,
+                                info=info,
+                            )
+                        )
+                        observation = next_obs
+                    with lock:
+                        self._finish(episode, episodes)
+            except BaseException:
+                # Let the other environments stop after their current episode
+                with lock:
+                    remaining[0] = 0
+                raise
+            finally:
+                if batcher is not None:
+                    with lock:
+                        # Don't wait for a worker that will never act again
+                        batcher.max_batch_size -= 1
+
+        futures = [
+            self._executor.submit(run_env, index) for index in range(num_workers)
+        ]
+        try:
+            wait(futures)
+            for future in futures:
+                future.result()
+        finally:
+            if batcher is not None:
+                batcher.close()
+        return episodes
@@ -2,8 +2,8 @@
 from pydantic import BaseModel
 from rich.console import Console
 
+from commandAGI.computers import load_computer
 from commandAGI.computers.base_computer import BaseComputer
-from commandAGI.computers.local_pynput_computer import LocalPynputComputer
 from commandAGI.gym.environments.multimodal_env import MultiModalEnv
 from commandAGI.types import ComputerAction, ComputerObservation, ShellCommandAction
 
@@ -11,7 +11,7 @@ from commandAGI.types import ComputerAction, ComputerObservation, ShellCommandAc
 class ComputerEnvConfig(BaseModel):
     """Configuration for the computer environment."""
 
-    computer_cls_name: str = LocalPynputComputer.__name__
+    computer_cls_name: str = "LocalPynputComputer"
     computer_cls_kwargs: dict = {}
 
     # NOTE: we might not be able to run this if the daemon is not running
@@ -37,16 +37,10 @@ class ComputerEnv(MultiModalEnv[ComputerObservation, ComputerAction]):
         self.config = config
 
         if computer is None:
-            computer_classes = BaseComputer.__subclasses__()
-            computer_class = next(
-                (
-                    c
-                    for c in computer_classes
-                    if c.__name__ == self.config.computer_cls_name
-                ),
-                None,
-            )
-            if computer_class is None:
+            # Only the configured computer's backend gets imported
+            try:
+                computer_class = load_computer(self.config.computer_cls_name)
+            except KeyError:
                 raise ValueError(
                     f"Computer class {self.config.computer_cls_name} not found"
                 )
@@ -0,0 +1,520 @@
+import base64
+import hashlib
+import io
+import json
+import mmap
+import os
+import pickle
+import shutil
+import struct
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, Literal, Optional
+
+import numpy as np
+
+from commandAGI._utils.frame_diff import (
+    block_hashes,
+    diff_block_hashes,
+    dirty_rectangles,
+)
+from commandAGI.gym.schema import ActionType, Episode, ObsType, Step
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None  # PIL is optional
+
+# Strings and bytes at least this long (e.g. screenshots) go to the blob store
+DEFAULT_BLOB_THRESHOLD = 4096
+DEFAULT_SEGMENT_SIZE = 64 * 1024 * 1024
+
+_JSON_BLOB_KEY = "$blob"
+_JSON_FRAME_KEY = "$frame"
+# Base64 of the PNG signature, used to spot screenshots among strings
+_B64_PNG_PREFIX = "iVBORw0KGgo"
+_DELTA_MAGIC = b"CAGD"
+
+
+class BlobStore:
+    """Content-addressed storage for large values such as screenshots.
+
+    Every blob is stored once under the SHA-256 of its content, so identical
+    screenshots in the same (or, with a shared directory, any) episode take
+    space only once.
+
+    Args:
+        directory: Directory holding the blobs
+
+    Examples:
+        >>> import tempfile
+        >>> store = BlobStore(tempfile.mkdtemp())
+        >>> digest = store.put(b"png bytes")
+        >>> store.put(b"png bytes") == digest
+        True
+        >>> store.get(digest)
+        b'png bytes'
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest[:2], digest[2:])
+
+    def put(self, data: bytes) -> str:
+        """Store data if it isn't stored yet and return its digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temporary file first so readers never see partial blobs
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        """Read the blob stored under digest."""
+        with open(self.path(digest), "rb") as f:
+            return f.read()
+
+    def __contains__(self, digest: str) -> bool:
+        return os.path.exists(self.path(digest))
+
+
+class SegmentedLog:
+    """Append-only records spread over segment files, found via an offset index.
+
+    Records are appended to the current segment file, and a new segment is
+    started once it grows past segment_size. The index file holds one fixed
+    size (segment, offset, length) entry per record in logical order, so any
+    record is read with one lookup. Records are read through mmap, so only
+    the pages actually read are loaded into memory.
+
+    Args:
+        directory: Directory holding the segments and the index
+        segment_size: Size in bytes after which a new segment is started
+    """
+
+    _ENTRY = struct.Struct("<IQI")
+
+    def __init__(self, directory: str, segment_size: int = DEFAULT_SEGMENT_SIZE):
+        self.directory = directory
+        self.segment_size = segment_size
+        os.makedirs(directory, exist_ok=True)
+        self._index_path = os.path.join(directory, "index.bin")
+        self._index = bytearray()
+        if os.path.exists(self._index_path):
+            with open(self._index_path, "rb") as f:
+                self._index = bytearray(f.read())
+        self._maps: Dict[int, mmap.mmap] = {}
+        self._segment = 0
+        while os.path.exists(self._segment_path(self._segment + 1)):
+            self._segment += 1
+
+    def __len__(self) -> int:
+        return len(self._index) // self._ENTRY.size
+
+    def append(self, data: bytes):
+        """Append a record at the end of the log."""
+        self._index += self._write(data)
+        with open(self._index_path, "ab") as f:
+            f.write(self._index[-self._ENTRY.size :])
+
+    def insert(self, index: int, data: bytes):
+        """Insert a record at a logical position.
+
+        The data is still appended to the log; only the small index entries
+        after the position move.
+        """
+        position = min(max(index, 0), len(self)) * self._ENTRY.size
+        self._index[position:position] = self._write(data)
+        self._save_index()
+
+    def read(self, index: int) -> bytes:
+        """Read the record at a logical position."""
+        segment, offset, length = self._entry(index)
+        segment_map = self._maps.get(segment)
+        if segment_map is None or segment_map.size() < offset + length:
+            if segment_map is not None:
+                segment_map.close()
+            with open(self._segment_path(segment), "rb") as f:
+                segment_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[segment] = segment_map
+        return segment_map[offset : offset + length]
+
+    def pop(self):
+        """Remove the last record, reclaiming its space if it was written last."""
+        segment, offset, length = self._entry(len(self) - 1)
+        del self._index[-self._ENTRY.size :]
+        self._save_index()
+        path = self._segment_path(segment)
+        if os.path.getsize(path) == offset + length:
+            self._unmap(segment)
+            with open(path, "r+b") as f:
+                f.truncate(offset)
+
+    def clear(self):
+        """Remove every record and segment."""
+        self.close()
+        for name in os.listdir(self.directory):
+            if name.startswith("segment_") or name == "index.bin":
+                os.remove(os.path.join(self.directory, name))
+        self._index = bytearray()
+        self._segment = 0
+
+    def close(self):
+        """Release the memory maps."""
+        for segment in list(self._maps):
+            self._unmap(segment)
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"segment_{segment:05d}.log")
+
+    def _entry(self, index: int) -> tuple[int, int, int]:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("log index out of range")
+        return self._ENTRY.unpack_from(self._index, index * self._ENTRY.size)
+
+    def _write(self, data: bytes) -> bytes:
+        """Write data to the current segment and return its index entry."""
+        path = self._segment_path(self._segment)
+        offset = os.path.getsize(path) if os.path.exists(path) else 0
+        if offset and offset + len(data) > self.segment_size:
+            self._segment += 1
+            path, offset = self._segment_path(self._segment), 0
+        with open(path, "ab") as f:
+            f.write(data)
+        return self._ENTRY.pack(self._segment, offset, len(data))
+
+    def _save_index(self):
+        tmp_path = self._index_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(self._index)
+        os.replace(tmp_path, self._index_path)
+
+    def _unmap(self, segment: int):
+        segment_map = self._maps.pop(segment, None)
+        if segment_map is not None:
+            segment_map.close()
+
+
+class FrameStore:
+    """Stores a sequence of screenshots as keyframes plus deltas.
+
+    Each frame is compared with the previous one in block_size tiles (see
+    frame_diff). An identical frame reuses the previous frame's reference,
+    a partly changed one is stored as a delta holding only the changed
+    rectangles as PNG patches, and every keyframe_interval frames (or when
+    the size or image mode changes or most of the frame changed) a full PNG
+    keyframe is stored. Frames and deltas live in a BlobStore, so identical
+    keyframes are shared too. Frames are rebuilt only when requested, from the nearest
+    keyframe, and recently rebuilt frames are cached so reading an episode in
+    order applies one delta per step.
+
+    Args:
+        blobs: Blob store holding the keyframes and deltas
+        block_size: Edge length in pixels of the compared tiles (must be even)
+        keyframe_interval: Maximum number of deltas between two keyframes
+        max_delta_ratio: Fraction of changed pixels above which a keyframe is
+            stored instead of a delta
+        cache_size: Number of rebuilt frames kept in memory
+
+    Examples:
+        >>> import tempfile
+        >>> frames = FrameStore(BlobStore(tempfile.mkdtemp()))
+        >>> first = frames.put(Image.new("RGB", (64, 64), "white"))
+        >>> frames.put(Image.new("RGB", (64, 64), "white")) == first
+        True
+        >>> frames.get(first).size
+        (64, 64)
+    """
+
+    def __init__(
+        self,
+        blobs: BlobStore,
+        block_size: int = 32,
+        keyframe_interval: int = 50,
+        max_delta_ratio: float = 0.5,
+        cache_size: int = 4,
+    ):
+        self.blobs = blobs
+        self.block_size = block_size
+        self.keyframe_interval = keyframe_interval
+        self.max_delta_ratio = max_delta_ratio
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, "Image.Image"] = OrderedDict()
+        # ((image mode, frame hashes), reference, deltas since the last keyframe)
+        self._previous: Optional[tuple[tuple[str, np.ndarray], str, int]] = None
+
+    def put(self, image: "Image.Image") -> str:
+        """Store the next frame of the sequence and return its reference."""
+        if image.mode not in ("RGB", "RGBA", "L"):
+            image = image.convert("RGB")
+        frame = np.asarray(image)
+        # Frames in different modes can pack to the same hashes (e.g. black in
+        # L and RGB), so the mode is part of what is compared
+        key = (image.mode, block_hashes(frame, block_size=self.block_size))
+
+        previous_key, previous_ref, deltas = self._previous or (None, None, 0)
+        dirty_mask = None
+        if previous_key is not None and previous_key[0] == key[0]:
+            dirty_mask = diff_block_hashes(previous_key[1], key[1])
+        if dirty_mask is not None and not dirty_mask.any():
+            return previous_ref
+
+        rects = None
+        if dirty_mask is not None and deltas < self.keyframe_interval:
+            rects = dirty_rectangles(dirty_mask, self.block_size, image.size)
+            changed = sum(rect[2] * rect[3] for rect in rects)
+            if changed > self.max_delta_ratio * image.size[0] * image.size[1]:
+                rects = None
+
+        if rects is None:
+            ref = self.blobs.put(_png_bytes(image))
+            deltas = 0
+        else:
+            ref = self.blobs.put(self._encode_delta(image, previous_ref, rects))
+            deltas += 1
+        self._previous = (key, ref, deltas)
+        self._remember(ref, image)
+        return ref
+
+    def get(self, ref: str) -> "Image.Image":
+        """Rebuild the frame stored under ref."""
+        if ref in self._cache:
+            self._cache.move_to_end(ref)
+            return self._cache[ref]
+
+        data = self.blobs.get(ref)
+        if not data.startswith(_DELTA_MAGIC):
+            image = Image.open(io.BytesIO(data))
+            image.load()
+        else:
+            (header_length,) = struct.unpack_from("!I", data, len(_DELTA_MAGIC))
+            start = len(_DELTA_MAGIC) + 4
+            header = json.loads(data[start : start + header_length])
+            frame = np.array(self.get(header["base"]))
+            position = start + header_length
+            for left, top, width, height, length in header["regions"]:
+                patch = Image.open(io.BytesIO(data[position : position + length]))
+                frame[top : top + height, left : left + width] = np.asarray(patch)
+                position += length
+            image = Image.fromarray(frame, header["mode"])
+        self._remember(ref, image)
+        return image
+
+    def reset(self):
+        """Start a new sequence, so the next frame is stored as a keyframe."""
+        self._previous = None
+
+    def _encode_delta(
+        self, image: "Image.Image", base: str, rects: list[tuple[int, int, int, int]]
+    ) -> bytes:
+        regions, patches = [], []
+        for left, top, width, height in rects:
+            patch = _png_bytes(image.crop((left, top, left + width, top + height)))
+            regions.append([left, top, width, height, len(patch)])
+            patches.append(patch)
+        header = json.dumps(
+            {"base": base, "mode": image.mode, "regions": regions}
+        ).encode("utf-8")
+        return b"".join(
+            [_DELTA_MAGIC, struct.pack("!I", len(header)), header, *patches]
+        )
+
+    def _remember(self, ref: str, image: "Image.Image"):
+        self._cache[ref] = image
+        self._cache.move_to_end(ref)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+
+def _png_bytes(image: "Image.Image") -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _is_b64_png(value: Any, threshold: int) -> bool:
+    return (
+        isinstance(value, str)
+        and len(value) >= threshold
+        and value.startswith(_B64_PNG_PREFIX)
+    )
+
+
+class _BlobPickler(pickle.Pickler):
+    def __init__(
+        self, file, blobs: BlobStore, threshold: int, frames: Optional[FrameStore]
+    ):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.blobs = blobs
+        self.threshold = threshold
+        self.frames = frames
+
+    def persistent_id(self, obj: Any) -> Optional[tuple[str, str]]:
+        if self.frames is not None:
+            if Image is not None and isinstance(obj, Image.Image):
+                return ("frame", self.frames.put(obj))
+            if _is_b64_png(obj, self.threshold):
+                image = Image.open(io.BytesIO(base64.b64decode(obj)))
+                return ("b64_frame", self.frames.put(image))
+        if isinstance(obj, (bytes, bytearray)) and len(obj) >= self.threshold:
+            return ("bytes", self.blobs.put(bytes(obj)))
+        if isinstance(obj, str) and len(obj) >= self.threshold:
+            return ("str", self.blobs.put(obj.encode("utf-8")))
+        return None
+
+
+class _BlobUnpickler(pickle.Unpickler):
+    def __init__(self, file, blobs: BlobStore, frames: Optional[FrameStore]):
+        super().__init__(file)
+        self.blobs = blobs
+        self.frames = frames
+
+    def persistent_load(self, pid: tuple[str, str]) -> Any:
+        kind, digest = pid
+        if kind == "frame":
+            return self.frames.get(digest)
+        if kind == "b64_frame":
+            return base64.b64encode(_png_bytes(self.frames.get(digest))).decode()
+        data = self.blobs.get(digest)
+        return data.decode("utf-8") if kind == "str" else data
+
+
+class SegmentedLogEpisode(Episode[ObsType, ActionType]):
+    """Episode stored in an append-only segmented log with a blob store.
+
+    Steps are serialized into a SegmentedLog, so pushing a step is a single
+    append and reading any step is a single random access; nothing is kept in
+    memory. Large strings and bytes anywhere in a step (typically base64 or
+    encoded screenshots) are moved to a content-addressed BlobStore so
+    repeated screenshots are stored once and the log stays small. Opening a
+    directory that already holds an episode continues it.
+
+    With frame_deltas, screenshots (PIL images and base64 PNG strings) are
+    stored through a FrameStore instead: unchanged frames are stored once and
+    changed ones as keyframes plus deltas of the changed tiles. Frames are
+    rebuilt when a step is read; base64 screenshots come back as PNGs with
+    the same pixels, though not necessarily the same bytes.
+
+    Args:
+        save_dir: Directory where the episode is stored
+        mode: Serialization of the steps, "pickle" or "json"
+        blob_dir: Directory of the blob store. Defaults to save_dir/blobs;
+            pass the same directory to several episodes to share blobs.
+        blob_threshold: Minimum length of values moved to the blob store
+        segment_size: Size in bytes after which a new log segment is started
+        frame_deltas: Store screenshots as keyframes plus deltas
+        keyframe_interval: Maximum number of deltas between two keyframes
+    """
+
+    def __init__(
+        self,
+        save_dir: str,
+        mode: Literal["pickle", "json"] = "pickle",
+        blob_dir: Optional[str] = None,
+        blob_threshold: int = DEFAULT_BLOB_THRESHOLD,
+        segment_size: int = DEFAULT_SEGMENT_SIZE,
+        frame_deltas: bool = False,
+        keyframe_interval: int = 50,
+    ):
+        if mode not in ("pickle", "json"):
+            raise ValueError(f"Invalid mode: {mode}")
+        self.save_dir = save_dir
+        self.mode = mode
+        self.blob_threshold = blob_threshold
+        self._owns_blobs = blob_dir is None
+        self.blobs = BlobStore(blob_dir or os.path.join(save_dir, "blobs"))
+        self.log = SegmentedLog(save_dir, segment_size=segment_size)
+        self.frame_deltas = frame_deltas
+        # Also used to read frames of episodes recorded with frame_deltas
+        self.frames = FrameStore(self.blobs, keyframe_interval=keyframe_interval)
+
+    @property
+    def num_steps(self) -> int:
+        """Get the number of steps in the episode."""
+        return len(self.log)
+
+    def iter_steps(self) -> Iterator[Step[ObsType, ActionType]]:
+        """Iterate over the steps of the episode."""
+        for i in range(len(self.log)):
+            yield self.get(i)
+
+    def get(self, index: int) -> Step[ObsType, ActionType]:
+        """Get a step from the episode at a specific index."""
+        return self._deserialize(self.log.read(index))
+
+    def push(self, step: Step[ObsType, ActionType]) -> None:
+        """Append a step to the episode."""
+        self.log.append(self._serialize(step))
+
+    def insert(self, step: Step[ObsType, ActionType], index: int) -> None:
+        """Insert a step into the episode at a specific index."""
+        self.log.insert(index, self._serialize(step))
+
+    def pop(self) -> Step[ObsType, ActionType]:
+        """Pop a step from the episode."""
+        step = self.get(-1)
+        self.log.pop()
+        return step
+
+    def clear(self) -> None:
+        """Clear the episode and remove its files."""
+        self.log.clear()
+        self.frames.reset()
+        if self._owns_blobs:
+            shutil.rmtree(self.blobs.directory, ignore_errors=True)
+            os.makedirs(self.blobs.directory, exist_ok=True)
+
+    def close(self) -> None:
+        """Release the memory maps held by the episode."""
+        self.log.close()
+
+    def _serialize(self, step: Step[ObsType, ActionType]) -> bytes:
+        if self.mode == "pickle":
+            buffer = io.BytesIO()
+            _BlobPickler(
+                buffer,
+                self.blobs,
+                self.blob_threshold,
+                self.frames if self.frame_deltas else None,
+            ).dump(step)
+            return buffer.getvalue()
+        data = self._extract_blobs(step.model_dump(mode="json"))
+        return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+    def _deserialize(self, record: bytes) -> Step[ObsType, ActionType]:
+        if self.mode == "pickle":
+            return _BlobUnpickler(io.BytesIO(record), self.blobs, self.frames).load()
+        return Step.model_validate(self._restore_blobs(json.loads(record)))
+
+    def _extract_blobs(self, value: Any) -> Any:
+        if self.frame_deltas and _is_b64_png(value, self.blob_threshold):
+            image = Image.open(io.BytesIO(base64.b64decode(value)))
+            return {_JSON_FRAME_KEY: self.frames.put(image)}
+        if isinstance(value, str) and len(value) >= self.blob_threshold:
+            return {_JSON_BLOB_KEY: self.blobs.put(value.encode("utf-8"))}
+        if isinstance(value, dict):
+            return {key: self._extract_blobs(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._extract_blobs(item) for item in value]
+        return value
+
+    def _restore_blobs(self, value: Any) -> Any:
+        if isinstance(value, dict):
+            if len(value) == 1 and _JSON_BLOB_KEY in value:
+                return self.blobs.get(value[_JSON_BLOB_KEY]).decode("utf-8")
+            if len(value) == 1 and _JSON_FRAME_KEY in value:
+                image = self.frames.get(value[_JSON_FRAME_KEY])
+                return base64.b64encode(_png_bytes(image)).decode()
+            return {key: self._restore_blobs(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._restore_blobs(item) for item in value]
+        return value
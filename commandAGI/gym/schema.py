@@ -105,7 +105,11 @@ class InMemoryEpisode(Episode[ObsType, ActionType]):
 
 
 class FilesystemSavedEpisode(Episode[ObsType, ActionType]):
-    """Filesystem-based implementation of an episode that saves steps to disk."""
+    """Filesystem-based implementation of an episode that saves steps to disk.
+
+    Every step is a separate file and inserting rewrites all later steps. For
+    long episodes use episode_store.SegmentedLogEpisode instead.
+    """
 
     def __init__(self, save_dir: str, mode: Literal["pickle", "json"] = "pickle"):
         """Initialize with directory to save episode data.
@@ -0,0 +1,308 @@
+import hashlib
+import string
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from commandAGI._utils.frame_diff import (
+    block_hashes,
+    crop_patch,
+    diff_block_hashes,
+    dirty_rectangles,
+)
+from commandAGI.processors.screen_parser.types import ParsedElement, ParsedScreenshot
+
+# Above this fraction of changed pixels a single full-frame pass is cheaper
+_FULL_PASS_RATIO = 0.5
+
+
+def _normalize(word: str) -> str:
+    return word.strip(string.punctuation + string.whitespace).lower()
+
+
+def _intersects(box: List[int], rect: tuple[int, int, int, int]) -> bool:
+    left, top, right, bottom = rect
+    return box[0] < right and box[2] > left and box[1] < bottom and box[3] > top
+
+
+def _contains(box: List[int], rect: tuple[int, int, int, int]) -> bool:
+    left, top, right, bottom = rect
+    return box[0] >= left and box[2] <= right and box[1] >= top and box[3] <= bottom
+
+
+class OCRIndex:
+    """The text found on a frame, indexed by word for fast lookups.
+
+    Args:
+        elements: Parsed text elements in frame coordinates
+
+    Examples:
+        >>> index = OCRIndex([
+        ...     ParsedElement(text="Save", bounding_box=[10, 10, 40, 20]),
+        ...     ParsedElement(text="As...", bounding_box=[45, 10, 70, 20]),
+        ... ])
+        >>> index.find("save as")
+        [10, 10, 70, 20]
+    """
+
+    def __init__(self, elements: List[ParsedElement]):
+        # Reading order, so lookups return the top-left-most occurrence first
+        self.elements = sorted(
+            elements, key=lambda e: (e.bounding_box[1], e.bounding_box[0])
+        )
+        self._index: Dict[str, List[int]] = {}
+        for i, element in enumerate(self.elements):
+            for word in element.text.split():
+                self._index.setdefault(_normalize(word), []).append(i)
+
+    def find(self, text: str) -> Optional[List[int]]:
+        """Find text and return its bounding box.
+
+        Words are looked up in the index, and a multi-word text matches a run
+        of elements on the same line. If that finds nothing, falls back to a
+        case-insensitive substring search of each element's text.
+
+        Args:
+            text: The text to find
+
+        Returns:
+            Optional[List[int]]: [left, top, right, bottom] of the first
+            occurrence, or None if the text isn't on the frame
+        """
+        matches = self.find_all(text, limit=1)
+        return matches[0] if matches else None
+
+    def find_all(self, text: str, limit: Optional[int] = None) -> List[List[int]]:
+        """Find every occurrence of text (see find)."""
+        words = [_normalize(word) for word in text.split()]
+        words = [word for word in words if word]
+        matches = []
+        if words:
+            for start in self._index.get(words[0], []):
+                box = self._match_run(start, words[1:])
+                if box is not None:
+                    matches.append(box)
+                    if len(matches) == limit:
+                        return matches
+        if matches:
+            return matches
+
+        needle = text.lower()
+        for element in self.elements:
+            if needle in element.text.lower():
+                matches.append(list(element.bounding_box))
+                if len(matches) == limit:
+                    break
+        return matches
+
+    def _match_run(self, start: int, words: List[str]) -> Optional[List[int]]:
+        """Extend a match rightwards along the line of element start."""
+        box = list(self.elements[start].bounding_box)
+        for word in words:
+            height = box[3] - box[1]
+            following = [
+                i
+                for i in self._index.get(word, [])
+                if self._continues(box, self.elements[i].bounding_box, height)
+            ]
+            if not following:
+                return None
+            next_box = self.elements[following[0]].bounding_box
+            box = [
+                box[0],
+                min(box[1], next_box[1]),
+                next_box[2],
+                max(box[3], next_box[3]),
+            ]
+        return box
+
+    @staticmethod
+    def _continues(box: List[int], next_box: List[int], height: int) -> bool:
+        # Same line: vertical overlap of at least half a line, small gap to the right
+        overlap = min(box[3], next_box[3]) - max(box[1], next_box[1])
+        gap = next_box[0] - box[2]
+        return overlap >= height / 2 and -height / 2 <= gap <= 2 * height
+
+
+class OCRCache:
+    """Runs OCR on screen frames, only re-reading the parts that changed.
+
+    Frames are split into block_size tiles which are hashed (see
+    frame_diff.block_hashes). A frame seen recently is answered from cache
+    without any OCR. Otherwise, if a previous frame of the same size exists,
+    only the changed tiles (grown to whole words and padded by margin) are
+    passed to the OCR engine and the text elsewhere is kept from before.
+
+    Args:
+        parse: OCR function taking an RGB PIL Image and returning a
+            ParsedScreenshot with coordinates relative to that image
+        block_size: Edge length in pixels of the compared tiles (must be even)
+        margin: Pixels of context added around changed regions
+        max_frames: Number of recent frames whose results are kept
+    """
+
+    def __init__(
+        self,
+        parse: Callable[..., ParsedScreenshot],
+        block_size: int = 32,
+        margin: int = 8,
+        max_frames: int = 8,
+    ):
+        self.parse = parse
+        self.block_size = block_size
+        self.margin = margin
+        self.max_frames = max_frames
+        self._lock = threading.Lock()
+        self._recent: OrderedDict[bytes, OCRIndex] = OrderedDict()
+        # Per region: (block hashes, elements) of the last frame read
+        self._previous: Dict[Optional[tuple], tuple[np.ndarray, List]] = {}
+
+    def read(
+        self, frame: np.ndarray, region: Optional[tuple[int, int, int, int]] = None
+    ) -> OCRIndex:
+        """Get the text on a frame.
+
+        Args:
+            frame: (H, W, C) uint8 frame; 4 channels are BGRA, 3 are RGB
+            region: Optional (x, y, width, height) to limit OCR to
+
+        Returns:
+            OCRIndex: The text found, in frame coordinates
+        """
+        offset_x, offset_y = 0, 0
+        if region:
+            region = tuple(region)
+            offset_x, offset_y, width, height = region
+            frame = frame[offset_y : offset_y + height, offset_x : offset_x + width]
+
+        hashes = block_hashes(frame, block_size=self.block_size)
+        key = hashlib.blake2b(
+            repr((region, hashes.shape)).encode() + hashes.tobytes(), digest_size=16
+        ).digest()
+
+        with self._lock:
+            if key in self._recent:
+                self._recent.move_to_end(key)
+                return self._recent[key]
+            previous_hashes, previous_elements = self._previous.get(
+                region, (None, None)
+            )
+
+        elements = self._read_changes(
+            frame, diff_block_hashes(previous_hashes, hashes), previous_elements
+        )
+        index = OCRIndex(
+            [
+                ParsedElement(
+                    text=element.text,
+                    bounding_box=[
+                        element.bounding_box[0] + offset_x,
+                        element.bounding_box[1] + offset_y,
+                        element.bounding_box[2] + offset_x,
+                        element.bounding_box[3] + offset_y,
+                    ],
+                )
+                for element in elements
+            ]
+        )
+
+        with self._lock:
+            self._previous[region] = (hashes, elements)
+            self._recent[key] = index
+            while len(self._recent) > self.max_frames:
+                self._recent.popitem(last=False)
+        return index
+
+    def clear(self):
+        """Forget all cached results."""
+        with self._lock:
+            self._recent.clear()
+            self._previous.clear()
+
+    def _read_changes(
+        self,
+        frame: np.ndarray,
+        dirty_mask: Optional[np.ndarray],
+        previous_elements: Optional[List[ParsedElement]],
+    ) -> List[ParsedElement]:
+        """OCR the changed parts of a frame and merge them with the old text."""
+        height, width = frame.shape[:2]
+        if dirty_mask is None:
+            return self._parse_rect(frame, (0, 0, width, height))
+
+        rects = [
+            self._grow(
+                (left, top, left + rect_width, top + rect_height),
+                previous_elements,
+                (width, height),
+            )
+            for left, top, rect_width, rect_height in dirty_rectangles(
+                dirty_mask, self.block_size, (width, height)
+            )
+        ]
+        changed_area = sum((r[2] - r[0]) * (r[3] - r[1]) for r in rects)
+        if changed_area > _FULL_PASS_RATIO * width * height:
+            return self._parse_rect(frame, (0, 0, width, height))
+
+        elements = [
+            element
+            for element in previous_elements
+            if not any(_intersects(element.bounding_box, rect) for rect in rects)
+        ]
+        for rect in rects:
+            elements.extend(self._parse_rect(frame, rect))
+        return elements
+
+    def _grow(
+        self,
+        rect: tuple[int, int, int, int],
+        elements: List[ParsedElement],
+        frame_size: tuple[int, int],
+    ) -> tuple[int, int, int, int]:
+        """Pad a changed rect and grow it until it cuts through no known word."""
+        frame_width, frame_height = frame_size
+        left, top, right, bottom = rect
+        rect = (
+            max(0, left - self.margin),
+            max(0, top - self.margin),
+            min(frame_width, right + self.margin),
+            min(frame_height, bottom + self.margin),
+        )
+        while True:
+            cut = [
+                element.bounding_box
+                for element in elements
+                if _intersects(element.bounding_box, rect)
+                and not _contains(element.bounding_box, rect)
+            ]
+            grown = (
+                max(0, min([rect[0]] + [box[0] for box in cut])),
+                max(0, min([rect[1]] + [box[1] for box in cut])),
+                min(frame_width, max([rect[2]] + [box[2] for box in cut])),
+                min(frame_height, max([rect[3]] + [box[3] for box in cut])),
+            )
+            if grown == rect:
+                return rect
+            rect = grown
+
+    def _parse_rect(
+        self, frame: np.ndarray, rect: tuple[int, int, int, int]
+    ) -> List[ParsedElement]:
+        left, top, right, bottom = rect
+        if right <= left or bottom <= top:
+            return []
+        image = crop_patch(frame, (left, top, right - left, bottom - top), "PIL")
+        return [
+            ParsedElement(
+                text=element.text,
+                bounding_box=[
+                    element.bounding_box[0] + left,
+                    element.bounding_box[1] + top,
+                    element.bounding_box[2] + left,
+                    element.bounding_box[3] + top,
+                ],
+            )
+            for element in self.parse(image).elements
+        ]
@@ -5,16 +5,19 @@ except ImportError:
         "pytesseract is not installed. Please install commandAGI with the pytesseract extra:\n\npip install commandAGI[pytesseract]"
     )
 
+from PIL import Image
+
+from commandAGI._utils.image import b64ToImage
 from commandAGI.processors.screen_parser.types import ParsedElement, ParsedScreenshot
-from commandAGI.utils.image import b64ToImage
 
 
-def parse_screenshot(screenshot_b64: str) -> ParsedScreenshot:
+def parse_screenshot(screenshot_b64: str, **kwargs) -> ParsedScreenshot:
     """
     Parse a screenshot using Tesseract OCR.
 
     Args:
         screenshot_b64: Base64 encoded screenshot image
+        **kwargs: Additional arguments passed to parse_image
 
     Returns:
         ParsedScreenshot containing the detected text elements and their bounding boxes
@@ -47,8 +50,25 @@ def parse_screenshot(screenshot_b64: str) -> ParsedScreenshot:
         >>> # "Hello" in result.elements[0].text
         >>> # True
     """
-    image = b64ToImage(screenshot_b64)
-    data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
+    return parse_image(b64ToImage(screenshot_b64), **kwargs)
+
+
+def parse_image(image: Image.Image, **kwargs) -> ParsedScreenshot:
+    """
+    Parse an image using Tesseract OCR, without a base64 round trip.
+
+    Args:
+        image: The image to read
+        **kwargs: Additional arguments passed to pytesseract.image_to_data
+            (e.g. lang or config)
+
+    Returns:
+        ParsedScreenshot containing the detected text elements and their bounding
+        boxes, relative to the image
+    """
+    data = pytesseract.image_to_data(
+        image, output_type=pytesseract.Output.DICT, **kwargs
+    )
 
     elements = []
     for i in range(len(data["text"])):
@@ -5,6 +5,9 @@ from typing import Annotated, List, Literal, Optional, TypedDict, Union
 
 from pydantic import BaseModel, Field, StringConstraints, field_validator
 
+from commandAGI.computers.base_computer.base_keyboard import KeyboardKey
+from commandAGI.computers.base_computer.base_mouse import MouseButton
+
 
 class ComputerObservationType(str, Enum):
     SCREENSHOT = "screenshot"
@@ -67,6 +70,26 @@ class KeyboardStateObservation(BaseComputerObservation):
         return v
 
 
+class LayoutTreeObservation(BaseComputerObservation):
+    observation_type: Literal["layout_tree"] = ComputerObservationType.LAYOUT_TREE.value
+    tree: dict
+
+
+class ProcessesObservation(BaseComputerObservation):
+    observation_type: Literal["processes"] = ComputerObservationType.PROCESSES.value
+    processes: List[dict]
+
+
+class WindowsObservation(BaseComputerObservation):
+    observation_type: Literal["windows"] = ComputerObservationType.WINDOWS.value
+    windows: List[dict]
+
+
+class DisplaysObservation(BaseComputerObservation):
+    observation_type: Literal["displays"] = ComputerObservationType.DISPLAYS.value
+    displays: List[dict]
+
+
 # Define a Union type for computer observations
 ComputerObservationUnion = Union[
     ScreenshotObservation,
@@ -96,6 +119,9 @@ class ComputerActionType(str, Enum):
     KEYBOARD_KEY_PRESS = "keyboard_key_press"
     KEYBOARD_KEY_DOWN = "keyboard_key_down"
     KEYBOARD_KEY_RELEASE = "keyboard_key_release"
+    KEYBOARD_KEYS_PRESS = "keyboard_keys_press"
+    KEYBOARD_KEYS_DOWN = "keyboard_keys_down"
+    KEYBOARD_KEYS_RELEASE = "keyboard_keys_release"
     KEYBOARD_HOTKEY = "keyboard_hotkey"
     TYPE = "type"
     MOUSE_MOVE = "mouse_move"
@@ -135,6 +161,8 @@ class ShellCommandAction(BaseComputerAction):
         None  # important: None means the command will run indefinitely until it finishes
     )
     executible: Optional[str] = None
+    cwd: Optional[str] = None
+    env: Optional[dict] = None
 
 
 class KeyboardKeyPressAction(BaseComputerAction):
@@ -159,6 +187,28 @@ class KeyboardKeyReleaseAction(BaseComputerAction):
     key: KeyboardKey
 
 
+class KeyboardKeysPressAction(BaseComputerAction):
+    action_type: Literal["keyboard_keys_press"] = (
+        ComputerActionType.KEYBOARD_KEYS_PRESS.value
+    )
+    keys: List[KeyboardKey]
+    duration: float = 0.1
+
+
+class KeyboardKeysDownAction(BaseComputerAction):
+    action_type: Literal["keyboard_keys_down"] = (
+        ComputerActionType.KEYBOARD_KEYS_DOWN.value
+    )
+    keys: List[KeyboardKey]
+
+
+class KeyboardKeysReleaseAction(BaseComputerAction):
+    action_type: Literal["keyboard_keys_release"] = (
+        ComputerActionType.KEYBOARD_KEYS_RELEASE.value
+    )
+    keys: List[KeyboardKey]
+
+
 class KeyboardHotkeyAction(BaseComputerAction):
     action_type: Literal["keyboard_hotkey"] = ComputerActionType.KEYBOARD_HOTKEY.value
     keys: List[KeyboardKey]
@@ -318,6 +368,9 @@ ComputerActionUnion = Union[
     KeyboardKeyPressAction,
     KeyboardKeyDownAction,
     KeyboardKeyReleaseAction,
+    KeyboardKeysPressAction,
+    KeyboardKeysDownAction,
+    KeyboardKeysReleaseAction,
     KeyboardHotkeyAction,
     TypeAction,
     MouseMoveAction,
@@ -346,6 +399,9 @@ class ComputerAction(TypedDict):
     keyboard_key_press: Optional[KeyboardKeyPressAction] = None
     keyboard_key_down: Optional[KeyboardKeyDownAction] = None
     keyboard_key_release: Optional[KeyboardKeyReleaseAction] = None
+    keyboard_keys_press: Optional[KeyboardKeysPressAction] = None
+    keyboard_keys_down: Optional[KeyboardKeysDownAction] = None
+    keyboard_keys_release: Optional[KeyboardKeysReleaseAction] = None
     keyboard_hotkey: Optional[KeyboardHotkeyAction] = None
     type: Optional[TypeAction] = None
     mouse_move: Optional[MouseMoveAction] = None
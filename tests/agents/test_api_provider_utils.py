@@ -0,0 +1,70 @@
+import asyncio
+import threading
+import unittest
+from unittest.mock import patch
+
+from commandAGI.agents import _api_provider_utils
+from commandAGI.agents._api_provider_utils import agenerate_response
+
+
+class TestAgenerateResponse(unittest.TestCase):
+    def generate(self, create):
+        parsed = []
+
+        def parse(response, output_schema):
+            parsed.append((response, output_schema))
+            return [response]
+
+        with patch.object(
+            _api_provider_utils,
+            "_build_request",
+            return_value=(create, {"model": "test"}, parse),
+        ) as build_request:
+            result = asyncio.run(agenerate_response([], client=object()))
+
+        self.assertTrue(build_request.call_args.kwargs["asynchronous"])
+        self.assertEqual(parsed, [(result[0], None)])
+        return result[0]
+
+    def test_async_create_is_awaited_on_the_event_loop(self):
+        async def create(**kwargs):
+            return kwargs, threading.current_thread()
+
+        kwargs, thread = self.generate(create)
+
+        self.assertEqual(kwargs, {"model": "test"})
+        self.assertIs(thread, threading.main_thread())
+
+    def test_sync_create_runs_in_a_worker_thread(self):
+        def create(**kwargs):
+            return kwargs, threading.current_thread()
+
+        kwargs, thread = self.generate(create)
+
+        self.assertEqual(kwargs, {"model": "test"})
+        self.assertIsNot(thread, threading.main_thread())
+
+    def test_sync_create_does_not_block_the_event_loop(self):
+        # create waits for a task on the event loop, which would deadlock if
+        # create ran on the event loop
+        loop_ran = threading.Event()
+
+        def create(**kwargs):
+            return loop_ran.wait(timeout=5)
+
+        async def generate():
+            with patch.object(
+                _api_provider_utils,
+                "_build_request",
+                return_value=(create, {}, lambda response, schema: [response]),
+            ):
+                task = asyncio.create_task(agenerate_response([], client=object()))
+                await asyncio.sleep(0)
+                loop_ran.set()
+                return await task
+
+        self.assertEqual(asyncio.run(generate()), [True])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+import asyncio
+import base64
+import io
+import unittest
+from unittest.mock import patch
+
+from PIL import Image
+
+from commandAGI._utils.image import b64ToImage, imageToB64
+from commandAGI.agents.context_window import (
+    _B64_HEADER_LENGTH,
+    ContextWindow,
+    _image_size,
+)
+from commandAGI.agents.events import (
+    AgentResponseEvent,
+    SystemInputEvent,
+    ToolResultEvent,
+    UserInputEvent,
+)
+
+
+def screenshot(width=800, height=600):
+    return imageToB64(Image.effect_noise((width, height), 64).convert("RGB"))
+
+
+def jpeg_screenshot(width=640, height=480):
+    buffer = io.BytesIO()
+    Image.effect_noise((width, height), 64).convert("RGB").save(buffer, "JPEG")
+    return base64.b64encode(buffer.getvalue()).decode()
+
+
+def screenshot_result(image):
+    return ToolResultEvent(call_id="call", result={"screenshot": image})
+
+
+def turns(count, length=400):
+    """Alternating user messages and responses of about length / 4 tokens."""
+    return [
+        (
+            UserInputEvent(content=f"{i}".ljust(length, "u"))
+            if i % 2 == 0
+            else AgentResponseEvent(role="assistant", content=f"{i}".ljust(length))
+        )
+        for i in range(count)
+    ]
+
+
+class TestImageSize(unittest.TestCase):
+    def test_only_the_header_is_decoded(self):
+        for image in [screenshot(), jpeg_screenshot()]:
+            size = b64ToImage(image).size
+            with patch("base64.b64decode", wraps=base64.b64decode) as b64decode:
+                self.assertEqual(_image_size(image), size)
+            for call in b64decode.call_args_list:
+                self.assertLessEqual(len(call.args[0]), _B64_HEADER_LENGTH)
+
+    def test_pil_images(self):
+        self.assertEqual(_image_size(Image.new("RGB", (30, 20))), (30, 20))
+
+
+class TestContextWindow(unittest.TestCase):
+    def prepare(self, window, events):
+        return asyncio.run(window.prepare(events))
+
+    def test_older_screenshots_are_downsampled_then_dropped(self):
+        window = ContextWindow(full_images=1, downsampled_images=1, downsample_size=64)
+        events = [UserInputEvent(content="objective")] + [
+            screenshot_result(screenshot()) for _ in range(3)
+        ]
+
+        prepared = self.prepare(window, events)
+
+        self.assertEqual(prepared[1].result, {"screenshot": "[screenshot omitted]"})
+        downsampled = b64ToImage(prepared[2].result["screenshot"])
+        self.assertEqual(downsampled.size, (64, 48))
+        self.assertIs(prepared[3], events[3])
+        # The history keeps the full screenshots
+        self.assertEqual(b64ToImage(events[1].result["screenshot"]).size, (800, 600))
+
+    def test_repeated_calls_return_the_same_events(self):
+        window = ContextWindow(full_images=1, downsampled_images=1)
+        events = [UserInputEvent(content="objective")] + [
+            screenshot_result(screenshot()) for _ in range(3)
+        ]
+
+        first = self.prepare(window, events)
+        second = self.prepare(window, events)
+
+        self.assertEqual(len(first), len(second))
+        for a, b in zip(first, second):
+            self.assertIs(a, b)
+
+    def test_end_of_stable_prefix_is_cacheable(self):
+        window = ContextWindow()
+        events = [UserInputEvent(content="objective")] + turns(2)
+
+        prepared = self.prepare(window, events)
+
+        self.assertTrue(prepared[0].cacheable)
+        self.assertFalse(any(event.cacheable for event in prepared[1:]))
+        self.assertFalse(events[0].cacheable)
+        self.assertEqual(prepared[0].content, "objective")
+
+    def test_oldest_turns_are_summarized(self):
+        calls = []
+
+        def summarize(previous, events):
+            calls.append((previous, [event.content[0] for event in events]))
+            return f"summary {len(calls)}"
+
+        window = ContextWindow(max_tokens=500, summarize=summarize)
+        events = [UserInputEvent(content="objective")] + turns(8)
+
+        prepared = self.prepare(window, events)
+
+        self.assertEqual(len(calls), 1)
+        self.assertIsNone(calls[0][0])
+        folded = len(calls[0][1])
+        self.assertEqual(prepared[0].content, "objective")
+        self.assertIsInstance(prepared[1], SystemInputEvent)
+        self.assertEqual(prepared[1].content, "summary 1")
+        self.assertTrue(prepared[1].cacheable)
+        self.assertEqual(prepared[2:], events[1 + folded :])
+
+        # Unchanged until the budget is exceeded again
+        self.assertEqual(self.prepare(window, events), prepared)
+        events += turns(8)
+        prepared = self.prepare(window, events)
+        self.assertEqual(calls[1][0], "summary 1")
+        self.assertEqual(prepared[1].content, "summary 2")
+
+    def test_without_summarizer_folded_events_are_left_out(self):
+        window = ContextWindow(max_tokens=500)
+        events = [UserInputEvent(content="objective")] + turns(8)
+
+        prepared = self.prepare(window, events)
+
+        self.assertRegex(prepared[1].content, r"^\d+ earlier events were left out")
+        self.assertLess(len(prepared), len(events))
+
+    def test_summary_is_kept_when_earlier_events_are_deleted(self):
+        calls = []
+
+        def summarize(previous, events):
+            calls.append(events)
+            return "summary"
+
+        window = ContextWindow(max_tokens=500, summarize=summarize)
+        events = [UserInputEvent(content="objective")] + turns(8)
+        prepared = self.prepare(window, events)
+
+        del events[1]
+
+        self.assertEqual(self.prepare(window, events), prepared)
+        self.assertEqual(len(calls), 1)
+
+    def test_history_is_summarized_again_when_folded_events_are_gone(self):
+        calls = []
+
+        def summarize(previous, events):
+            calls.append(previous)
+            return f"summary {len(calls)}"
+
+        window = ContextWindow(max_tokens=500, summarize=summarize)
+        events = [UserInputEvent(content="objective")] + turns(8)
+        self.prepare(window, events)
+
+        events[1:] = turns(8)
+        prepared = self.prepare(window, events)
+
+        self.assertEqual(calls, [None, None])
+        self.assertEqual(prepared[1].content, "summary 2")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+
+from commandAGI.agents._message_cache import AttachToolCall, ProviderMessageCache
+
+
+class Event:
+    def __init__(self, kind, text):
+        self.kind = kind
+        self.text = text
+
+
+def convert(event):
+    if event.kind == "tool_call":
+        return AttachToolCall({"id": event.text})
+    if event.kind == "thought":
+        return None
+    return {"role": event.kind, "content": event.text}
+
+
+def rebuild(events):
+    """Reference implementation: convert the whole history at once."""
+    return ProviderMessageCache(convert).messages(events)
+
+
+class TestProviderMessageCache(unittest.TestCase):
+    def setUp(self):
+        self.converted = []
+
+        def counting_convert(event):
+            self.converted.append(event)
+            return convert(event)
+
+        self.cache = ProviderMessageCache(counting_convert)
+        self.events = [
+            Event("user", "open the file"),
+            Event("assistant", "sure"),
+            Event("tool_call", "call-1"),
+            Event("tool", "done"),
+        ]
+
+    def test_new_events_are_converted_once(self):
+        self.cache.messages(self.events)
+        self.events += [Event("thought", "hmm"), Event("tool_call", "call-2")]
+        messages = self.cache.messages(self.events)
+
+        self.assertEqual(len(self.converted), 6)
+        self.assertEqual(messages, rebuild(self.events))
+        self.assertEqual(
+            messages[1]["tool_calls"], [{"id": "call-1"}, {"id": "call-2"}]
+        )
+
+    def test_earlier_results_are_not_modified(self):
+        first = self.cache.messages(self.events)
+        self.events.append(Event("tool_call", "call-2"))
+        self.cache.messages(self.events)
+        self.assertEqual(first[1]["tool_calls"], [{"id": "call-1"}])
+
+    def test_insert_and_delete_reuse_conversions(self):
+        self.cache.messages(self.events)
+        self.events.insert(1, Event("system", "be brief"))
+        self.assertEqual(self.cache.messages(self.events), rebuild(self.events))
+        del self.events[2]  # the assistant message the tool call belongs to
+        self.assertEqual(self.cache.messages(self.events), rebuild(self.events))
+        self.assertEqual(len(self.converted), 5)
+
+    def test_invalidate_converts_an_edited_event_again(self):
+        self.cache.messages(self.events)
+        self.events[1].text = "sure thing"
+        self.cache.invalidate(1)
+        messages = self.cache.messages(self.events)
+        self.assertEqual(messages[1]["content"], "sure thing")
+        self.assertEqual(len(self.converted), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+import asyncio
+import unittest
+
+from commandAGI.agents.events import AgentResponseEvent, UserInputEvent
+from commandAGI.agents.rule_enforcer import RuleEnforcer, RuleVerdict, RuleViolation
+
+
+def respond(content, tool_calls=None):
+    return AgentResponseEvent(role="assistant", content=content, tool_calls=tool_calls)
+
+
+class Checker:
+    """Gives the verdicts of a dict of rule -> function of the response."""
+
+    def __init__(self, verdicts, delays=None):
+        self.verdicts = verdicts
+        self.delays = delays or {}
+        self.checked = []
+        self.contexts = []
+        self.running = 0
+        self.max_running = 0
+
+    async def __call__(self, rule, context, response):
+        self.checked.append((rule, response.content))
+        self.contexts.append(context)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.delays.get(rule, 0.01))
+            return self.verdicts[rule](response)
+        finally:
+            self.running -= 1
+
+
+def passed(response):
+    return RuleVerdict(status="passed")
+
+
+def polite(response):
+    if "please" in response.content:
+        return RuleVerdict(status="passed")
+    return RuleVerdict(status="feedback", feedback="Say please")
+
+
+async def add_please(response, feedback):
+    return respond("please " + response.content)
+
+
+class TestRuleEnforcer(unittest.TestCase):
+    def enforce(self, enforcer, response, context=(), regenerate=add_please):
+        return asyncio.run(enforcer.enforce(list(context), response, regenerate))
+
+    def test_rules_are_checked_concurrently(self):
+        checker = Checker({"a": passed, "b": passed, "c": passed})
+
+        self.enforce(RuleEnforcer(["a", "b", "c"], checker), respond("ok"))
+
+        self.assertEqual(checker.max_running, 3)
+
+    def test_concurrency_is_limited(self):
+        checker = Checker({"a": passed, "b": passed, "c": passed})
+        enforcer = RuleEnforcer(["a", "b", "c"], checker, max_concurrency=1)
+
+        self.enforce(enforcer, respond("ok"))
+
+        self.assertEqual(checker.max_running, 1)
+
+    def test_failing_rule_raises_rule_violation(self):
+        def fail(response):
+            return RuleVerdict(status="fail", feedback="Deletes files")
+
+        checker = Checker({"fast": fail, "slow": passed}, delays={"slow": 5})
+
+        with self.assertRaises(RuleViolation) as raised:
+            self.enforce(RuleEnforcer(["slow", "fast"], checker), respond("rm -rf"))
+
+        self.assertEqual(raised.exception.rule_state.rule, "fast")
+        self.assertEqual(raised.exception.rule_state.status, "fail")
+        self.assertIn("Deletes files", str(raised.exception))
+        self.assertIsInstance(raised.exception, ValueError)
+        # The slow check was cancelled instead of awaited
+        self.assertEqual(checker.running, 0)
+
+    def test_only_rules_with_feedback_are_checked_again(self):
+        checker = Checker({"polite": polite, "short": passed})
+
+        revised = self.enforce(
+            RuleEnforcer(["polite", "short"], checker), respond("wait")
+        )
+
+        self.assertEqual(revised.content, "please wait")
+        self.assertCountEqual(
+            checker.checked,
+            [("polite", "wait"), ("short", "wait"), ("polite", "please wait")],
+        )
+
+    def test_feedback_until_max_retries_raises(self):
+        async def keep(response, feedback):
+            return response
+
+        checker = Checker({"polite": polite})
+
+        with self.assertRaises(ValueError):
+            self.enforce(
+                RuleEnforcer(["polite"], checker), respond("no"), regenerate=keep
+            )
+
+    def test_verdicts_are_cached(self):
+        checker = Checker({"polite": polite})
+        enforcer = RuleEnforcer(["polite"], checker)
+
+        self.enforce(enforcer, respond("please go"))
+        self.enforce(enforcer, respond("please go"))
+        self.enforce(enforcer, respond("please stop"))
+
+        self.assertEqual(
+            checker.checked, [("polite", "please go"), ("polite", "please stop")]
+        )
+
+    def test_cache_hits_with_new_events_of_the_same_content(self):
+        # Events of a later step have new ids, but the same inputs
+        checker = Checker({"polite": polite})
+        enforcer = RuleEnforcer(["polite"], checker)
+
+        self.enforce(enforcer, respond("please go"), [UserInputEvent(content="go")])
+        self.enforce(enforcer, respond("please go"), [UserInputEvent(content="go")])
+        self.enforce(enforcer, respond("please go"), [UserInputEvent(content="run")])
+
+        self.assertEqual(len(checker.checked), 2)
+
+    def test_checks_are_given_the_window(self):
+        checker = Checker({"polite": polite})
+        enforcer = RuleEnforcer(["polite"], checker, window=1)
+        first = [UserInputEvent(content="go"), respond("please go")]
+        later = first + [UserInputEvent(content="again")]
+
+        self.enforce(
+            enforcer, respond("please go"), first + [UserInputEvent(content="x")]
+        )
+        self.enforce(enforcer, respond("please go"), later)
+        self.enforce(
+            enforcer, respond("please go"), later + [UserInputEvent(content="x")]
+        )
+
+        self.assertEqual(len(checker.checked), 2)
+        self.assertEqual([len(context) for context in checker.contexts], [1, 1])
+        self.assertEqual(checker.contexts[1][0].content, "again")
+
+    def test_undecided_rules_are_not_cached(self):
+        checker = Checker({"unsure": lambda response: None})
+        enforcer = RuleEnforcer(["unsure"], checker)
+
+        with self.assertRaises(ValueError):
+            self.enforce(enforcer, respond("ok"))
+
+        self.assertEqual(len(checker.checked), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,205 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+from commandAGI.agents.agent import Agent, is_exclusive_tool
+from commandAGI.computers.local_computer.local_computer import LocalComputer
+
+
+class Tool:
+    def __init__(self, name, log, exclusive=None, error=None, delay=0.01):
+        self.name = name
+        self.metadata = {} if exclusive is None else {"exclusive": exclusive}
+        self.log = log
+        self.error = error
+        self.delay = delay
+
+    async def arun(self, arguments):
+        self.log.append(("start", self.name))
+        await asyncio.sleep(self.delay)
+        self.log.append(("end", self.name))
+        if self.error is not None:
+            raise self.error
+        return f"{self.name}({arguments})"
+
+
+class Session:
+    """The parts of AgentRunSession that _execute_tool_calls uses."""
+
+    def __init__(self, tools):
+        self.tools = tools
+        self.events = [None]
+        self.state = "running"
+        self.calls = []
+        self.results = []
+        self.errors = []
+        self._hooks = SimpleNamespace(
+            on_tool_execution_start_hooks=[],
+            on_tool_execution_end_hooks=[],
+            on_tool_execution_error_hooks=[],
+        )
+
+    def add_tool_call(self, tool_name, arguments):
+        self.calls.append(tool_name)
+        return len(self.calls) - 1
+
+    def add_tool_result(self, call_id, result, error=None, success=True):
+        self.results.append((call_id, result, error, success))
+
+    def add_error(self, error_type, message, traceback):
+        self.errors.append((error_type, message))
+
+
+def tool_call(name, arguments="{}"):
+    # Shaped like the tool calls of AgentResponseEvent
+    return {
+        "id": f"call-{name}",
+        "type": "function",
+        "function": {"name": name, "arguments": arguments},
+    }
+
+
+def max_running(log):
+    running = peak = 0
+    for event, _ in log:
+        running += 1 if event == "start" else -1
+        peak = max(peak, running)
+    return peak
+
+
+class TestIsExclusiveTool(unittest.TestCase):
+    def test_tools_are_exclusive_by_default(self):
+        self.assertTrue(is_exclusive_tool(Tool("click", [])))
+        self.assertTrue(is_exclusive_tool(Tool("click", [], exclusive=True)))
+
+    def test_tools_marked_non_exclusive(self):
+        self.assertFalse(is_exclusive_tool(Tool("locate", [], exclusive=False)))
+
+    def test_computer_tools_are_exclusive(self):
+        # Even the locate_* tools share the computer's screen capture
+        tools = {tool.name: tool for tool in LocalComputer().tools}
+        self.assertIn("locate_texts_on_screen", tools)
+        self.assertTrue(all(is_exclusive_tool(tool) for tool in tools.values()))
+
+
+class TestExecuteToolCalls(unittest.TestCase):
+    def setUp(self):
+        self.log = []
+        self.agent = Agent.model_construct(max_concurrent_tools=4)
+
+    def read_tool(self, name, **kwargs):
+        return Tool(name, self.log, exclusive=False, **kwargs)
+
+    def execute(self, session, calls):
+        return asyncio.run(self.agent._execute_tool_calls(session, calls))
+
+    def test_non_exclusive_calls_run_together(self):
+        session = Session([self.read_tool("a"), self.read_tool("b")])
+
+        self.assertTrue(self.execute(session, [tool_call("a"), tool_call("b")]))
+
+        self.assertEqual(max_running(self.log), 2)
+
+    def test_concurrency_is_limited(self):
+        self.agent = Agent.model_construct(max_concurrent_tools=2)
+        session = Session([self.read_tool("a")])
+
+        self.execute(session, [tool_call("a")] * 5)
+
+        self.assertEqual(max_running(self.log), 2)
+        self.assertEqual(len(session.results), 5)
+
+    def test_exclusive_calls_run_alone_in_order(self):
+        session = Session(
+            [
+                self.read_tool("read"),
+                Tool("click", self.log),
+                Tool("type", self.log),
+            ]
+        )
+        calls = [tool_call(name) for name in ["read", "click", "type", "read"]]
+
+        self.execute(session, calls)
+
+        self.assertEqual(
+            self.log,
+            [
+                ("start", "read"),
+                ("end", "read"),
+                ("start", "click"),
+                ("end", "click"),
+                ("start", "type"),
+                ("end", "type"),
+                ("start", "read"),
+                ("end", "read"),
+            ],
+        )
+
+    def test_results_are_added_in_call_order(self):
+        session = Session(
+            [self.read_tool("slow", delay=0.05), self.read_tool("fast", delay=0)]
+        )
+
+        self.execute(session, [tool_call("slow", "1"), tool_call("fast", "2")])
+
+        self.assertEqual(self.log[0], ("start", "slow"))
+        self.assertEqual(self.log[-1], ("end", "slow"))
+        self.assertEqual(session.calls, ["slow", "fast"])
+        self.assertEqual(
+            session.results,
+            [(0, "slow(1)", None, True), (1, "fast(2)", None, True)],
+        )
+
+    def test_errors_are_recorded_and_raised_after_the_batch(self):
+        error = RuntimeError("not found")
+        session = Session(
+            [
+                self.read_tool("fails", error=error),
+                self.read_tool("read"),
+                Tool("click", self.log),
+            ]
+        )
+        failed = []
+        session._hooks.on_tool_execution_error_hooks.append(
+            lambda message_index, tool_call_index, e: failed.append(tool_call_index)
+        )
+
+        with self.assertRaises(RuntimeError) as raised:
+            self.execute(
+                session, [tool_call("fails"), tool_call("read"), tool_call("click")]
+            )
+
+        self.assertIs(raised.exception, error)
+        # The other call of the batch still completes, the next batch never runs
+        self.assertEqual(
+            session.results,
+            [(0, None, "not found", False), (1, "read({})", None, True)],
+        )
+        self.assertNotIn(("start", "click"), self.log)
+        self.assertEqual(failed, [0])
+        self.assertEqual(session.errors, [("tool_execution_error", "not found")])
+
+    def test_unknown_tool_runs_alone_and_fails(self):
+        session = Session([self.read_tool("read")])
+
+        with self.assertRaises(ValueError):
+            self.execute(session, [tool_call("read"), tool_call("missing")])
+
+        self.assertEqual(self.log, [("start", "read"), ("end", "read")])
+        self.assertEqual(session.results[1][:2], (1, None))
+        self.assertFalse(session.results[1][3])
+
+    def test_stopped_session_runs_no_more_batches(self):
+        session = Session([Tool("click", self.log)])
+
+        def stop(message_index, tool_call_index):
+            session.state = "stopped"
+
+        session._hooks.on_tool_execution_end_hooks.append(stop)
+
+        self.assertFalse(self.execute(session, [tool_call("click")] * 2))
+        self.assertEqual(session.calls, ["click"])
+
+
+if __name__ == "__main__":
+    unittest.main()
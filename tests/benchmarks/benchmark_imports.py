@@ -0,0 +1,164 @@
+"""
+Benchmarks for commandAGI import times.
+
+This module measures how long it takes to import commandAGI modules in a fresh
+interpreter, as a cold-started daemon container or CLI invocation would.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+# Imports done at startup, from cheapest to most expensive
+MODULES = [
+    "commandAGI",
+    "commandAGI.computers",
+    "commandAGI.daemon",
+    "commandAGI.cli",
+    "commandAGI.daemon.cli",
+    "commandAGI.computers.local_computer.local_computer",
+    "commandAGI.daemon.server",
+]
+
+
+def measure_import(module: str) -> Optional[tuple[float, List[str]]]:
+    """
+    Import a module in a fresh interpreter.
+
+    Args:
+        module: Name of the module to import
+
+    Returns:
+        The import time in seconds and the top-level packages outside the
+        standard library that were imported along with it, or None if the
+        module failed to import
+    """
+    code = (
+        "import sys, time\n"
+        "before = set(sys.modules)\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "print(time.perf_counter() - start)\n"
+        "new = {m.split('.')[0] for m in set(sys.modules) - before}\n"
+        "print(' '.join(sorted(new - set(sys.stdlib_module_names))))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()
+        print(f"Error: {error[-1] if error else 'unknown'}")
+        return None
+    elapsed, packages = result.stdout.splitlines()[-2:]
+    return float(elapsed), packages.split()
+
+
+def benchmark_imports(modules: List[str], num_runs: int = 5) -> Dict[str, List[float]]:
+    """
+    Benchmark the import time of modules.
+
+    Args:
+        modules: Names of the modules to import
+        num_runs: Number of fresh interpreters per module
+
+    Returns:
+        Dictionary mapping module names to import times
+    """
+    results = {}
+
+    for module in modules:
+        print(f"  Benchmarking import {module}...", end="", flush=True)
+        times = []
+        packages = []
+        for _ in range(num_runs):
+            measured = measure_import(module)
+            if measured is None:
+                break
+            times.append(measured[0])
+            packages = measured[1]
+        results[module] = times
+        if times:
+            print(f" Mean: {statistics.mean(times):.6f}s")
+            print(f"    Loaded packages: {', '.join(packages)}")
+
+    return results
+
+
+def print_stats(name: str, times: List[float]) -> None:
+    """Print statistics for a set of benchmark times."""
+    if not times:
+        print(f"{name}: No data")
+        return
+
+    print(f"{name}:")
+    print(f"  Mean: {statistics.mean(times):.6f}s")
+    print(f"  Median: {statistics.median(times):.6f}s")
+    print(f"  Min: {min(times):.6f}s")
+    print(f"  Max: {max(times):.6f}s")
+    if len(times) > 1:
+        print(f"  Std Dev: {statistics.stdev(times):.6f}s")
+
+
+def plot_results(
+    results: Dict[str, List[float]], title: str = "Import Time Benchmark"
+) -> None:
+    """
+    Plot benchmark results.
+
+    Args:
+        results: Dictionary mapping module names to import times
+        title: Plot title
+    """
+    modules = [module for module, times in results.items() if times]
+    means = [statistics.mean(results[module]) for module in modules]
+    stds = [
+        statistics.stdev(results[module]) if len(results[module]) > 1 else 0
+        for module in modules
+    ]
+
+    fig, ax = plt.subplots(figsize=(12, 6))
+    y = np.arange(len(modules))
+    ax.barh(y, means, xerr=stds)
+    ax.set_xlabel("Time (s)")
+    ax.set_yticks(y)
+    ax.set_yticklabels(modules)
+    ax.invert_yaxis()
+
+    fig.suptitle(title, fontsize=16)
+    fig.tight_layout(rect=[0, 0, 1, 0.97])  # Adjust for the suptitle
+    plt.savefig("imports_benchmark.png")
+    plt.show()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark commandAGI import times")
+    parser.add_argument(
+        "--runs", type=int, default=5, help="Number of fresh interpreters per module"
+    )
+    parser.add_argument("--plot", action="store_true", help="Generate plot of results")
+    parser.add_argument(
+        "--modules", nargs="+", default=MODULES, help="Modules to import"
+    )
+    args = parser.parse_args()
+
+    # Run benchmarks
+    print("\nRunning benchmarks...")
+    results = benchmark_imports(args.modules, num_runs=args.runs)
+
+    # Print detailed statistics
+    print("\nDetailed Results:")
+    for module, times in results.items():
+        print_stats(f"  {module}", times)
+
+    # Plot results if requested
+    if args.plot:
+        plot_results(results)
+
+
+if __name__ == "__main__":
+    main()
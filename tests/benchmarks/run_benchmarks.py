@@ -68,6 +68,7 @@ def main():
         "benchmark_daemon": [],
         "benchmark_image_utils": [],
         "benchmark_screen_parser": [],
+        "benchmark_imports": [],
     }
 
     # Filter benchmarks if specified
@@ -0,0 +1,48 @@
+import subprocess
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+
+import commandAGI.computers as computers
+
+
+class TestComputerRegistry(unittest.TestCase):
+    def test_importing_the_package_loads_no_backend(self):
+        code = (
+            "import sys, commandAGI.computers\n"
+            "print(sorted(m for m in sys.modules if m.startswith('commandAGI')))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        self.assertEqual(
+            result.stdout.strip(), "['commandAGI', 'commandAGI.computers']"
+        )
+
+    def test_missing_dependencies_name_the_extra(self):
+        with patch.object(
+            computers.importlib, "import_module", side_effect=ImportError("mss")
+        ):
+            with self.assertRaisesRegex(ImportError, r"commandAGI\[vnc\]"):
+                computers.load_computer("VNCComputer")
+
+    def test_plugins_are_loaded_from_entry_points(self):
+        plugin_cls = type("PluginComputer", (), {})
+        entry_point = MagicMock()
+        entry_point.load.return_value = plugin_cls
+        with patch.object(
+            computers, "_plugins", return_value={"PluginComputer": entry_point}
+        ):
+            self.assertIn("PluginComputer", computers.available_computers())
+            self.assertIs(computers.PluginComputer, plugin_cls)
+        del computers.PluginComputer
+
+    def test_unknown_computer(self):
+        with self.assertRaises(KeyError):
+            computers.load_computer("NoSuchComputer")
+        with self.assertRaises(AttributeError):
+            computers.NoSuchComputer
+
+
+if __name__ == "__main__":
+    unittest.main()
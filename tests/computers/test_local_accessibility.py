@@ -0,0 +1,153 @@
+import queue
+import sys
+import threading
+import types
+import unittest
+from unittest.mock import patch
+
+from commandAGI._utils.layout_tree import LayoutTree
+from commandAGI.computers.local_computer.local_accessibility import (
+    LinuxAccessibilityBackend,
+    MacOSAccessibilityBackend,
+)
+
+
+class FakeAXElement:
+    """Mimics a pyax element: attributes by name, iterating over children."""
+
+    def __init__(self, role, title, children=()):
+        self.attributes = {"AXRole": role, "AXTitle": title}
+        self.children = list(children)
+
+    def get(self, name, default=None):
+        return self.attributes.get(name, default)
+
+    def __getitem__(self, name):
+        return self.attributes[name]
+
+    def keys(self):
+        return self.attributes.keys()
+
+    def items(self):
+        return self.attributes.items()
+
+    def __iter__(self):
+        # pyax builds new objects on every read
+        return iter([FakeAXElement(**child.spec()) for child in self.children])
+
+    def __eq__(self, other):
+        # Like AXUIElement, copies of the same element compare equal
+        return isinstance(other, FakeAXElement) and self.spec() == other.spec()
+
+    def spec(self):
+        return {
+            "role": self.attributes["AXRole"],
+            "title": self.attributes["AXTitle"],
+            "children": self.children,
+        }
+
+
+class TestMacOSAccessibilityBackend(unittest.TestCase):
+    def setUp(self):
+        self.window = FakeAXElement(
+            "AXWindow",
+            "Notes",
+            [FakeAXElement("AXButton", "OK"), FakeAXElement("AXButton", "OK")],
+        )
+        app = FakeAXElement("AXApplication", "Notes", [self.window])
+        app.attributes["AXFocusedWindow"] = self.window
+        self.pyax = types.SimpleNamespace(get_frontmost_application=lambda: app)
+
+    def test_ids_are_stable_across_reads(self):
+        layout_tree = LayoutTree(MacOSAccessibilityBackend(self.pyax))
+        first = layout_tree.get()
+        second = layout_tree.get()
+        self.assertEqual(first, second)
+
+        buttons = first["children"][0]["children"]
+        # Siblings with the same role and title are told apart by their index
+        self.assertNotEqual(buttons[0]["id"], buttons[1]["id"])
+
+    def test_focused_window_has_the_same_id_as_from_the_root(self):
+        layout_tree = LayoutTree(MacOSAccessibilityBackend(self.pyax))
+        window = layout_tree.get()["children"][0]
+        self.assertEqual(layout_tree.get(focused_window_only=True)["id"], window["id"])
+
+
+class FakeAccessible:
+    def __init__(self, name, children=(), reads=None):
+        self.name = name
+        self.children = list(children)
+        self.reads = reads
+
+    @property
+    def childCount(self):
+        self.reads.append(threading.current_thread().name)
+        return len(self.children)
+
+    def getChildAtIndex(self, index):
+        return self.children[index]
+
+    def getState(self):
+        raise RuntimeError("no states")
+
+
+class FakeRegistry:
+    """Runs idle callbacks on the thread that calls start, like GLib's loop."""
+
+    def __init__(self, desktop):
+        self.desktop = desktop
+        self.callbacks = queue.Queue()
+        self.listeners = []
+
+    def getDesktop(self, index):
+        return self.desktop
+
+    def registerEventListener(self, listener, *events):
+        self.listeners.append(listener)
+
+    def deregisterEventListener(self, listener, *events):
+        self.listeners.remove(listener)
+
+    def start(self):
+        while (callback := self.callbacks.get()) is not None:
+            callback()
+
+    def stop(self):
+        self.callbacks.put(None)
+
+
+class TestLinuxAccessibilityBackend(unittest.TestCase):
+    def setUp(self):
+        self.reads = []
+        desktop = FakeAccessible(
+            "desktop", [FakeAccessible("app", reads=self.reads)], reads=self.reads
+        )
+        self.registry = FakeRegistry(desktop)
+        pyatspi = types.SimpleNamespace(Registry=self.registry)
+        glib = types.SimpleNamespace(idle_add=self.registry.callbacks.put)
+        gi = types.ModuleType("gi")
+        gi.repository = types.SimpleNamespace(GLib=glib)
+        with patch.dict(sys.modules, {"gi": gi, "gi.repository": gi.repository}):
+            self.layout_tree = LayoutTree(LinuxAccessibilityBackend(pyatspi))
+
+    def tearDown(self):
+        self.layout_tree.close()
+
+    def test_calls_run_on_the_event_thread(self):
+        tree = self.layout_tree.get(max_depth=0)
+        self.assertEqual(tree["child_count"], 1)
+        self.layout_tree.get()
+        self.assertTrue(self.reads)
+        self.assertEqual(set(self.reads), {"commandagi-atspi-events"})
+
+    def test_close_stops_the_event_thread(self):
+        backend = self.layout_tree.backend
+        event_thread = backend._event_thread
+        self.layout_tree.close()
+        self.assertFalse(event_thread.is_alive())
+        self.assertEqual(self.registry.listeners, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import subprocess
+import sys
+import unittest
+
+from commandAGI._utils.output_pump import OutputBuffer, shared_pump
+from commandAGI.computers.local_computer.applications.local_background_shell import (
+    LocalBackgroundShell,
+)
+
+
+class TestReadCommandOutput(unittest.TestCase):
+    def setUp(self):
+        self.shell = LocalBackgroundShell.model_construct()
+        self.process = subprocess.Popen(
+            [sys.executable, "-c", "import sys; sys.stdout.write('é€a')"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        buffers = {name: OutputBuffer(1 << 20) for name in ("stdout", "stderr")}
+        self.shell._background_processes = {self.process.pid: self.process}
+        self.shell._output_buffers = {self.process.pid: buffers}
+        shared_pump().add(self.process.stdout, buffers["stdout"])
+        shared_pump().add(self.process.stderr, buffers["stderr"])
+        self.process.wait()
+
+    def test_characters_longer_than_max_bytes_are_read_whole(self):
+        offset, data = 0, []
+        while True:
+            result = self.shell.read_command_output(
+                self.process.pid, offset=offset, max_bytes=1, timeout=5
+            )
+            data.append(result["data"])
+            self.assertGreater(result["next_offset"], offset)
+            offset = result["next_offset"]
+            if offset == 6:
+                break
+        self.assertEqual(data, ["é", "€", "a"])
+
+    def test_rejects_unknown_stream(self):
+        with self.assertRaises(ValueError):
+            self.shell.read_command_output(self.process.pid, stream="stdin")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from commandAGI._utils.file_transfer import FileChangedError, file_version
+from commandAGI.computers.base_computer.paged_file import PAGE_SIZE, PagedComputerFile
+
+
+class LocalPagedFile(PagedComputerFile):
+    """Pages a local file, counting the bytes moved in each direction."""
+
+    def __init__(self, *args, **kwargs):
+        self.read_bytes = 0
+        self.written_bytes = 0
+        super().__init__(None, *args, **kwargs)
+
+    def _stat(self):
+        if not self.path.exists():
+            return None
+        return self.path.stat().st_size, file_version(self.path)
+
+    def _read_range(self, offset, length, version):
+        if file_version(self.path) != version:
+            raise FileChangedError(str(self.path))
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            data = f.read(length)
+        self.read_bytes += len(data)
+        return data
+
+    def _write_range(self, offset, data):
+        with open(self.path, "r+b") as f:
+            f.seek(offset)
+            f.write(data)
+        self.written_bytes += len(data)
+        return self._stat()
+
+    def _truncate(self, size):
+        with open(self.path, "ab") as f:
+            f.truncate(size)
+        return self._stat()
+
+
+class TestPagedComputerFile(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = Path(self.dir) / "big.log"
+        self.lines = [f"line {i}\n".encode() for i in range(500000)]
+        self.path.write_bytes(b"".join(self.lines))
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_reading_a_line_fetches_a_few_pages(self):
+        with LocalPagedFile(self.path, "r") as f:
+            self.assertEqual(f.readline(), "line 0\n")
+        self.assertLessEqual(f.read_bytes, 2 * PAGE_SIZE)
+
+    def test_sequential_reads(self):
+        with LocalPagedFile(self.path, "rb") as f:
+            self.assertEqual(f.read(), self.path.read_bytes())
+            f.seek(-9, os.SEEK_END)
+            self.assertEqual(f.read(), b"e 499999\n")
+
+    def test_appending_writes_only_the_new_bytes(self):
+        with LocalPagedFile(self.path, "a") as f:
+            f.write("appended\n")
+        self.assertEqual(f.written_bytes, len("appended\n"))
+        self.assertLessEqual(f.read_bytes, PAGE_SIZE)
+        self.assertEqual(self.path.read_bytes(), b"".join(self.lines) + b"appended\n")
+
+    def test_writing_back_changed_pages(self):
+        expected = bytearray(self.path.read_bytes())
+        with LocalPagedFile(self.path, "r+b") as f:
+            f.seek(PAGE_SIZE * 3 + 5)
+            f.write(b"XYZ")
+            expected[PAGE_SIZE * 3 + 5 : PAGE_SIZE * 3 + 8] = b"XYZ"
+            f.flush()
+            self.assertEqual(self.path.read_bytes(), expected)
+            self.assertEqual(f.written_bytes, 3)
+
+            f.truncate(10)
+        self.assertEqual(self.path.read_bytes(), expected[:10])
+
+    def test_changes_on_the_computer_invalidate_the_cache(self):
+        with LocalPagedFile(self.path, "rb", buffering=0) as f:
+            f.revalidate_after = 0
+            self.assertEqual(f.read(6), b"line 0")
+            self.path.write_bytes(b"changed")
+            f.seek(0)
+            self.assertEqual(f.read(), b"changed")
+
+    def test_writes_across_pages_and_past_the_end(self):
+        size = self.path.stat().st_size
+        data = b"x" * (PAGE_SIZE * 2 + 10)
+        with LocalPagedFile(self.path, "r+b") as f:
+            f.seek(PAGE_SIZE - 5)
+            f.write(data)
+            f.seek(size + 100)
+            f.write(b"end")
+        content = self.path.read_bytes()
+        self.assertEqual(content[PAGE_SIZE - 5 : PAGE_SIZE * 3 + 5], data)
+        self.assertEqual(content[size : size + 100], bytes(100))
+        self.assertEqual(content[size + 100 :], b"end")
+        self.assertEqual(f.written_bytes, len(data) + 3)
+
+    def test_write_mode(self):
+        with LocalPagedFile(self.path, "w") as f:
+            f.write("new")
+        self.assertEqual(self.path.read_text(), "new")
+        with self.assertRaises(FileExistsError):
+            LocalPagedFile(self.path, "x")
+        with self.assertRaises(FileNotFoundError):
+            LocalPagedFile(Path(self.dir) / "missing", "r")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import base64
+import io
+import logging
+import unittest
+from unittest.mock import MagicMock, patch
+
+from PIL import Image
+
+from commandAGI._utils.image import b64ToImage
+from commandAGI.computers.remote_computer import remote_computer
+from commandAGI.computers.remote_computer.remote_computer import RemoteComputer
+from commandAGI.daemon.websocket import RequestNotSentError
+
+
+def png_bytes():
+    buffer = io.BytesIO()
+    Image.new("RGB", (4, 3), "red").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class DroppingWebSocket:
+    """A WebSocket channel whose connection drops after some requests.
+
+    With sent=True the connection drops while waiting for the response to
+    the last request, after the daemon received it.
+    """
+
+    def __init__(self, requests_before_drop, sent=False):
+        self.remaining = requests_before_drop
+        self.sent = sent
+        self.connected = True
+        self.closed = False
+        self.requests = []
+
+    def drop(self):
+        # The reader thread ends when the connection drops
+        self.connected = False
+
+    def request(self, message):
+        if self.remaining == 0:
+            self.drop()
+            if self.sent:
+                self.requests.append(message)
+                raise ConnectionError("WebSocket connection to daemon closed")
+            raise RequestNotSentError("WebSocket connection to daemon is closed")
+        self.remaining -= 1
+        self.requests.append(message)
+        if message["type"] == "screenshot":
+            return {"type": "screenshot", "codec": "png"}, png_bytes()
+        results = [{"success": True, "error": None} for _ in message["actions"]]
+        return {"success": True, "results": results}, b""
+
+    def close(self):
+        self.closed = True
+
+
+class TestWebSocketFallback(unittest.TestCase):
+    def setUp(self):
+        self.computer = RemoteComputer.model_construct(
+            client=MagicMock(), logger=logging.getLogger(__name__)
+        )
+        self.http = self.computer.client.get_httpx_client.return_value
+        self.http.post.return_value.json.return_value = {
+            "success": True,
+            "results": [{"success": True, "error": None}],
+        }
+        self.http.get.return_value.json.return_value = {
+            "screenshot": base64.b64encode(png_bytes()).decode(),
+            "codec": "png",
+        }
+
+    def screenshot_size(self):
+        observation = self.computer._get_screenshot(format="base64")
+        return b64ToImage(observation.screenshot).size
+
+    def test_unsent_request_is_retried_over_rest(self):
+        websocket = self.computer._websocket = DroppingWebSocket(1)
+        action = {"action_type": "type", "text": "hi"}
+
+        self.computer.execute_batch([action])
+        self.http.post.assert_not_called()
+
+        # The connection drops during the second request
+        self.computer.execute_batch([action])
+
+        self.http.post.assert_called_once_with(
+            "/execute/batch", json={"actions": [action], "stop_on_error": True}
+        )
+        self.assertTrue(websocket.closed)
+        self.assertIsNone(self.computer._websocket)
+        self.assertEqual(len(websocket.requests), 1)
+
+    def test_sent_batch_is_not_resent_when_the_connection_drops(self):
+        websocket = self.computer._websocket = DroppingWebSocket(0, sent=True)
+
+        with self.assertRaises(ConnectionError):
+            self.computer.execute_batch([{"action_type": "type", "text": "hi"}])
+
+        self.http.post.assert_not_called()
+        self.assertEqual(len(websocket.requests), 1)
+        self.assertIsNone(self.computer._websocket)
+
+    def test_sent_screenshot_is_retried_over_rest(self):
+        websocket = self.computer._websocket = DroppingWebSocket(0, sent=True)
+
+        self.assertEqual(self.screenshot_size(), (4, 3))
+
+        self.http.get.assert_called_once()
+        self.assertEqual(len(websocket.requests), 1)
+
+    def test_closed_connection_is_not_used(self):
+        websocket = self.computer._websocket = DroppingWebSocket(10)
+        self.assertEqual(self.screenshot_size(), (4, 3))
+        self.http.get.assert_not_called()
+
+        websocket.drop()
+
+        self.assertEqual(self.screenshot_size(), (4, 3))
+        self.http.get.assert_called_once()
+        self.assertEqual(len(websocket.requests), 1)
+        self.assertIsNone(self.computer._websocket)
+
+    def test_actions_use_rest_once_the_connection_dropped(self):
+        websocket = self.computer._websocket = DroppingWebSocket(10)
+        with patch.object(remote_computer, "type_sync") as type_sync:
+            self.computer._type("before")
+            type_sync.assert_not_called()
+
+            websocket.drop()
+            self.computer._type("after")
+
+        self.assertEqual(len(websocket.requests), 1)
+        self.assertEqual(type_sync.call_args.kwargs["body"].text, "after")
+        with self.assertRaises(RuntimeError):
+            self.computer.subscribe_screen_updates(lambda image: None)
+
+
+if __name__ == "__main__":
+    unittest.main()
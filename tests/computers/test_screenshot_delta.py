@@ -0,0 +1,117 @@
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from commandAGI._utils.image import process_screenshot
+from commandAGI.computers.base_computer import BaseComputer
+from commandAGI.computers.local_computer.local_computer import LocalComputer
+
+
+class FakeScreenShot:
+    def __init__(self, frame):
+        self.raw = frame.tobytes()
+        self.height, self.width = frame.shape[:2]
+        self.left = self.top = 0
+
+
+class FakeMSS:
+    """Stands in for mss, capturing a BGRA array."""
+
+    def __init__(self, width=64, height=48):
+        self.frame = np.zeros((height, width, 4), dtype=np.uint8)
+        self.monitors = [None, {"left": 0, "top": 0}]
+
+    def grab(self, monitor):
+        return FakeScreenShot(self.frame)
+
+
+class ImageComputer(BaseComputer):
+    """A computer whose backend only returns encoded screenshots."""
+
+    def _get_screenshot(self, display_id=0, format="PIL"):
+        return process_screenshot(
+            screenshot_data=self._image,
+            output_format=format,
+            input_format="PIL",
+            computer_name="test",
+        )
+
+    def _open(self, path, mode="r", encoding=None, errors=None, buffering=-1):
+        raise NotImplementedError
+
+
+class TestLocalComputerScreenshotDelta(unittest.TestCase):
+    def setUp(self):
+        self.computer = LocalComputer()
+        self.screen = self.computer._sct = FakeMSS()
+
+    def paint(self, left, top, bgra):
+        self.screen.frame[top : top + 8, left : left + 8] = bgra
+
+    def test_changed_blocks_are_cropped_from_the_captured_frame(self):
+        keyframe = self.computer.get_screenshot_delta(block_size=16)
+        self.assertTrue(keyframe["keyframe"])
+        self.assertEqual(keyframe["frame_size"], (64, 48))
+        self.assertEqual(keyframe["regions"][0]["patch"].size, (64, 48))
+
+        self.paint(20, 20, (0, 0, 255, 255))
+        delta = self.computer.get_screenshot_delta(block_size=16)
+
+        self.assertFalse(delta["keyframe"])
+        self.assertEqual(len(delta["regions"]), 1)
+        region = delta["regions"][0]
+        self.assertEqual(
+            (region["left"], region["top"], region["width"], region["height"]),
+            (16, 16, 16, 16),
+        )
+        self.assertEqual(region["patch"].getpixel((4, 4)), (255, 0, 0))
+        self.assertFalse(self.computer.get_screenshot_delta(block_size=16)["changed"])
+
+    def test_sessions_compare_against_their_own_previous_frame(self):
+        self.computer.get_screenshot_delta(session="a")
+        self.computer.get_screenshot_delta(session="b")
+
+        self.paint(0, 0, (255, 255, 255, 255))
+        self.assertTrue(self.computer.get_screenshot_delta(session="a")["changed"])
+
+        # a having seen the change doesn't hide it from b
+        delta = self.computer.get_screenshot_delta(session="b")
+        self.assertTrue(delta["changed"])
+        self.assertFalse(delta["keyframe"])
+
+    def test_reset_only_affects_its_session(self):
+        self.computer.get_screenshot_delta(session="a")
+        self.computer.get_screenshot_delta(session="b")
+
+        self.computer.reset_screenshot_delta(session="a")
+
+        self.assertTrue(self.computer.get_screenshot_delta(session="a")["keyframe"])
+        self.assertFalse(self.computer.get_screenshot_delta(session="b")["changed"])
+
+    def test_least_recently_used_sessions_are_forgotten(self):
+        self.computer.max_screenshot_delta_sessions = 2
+        for session in ["a", "b", "a", "c"]:
+            self.computer.get_screenshot_delta(session=session)
+
+        self.assertFalse(self.computer.get_screenshot_delta(session="a")["changed"])
+        self.assertTrue(self.computer.get_screenshot_delta(session="b")["keyframe"])
+
+
+class TestDefaultScreenshotDelta(unittest.TestCase):
+    def test_encoded_screenshots_are_decoded(self):
+        computer = ImageComputer()
+        computer._image = Image.new("RGB", (40, 30), "blue")
+
+        delta = computer.get_screenshot_delta(block_size=8, format="ndarray")
+
+        self.assertEqual(delta["frame_size"], (40, 30))
+        self.assertEqual(delta["regions"][0]["patch"][0, 0].tolist(), [0, 0, 255])
+        computer._image.paste("red", (0, 0, 8, 8))
+        delta = computer.get_screenshot_delta(block_size=8, format="ndarray")
+        self.assertEqual(len(delta["regions"]), 1)
+        self.assertEqual(delta["regions"][0]["patch"].shape, (8, 8, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
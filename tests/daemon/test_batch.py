@@ -0,0 +1,119 @@
+import unittest
+from unittest.mock import MagicMock, call, patch
+
+from fastapi.testclient import TestClient
+
+from commandAGI.daemon.server import ComputerDaemon
+
+
+class TestBatchEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.mock_computer = MagicMock()
+        for method in ["move", "mouse_down", "type", "mouse_up", "scroll"]:
+            getattr(self.mock_computer, method).return_value = None
+        with patch.object(ComputerDaemon, "_create_mcp_server"):
+            self.daemon = ComputerDaemon(self.mock_computer, api_token="test_token")
+        self.client = TestClient(self.daemon._fastapi_server)
+        self.headers = {"Authorization": "Bearer test_token"}
+
+    def post_batch(self, actions, **kwargs):
+        return self.client.post(
+            "/execute/batch",
+            headers=self.headers,
+            json={"actions": actions, **kwargs},
+        )
+
+    def test_runs_actions_in_order(self):
+        response = self.post_batch(
+            [
+                {"action_type": "mouse_move", "x": 10, "y": 20},
+                {"action_type": "mouse_down"},
+                {"action_type": "type", "text": "hello"},
+                {"action_type": "mouse_button_up"},
+            ]
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["success"])
+        self.assertEqual(len(response.json()["results"]), 4)
+        self.assertEqual(
+            [c[0] for c in self.mock_computer.mock_calls],
+            ["move", "mouse_down", "type", "mouse_up"],
+        )
+        self.mock_computer.move.assert_called_once_with(10, 20, 0.5)
+
+    def test_stops_at_first_failure(self):
+        self.mock_computer.type.side_effect = RuntimeError("typing failed")
+        response = self.post_batch(
+            [
+                {"action_type": "type", "text": "a"},
+                {"action_type": "mouse_scroll", "amount": 3},
+            ]
+        )
+        body = response.json()
+        self.assertFalse(body["success"])
+        self.assertEqual(
+            body["results"],
+            [{"success": False, "result": None, "error": "typing failed"}],
+        )
+        self.mock_computer.scroll.assert_not_called()
+
+    def test_continues_after_failure_when_requested(self):
+        self.mock_computer.type.side_effect = RuntimeError("typing failed")
+        response = self.post_batch(
+            [
+                {"action_type": "type", "text": "a"},
+                {"action_type": "mouse_scroll", "amount": 3},
+            ],
+            stop_on_error=False,
+        )
+        self.assertEqual(len(response.json()["results"]), 2)
+        self.assertEqual(self.mock_computer.scroll.call_args, call(3))
+
+    def test_returns_each_action_result(self):
+        self.mock_computer.shell.return_value = {"stdout": "hi", "exit_code": 0}
+        response = self.post_batch(
+            [
+                {"action_type": "command", "command": "echo hi"},
+                {"action_type": "mouse_scroll", "amount": 3},
+            ]
+        )
+        self.assertEqual(
+            response.json()["results"],
+            [
+                {
+                    "success": True,
+                    "result": {"stdout": "hi", "exit_code": 0},
+                    "error": None,
+                },
+                {"success": True, "result": None, "error": None},
+            ],
+        )
+
+    def test_holds_the_input_resource_per_action(self):
+        resources = []
+        run = self.daemon._executor.run
+
+        async def record(resource, func, *args, **kwargs):
+            resources.append(resource)
+            return await run(resource, func, *args, **kwargs)
+
+        with patch.object(self.daemon._executor, "run", record):
+            self.post_batch(
+                [
+                    {"action_type": "command", "command": "echo hi"},
+                    {"action_type": "type", "text": "a"},
+                ]
+            )
+        self.assertEqual(resources, [None, "input"])
+
+    def test_rejects_unknown_action_type(self):
+        response = self.post_batch([{"action_type": "self_destruct"}])
+        self.assertEqual(response.status_code, 422)
+
+    def test_requires_token(self):
+        response = self.client.post("/execute/batch", json={"actions": []})
+        self.assertIn(response.status_code, (401, 403))
+
+
+if __name__ == "__main__":
+    unittest.main()
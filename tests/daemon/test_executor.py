@@ -0,0 +1,100 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from commandAGI.daemon.executor import DaemonExecutor, ExecutorSaturatedError
+
+
+class TestDaemonExecutor(unittest.TestCase):
+    def setUp(self):
+        self.executor = DaemonExecutor(max_workers=4, max_queue_size=8)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_run_returns_result(self):
+        async def main():
+            return await self.executor.run(None, lambda x, y=0: x + y, 1, y=2)
+
+        self.assertEqual(asyncio.run(main()), 3)
+        self.assertEqual(self.executor.stats()["completed"], 1)
+
+    def test_same_resource_runs_in_arrival_order(self):
+        order = []
+
+        def record(i):
+            time.sleep(0.01 * (5 - i))
+            order.append(i)
+
+        async def main():
+            await asyncio.gather(
+                *(self.executor.run("input", record, i) for i in range(5))
+            )
+
+        asyncio.run(main())
+        self.assertEqual(order, [0, 1, 2, 3, 4])
+
+    def test_different_resources_run_concurrently(self):
+        barrier = threading.Barrier(2, timeout=2)
+
+        async def main():
+            await asyncio.gather(
+                self.executor.run("input", barrier.wait),
+                self.executor.run("screen", barrier.wait),
+            )
+
+        # Would raise BrokenBarrierError if the calls were serialized
+        asyncio.run(main())
+
+    def test_rejects_calls_when_saturated(self):
+        executor = DaemonExecutor(max_workers=1, max_queue_size=2)
+        release = threading.Event()
+
+        async def main():
+            pending = [
+                asyncio.ensure_future(executor.run(None, release.wait))
+                for _ in range(2)
+            ]
+            await asyncio.sleep(0)
+            with self.assertRaises(ExecutorSaturatedError):
+                await executor.run(None, release.wait)
+            self.assertEqual(executor.stats()["queued"], 1)
+            self.assertEqual(executor.stats()["running"], 1)
+            release.set()
+            await asyncio.gather(*pending)
+
+        asyncio.run(main())
+        self.assertEqual(executor.stats()["rejected"], 1)
+        self.assertEqual(executor.stats()["completed"], 2)
+        executor.shutdown()
+
+    def test_failed_call_releases_resource(self):
+        def fail():
+            raise RuntimeError("boom")
+
+        async def main():
+            with self.assertRaises(RuntimeError):
+                await self.executor.run("input", fail)
+            return await self.executor.run("input", lambda: "ok")
+
+        self.assertEqual(asyncio.run(main()), "ok")
+        stats = self.executor.stats()
+        self.assertEqual(stats["failed"], 1)
+        self.assertEqual(stats["completed"], 1)
+        self.assertEqual(stats["waiting_by_resource"], {})
+
+    def test_failed_submit_releases_resource_and_queue_slot(self):
+        self.executor.shutdown()
+
+        async def main():
+            with self.assertRaises(RuntimeError):
+                await self.executor.run("input", lambda: "ok")
+            self.assertFalse(self.executor._resource_locks["input"].locked())
+
+        asyncio.run(main())
+        self.assertEqual(self.executor.stats()["queued"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,223 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from fastapi.testclient import TestClient
+
+from commandAGI._utils.file_transfer import (
+    CHUNK_SIZE,
+    compress,
+    decompress,
+    extract_tar,
+    file_version,
+    iter_tar,
+    sha256,
+)
+from commandAGI.daemon.server import ComputerDaemon
+
+
+class TestFileTransferEndpoints(unittest.TestCase):
+    def setUp(self):
+        with patch.object(ComputerDaemon, "_create_mcp_server"):
+            self.daemon = ComputerDaemon(MagicMock(), api_token="test_token")
+        self.client = TestClient(self.daemon._fastapi_server)
+        self.headers = {"Authorization": "Bearer test_token"}
+        self.dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def upload_chunk(self, path, version, offset, data, checksum=None):
+        return self.client.put(
+            "/file/upload",
+            headers=self.headers,
+            params={
+                "path": str(path),
+                "version": version,
+                "offset": offset,
+                "checksum": checksum or sha256(data),
+                "compression": "gzip",
+            },
+            content=compress(data, "gzip"),
+        )
+
+    def test_upload_resumes_after_last_chunk(self):
+        data = b"a" * CHUNK_SIZE + b"b" * 10
+        path = self.dir / "upload.bin"
+        response = self.upload_chunk(path, "10-1", 0, data[:CHUNK_SIZE])
+        self.assertEqual(response.json(), {"offset": CHUNK_SIZE})
+
+        # The client reconnects and asks where to continue
+        response = self.client.get(
+            "/file/upload",
+            headers=self.headers,
+            params={"path": str(path), "version": "10-1"},
+        )
+        self.assertEqual(response.json(), {"offset": CHUNK_SIZE})
+        response = self.client.get(
+            "/file/upload",
+            headers=self.headers,
+            params={"path": str(path), "version": "10-2"},
+        )
+        self.assertEqual(response.json(), {"offset": 0})
+
+        self.upload_chunk(path, "10-1", CHUNK_SIZE, data[CHUNK_SIZE:])
+        response = self.client.post(
+            "/file/upload/complete",
+            headers=self.headers,
+            params={
+                "path": str(path),
+                "version": "10-1",
+                "size": len(data),
+                "checksum": sha256(data),
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(path.read_bytes(), data)
+        self.assertEqual([p.name for p in self.dir.iterdir()], ["upload.bin"])
+
+    def test_upload_rejects_bad_chunks(self):
+        path = self.dir / "upload.bin"
+        response = self.upload_chunk(
+            path, "10-1", 0, b"data", checksum=sha256(b"other")
+        )
+        self.assertEqual(response.status_code, 422)
+        response = self.upload_chunk(path, "10-1", 100, b"data")
+        self.assertEqual(response.status_code, 409)
+
+    def test_invalid_versions_are_rejected(self):
+        path = self.dir / "upload.bin"
+        version = "1/../../escaped"
+        params = {"path": str(path), "version": version}
+        responses = [
+            self.upload_chunk(path, version, 0, b"data"),
+            self.client.get("/file/upload", headers=self.headers, params=params),
+            self.client.post(
+                "/file/upload/complete",
+                headers=self.headers,
+                params={**params, "size": 4, "checksum": sha256(b"data")},
+            ),
+            self.client.get("/file/download", headers=self.headers, params=params),
+        ]
+        self.assertEqual([r.status_code for r in responses], [400] * 4)
+        self.assertEqual(list(self.dir.iterdir()), [])
+
+    def test_download(self):
+        path = self.dir / "download.bin"
+        path.write_bytes(b"0123456789")
+        stat = self.client.get(
+            "/file/stat", headers=self.headers, params={"path": str(path)}
+        ).json()
+        self.assertEqual(stat["size"], 10)
+        self.assertEqual(stat["version"], file_version(path))
+
+        response = self.client.get(
+            "/file/download",
+            headers=self.headers,
+            params={
+                "path": str(path),
+                "version": stat["version"],
+                "offset": 4,
+                "length": 3,
+                "compression": "gzip",
+            },
+        )
+        self.assertEqual(decompress(response.content, "gzip"), b"456")
+        self.assertEqual(response.headers["X-Chunk-SHA256"], sha256(b"456"))
+
+        response = self.client.get(
+            "/file/download",
+            headers=self.headers,
+            params={"path": str(path), "version": "0-0"},
+        )
+        self.assertEqual(response.status_code, 412)
+        response = self.client.get(
+            "/file/stat",
+            headers=self.headers,
+            params={"path": str(self.dir / "missing")},
+        )
+        self.assertEqual(response.json()["exists"], False)
+
+    def test_write_and_truncate_in_place(self):
+        path = self.dir / "paged.bin"
+        path.write_bytes(b"0123456789")
+        response = self.client.put(
+            "/file/write",
+            headers=self.headers,
+            params={
+                "path": str(path),
+                "offset": 8,
+                "checksum": sha256(b"abcd"),
+                "compression": "gzip",
+            },
+            content=compress(b"abcd", "gzip"),
+        )
+        self.assertEqual(response.json()["version"], file_version(path))
+        self.assertEqual(path.read_bytes(), b"01234567abcd")
+
+        response = self.client.post(
+            "/file/truncate",
+            headers=self.headers,
+            params={"path": str(path), "size": 4},
+        )
+        self.assertEqual(response.json()["size"], 4)
+        self.assertEqual(path.read_bytes(), b"0123")
+
+    def test_directory_round_trip(self):
+        source = self.dir / "source"
+        (source / "sub").mkdir(parents=True)
+        (source / "sub" / "file.txt").write_text("tree")
+
+        response = self.client.put(
+            "/file/upload_tree",
+            headers=self.headers,
+            params={"path": str(self.dir / "uploaded"), "compression": "gzip"},
+            content=iter_tar(source, "gzip"),
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((self.dir / "uploaded/sub/file.txt").read_text(), "tree")
+
+        with self.client.stream(
+            "GET",
+            "/file/download_tree",
+            headers=self.headers,
+            params={"path": str(source), "compression": "gzip"},
+        ) as response:
+            extract_tar(response.iter_bytes(), self.dir / "downloaded", "gzip")
+        self.assertEqual((self.dir / "downloaded/sub/file.txt").read_text(), "tree")
+
+    def test_upload_tree_doesnt_hold_executor_workers(self):
+        source = self.dir / "source"
+        source.mkdir()
+        (source / "file.txt").write_text("tree")
+        running = []
+
+        def chunks():
+            for chunk in iter_tar(source, "none"):
+                running.append(self.daemon._executor.stats()["running"])
+                yield chunk
+
+        response = self.client.put(
+            "/file/upload_tree",
+            headers=self.headers,
+            params={"path": str(self.dir / "uploaded")},
+            content=chunks(),
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(running)
+        self.assertEqual(set(running), {0})
+
+    def test_upload_tree_rejects_invalid_archives(self):
+        response = self.client.put(
+            "/file/upload_tree",
+            headers=self.headers,
+            params={"path": str(self.dir / "uploaded")},
+            content=b"not a tar archive" * 100,
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+from unittest.mock import ANY, MagicMock, patch
+
+from fastapi.testclient import TestClient
+
+from commandAGI._utils.output_stream import OutputChunk, ProcessExit, decode_sse_events
+from commandAGI.daemon.server import ComputerDaemon
+
+
+class TestOutputStreamEndpoints(unittest.TestCase):
+    def setUp(self):
+        self.mock_computer = MagicMock()
+        with patch.object(ComputerDaemon, "_create_mcp_server"):
+            self.daemon = ComputerDaemon(self.mock_computer, api_token="test_token")
+        self.client = TestClient(self.daemon._fastapi_server)
+        self.headers = {"Authorization": "Bearer test_token"}
+
+    def stream(self, path, action, **params):
+        with self.client.stream(
+            "POST", path, headers=self.headers, json=action, params=params
+        ) as response:
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(
+                response.headers["content-type"].startswith("text/event-stream")
+            )
+            return list(decode_sse_events(response.iter_lines()))
+
+    def test_streams_shell_output(self):
+        events = [
+            OutputChunk(stream="stdout", data="building\n"),
+            OutputChunk(stream="stderr", data="warning\n"),
+            ProcessExit(returncode=0),
+        ]
+        self.mock_computer.stream_shell.return_value = (e for e in events)
+        received = self.stream(
+            "/execute/command/stream",
+            {"command": "make", "timeout": 60},
+            max_output_bytes=1024,
+            tail=True,
+        )
+        self.assertEqual(received, events)
+        self.mock_computer.stream_shell.assert_called_once_with(
+            "make",
+            timeout=60,
+            executible=None,
+            cwd=None,
+            env=None,
+            max_output_bytes=1024,
+            tail=True,
+            cancel=ANY,
+        )
+
+    def test_cancel_is_set_once_the_stream_ends(self):
+        self.mock_computer.stream_shell.return_value = (
+            e for e in [ProcessExit(returncode=0)]
+        )
+        self.stream("/execute/command/stream", {"command": "true"})
+        cancel = self.mock_computer.stream_shell.call_args.kwargs["cancel"]
+        self.assertTrue(cancel.is_set())
+
+    def test_streams_process_output(self):
+        self.mock_computer.stream_process.return_value = (
+            e for e in [ProcessExit(returncode=2)]
+        )
+        received = self.stream(
+            "/execute/run_process/stream", {"command": "pytest", "args": ["-q"]}
+        )
+        self.assertEqual(received, [ProcessExit(returncode=2)])
+        self.assertEqual(
+            self.mock_computer.stream_process.call_args.kwargs["args"], ["-q"]
+        )
+
+    def test_errors_are_sent_as_events(self):
+        def failing():
+            yield OutputChunk(stream="stdout", data="partial")
+            raise NotImplementedError("no streaming here")
+
+        self.mock_computer.stream_shell.return_value = failing()
+        with self.assertRaisesRegex(RuntimeError, "no streaming here"):
+            self.stream("/execute/command/stream", {"command": "ls"})
+
+    def test_streams_dont_hold_executor_workers(self):
+        # A stream lasts as long as its command, so it must leave the
+        # executor's workers to the other routes
+        running = []
+
+        def events():
+            for i in range(3):
+                running.append(self.daemon._executor.stats()["running"])
+                yield OutputChunk(stream="stdout", data=str(i))
+            yield ProcessExit(returncode=0)
+
+        self.mock_computer.stream_shell.return_value = events()
+        received = self.stream("/execute/command/stream", {"command": "ls"})
+        self.assertEqual(len(received), 4)
+        self.assertEqual(running, [0, 0, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import io
+import json
+import unittest
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from commandAGI.daemon.server import ComputerDaemon
+from commandAGI.daemon.websocket import (
+    decode_binary_frame,
+    encode_binary_frame,
+    websocket_url,
+)
+
+
+class TestBinaryFrames(unittest.TestCase):
+    def test_round_trip(self):
+        header = {"id": 7, "type": "screenshot", "width": 2}
+        payload = bytes(range(256))
+        self.assertEqual(
+            decode_binary_frame(encode_binary_frame(header, payload)),
+            (header, payload),
+        )
+
+    def test_websocket_url(self):
+        self.assertEqual(
+            websocket_url("http://localhost:8000"), "ws://localhost:8000/ws"
+        )
+        self.assertEqual(websocket_url("https://vm:8000/"), "wss://vm:8000/ws")
+
+
+class TestWebSocketEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.mock_computer = MagicMock()
+        red = np.zeros((3, 4, 3), dtype=np.uint8)
+        red[..., 0] = 255
+        self.mock_computer._get_screenshot_ndarray.return_value = red
+        with patch.object(ComputerDaemon, "_create_mcp_server"):
+            self.daemon = ComputerDaemon(self.mock_computer, api_token="test_token")
+        self.client = TestClient(self.daemon._fastapi_server)
+        self.headers = {"Authorization": "Bearer test_token"}
+
+    def test_screenshot_is_sent_as_binary_png(self):
+        with self.client.websocket_connect("/ws", headers=self.headers) as ws:
+            ws.send_text(json.dumps({"id": 1, "type": "screenshot"}))
+            header, payload = decode_binary_frame(ws.receive_bytes())
+        self.assertEqual(header["id"], 1)
+        self.assertEqual((header["width"], header["height"]), (4, 3))
+        self.assertEqual(Image.open(io.BytesIO(payload)).getpixel((0, 0)), (255, 0, 0))
+
+    def test_batch_runs_actions(self):
+        with self.client.websocket_connect("/ws", headers=self.headers) as ws:
+            ws.send_text(
+                json.dumps(
+                    {
+                        "id": 2,
+                        "type": "batch",
+                        "actions": [{"action_type": "type", "text": "hi"}],
+                    }
+                )
+            )
+            response = json.loads(ws.receive_text())
+        self.assertEqual(response["id"], 2)
+        self.assertTrue(response["success"])
+        self.mock_computer.type.assert_called_once_with("hi")
+
+    def test_unknown_request_returns_error(self):
+        with self.client.websocket_connect("/ws", headers=self.headers) as ws:
+            ws.send_text(json.dumps({"id": 3, "type": "self_destruct"}))
+            response = json.loads(ws.receive_text())
+        self.assertEqual(response["id"], 3)
+        self.assertEqual(response["type"], "error")
+
+    def test_invalid_json_returns_error_and_keeps_the_connection(self):
+        with self.client.websocket_connect("/ws", headers=self.headers) as ws:
+            ws.send_text("{not json")
+            self.assertEqual(json.loads(ws.receive_text())["type"], "error")
+            ws.send_text(json.dumps({"id": 4, "type": "screenshot", "scale": 5}))
+            response = json.loads(ws.receive_text())
+            self.assertEqual((response["id"], response["type"]), (4, "error"))
+            self.assertIn("Invalid request", response["error"])
+            ws.send_text(json.dumps({"id": 5, "type": "screenshot"}))
+            header, _ = decode_binary_frame(ws.receive_bytes())
+        self.assertEqual(header["id"], 5)
+
+    def test_screen_updates_are_pushed_only_when_blocks_change(self):
+        blue = np.zeros((40, 40, 3), dtype=np.uint8)
+        blue[..., 2] = 255
+        red = blue.copy()
+        red[:8, :8] = (255, 0, 0)
+        self.mock_computer._get_screenshot_ndarray.side_effect = [
+            blue,
+            blue,
+            red,
+        ] + [red] * 100
+        with self.client.websocket_connect("/ws", headers=self.headers) as ws:
+            ws.send_text(
+                json.dumps({"id": 1, "type": "subscribe_screen", "interval": 0})
+            )
+            self.assertTrue(json.loads(ws.receive_text())["success"])
+            first, payload = decode_binary_frame(ws.receive_bytes())
+            second, payload = decode_binary_frame(ws.receive_bytes())
+        self.assertEqual(first["type"], "screen_update")
+        self.assertEqual(Image.open(io.BytesIO(payload)).getpixel((0, 0)), (255, 0, 0))
+        self.assertGreaterEqual(
+            self.mock_computer._get_screenshot_ndarray.call_count, 3
+        )
+
+    def test_failed_screen_updates_close_the_subscription(self):
+        self.mock_computer._get_screenshot_ndarray.side_effect = RuntimeError(
+            "no display"
+        )
+        with self.assertLogs("commandAGI.daemon.server", "ERROR"):
+            with self.client.websocket_connect("/ws", headers=self.headers) as ws:
+                ws.send_text(json.dumps({"id": 1, "type": "subscribe_screen"}))
+                self.assertTrue(json.loads(ws.receive_text())["success"])
+                closed = json.loads(ws.receive_text())
+        self.assertEqual(closed, {"type": "screen_closed", "error": "no display"})
+
+    def test_rejects_invalid_token(self):
+        with self.assertRaises(Exception):
+            with self.client.websocket_connect(
+                "/ws", headers={"Authorization": "Bearer wrong"}
+            ) as ws:
+                ws.receive_text()
+
+
+if __name__ == "__main__":
+    unittest.main()
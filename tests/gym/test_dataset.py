@@ -0,0 +1,111 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+import numpy as np
+
+from commandAGI.gym.dataset import DecodeStep, EpisodeDataset
+from commandAGI.gym.episode_store import SegmentedLogEpisode
+from commandAGI.gym.schema import Step
+
+
+def make_step(episode, i, size=16):
+    return Step(
+        observation={"screenshot": np.full((size, size, 3), i, np.uint8)},
+        action={"type": "click", "x": i},
+        reward=float(episode * 100 + i),
+        info={},
+    )
+
+
+class TestEpisodeDataset(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        for episode_index in range(4):
+            episode = SegmentedLogEpisode(os.path.join(self.dir, f"ep{episode_index}"))
+            for i in range(5):
+                episode.push(make_step(episode_index, i, size=16 + episode_index))
+            episode.close()
+
+    def rewards(self, dataset):
+        return [float(r) for batch in dataset for r in batch["reward"]]
+
+    def test_yields_fixed_shape_batches(self):
+        dataset = EpisodeDataset.from_directory(
+            self.dir, batch_size=6, transform=DecodeStep(image_size=(8, 8))
+        )
+        batches = list(dataset)
+        self.assertEqual(len(batches), 3)  # 20 steps, the last 2 are dropped
+        for batch in batches:
+            self.assertEqual(batch["screenshot"].shape, (6, 8, 8, 3))
+            self.assertEqual(batch["reward"].shape, (6,))
+
+    def test_shuffle_is_deterministic_per_epoch(self):
+        def make_dataset():
+            return EpisodeDataset.from_directory(
+                self.dir, batch_size=4, shuffle_buffer=8, transform=DecodeStep((8, 8))
+            )
+
+        first = self.rewards(make_dataset())
+        self.assertEqual(first, self.rewards(make_dataset()))
+        self.assertEqual(sorted(first), sorted(s.reward for s in self.all_steps()))
+        self.assertNotEqual(first, sorted(first))
+
+        dataset = make_dataset()
+        dataset.set_epoch(1)
+        self.assertNotEqual(first, self.rewards(dataset))
+
+    def test_shards_partition_the_episodes(self):
+        shards = [
+            self.rewards(
+                EpisodeDataset.from_directory(
+                    self.dir,
+                    batch_size=1,
+                    transform=DecodeStep((8, 8)),
+                    num_shards=3,
+                    shard_index=index,
+                )
+            )
+            for index in range(3)
+        ]
+        self.assertEqual([len(shard) for shard in shards], [10, 5, 5])
+        self.assertEqual(
+            sorted(sum(shards, [])), sorted(s.reward for s in self.all_steps())
+        )
+
+    def test_decoding_runs_off_the_training_thread(self):
+        threads = set()
+
+        def transform(step):
+            threads.add(threading.current_thread().name)
+            return {"reward": step.reward}
+
+        dataset = EpisodeDataset.from_directory(
+            self.dir, batch_size=5, transform=transform, shuffle_buffer=0
+        )
+        self.assertEqual(self.rewards(dataset), [s.reward for s in self.all_steps()])
+        self.assertNotIn(threading.current_thread().name, threads)
+
+    def test_stopping_early_and_transform_errors(self):
+        dataset = EpisodeDataset.from_directory(
+            self.dir, batch_size=1, transform=DecodeStep(), prefetch_batches=1
+        )
+        for _ in dataset:
+            break
+        # Screenshots of different episodes have different sizes
+        dataset.batch_size = 10
+        with self.assertRaises(ValueError):
+            list(dataset)
+
+    def all_steps(self):
+        for name in sorted(os.listdir(self.dir)):
+            episode = SegmentedLogEpisode(os.path.join(self.dir, name))
+            yield from episode
+            episode.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+import base64
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from commandAGI.gym.episode_store import (
+    BlobStore,
+    FrameStore,
+    SegmentedLog,
+    SegmentedLogEpisode,
+)
+from commandAGI.gym.schema import Step
+
+
+def make_step(i, screenshot="x" * 10000):
+    return Step(
+        observation={"screenshot": screenshot, "step": i},
+        action={"type": "click", "x": i},
+        reward=float(i),
+        info={},
+    )
+
+
+class TestSegmentedLog(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def test_records_span_segments_and_survive_reopening(self):
+        log = SegmentedLog(self.dir, segment_size=10)
+        for i in range(5):
+            log.append(f"record {i}".encode())
+        log.insert(1, b"inserted")
+        log.close()
+
+        log = SegmentedLog(self.dir, segment_size=10)
+        self.assertEqual(len(log), 6)
+        self.assertEqual(log.read(1), b"inserted")
+        self.assertEqual(log.read(-1), b"record 4")
+        self.assertGreater(
+            len([f for f in os.listdir(self.dir) if f.startswith("segment_")]), 1
+        )
+
+    def test_pop_reclaims_space_of_last_record(self):
+        log = SegmentedLog(self.dir)
+        log.append(b"first")
+        log.append(b"second")
+        log.read(1)
+        log.pop()
+        self.assertEqual(len(log), 1)
+        self.assertEqual(os.path.getsize(log._segment_path(0)), len(b"first"))
+        with self.assertRaises(IndexError):
+            log.read(1)
+
+
+class TestSegmentedLogEpisode(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def test_round_trip_in_both_modes(self):
+        for mode in ("pickle", "json"):
+            episode = SegmentedLogEpisode(os.path.join(self.dir, mode), mode=mode)
+            for i in range(3):
+                episode.push(make_step(i))
+            episode.insert(make_step(99), 1)
+            self.assertEqual([step.reward for step in episode], [0, 99, 1, 2])
+            self.assertEqual(episode[2].observation, make_step(1).observation)
+            self.assertEqual(episode.pop().reward, 2)
+            self.assertEqual(len(episode), 3)
+            episode.close()
+
+    def test_repeated_screenshots_are_stored_once(self):
+        episode = SegmentedLogEpisode(self.dir)
+        for i in range(10):
+            episode.push(make_step(i))
+        blob_files = [files for _, _, files in os.walk(episode.blobs.directory)]
+        self.assertEqual(sum(len(files) for files in blob_files), 1)
+        # The log only holds small step records
+        self.assertLess(os.path.getsize(episode.log._segment_path(0)), 10 * 1000)
+
+    def test_clear_removes_steps_and_blobs(self):
+        episode = SegmentedLogEpisode(self.dir)
+        episode.push(make_step(0))
+        episode.clear()
+        self.assertEqual(len(episode), 0)
+        self.assertEqual(os.listdir(episode.blobs.directory), [])
+        episode.push(make_step(1))
+        self.assertEqual(episode[0].reward, 1)
+
+
+def make_frame(i):
+    """A noisy desktop where a cursor moves along the top row."""
+    pixels = np.random.default_rng(0).integers(0, 255, (256, 256, 3), np.uint8)
+    pixels[0:16, i * 16 : i * 16 + 16] = (255, 0, 0)
+    return Image.fromarray(pixels)
+
+
+def to_b64(image):
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode()
+
+
+class TestFrameStore(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.blobs = BlobStore(self.dir)
+
+    def test_deltas_rebuild_identical_frames(self):
+        frames = FrameStore(self.blobs, keyframe_interval=3)
+        refs = [frames.put(make_frame(i)) for i in range(8)]
+        self.assertEqual(frames.put(make_frame(7)), refs[-1])
+
+        sizes = [os.path.getsize(self.blobs.path(ref)) for ref in refs]
+        # Keyframes at 0, 4; the deltas only hold the changed tiles
+        self.assertLess(sizes[1], sizes[0] / 10)
+        self.assertGreater(sizes[4], sizes[0] / 2)
+
+        reader = FrameStore(self.blobs, cache_size=1)
+        for i in reversed(range(8)):
+            self.assertEqual(reader.get(refs[i]).tobytes(), make_frame(i).tobytes())
+
+    def test_mode_change_stores_a_keyframe(self):
+        frames = FrameStore(self.blobs)
+        gray = frames.put(Image.new("L", (64, 64), 0))
+        # Packs to the same block hashes as the gray frame
+        rgb = frames.put(Image.new("RGB", (64, 64), (0, 0, 0)))
+        self.assertNotEqual(rgb, gray)
+
+        rgb_frame = Image.new("RGB", (64, 64), (0, 0, 0))
+        rgb_frame.paste((255, 0, 0), (0, 0, 8, 8))
+        changed = frames.put(rgb_frame)
+
+        reader = FrameStore(self.blobs, cache_size=1)
+        self.assertEqual(reader.get(gray).mode, "L")
+        self.assertEqual(reader.get(rgb).mode, "RGB")
+        self.assertEqual(reader.get(changed).tobytes(), rgb_frame.tobytes())
+
+
+class TestFrameDeltaEpisode(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def test_screenshots_round_trip_in_both_modes(self):
+        for mode in ("pickle", "json"):
+            save_dir = os.path.join(self.dir, mode)
+            episode = SegmentedLogEpisode(save_dir, mode=mode, frame_deltas=True)
+            for i in range(5):
+                episode.push(make_step(i, screenshot=to_b64(make_frame(i))))
+            episode.close()
+
+            episode = SegmentedLogEpisode(save_dir, mode=mode)
+            for i, step in enumerate(episode):
+                image = Image.open(
+                    io.BytesIO(base64.b64decode(step.observation["screenshot"]))
+                )
+                self.assertEqual(image.tobytes(), make_frame(i).tobytes())
+            episode.close()
+
+    def test_pil_images_round_trip(self):
+        episode = SegmentedLogEpisode(self.dir, frame_deltas=True)
+        episode.push(make_step(0, screenshot=make_frame(0)))
+        episode.push(make_step(1, screenshot=make_frame(0)))
+        restored = episode[1].observation["screenshot"]
+        self.assertIsInstance(restored, Image.Image)
+        self.assertEqual(restored.tobytes(), make_frame(0).tobytes())
+
+
+if __name__ == "__main__":
+    unittest.main()
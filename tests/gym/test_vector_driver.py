@@ -0,0 +1,125 @@
+import queue
+import unittest
+
+from commandAGI.gym.agents.base_agent import BaseAgent
+from commandAGI.gym.drivers import VectorDriver
+from commandAGI.gym.environments.base_env import BaseEnv
+
+
+class CountdownEnv(BaseEnv[int, int]):
+    """Episodes last `length` steps; the observation is the steps left."""
+
+    def __init__(self, length: int):
+        self.length = length
+        self.left = length
+        self.closed = False
+
+    def reset(self) -> int:
+        self.left = self.length
+        return self.left
+
+    def step(self, action: int):
+        self.left -= action
+        return self.left, 1.0, self.left <= 0, {}
+
+    def get_observation(self) -> int:
+        return self.left
+
+    def execute_action(self, action: int) -> bool:
+        return True
+
+    def get_reward(self, action: int) -> float:
+        return 1.0
+
+    def get_done(self, action: int) -> bool:
+        return self.left <= 0
+
+    def close(self):
+        self.closed = True
+
+
+class OneStepAgent(BaseAgent[int, int]):
+    def reset(self) -> None:
+        pass
+
+    def act(self, observation: int) -> int:
+        return 1
+
+    def update(self, reward: float) -> None:
+        pass
+
+    def train(self, episodes) -> None:
+        pass
+
+
+class RecordingAgent(OneStepAgent):
+    _batch_sizes: list
+
+    def __init__(self):
+        super().__init__()
+        self._batch_sizes = []
+
+    def act_batch(self, observations):
+        self._batch_sizes.append(len(observations))
+        return super().act_batch(observations)
+
+
+class TestVectorDriver(unittest.TestCase):
+    def make_driver(self, **kwargs):
+        self.envs = []
+
+        def env_factory(index):
+            env = CountdownEnv(length=index + 2)
+            self.envs.append(env)
+            return env
+
+        return VectorDriver(env_factory, num_envs=3, **kwargs)
+
+    def test_sync_mode_batches_act_calls(self):
+        agent = RecordingAgent()
+        driver = self.make_driver(agent=agent)
+        episodes = driver.collect_episodes(3)
+        driver.close()
+
+        self.assertEqual(sorted(len(episode) for episode in episodes), [2, 3, 4])
+        # All three environments step together until the shorter ones finish
+        self.assertEqual(agent._batch_sizes, [3, 3, 2, 1])
+        self.assertTrue(all(env.closed for env in self.envs))
+
+    def test_sync_mode_reuses_finished_environments(self):
+        driver = self.make_driver(agent=OneStepAgent())
+        episodes = driver.collect_episodes(7)
+        driver.close()
+        self.assertEqual(len(episodes), 7)
+
+    def test_async_mode_feeds_episode_queue(self):
+        episode_queue = queue.Queue()
+        driver = self.make_driver(
+            agent=RecordingAgent(), mode="async", episode_queue=episode_queue
+        )
+        episodes = driver.collect_episodes(10)
+        driver.close()
+
+        self.assertEqual(len(episodes), 10)
+        self.assertEqual(episode_queue.qsize(), 10)
+        self.assertTrue(all(len(episode) >= 2 for episode in episodes))
+
+    def test_agent_factory_gives_each_environment_its_own_agent(self):
+        agents = []
+
+        def agent_factory(index):
+            agents.append(OneStepAgent())
+            return agents[-1]
+
+        driver = self.make_driver(agent_factory=agent_factory, mode="async")
+        self.assertEqual(len(driver.collect_episodes(4)), 4)
+        driver.close()
+        self.assertEqual(len(agents), 3)
+
+    def test_requires_exactly_one_agent_source(self):
+        with self.assertRaises(ValueError):
+            VectorDriver(lambda i: CountdownEnv(1), num_envs=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
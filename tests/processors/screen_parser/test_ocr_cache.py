@@ -0,0 +1,89 @@
+import unittest
+
+import numpy as np
+
+from commandAGI.processors.screen_parser.ocr_cache import OCRCache, OCRIndex
+from commandAGI.processors.screen_parser.types import ParsedElement, ParsedScreenshot
+
+# The fake OCR engine "reads" each solid color as a word
+WORDS = {(255, 0, 0): "File", (0, 255, 0): "Save", (0, 0, 255): "As"}
+
+
+class FakeOCR:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, image):
+        pixels = np.asarray(image)
+        self.calls.append(image.size)
+        elements = []
+        for color, word in WORDS.items():
+            ys, xs = np.nonzero(np.all(pixels == color, axis=-1))
+            if len(xs):
+                box = [
+                    int(xs.min()),
+                    int(ys.min()),
+                    int(xs.max()) + 1,
+                    int(ys.max()) + 1,
+                ]
+                elements.append(ParsedElement(text=word, bounding_box=box))
+        return ParsedScreenshot(elements=elements)
+
+
+class TestOCRCache(unittest.TestCase):
+    def setUp(self):
+        self.frame = np.full((256, 256, 3), 255, dtype=np.uint8)
+        self.frame[10:20, 10:40] = (255, 0, 0)
+        self.frame[200:210, 100:130] = (0, 255, 0)
+        self.ocr = FakeOCR()
+        self.cache = OCRCache(self.ocr)
+
+    def test_unchanged_frame_is_not_read_again(self):
+        first = self.cache.read(self.frame)
+        second = self.cache.read(self.frame.copy())
+        self.assertIs(first, second)
+        self.assertEqual(len(self.ocr.calls), 1)
+
+    def test_only_changed_tiles_are_read(self):
+        self.cache.read(self.frame)
+        self.frame[200:210, 135:150] = (0, 0, 255)
+        index = self.cache.read(self.frame)
+        self.assertEqual(len(self.ocr.calls), 2)
+        # The second pass covers the changed area and the word next to it
+        width, height = self.ocr.calls[1]
+        self.assertLess(width * height, 256 * 256 / 4)
+        self.assertEqual(index.find("file"), [10, 10, 40, 20])
+        self.assertEqual(index.find("Save As"), [100, 200, 150, 210])
+
+    def test_region_coordinates_are_in_frame_space(self):
+        index = self.cache.read(self.frame, region=(90, 190, 60, 30))
+        self.assertEqual(index.find("save"), [100, 200, 130, 210])
+        self.assertIsNone(index.find("file"))
+        self.assertEqual(self.ocr.calls, [(60, 30)])
+
+
+class TestOCRIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = OCRIndex(
+            [
+                ParsedElement(text="Open", bounding_box=[100, 50, 140, 60]),
+                ParsedElement(text="Recent", bounding_box=[145, 50, 190, 60]),
+                ParsedElement(text="Recent", bounding_box=[10, 90, 60, 100]),
+                ParsedElement(text="Open", bounding_box=[10, 10, 50, 20]),
+            ]
+        )
+
+    def test_finds_first_occurrence_in_reading_order(self):
+        self.assertEqual(self.index.find("OPEN"), [10, 10, 50, 20])
+        self.assertEqual(len(self.index.find_all("open")), 2)
+
+    def test_phrase_must_be_on_one_line(self):
+        self.assertEqual(self.index.find("open recent"), [100, 50, 190, 60])
+        self.assertIsNone(self.index.find("recent open"))
+
+    def test_falls_back_to_substring_search(self):
+        self.assertEqual(self.index.find("cen"), [145, 50, 190, 60])
+
+
+if __name__ == "__main__":
+    unittest.main()
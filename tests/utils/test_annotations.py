@@ -0,0 +1,81 @@
+import unittest
+
+from commandAGI._utils.annotations import (
+    annotation,
+    class_annotations,
+    gather_annotated_attr_keys,
+    gather_annotated_attrs,
+)
+
+
+class Computer:
+    def __init__(self):
+        self.captures = 0
+        self._position = (0, 0)
+
+    @annotation("endpoint", {})
+    @annotation("mcp_tool", {})
+    def wait(self, timeout: float = 5.0):
+        """Waits a specified amount of time"""
+        return timeout
+
+    @annotation("endpoint", {"use_getter": True, "use_setter": True})
+    @property
+    def position(self):
+        return self._position
+
+    @position.setter
+    def position(self, value):
+        self._position = value
+
+    @property
+    def screenshot(self):
+        self.captures += 1
+        return "pixels"
+
+    @annotation("endpoint", {"method": "get", "path": "/screenshot"})
+    @annotation("mcp_resource", {"resource_name": "screenshot"})
+    def get_screenshot(self):
+        return self.screenshot
+
+
+class QuietComputer(Computer):
+    def wait(self, timeout: float = 5.0):
+        return None
+
+
+class TestAnnotations(unittest.TestCase):
+    def test_gathering_does_not_evaluate_properties(self):
+        computer = Computer()
+        self.assertEqual(
+            gather_annotated_attr_keys(computer, "endpoint"),
+            ["get_screenshot", "position", "wait"],
+        )
+        self.assertEqual(gather_annotated_attr_keys(computer, "mcp_tool"), ["wait"])
+        self.assertEqual(computer.captures, 0)
+
+    def test_stacked_annotations_are_merged(self):
+        attrs = gather_annotated_attrs(Computer, "mcp_resource")
+        self.assertEqual(
+            attrs["get_screenshot"],
+            {
+                "endpoint": {"method": "get", "path": "/screenshot"},
+                "mcp_resource": {"resource_name": "screenshot"},
+            },
+        )
+        self.assertEqual(Computer().wait(1.0), 1.0)
+        self.assertEqual(Computer.wait.__doc__, "Waits a specified amount of time")
+
+    def test_annotated_property_stays_a_property(self):
+        computer = Computer()
+        computer.position = (3, 4)
+        self.assertEqual(computer.position, (3, 4))
+
+    def test_registry_is_per_class_and_follows_overrides(self):
+        self.assertIs(class_annotations(Computer()), class_annotations(Computer))
+        self.assertNotIn("wait", class_annotations(QuietComputer))
+        self.assertIn("position", class_annotations(QuietComputer))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from commandAGI._utils.file_transfer import (
+    CHUNK_SIZE,
+    available_compressions,
+    compress,
+    decompress,
+    extract_tar,
+    iter_tar,
+    partial_path,
+    remove_stale_partials,
+    resume_offset,
+    write_chunk,
+)
+
+
+class TestCompression(unittest.TestCase):
+    def test_round_trip(self):
+        data = bytes(range(256)) * 100
+        for compression in available_compressions():
+            with self.subTest(compression=compression):
+                self.assertEqual(
+                    decompress(compress(data, compression), compression), data
+                )
+
+
+class TestPartialFiles(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.dir.name) / "data.bin"
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_write_and_resume(self):
+        partial = partial_path(self.path, "10-1")
+        self.assertEqual(resume_offset(partial), 0)
+        self.assertEqual(write_chunk(partial, 0, b"x" * CHUNK_SIZE), CHUNK_SIZE)
+        self.assertEqual(write_chunk(partial, CHUNK_SIZE, b"half"), CHUNK_SIZE + 4)
+        # The last chunk may be incomplete, so it's sent again
+        self.assertEqual(resume_offset(partial), CHUNK_SIZE)
+        self.assertEqual(write_chunk(partial, CHUNK_SIZE, b"y"), CHUNK_SIZE + 1)
+
+    def test_missing_chunk(self):
+        with self.assertRaises(ValueError):
+            write_chunk(partial_path(self.path, "10-1"), 5, b"data")
+
+    def test_version_must_not_leave_the_directory(self):
+        with self.assertRaises(ValueError):
+            partial_path(self.path, "1/../../escaped")
+
+    def test_remove_stale_partials(self):
+        old = partial_path(self.path, "10-1")
+        new = partial_path(self.path, "20-2")
+        write_chunk(old, 0, b"old")
+        write_chunk(new, 0, b"new")
+        remove_stale_partials(self.path, keep=new)
+        self.assertFalse(old.exists())
+        self.assertTrue(new.exists())
+
+
+class TestTarStreams(unittest.TestCase):
+    def test_round_trip(self):
+        with (
+            tempfile.TemporaryDirectory() as source,
+            tempfile.TemporaryDirectory() as dest,
+        ):
+            (Path(source) / "sub").mkdir()
+            (Path(source) / "a.txt").write_text("hello")
+            (Path(source) / "sub" / "b.bin").write_bytes(b"\0" * 100000)
+            extract_tar(iter_tar(Path(source), "gzip"), Path(dest), "gzip")
+            self.assertEqual((Path(dest) / "a.txt").read_text(), "hello")
+            self.assertEqual(
+                (Path(dest) / "sub" / "b.bin").read_bytes(), b"\0" * 100000
+            )
+
+    def test_closing_stops_the_writer(self):
+        with tempfile.TemporaryDirectory() as source:
+            (Path(source) / "big.bin").write_bytes(b"\1" * (4 << 20))
+            stream = iter_tar(Path(source))
+            next(stream)
+            stream.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+
+import numpy as np
+
+from commandAGI._utils.frame_diff import (
+    block_hashes,
+    crop_patch,
+    diff_block_hashes,
+    dirty_rectangles,
+)
+
+
+class TestFrameDiff(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.frame = rng.integers(0, 256, size=(100, 130, 4), dtype=np.uint8)
+
+    def test_block_hashes_shape_covers_partial_blocks(self):
+        hashes = block_hashes(self.frame, block_size=32)
+        self.assertEqual(hashes.shape, (4, 5))
+        self.assertEqual(hashes.dtype, np.uint64)
+
+    def test_block_hashes_rejects_odd_block_size(self):
+        with self.assertRaises(ValueError):
+            block_hashes(self.frame, block_size=15)
+
+    def test_unchanged_frame_has_no_dirty_blocks(self):
+        previous = block_hashes(self.frame)
+        mask = diff_block_hashes(previous, block_hashes(self.frame.copy()))
+        self.assertFalse(mask.any())
+        self.assertEqual(dirty_rectangles(mask, 32, (130, 100)), [])
+
+    def test_changed_pixel_marks_its_block(self):
+        previous = block_hashes(self.frame)
+        changed = self.frame.copy()
+        changed[70, 120, 1] ^= 0xFF
+        mask = diff_block_hashes(previous, block_hashes(changed))
+        self.assertEqual(np.argwhere(mask).tolist(), [[2, 3]])
+        # The last column of blocks is clipped to the frame width
+        self.assertEqual(dirty_rectangles(mask, 32, (130, 100)), [(96, 64, 32, 32)])
+
+    def test_resolution_change_is_not_comparable(self):
+        previous = block_hashes(self.frame)
+        self.assertIsNone(diff_block_hashes(previous, block_hashes(self.frame[:50])))
+        self.assertIsNone(diff_block_hashes(None, previous))
+
+    def test_dirty_rectangles_merges_runs_across_rows(self):
+        mask = np.array(
+            [
+                [True, True, False, True],
+                [True, True, False, False],
+                [False, True, False, False],
+            ]
+        )
+        self.assertEqual(
+            dirty_rectangles(mask, 10, (40, 30)),
+            [(0, 0, 20, 20), (30, 0, 10, 10), (10, 20, 10, 10)],
+        )
+
+    def test_crop_patch_converts_bgra_to_rgb(self):
+        frame = np.zeros((4, 4, 4), dtype=np.uint8)
+        frame[..., 2] = 255  # red in BGRA
+        img = crop_patch(frame, (1, 1, 2, 2), format="PIL")
+        self.assertEqual(img.size, (2, 2))
+        self.assertEqual(img.getpixel((0, 0)), (255, 0, 0))
+        self.assertEqual(crop_patch(frame, (0, 0, 3, 1)).shape, (1, 3, 4))
+
+
+if __name__ == "__main__":
+    unittest.main()
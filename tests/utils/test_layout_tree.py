@@ -0,0 +1,136 @@
+import threading
+import unittest
+
+from commandAGI._utils.layout_tree import AccessibilityBackend, LayoutTree
+
+
+class FakeElement:
+    def __init__(self, name, children=()):
+        self.name = name
+        self.children = list(children)
+
+
+class FakeBackend(AccessibilityBackend):
+    def __init__(self, root, focused=None, events=False):
+        self.tree_root = root
+        self.focused = focused
+        self.events = events
+        self.reads = []
+        self.expanded = []
+        self.on_change = None
+
+    def root(self):
+        return self.tree_root
+
+    def focused_window(self):
+        return self.focused
+
+    def children(self, element):
+        self.expanded.append(element.name)
+        return element.children
+
+    def child_count(self, element):
+        return len(element.children)
+
+    def describe(self, element):
+        self.reads.append(element.name)
+        return {"properties": {"name": element.name}, "platform_properties": {}}
+
+    def watch(self, on_change):
+        self.on_change = on_change
+        return self.events
+
+
+class TestLayoutTree(unittest.TestCase):
+    def setUp(self):
+        self.button = FakeElement("button")
+        self.window = FakeElement("window", [self.button, FakeElement("label")])
+        self.root = FakeElement("desktop", [self.window, FakeElement("taskbar")])
+
+    def names(self, node):
+        return [node["properties"]["name"]] + [
+            name for child in node["children"] for name in self.names(child)
+        ]
+
+    def test_full_tree(self):
+        tree = LayoutTree(FakeBackend(self.root)).get()
+        self.assertEqual(
+            self.names(tree), ["desktop", "window", "button", "label", "taskbar"]
+        )
+        self.assertEqual(tree["child_count"], 2)
+
+    def test_depth_and_child_limits_skip_reading_elements(self):
+        backend = FakeBackend(self.root)
+        tree = LayoutTree(backend).get(max_depth=1, max_children=1)
+        self.assertEqual(self.names(tree), ["desktop", "window"])
+        self.assertEqual(tree["children"][0]["child_count"], 2)
+        self.assertNotIn("button", backend.reads)
+        # The window's children are counted, not fetched
+        self.assertEqual(backend.expanded, ["desktop"])
+
+    def test_expand_node_by_id(self):
+        layout_tree = LayoutTree(FakeBackend(self.root))
+        window = layout_tree.get(max_depth=1)["children"][0]
+        subtree = layout_tree.get(node_id=window["id"], max_depth=1)
+        self.assertEqual(subtree["id"], window["id"])
+        self.assertEqual(self.names(subtree), ["window", "button", "label"])
+        with self.assertRaises(KeyError):
+            layout_tree.get(node_id="missing")
+
+    def test_focused_window_only(self):
+        backend = FakeBackend(self.root, focused=self.window)
+        tree = LayoutTree(backend).get(focused_window_only=True)
+        self.assertEqual(self.names(tree), ["window", "button", "label"])
+        self.assertNotIn("desktop", backend.reads)
+
+    def test_events_limit_rereads_to_changed_elements(self):
+        backend = FakeBackend(self.root, events=True)
+        layout_tree = LayoutTree(backend)
+        layout_tree.get()
+        backend.reads.clear()
+        layout_tree.get()
+        self.assertEqual(backend.reads, [])
+
+        self.button.name = "pressed"
+        backend.on_change(self.button)
+        self.assertIn("pressed", self.names(layout_tree.get()))
+        self.assertEqual(backend.reads, ["pressed"])
+
+    def test_invalidate_does_not_wait_for_a_read(self):
+        backend = FakeBackend(self.root, events=True)
+        layout_tree = LayoutTree(backend)
+        layout_tree.get()
+
+        self.button.name = "pressed"
+        with layout_tree._lock:
+            notifier = threading.Thread(target=backend.on_change, args=(self.button,))
+            notifier.start()
+            notifier.join(timeout=1)
+            self.assertFalse(notifier.is_alive())
+        self.assertIn("pressed", self.names(layout_tree.get()))
+
+    def test_delta_returns_changed_subtrees_and_removed_ids(self):
+        layout_tree = LayoutTree(FakeBackend(self.root))
+        keyframe = layout_tree.delta()
+        self.assertTrue(keyframe["keyframe"])
+        self.assertEqual(len(keyframe["updated"]), 1)
+
+        self.assertFalse(layout_tree.delta()["changed"])
+
+        self.button.name = "pressed"
+        delta = layout_tree.delta()
+        self.assertFalse(delta["keyframe"])
+        self.assertEqual([self.names(node) for node in delta["updated"]], [["pressed"]])
+
+        label_id = keyframe["updated"][0]["children"][0]["children"][1]["id"]
+        del self.window.children[1]
+        delta = layout_tree.delta()
+        self.assertEqual(delta["removed"], [label_id])
+        self.assertEqual(self.names(delta["updated"][0]), ["window", "pressed"])
+
+        layout_tree.reset_delta()
+        self.assertTrue(layout_tree.delta()["keyframe"])
+
+
+if __name__ == "__main__":
+    unittest.main()
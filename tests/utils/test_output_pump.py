@@ -0,0 +1,100 @@
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+from commandAGI._utils.output_pump import OutputBuffer, OutputPump
+
+
+class TestOutputBuffer(unittest.TestCase):
+    def test_old_output_is_dropped(self):
+        buffer = OutputBuffer(max_memory=5)
+        for chunk in (b"abc", b"def", b"ghi"):
+            buffer.write(chunk)
+        self.assertEqual((buffer.start, buffer.end), (4, 9))
+        self.assertEqual(buffer.read(0), (4, b"efghi"))
+        self.assertEqual(buffer.read(6, max_bytes=2), (6, b"gh"))
+        self.assertEqual(buffer.read(20), (9, b""))
+
+    def test_old_output_is_spilled(self):
+        with tempfile.TemporaryDirectory() as spill_dir:
+            buffer = OutputBuffer(max_memory=5, spill_dir=spill_dir)
+            for chunk in (b"abc", b"def", b"ghi"):
+                buffer.write(chunk)
+            self.assertEqual(buffer.start, 0)
+            self.assertEqual(buffer.read(0), (0, b"abcdefghi"))
+            self.assertEqual(buffer.read(2, max_bytes=4), (2, b"cdef"))
+            buffer.discard()
+            self.assertEqual(buffer.read(0), (9, b""))
+
+    def test_wait(self):
+        buffer = OutputBuffer()
+        self.assertFalse(buffer.wait(0, timeout=0.01))
+        threading.Timer(0.05, buffer.write, args=(b"x",)).start()
+        self.assertTrue(buffer.wait(0, timeout=5))
+        threading.Timer(0.05, buffer.close).start()
+        self.assertFalse(buffer.wait(1, timeout=5))
+        self.assertTrue(buffer.closed)
+
+
+def wait_closed(buffer, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not buffer.closed and time.monotonic() < deadline:
+        buffer.wait(buffer.end, timeout=0.1)
+    return buffer.closed
+
+
+class FullDiskBuffer(OutputBuffer):
+    def write(self, data):
+        raise OSError(28, "No space left on device")
+
+
+class TestOutputPump(unittest.TestCase):
+    def test_drains_processes_without_readers(self):
+        pump = OutputPump()
+        processes, buffers = [], []
+        for _ in range(5):
+            # Far more than a pipe holds, so the process only exits if drained
+            process = subprocess.Popen(
+                [sys.executable, "-c", "import sys; sys.stdout.write('x' * 2000000)"],
+                stdout=subprocess.PIPE,
+            )
+            buffer = OutputBuffer(max_memory=1000)
+            pump.add(process.stdout, buffer)
+            processes.append(process)
+            buffers.append(buffer)
+
+        for process, buffer in zip(processes, buffers):
+            self.assertEqual(process.wait(timeout=30), 0)
+            while not buffer.closed:
+                buffer.wait(buffer.end, timeout=5)
+            self.assertEqual(buffer.end, 2000000)
+            self.assertEqual(buffer.read(0), (1999000, b"x" * 1000))
+
+    def test_failing_stream_does_not_stop_the_others(self):
+        pump = OutputPump()
+        failing_read, failing_write = os.pipe()
+        failing_pipe = os.fdopen(failing_read, "rb")
+        failing = FullDiskBuffer()
+        pump.add(failing_pipe, failing)
+        os.write(failing_write, b"lost")
+        self.assertTrue(wait_closed(failing))
+        self.assertIsInstance(failing.error, OSError)
+        self.assertTrue(failing_pipe.closed)
+        os.close(failing_write)
+
+        read_fd, write_fd = os.pipe()
+        buffer = OutputBuffer()
+        pump.add(os.fdopen(read_fd, "rb"), buffer)
+        os.write(write_fd, b"still read")
+        os.close(write_fd)
+        self.assertTrue(wait_closed(buffer))
+        self.assertEqual(buffer.read(0), (0, b"still read"))
+        self.assertIsNone(buffer.error)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+from commandAGI._utils.output_stream import (
+    OutputChunk,
+    ProcessExit,
+    collect_output,
+    decode_sse_events,
+    encode_sse_error,
+    encode_sse_event,
+    iter_process_output,
+    limit_output,
+)
+
+
+def python_process(code):
+    return subprocess.Popen(
+        [sys.executable, "-c", code],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+
+
+def chunks(*texts):
+    return [OutputChunk(stream="stdout", data=text) for text in texts] + [
+        ProcessExit(returncode=0)
+    ]
+
+
+class TestIterProcessOutput(unittest.TestCase):
+    def test_output_arrives_before_exit(self):
+        process = python_process(
+            "import sys, time\n"
+            "sys.stdout.write('first\\n'); sys.stdout.flush()\n"
+            "time.sleep(0.5)\n"
+            "sys.stderr.write('second\\n'); sys.stderr.flush()\n"
+            "sys.exit(3)\n"
+        )
+        events = iter_process_output(process)
+        started = time.monotonic()
+        self.assertEqual(next(events), OutputChunk(stream="stdout", data="first\n"))
+        self.assertLess(time.monotonic() - started, 0.4)
+        rest = list(events)
+        self.assertEqual(rest[0], OutputChunk(stream="stderr", data="second\n"))
+        self.assertEqual(rest[-1], ProcessExit(returncode=3))
+
+    def test_timeout_kills_the_process(self):
+        process = python_process("import time; time.sleep(30)")
+        result = collect_output(iter_process_output(process, timeout=0.2))
+        self.assertTrue(result["timed_out"])
+        self.assertIsNone(result["returncode"])
+        self.assertIsNotNone(process.poll())
+
+    def test_closing_kills_the_process(self):
+        process = python_process("import time\nprint('hi', flush=True)\ntime.sleep(30)")
+        events = iter_process_output(process)
+        next(events)
+        events.close()
+        self.assertIsNotNone(process.poll())
+
+    def test_cancel_kills_a_quiet_process(self):
+        process = python_process("import time; time.sleep(30)")
+        cancel = threading.Event()
+        threading.Timer(0.2, cancel.set).start()
+        started = time.monotonic()
+        self.assertEqual(list(iter_process_output(process, cancel=cancel)), [])
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertIsNotNone(process.poll())
+
+    @unittest.skipUnless(os.name == "posix", "process groups are POSIX only")
+    def test_killing_a_group_leader_kills_its_children(self):
+        with tempfile.TemporaryDirectory() as directory:
+            marker = os.path.join(directory, "survived")
+            process = subprocess.Popen(
+                f"(sleep 0.5; touch {marker}) & echo started; wait",
+                shell=True,
+                start_new_session=True,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+            events = iter_process_output(process)
+            next(events)
+            events.close()
+            time.sleep(1)
+            self.assertFalse(os.path.exists(marker))
+
+
+class TestLimitOutput(unittest.TestCase):
+    def test_no_limit(self):
+        self.assertEqual(list(limit_output(chunks("a", "b"))), chunks("a", "b"))
+
+    def test_head(self):
+        events = list(limit_output(chunks("abc", "def", "ghi"), 4))
+        self.assertEqual(events[:-1], chunks("abc", "d")[:-1])
+        self.assertEqual(events[-1].dropped_bytes, 5)
+
+    def test_tail(self):
+        events = list(limit_output(chunks("abc", "def", "ghi"), 4, tail=True))
+        self.assertEqual(events[:-1], chunks("f", "ghi")[:-1])
+        self.assertEqual(events[-1].dropped_bytes, 5)
+
+    def test_characters_are_not_split(self):
+        result = collect_output(limit_output(chunks("héllo"), 2))
+        self.assertEqual(result["stdout"], "h")
+
+
+class TestServerSentEvents(unittest.TestCase):
+    def test_round_trip(self):
+        events = [
+            OutputChunk(stream="stdout", data="line\n\nwith blank"),
+            OutputChunk(stream="stderr", data="oops"),
+            ProcessExit(returncode=1, dropped_bytes=7),
+        ]
+        body = b"".join(encode_sse_event(event) for event in events)
+        lines = (b": keep-alive\n\n" + body).decode().split("\n")
+        self.assertEqual(list(decode_sse_events(lines)), events)
+
+    def test_error(self):
+        lines = encode_sse_error("no shell").decode().split("\n")
+        with self.assertRaisesRegex(RuntimeError, "no shell"):
+            list(decode_sse_events(lines))
+
+
+if __name__ == "__main__":
+    unittest.main()
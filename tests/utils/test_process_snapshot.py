@@ -0,0 +1,53 @@
+import os
+import unittest
+from unittest.mock import patch
+
+from commandAGI._utils.process_snapshot import PROCESS_FIELDS, ProcessSampler
+
+
+class TestProcessSampler(unittest.TestCase):
+    def setUp(self):
+        self.sampler = ProcessSampler(ttl=60, sample_interval=0)
+
+    def own_process(self, processes):
+        return next(p for p in processes if p["pid"] == os.getpid())
+
+    def test_snapshot_includes_all_fields_in_order(self):
+        info = self.own_process(self.sampler.snapshot())
+        self.assertEqual(tuple(info), PROCESS_FIELDS)
+        self.assertGreater(info["memory_mb"], 0)
+        self.assertIsInstance(info["cmdline"], list)
+
+    def test_field_selection(self):
+        info = self.own_process(self.sampler.snapshot(fields=["pid", "status"]))
+        self.assertEqual(set(info), {"pid", "status"})
+
+    def test_unknown_field_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.sampler.snapshot(fields=["pid", "favourite_colour"])
+
+    def test_recent_snapshot_is_reused(self):
+        self.sampler.snapshot()
+        with patch("psutil.pids") as pids:
+            self.sampler.snapshot(fields=["pid", "name"])
+        pids.assert_not_called()
+
+    def test_wider_field_set_resamples(self):
+        self.sampler.snapshot(fields=["pid"])
+        info = self.own_process(self.sampler.snapshot(fields=["pid", "name"]))
+        self.assertIn("name", info)
+
+    def test_cpu_window_is_shared_across_processes(self):
+        sampler = ProcessSampler(ttl=0, sample_interval=0.05)
+        # Pin the process list so no new process shows up between snapshots
+        pids = [os.getpid()]
+        with patch("psutil.pids", return_value=pids), patch("time.sleep") as sleep:
+            sampler.snapshot(fields=["pid", "cpu_percent"])
+            self.assertEqual(sleep.call_count, 1)
+            # Every process is primed now, so the next snapshot doesn't wait
+            sampler.snapshot(fields=["pid", "cpu_percent"])
+            self.assertEqual(sleep.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import base64
+import io
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from commandAGI._utils.image import RawFrame, process_screenshot
+
+
+class TestRawFrame(unittest.TestCase):
+    def setUp(self):
+        # 2x3 BGRA frame where every pixel is pure red (B=0, G=0, R=255, A=255)
+        self.width, self.height = 3, 2
+        self.buffer = bytearray([0, 0, 255, 255] * self.width * self.height)
+        self.frame = RawFrame(self.buffer, self.width, self.height)
+
+    def test_to_ndarray_is_readonly_view(self):
+        array = self.frame.to_ndarray()
+        self.assertEqual(array.shape, (2, 3, 4))
+        self.assertFalse(array.flags.writeable)
+        # The array shares memory with the capture buffer instead of copying it
+        self.buffer[0] = 7
+        self.assertEqual(array[0, 0, 0], 7)
+
+    def test_to_pil(self):
+        img = self.frame.to_pil()
+        self.assertEqual(img.mode, "RGB")
+        self.assertEqual(img.size, (3, 2))
+        self.assertEqual(img.getpixel((0, 0)), (255, 0, 0))
+
+    def test_to_base64_round_trip(self):
+        img = Image.open(io.BytesIO(base64.b64decode(self.frame.to_base64())))
+        self.assertEqual(img.size, (3, 2))
+        self.assertEqual(img.getpixel((2, 1)), (255, 0, 0))
+
+    def test_process_screenshot_detects_raw_input(self):
+        observation = process_screenshot(self.frame, output_format="base64")
+        img = Image.open(io.BytesIO(base64.b64decode(observation.screenshot)))
+        self.assertEqual(np.array(img).shape, (2, 3, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
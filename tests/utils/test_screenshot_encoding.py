@@ -0,0 +1,47 @@
+import unittest
+
+from PIL import Image
+
+from commandAGI._utils.image import decode_screenshot, encode_screenshot
+
+
+class TestScreenshotEncoding(unittest.TestCase):
+    def setUp(self):
+        self.img = Image.new("RGB", (200, 100), color="red")
+        self.img.paste((0, 0, 255), (50, 20, 70, 40))
+
+    def test_png_is_lossless(self):
+        data, metadata = encode_screenshot(self.img)
+        self.assertEqual(metadata["mime_type"], "image/png")
+        decoded = decode_screenshot(data, metadata)
+        self.assertEqual(list(decoded.getdata()), list(self.img.getdata()))
+
+    def test_lossy_codecs_scale_down(self):
+        for codec in ("jpeg", "webp"):
+            data, metadata = encode_screenshot(
+                self.img, codec=codec, quality=50, scale=0.5
+            )
+            self.assertEqual((metadata["width"], metadata["height"]), (100, 50))
+            self.assertEqual(decode_screenshot(data, metadata).size, (100, 50))
+
+    def test_region_is_cropped_before_scaling(self):
+        data, metadata = encode_screenshot(
+            self.img, codec="raw", region=(50, 20, 20, 20), scale=0.5
+        )
+        self.assertEqual(len(data), 10 * 10 * 3)
+        decoded = decode_screenshot(data, metadata)
+        self.assertEqual(decoded.getpixel((5, 5)), (0, 0, 255))
+
+    def test_rgba_is_flattened_for_jpeg(self):
+        data, metadata = encode_screenshot(self.img.convert("RGBA"), codec="jpeg")
+        self.assertEqual(decode_screenshot(data, metadata).mode, "RGB")
+
+    def test_rejects_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            encode_screenshot(self.img, codec="gif")
+        with self.assertRaises(ValueError):
+            encode_screenshot(self.img, scale=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import select
+import subprocess
+import unittest
+
+from commandAGI._utils.shell_protocol import SentinelCommand
+
+
+def feed_bytewise(command, data):
+    return b"".join(command.feed(data[i : i + 1]) for i in range(len(data)))
+
+
+class TestSentinelCommand(unittest.TestCase):
+    def test_markers_split_across_reads(self):
+        command = SentinelCommand("echo hello")
+        token = command.token.encode()
+        data = b"$ " + token + b"B\nhello\nworld\n\n" + token + b"E:0\n$ "
+        self.assertEqual(feed_bytewise(command, data), b"hello\nworld\n")
+        self.assertTrue(command.done)
+        self.assertEqual(command.returncode, 0)
+        self.assertEqual(command.output, b"hello\nworld\n")
+
+    def test_output_without_trailing_newline(self):
+        command = SentinelCommand("printf done", windows=True)
+        token = command.token.encode()
+        command.feed(token + b"B\r\ndone\r\n" + token + b"E:1\r\n")
+        self.assertEqual(command.output, b"done")
+        self.assertEqual(command.returncode, 1)
+
+    def test_stale_output_is_discarded(self):
+        command = SentinelCommand("true")
+        token = command.token.encode()
+        self.assertEqual(command.feed(b"late output of another command\n"), b"")
+        self.assertFalse(command.started)
+        command.feed(token + b"B\n\n" + token + b"E:0\nignored")
+        self.assertEqual(command.output, b"")
+        self.assertEqual(command.feed(b"more"), b"")
+
+    def test_markers_of_other_commands_are_ignored(self):
+        earlier = SentinelCommand("sleep 10")
+        command = SentinelCommand("true")
+        stale = earlier.token.encode() + b"E:0\n"
+        command.feed(command.token.encode() + b"B\n" + stale)
+        self.assertFalse(command.done)
+        command.feed(b"\n" + command.token.encode() + b"E:0\n")
+        self.assertEqual(command.output, stale)
+
+    @unittest.skipIf(os.name == "nt", "needs a POSIX shell")
+    def test_shell_session(self):
+        shell = subprocess.Popen(
+            ["sh", "-s"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+        )
+        self.addCleanup(shell.wait)
+        self.addCleanup(shell.stdin.close)
+        self.addCleanup(shell.stdout.close)
+
+        def run(text):
+            command = SentinelCommand(text)
+            shell.stdin.write(command.script)
+            shell.stdin.flush()
+            while not command.done:
+                ready, _, _ = select.select([shell.stdout], [], [], 10)
+                self.assertTrue(ready, "shell did not answer")
+                data = os.read(shell.stdout.fileno(), 65536)
+                self.assertTrue(data, "shell exited")
+                command.feed(data)
+            return command
+
+        command = run("echo out; echo err >&2; (exit 3)")
+        self.assertEqual(command.output, b"out\nerr\n")
+        self.assertEqual(command.returncode, 3)
+        command = run("printf 'no newline'")
+        self.assertEqual(command.output, b"no newline")
+        self.assertEqual(command.returncode, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from commandAGI._utils.template_match import (
+    match_templates,
+    non_max_suppression,
+    prepare_template,
+    to_match_image,
+)
+
+
+class TestTemplateMatch(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.icon = rng.integers(0, 256, size=(12, 16, 3), dtype=np.uint8)
+        self.other = rng.integers(0, 256, size=(10, 10, 3), dtype=np.uint8)
+        self.frame = np.full((120, 160, 3), 128, dtype=np.uint8)
+        self.frame[10:22, 20:36] = self.icon
+        self.frame[70:82, 100:116] = self.icon
+        self.frame[40:50, 60:70] = self.other
+
+    def test_finds_every_occurrence_of_every_template(self):
+        frame = to_match_image(self.frame, grayscale=True)
+        icon, other = (
+            prepare_template(Image.fromarray(self.icon)),
+            prepare_template(self.other),
+        )
+        icon_matches, other_matches = match_templates(frame, [icon, other])
+        self.assertEqual(
+            sorted((m["left"], m["top"]) for m in icon_matches), [(20, 10), (100, 70)]
+        )
+        self.assertEqual([(m["x"], m["y"]) for m in other_matches], [(65, 45)])
+        self.assertGreater(icon_matches[0]["score"], 0.99)
+
+    def test_max_matches(self):
+        frame = to_match_image(self.frame, grayscale=True)
+        (matches,) = match_templates(
+            frame, [prepare_template(self.icon)], max_matches=1
+        )
+        self.assertEqual(len(matches), 1)
+
+    def test_multi_scale_finds_upscaled_icon(self):
+        frame = np.full((120, 160, 3), 128, dtype=np.uint8)
+        frame[30:54, 40:72] = cv2.resize(
+            self.icon, (32, 24), interpolation=cv2.INTER_LINEAR
+        )
+        template = prepare_template(self.icon, grayscale=False)
+        frame = to_match_image(frame, grayscale=False)
+        (matches,) = match_templates(frame, [template], scales=(1.0, 2.0))
+        self.assertEqual(len(matches), 1)
+        self.assertEqual(matches[0]["scale"], 2.0)
+        self.assertEqual((matches[0]["width"], matches[0]["height"]), (32, 24))
+
+    def test_template_larger_than_frame_has_no_matches(self):
+        frame = to_match_image(self.frame[:8, :8], grayscale=True)
+        self.assertEqual(match_templates(frame, [prepare_template(self.icon)]), [[]])
+
+    def test_non_max_suppression(self):
+        boxes = np.array([[0, 0, 10, 10], [2, 0, 10, 10], [30, 30, 10, 10]])
+        scores = np.array([0.9, 0.95, 0.85])
+        self.assertEqual(non_max_suppression(boxes, scores), [1, 2])
+        self.assertEqual(
+            non_max_suppression(boxes, scores, overlap_threshold=0.9), [1, 0, 2]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()